@@ -23,9 +23,29 @@ from ..rpc.rpc_meta import RpcMeta, async_func, sync_func
 from ..logging import log_stream_msg, log_msg
 from ..manager import ModelManager
 from ..message import Msg, ToolUseBlock, TextBlock
+from ..models import ResponseStream
 from ..memory import TemporaryMemory
 
 
+def _iter_stream_deltas(
+    stream: Union[
+        Generator[Tuple[bool, str], None, None],
+        ResponseStream,
+    ],
+) -> Generator[Tuple[bool, str], None, None]:
+    """Iterate over the increments of a stream, which can be the stream of
+    a model response, or a generator that yields `(last, text)` tuples with
+    the accumulated text."""
+    if isinstance(stream, ResponseStream):
+        yield from stream.deltas()
+        return
+
+    length = 0
+    for last, text in stream:
+        yield last, text[length:]
+        length = len(text)
+
+
 class _HooksMeta(type):
     """The hooks metaclass for all agents."""
 
@@ -218,8 +238,9 @@ class AgentBase(metaclass=_AgentMeta):
     """The class-level hook functions that will be called before printing,
     which takes the `self` object, a deep copied printing message, a streaming
     flag, and a last flag as input. In streaming mode, the deep copied message
-    will be a chunk of the original message, the streaming flat will be
-    `True`, and the last flag will be `False` at the end of the streaming.
+    will be a chunk of the original message, whose content is the increment
+    of the text since the previous chunk, the streaming flag will be `True`,
+    and the last flag will be `True` at the end of the streaming.
     If the hook returns a message, the new message will be passed to the next
     hook or the original speak function. Otherwise, the original input
     message will be passed instead."""
@@ -383,11 +404,12 @@ class AgentBase(metaclass=_AgentMeta):
 
         return res
 
-    def speak(
+    def speak(  # pylint: disable=too-many-branches
         self,
         content: Union[
             str,
             Msg,
+            ResponseStream,
             Generator[Tuple[bool, str], None, None],
             None,
         ],
@@ -399,13 +421,14 @@ class AgentBase(metaclass=_AgentMeta):
 
         Args:
             content
-             (`Union[str, Msg, Generator[Tuple[bool, str], None, None],
-             None]`):
+             (`Union[str, Msg, ResponseStream, Generator[Tuple[bool, str],
+             None, None], None]`):
                 The content of the message to be spoken out. If a string is
                 given, a Msg object will be created with the agent's name, role
                 as "assistant", and the given string as the content.
-                If the content is a Generator, the agent will speak out the
-                message chunk by chunk.
+                If the content is the stream of a model response or a
+                Generator, the agent will speak out the message chunk by
+                chunk.
             tool_calls (`Optional[list[ToolUseBlock]]`, defaults to `None`):
                 The tool calls generated by the agent. This parameter is only
                 used when the content is a string or a generator (TODO). When
@@ -435,19 +458,29 @@ class AgentBase(metaclass=_AgentMeta):
             return current_input
 
         # Streaming mode
-        if isinstance(content, GeneratorType):
+        if isinstance(content, (GeneratorType, ResponseStream)):
             # The streaming message must share the same id for displaying in
             # the agentscope studio.
             msg = Msg(name=self.name, content="", role="assistant")
-            for last, text_chunk in content:
-                msg.content = text_chunk  # type: ignore[misc]
-                # Call the hooks
-                new_input = _call_pre_speak_hooks(
-                    msg,
+            texts = []
+            for last, delta in _iter_stream_deltas(content):
+                # Call the hooks with the increment only, so that the cost
+                # of each chunk doesn't grow with the accumulated text
+                chunk = _call_pre_speak_hooks(
+                    msg.model_copy(update={"content": delta}),
                     stream=True,
                     last=last,
                 )
-                log_stream_msg(new_input, last=last)
+                delta = chunk.content
+                if not isinstance(delta, str):
+                    delta = chunk.get_text_content() or ""
+                texts.append(delta)
+
+                if last:
+                    msg.content = "".join(texts)
+                    log_stream_msg(msg, last=True, delta=delta)
+                else:
+                    log_stream_msg(chunk, last=False, delta=delta)
 
             # Call the object-level post speak hooks
             for _, hook in self._hooks_post_speak.items():
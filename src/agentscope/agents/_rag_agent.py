@@ -6,12 +6,14 @@ with LlamaIndex.
 Notice, this is a Beta version of RAG agent.
 """
 import json
-from typing import Any, Optional, Union, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional, Union, Sequence
 from loguru import logger
 
 from ..agents._agent import AgentBase
+from ..constants import DEFAULT_RERANK_BATCH_SIZE
 from ..message.msg import Msg
-from ..rag.knowledge import Knowledge
+from ..rag.knowledge import Knowledge, RetrievedChunk
 
 CHECKING_PROMPT = """
                 Is the retrieved content relevant to the query?
@@ -36,6 +38,11 @@ class LlamaIndexAgent(AgentBase):
         similarity_top_k: int = None,
         log_retrieval: bool = True,
         recent_n_mem_for_retrieve: int = 1,
+        retrieval_timeout: Optional[float] = None,
+        reranker: Optional[
+            Callable[[str, list[RetrievedChunk]], list[float]]
+        ] = None,
+        rerank_batch_size: int = DEFAULT_RERANK_BATCH_SIZE,
         **kwargs: Any,
     ) -> None:
         """
@@ -69,6 +76,20 @@ class LlamaIndexAgent(AgentBase):
             recent_n_mem_for_retrieve (int):
                 The number of pieces of memory used as part of
                 retrieval query
+            retrieval_timeout (Optional[float]):
+                The seconds to wait for the knowledge, which are retrieved
+                concurrently. The results of the knowledge not finished in
+                time are skipped. None means waiting for all of them. Note
+                a timed out retrieval keeps a thread of the agent busy
+                until it finishes.
+            reranker (Optional[Callable]):
+                A function scoring the relevance of a batch of retrieved
+                chunks to the query, which takes the query and the chunks
+                and returns their scores. If given, the merged chunks are
+                ranked by these scores instead of the (normalized)
+                retrieval scores, which are only comparable in rank.
+            rerank_batch_size (int):
+                The number of chunks passed to the reranker at a time
         """
         super().__init__(
             name=name,
@@ -80,7 +101,14 @@ class LlamaIndexAgent(AgentBase):
         self.similarity_top_k = similarity_top_k
         self.log_retrieval = log_retrieval
         self.recent_n_mem_for_retrieve = recent_n_mem_for_retrieve
+        self.retrieval_timeout = retrieval_timeout
+        self.reranker = reranker
+        self.rerank_batch_size = rerank_batch_size
         self.description = kwargs.get("description", "")
+        # created on the first concurrent retrieval and reused by the
+        # following replies
+        self._retrieval_executor: Optional[ThreadPoolExecutor] = None
+        self._retrieval_executor_workers = 0
 
     def reply(self, x: Optional[Union[Msg, Sequence[Msg]]] = None) -> Msg:
         """
@@ -124,27 +152,22 @@ class LlamaIndexAgent(AgentBase):
         if len(query) > 0:
             # when content has information, do retrieval
             scores = []
-            for knowledge in self.knowledge_list:
-                retrieved_chunks = knowledge.retrieve(
-                    str(query),
-                    self.similarity_top_k,
-                )
-                for chunk in retrieved_chunks:
-                    scores.append(chunk.score)
-                    retrieved_docs_to_string += (
-                        json.dumps(
-                            chunk.to_dict(),
-                            ensure_ascii=False,
-                            indent=2,
-                        )
-                        + "\n"
+            for chunk in self.retrieve(str(query)):
+                scores.append(chunk.score)
+                retrieved_docs_to_string += (
+                    json.dumps(
+                        chunk.to_dict(),
+                        ensure_ascii=False,
+                        indent=2,
                     )
+                    + "\n"
+                )
 
             if self.log_retrieval:
                 self.speak("[retrieved]:" + retrieved_docs_to_string)
 
-            if max(scores) < 0.4:
-                # if the max score is lower than 0.4, then we let LLM
+            if scores and max(scores) < 0.4:
+                # if the max (raw) score is lower than 0.4, then we let LLM
                 # decide whether the retrieved content is relevant
                 # to the user input.
                 msg = Msg(
@@ -191,3 +214,144 @@ class LlamaIndexAgent(AgentBase):
             self.memory.add(msg)
 
         return msg
+
+    def retrieve(self, query: str) -> list[RetrievedChunk]:
+        """
+        Retrieve from all the knowledge concurrently, and merge the
+        retrieved chunks into one ranking. The scores of the knowledge are
+        on different scales (e.g. cosine similarity and reciprocal rank
+        fusion), so that if more than one knowledge returns chunks, the
+        merged chunks are ordered by their scores min-max normalized into
+        [0, 1] within each knowledge. The returned chunks keep their raw
+        scores, which are compared with the relevance threshold in
+        `reply`. The chunks retrieved from multiple knowledge are
+        deduplicated by their hashes, keeping the highest ranked one.
+
+        Args:
+            query (`str`):
+                The query for retrieval.
+
+        Returns:
+            `list[RetrievedChunk]`: The merged chunks in the descending
+            order of the re-ranked or normalized scores.
+        """
+        if len(self.knowledge_list) == 0:
+            return []
+        if len(self.knowledge_list) <= 1 and self.retrieval_timeout is None:
+            # no need for the threads to retrieve from a single knowledge
+            results = [
+                knowledge.retrieve(query, self.similarity_top_k)
+                for knowledge in self.knowledge_list
+            ]
+        else:
+            executor = self._get_retrieval_executor()
+            futures = {
+                executor.submit(
+                    knowledge.retrieve,
+                    query,
+                    self.similarity_top_k,
+                ): knowledge
+                for knowledge in self.knowledge_list
+            }
+            done, _ = wait(futures, timeout=self.retrieval_timeout)
+
+            results = []
+            for future, knowledge in futures.items():
+                if future not in done:
+                    # don't wait for the knowledge timed out
+                    future.cancel()
+                    logger.warning(
+                        f"Retrieval from knowledge {knowledge.knowledge_id} "
+                        f"timed out after {self.retrieval_timeout}s, skipped.",
+                    )
+                elif future.exception() is not None:
+                    logger.error(
+                        f"Retrieval from knowledge {knowledge.knowledge_id} "
+                        f"failed, skipped: {future.exception()}",
+                    )
+                else:
+                    results.append(future.result())
+
+        results = [res for res in results if len(res) > 0]
+        if len(results) > 1:
+            rank_scores = [self._normalize_scores(res) for res in results]
+        else:
+            rank_scores = [[chunk.score for chunk in res] for res in results]
+
+        # key -> (rank score, chunk)
+        merged: dict = {}
+        for res, scores in zip(results, rank_scores):
+            for chunk, score in zip(res, scores):
+                key = chunk.hash or str(chunk.content)
+                if key not in merged or score > merged[key][0]:
+                    merged[key] = (score, chunk)
+
+        if self.reranker is not None and len(merged) > 0:
+            chunks = self._rerank(query, [_[1] for _ in merged.values()])
+            return sorted(chunks, key=lambda _: _.score, reverse=True)
+        return [
+            chunk
+            for _, chunk in sorted(
+                merged.values(),
+                key=lambda _: _[0],
+                reverse=True,
+            )
+        ]
+
+    def _get_retrieval_executor(self) -> ThreadPoolExecutor:
+        """Get the executor retrieving from the knowledge concurrently,
+        which is recreated with more threads if more knowledge is equipped
+        since it was created."""
+        n_workers = len(self.knowledge_list)
+        if (
+            self._retrieval_executor is None
+            or self._retrieval_executor_workers < n_workers
+        ):
+            if self._retrieval_executor is not None:
+                self._retrieval_executor.shutdown(wait=False)
+            self._retrieval_executor = ThreadPoolExecutor(
+                max_workers=n_workers,
+                thread_name_prefix="rag-retrieval",
+            )
+            self._retrieval_executor_workers = n_workers
+        return self._retrieval_executor
+
+    @staticmethod
+    def _normalize_scores(chunks: list[RetrievedChunk]) -> list[float]:
+        """Min-max normalize the scores of the chunks retrieved from one
+        knowledge into [0, 1], where the chunks with the same score all get
+        1.0."""
+        scores = [chunk.score for chunk in chunks]
+        low, high = min(scores), max(scores)
+        return [
+            (score - low) / (high - low) if high > low else 1.0
+            for score in scores
+        ]
+
+    def _rerank(
+        self,
+        query: str,
+        chunks: list[RetrievedChunk],
+    ) -> list[RetrievedChunk]:
+        """Score the chunks by the reranker in batches, and replace their
+        scores with the reranked ones."""
+        scores = []
+        for i in range(0, len(chunks), self.rerank_batch_size):
+            batch = chunks[i : i + self.rerank_batch_size]
+            batch_scores = self.reranker(query, batch)
+            if len(batch_scores) != len(batch):
+                raise ValueError(
+                    f"The reranker returned {len(batch_scores)} scores for "
+                    f"{len(batch)} chunks.",
+                )
+            scores.extend(batch_scores)
+        return [
+            RetrievedChunk(
+                score=float(score),
+                content=chunk.content,
+                metadata=chunk.metadata,
+                embedding=chunk.embedding,
+                hash=chunk.hash,
+            )
+            for chunk, score in zip(chunks, scores)
+        ]
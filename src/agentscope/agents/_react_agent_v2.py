@@ -14,6 +14,7 @@ from ..models import (
     AnthropicChatWrapper,
 )
 from ..service import ServiceToolkit, ServiceResponse, ServiceExecStatus
+from ..utils.schema_utils import get_json_schema, get_type_adapter
 
 
 class ReActAgentV2(AgentBase):
@@ -38,6 +39,7 @@ class ReActAgentV2(AgentBase):
         max_iters: int = 10,
         verbose: bool = True,
         exit_reply_without_tool_calls: bool = True,
+        parallel_tool_calls: bool = False,
     ) -> None:
         """Initial the ReAct agent with the given name, model config name and
         tools.
@@ -62,6 +64,10 @@ class ReActAgentV2(AgentBase):
                 Whether to exit the reply function when no tool calls are
                 generated. If `True`, the agent is allowed to generate a
                 response without calling the `generate_response` function.
+            parallel_tool_calls (`bool`, defaults to `False`):
+                Whether to execute the tool calls generated in one reasoning
+                step concurrently. The results are still recorded in the
+                order of the tool calls.
         """
         super().__init__(name=name)
 
@@ -91,6 +97,7 @@ class ReActAgentV2(AgentBase):
         self.verbose = verbose
         self.max_iters = max_iters
         self.exit_reply_without_tool_calls = exit_reply_without_tool_calls
+        self.parallel_tool_calls = parallel_tool_calls
 
         # Used to store the structured output in the current reply
         self._current_structured_output = None
@@ -241,12 +248,29 @@ class ReActAgentV2(AgentBase):
                 otherwise return a message to the user.
         """
         msg_response: Union[None, Msg] = None
-        for tool_call in tool_calls:
-            # Execute the function
-            msg_execution = self.service_toolkit.parse_and_call_func(
-                tool_call,
+
+        # Execute the independent tool calls concurrently in advance
+        executions = None
+        if self.parallel_tool_calls and len(tool_calls) > 1:
+            msg_results = self.service_toolkit.parse_and_call_func(
+                tool_calls,
                 tools_api_mode=True,
+                parallel=True,
             )
+            executions = [
+                Msg("system", [block], role="system")
+                for block in msg_results.content
+            ]
+
+        for index, tool_call in enumerate(tool_calls):
+            # Execute the function
+            if executions is not None:
+                msg_execution = executions[index]
+            else:
+                msg_execution = self.service_toolkit.parse_and_call_func(
+                    tool_call,
+                    tools_api_mode=True,
+                )
 
             # Print and remember the execution result
             if self.verbose:
@@ -255,9 +279,8 @@ class ReActAgentV2(AgentBase):
 
             # When calling finish function, return a message if no structured
             # output is required or have met the structured output
-            if (
-                tool_call["name"] == self._finish_function
-                and self._current_structured_model is None
+            if tool_call["name"] == self._finish_function and (
+                self._current_structured_model is None
                 or self._current_structured_output is not None
             ):
                 # This message won't be record in the memory for duplicate
@@ -307,8 +330,9 @@ class ReActAgentV2(AgentBase):
                 The response to the user.
         """
         if self._current_structured_model:
+            adapter = get_type_adapter(self._current_structured_model)
             try:
-                self._current_structured_model.model_validate(kwargs)
+                adapter.validate_python(kwargs)
                 self._current_structured_output = kwargs
             except ValidationError as e:
                 return ServiceResponse(
@@ -345,7 +369,7 @@ class ReActAgentV2(AgentBase):
 
         self._current_structured_model = structured_output
 
-        output_schema = structured_output.model_json_schema()
+        output_schema = get_json_schema(structured_output)
 
         # Update the schema of the finish function by inserting the
         # structured output schema
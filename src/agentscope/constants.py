@@ -40,6 +40,41 @@ _DEFAULT_MAX_RETRIES = 3
 _DEFAULT_MESSAGES_KEY = "messages"
 _DEFAULT_RETRY_INTERVAL = 1
 _DEFAULT_API_BUDGET = None
+# for model response cache
+_DEFAULT_SUBDIR_RESPONSE_CACHE = "model_response"
+_DEFAULT_RESPONSE_CACHE_MAX_SIZE = 1024
+_DEFAULT_RESPONSE_CACHE_REPLAY_CHUNK_SIZE = 16
+# for model rate limiter
+_DEFAULT_RATE_LIMIT_BURST_SECONDS = 1.0
+_DEFAULT_RATE_LIMIT_DECREASE_FACTOR = 0.5
+_DEFAULT_RATE_LIMIT_INCREASE_STEP = 0.05
+_DEFAULT_RATE_LIMIT_MIN_FACTOR = 0.05
+_DEFAULT_RATE_LIMIT_COOLDOWN = 1.0
+_DEFAULT_RATE_LIMIT_POLL_INTERVAL = 0.05
+# for router model wrapper
+_DEFAULT_ROUTER_EWMA_ALPHA = 0.3
+_DEFAULT_ROUTER_FAILURE_COOLDOWN = 5.0
+_DEFAULT_ROUTER_HEDGE_WORKERS = 16
+# for pushing streaming messages to studio
+_DEFAULT_STUDIO_STREAM_PUSH_INTERVAL = 0.1
+# for formatters
+_DEFAULT_FORMATTER_CACHE_MAX_SIZE = 4096
+_DEFAULT_FORMATTER_DISPATCH_MAX_SIZE = 1024
+# for token counting
+_DEFAULT_TOKENS_CACHE_MAX_SIZE = 65536
+_DEFAULT_TOKENS_MESSAGE_KEYS_MAX_SIZE = 1024
+_DEFAULT_TOKENS_APPROX_CHARS_PER_TOKEN = 8
+# for pydantic schemas and tool function schemas
+_DEFAULT_SCHEMA_CACHE_MAX_SIZE = 256
+# for executing tool functions concurrently
+_DEFAULT_TOOL_MAX_WORKERS = 8
+# for MCP sessions in the background event loop
+_DEFAULT_MCP_MAX_CONCURRENCY = 16
+_DEFAULT_MCP_CLEANUP_TIMEOUT = 5.0
+# for model micro-batching
+_DEFAULT_BATCH_MAX_SIZE = 8
+_DEFAULT_BATCH_MAX_WAIT = 0.01
+_DEFAULT_BATCH_MAX_WORKERS = 32
 # for monitor
 _DEFAULT_TABLE_NAME_FOR_CHAT_AND_EMBEDDING = "chat_and_embedding_model_monitor"
 _DEFAULT_TABLE_NAME_FOR_IMAGE = "image_model_monitor"
@@ -89,3 +124,12 @@ class ShrinkPolicy(IntEnum):
 DEFAULT_CHUNK_SIZE = 1024
 DEFAULT_CHUNK_OVERLAP = 20
 DEFAULT_TOP_K = 5
+DEFAULT_EMBED_BATCH_SIZE = 10
+DEFAULT_EMBED_MAX_CONCURRENCY = 4
+DEFAULT_RETRIEVER_CACHE_MAX_SIZE = 16
+DEFAULT_RRF_K = 60
+DEFAULT_ANN_NPROBE = 16
+DEFAULT_ANN_TRAIN_SIZE = 2048
+DEFAULT_INGESTION_BATCH_SIZE = 128
+DEFAULT_KNOWLEDGE_WARM_UP_WORKERS = 2
+DEFAULT_RERANK_BATCH_SIZE = 32
@@ -1,12 +1,22 @@
 # -*- coding: utf-8 -*-
 """The formatter modules for different models."""
-from ._formatter_base import FormatterBase
+from ._formatter_base import (
+    FormatterBase,
+    register_formatter,
+    get_formatter,
+)
 from ._common_formatter import CommonFormatter
 from ._anthropic_formatter import AnthropicFormatter
 from ._gemini_formatter import GeminiFormatter
 from ._openai_formatter import OpenAIFormatter
 from ._dashscope_formatter import DashScopeFormatter
 
+# The built-in formatters, where CommonFormatter is the fallback
+register_formatter(OpenAIFormatter)
+register_formatter(AnthropicFormatter)
+register_formatter(GeminiFormatter)
+register_formatter(DashScopeFormatter)
+
 __all__ = [
     "FormatterBase",
     "AnthropicFormatter",
@@ -14,4 +24,6 @@ __all__ = [
     "CommonFormatter",
     "GeminiFormatter",
     "DashScopeFormatter",
+    "register_formatter",
+    "get_formatter",
 ]
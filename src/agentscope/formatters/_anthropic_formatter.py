@@ -35,39 +35,7 @@ class AnthropicFormatter(FormatterBase):
 
         formatted_msgs = []
         for index, msg in enumerate(msgs):
-            content = []
-            for block in msg.get_content_blocks():
-                if block.get("type") == "text":
-                    content.append(
-                        {
-                            "type": "text",
-                            "text": block.get("text"),
-                        },
-                    )
-                elif block.get("type") == "image":
-                    content.append(
-                        {
-                            "type": "image",
-                            "source": _to_anthropic_image_url(
-                                str(block.get("url")),
-                            ),
-                        },
-                    )
-                elif block.get("type") == "tool_use":
-                    content.append(dict(block))
-                elif block.get("type") == "tool_result":
-                    content.append(
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": block.get("id"),
-                            "content": block.get("output"),
-                        },
-                    )
-                else:
-                    logger.warning(
-                        f"Unsupported block type: {block.get('type')}",
-                        "skipped",
-                    )
+            content = cls._format_chat_content(msg)
 
             # Claude only allow the first message to be system message
             if msg.role == "system" and index != 0:
@@ -83,6 +51,45 @@ class AnthropicFormatter(FormatterBase):
             )
         return formatted_msgs
 
+    @staticmethod
+    def _format_chat_content(msg: Msg) -> list[dict]:
+        """Format the content blocks of a single message in chat
+        scenario."""
+        content = []
+        for block in msg.get_content_blocks():
+            if block.get("type") == "text":
+                content.append(
+                    {
+                        "type": "text",
+                        "text": block.get("text"),
+                    },
+                )
+            elif block.get("type") == "image":
+                content.append(
+                    {
+                        "type": "image",
+                        "source": _to_anthropic_image_url(
+                            str(block.get("url")),
+                        ),
+                    },
+                )
+            elif block.get("type") == "tool_use":
+                content.append(dict(block))
+            elif block.get("type") == "tool_result":
+                content.append(
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": block.get("id"),
+                        "content": block.get("output"),
+                    },
+                )
+            else:
+                logger.warning(
+                    f"Unsupported block type: {block.get('type')}",
+                    "skipped",
+                )
+        return content
+
     @classmethod
     def format_multi_agent(
         cls,
@@ -110,29 +117,13 @@ class AnthropicFormatter(FormatterBase):
                 sys_prompt = msg.get_text_content()
             else:
                 # Merge all messages into a conversation history prompt
-                for block in msg.get_content_blocks():
-                    typ = block.get("type")
-                    if typ == "text":
-                        dialogue.append(
-                            f"{msg.name}: {block.get('text')}",
-                        )
-                    elif typ == "tool_use":
-                        dialogue.append(
-                            f"<tool_use>{block}</tool_use>",
-                        )
-                    elif typ == "tool_result":
-                        dialogue.append(
-                            f"<tool_result>{block}</tool_result>",
-                        )
-                    elif typ == "image":
-                        image_blocks.append(
-                            {
-                                "type": "image",
-                                "source": _to_anthropic_image_url(
-                                    str(block.get("url")),
-                                ),
-                            },
-                        )
+                lines, images = cls._format_msg_cached(
+                    "multi_agent",
+                    msg,
+                    cls._format_multi_agent_msg,
+                )
+                dialogue.extend(lines)
+                image_blocks.extend(images)
 
         content_components = []
 
@@ -159,6 +150,37 @@ class AnthropicFormatter(FormatterBase):
 
         return messages
 
+    @staticmethod
+    def _format_multi_agent_msg(msg: Msg) -> tuple[list[str], list[dict]]:
+        """Format a single message in multi-agent scenario into the lines of
+        the conversation history and the image blocks."""
+        lines = []
+        images = []
+        for block in msg.get_content_blocks():
+            typ = block.get("type")
+            if typ == "text":
+                lines.append(
+                    f"{msg.name}: {block.get('text')}",
+                )
+            elif typ == "tool_use":
+                lines.append(
+                    f"<tool_use>{block}</tool_use>",
+                )
+            elif typ == "tool_result":
+                lines.append(
+                    f"<tool_result>{block}</tool_result>",
+                )
+            elif typ == "image":
+                images.append(
+                    {
+                        "type": "image",
+                        "source": _to_anthropic_image_url(
+                            str(block.get("url")),
+                        ),
+                    },
+                )
+        return lines, images
+
     @classmethod
     def format_tools_json_schemas(cls, schemas: dict[str, dict]) -> list[dict]:
         """Format the JSON schemas of the tool functions to the format that
@@ -68,56 +68,67 @@ class DashScopeFormatter(FormatterBase):
 
         formatted_msgs: list[dict] = []
         for msg in input_msgs:
-            content_blocks = []
-            tool_calls = []
-            for block in msg.get_content_blocks():
-                typ = block.get("type")
-                if typ in ["text", "image", "audio"]:
-                    content_blocks.append(
-                        {
-                            typ: block.get("text", block.get("url")),
-                        },
-                    )
-                elif typ == "tool_use":
-                    tool_calls.append(
-                        {
-                            "id": block.get("id"),
-                            "type": "function",
-                            "function": {
-                                "name": block.get("name"),
-                                "arguments": json.dumps(
-                                    block.get("input", {}),
-                                    ensure_ascii=False,
-                                ),
-                            },
-                        },
-                    )
-
-                elif typ == "tool_result":
-                    formatted_msgs.append(
-                        {
-                            "role": "tool",
-                            "tool_call_id": block.get("id"),
-                            "content": str(block.get("output")),
+            formatted_msgs.extend(
+                cls._format_msg_cached("chat", msg, cls._format_chat_msg),
+            )
+
+        return formatted_msgs
+
+    @staticmethod
+    def _format_chat_msg(msg: Msg) -> list[dict]:
+        """Format a single message in chat scenario, where the tool results
+        are formatted into separate tool messages."""
+        formatted_msgs: list[dict] = []
+        content_blocks = []
+        tool_calls = []
+        for block in msg.get_content_blocks():
+            typ = block.get("type")
+            if typ in ["text", "image", "audio"]:
+                content_blocks.append(
+                    {
+                        typ: block.get("text", block.get("url")),
+                    },
+                )
+            elif typ == "tool_use":
+                tool_calls.append(
+                    {
+                        "id": block.get("id"),
+                        "type": "function",
+                        "function": {
                             "name": block.get("name"),
+                            "arguments": json.dumps(
+                                block.get("input", {}),
+                                ensure_ascii=False,
+                            ),
                         },
-                    )
-                else:
-                    logger.warning(
-                        f"Unsupported block type {typ} in the message, "
-                        f"skipped.",
-                    )
+                    },
+                )
 
-            msg_dashscope = {
-                "role": msg.role,
-                "content": content_blocks or None,
-            }
+            elif typ == "tool_result":
+                formatted_msgs.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": block.get("id"),
+                        "content": str(block.get("output")),
+                        "name": block.get("name"),
+                    },
+                )
+            else:
+                logger.warning(
+                    f"Unsupported block type {typ} in the message, "
+                    f"skipped.",
+                )
+
+        msg_dashscope = {
+            "role": msg.role,
+            "content": content_blocks or None,
+        }
 
-            if tool_calls:
-                msg_dashscope["tool_calls"] = tool_calls
+        if tool_calls:
+            msg_dashscope["tool_calls"] = tool_calls
 
-            if msg_dashscope["content"] or msg_dashscope.get("tool_calls"):
-                formatted_msgs.append(msg_dashscope)
+        if msg_dashscope["content"] or msg_dashscope.get("tool_calls"):
+            formatted_msgs.append(msg_dashscope)
 
         return formatted_msgs
 
@@ -147,17 +158,14 @@ class DashScopeFormatter(FormatterBase):
                     },
                 )
             else:
-                # text message
-                if msg.get_text_content():
-                    dialogue.append(
-                        f"{msg.name}: {msg.get_text_content()}",
-                    )
-                # image and audio
-                for block in msg.get_content_blocks():
-                    if block.get("type") in ["image", "audio"]:
-                        image_or_audio_dicts.extend(
-                            cls._convert_url(str(block.get("url"))),
-                        )
+                line, urls = cls._format_msg_cached(
+                    "multi_agent",
+                    msg,
+                    cls._format_multi_agent_msg,
+                )
+                if line is not None:
+                    dialogue.append(line)
+                image_or_audio_dicts.extend(urls)
 
         dialogue_history = "\n".join(dialogue)
 
@@ -180,6 +188,26 @@ class DashScopeFormatter(FormatterBase):
 
         return messages
 
+    @classmethod
+    def _format_multi_agent_msg(
+        cls,
+        msg: Msg,
+    ) -> tuple[Union[str, None], list[dict]]:
+        """Format a single message in multi-agent scenario into a line of the
+        conversation history and the image or audio dicts."""
+        line = None
+        # text message
+        if msg.get_text_content():
+            line = f"{msg.name}: {msg.get_text_content()}"
+
+        # image and audio
+        urls = []
+        for block in msg.get_content_blocks():
+            if block.get("type") in ["image", "audio"]:
+                urls.extend(cls._convert_url(str(block.get("url"))))
+
+        return line, urls
+
     @classmethod
     def format_tools_json_schemas(cls, schemas: dict[str, dict]) -> list[dict]:
         """Format the JSON schemas of the tool functions to the format that
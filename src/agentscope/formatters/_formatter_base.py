@@ -2,10 +2,29 @@
 """The base class for formatters."""
 import collections
 import re
+import threading
 from abc import abstractmethod, ABC
-from typing import Union, Any
+from typing import Union, Any, Callable, Optional, Type
 
 from ..message import Msg
+from ..constants import (
+    _DEFAULT_FORMATTER_CACHE_MAX_SIZE,
+    _DEFAULT_FORMATTER_DISPATCH_MAX_SIZE,
+)
+
+_MEDIA_BLOCK_TYPES = ("image", "audio", "video", "file")
+"""The types of the content blocks whose messages are not cached."""
+
+
+def _copy_formatted(formatted: Any) -> Any:
+    """Copy the top-level dicts of a formatted result, so that the caller
+    can modify the returned messages (e.g. replacing their content) without
+    modifying the cache."""
+    if isinstance(formatted, dict):
+        return formatted.copy()
+    if isinstance(formatted, list):
+        return [_.copy() if isinstance(_, dict) else _ for _ in formatted]
+    return formatted
 
 
 class FormatterBase(ABC):
@@ -14,13 +33,122 @@ class FormatterBase(ABC):
     supported_model_regexes: list[str]
     """The supported model regexes"""
 
+    _compiled_regexes: tuple[tuple, list[re.Pattern], dict[str, bool]]
+    """The snapshot of the supported model regexes, the compiled patterns,
+    and the memoised matching results by model names, which are created for
+    each formatter class on its first check."""
+
+    _format_cache: collections.OrderedDict = collections.OrderedDict()
+    """The formatted messages shared by all formatters, keyed by the
+    formatter, the format strategy, and the id of the message."""
+
+    _format_cache_lock = threading.Lock()
+
+    @classmethod
+    def _format_msg_cached(
+        cls,
+        strategy: str,
+        msg: Msg,
+        format_func: Callable[[Msg], Any],
+    ) -> Any:
+        """Format a single message by `format_func`, and cache the result,
+        so that in a growing conversation only the new messages are
+        formatted, and the formatted history is reused in the following
+        calls.
+
+        The cache is keyed by the message id, and a cached result is only
+        used if the message still has the same role, name and content
+        object (and the same number of blocks), which are compared without
+        walking the content. So a message whose content is replaced or
+        extended (e.g. by the hooks) is formatted again, while a block
+        modified in place is not detected. The messages with media blocks
+        (e.g. images) are not cached, since the local files may be loaded
+        as large base64 strings, and modified without changing the
+        message.
+
+        Args:
+            strategy (`str`):
+                The name of the format strategy, e.g. "chat" or
+                "multi_agent", which distinguishes the different results of
+                the same message in the same formatter.
+            msg (`Msg`):
+                The message to be formatted.
+            format_func (`Callable[[Msg], Any]`):
+                The function to format the message on cache miss.
+
+        Returns:
+            `Any`: The formatted result, whose top-level dicts are copies,
+            while the nested values are shared with the cache and shouldn't
+            be modified in place.
+        """
+        key = (cls, strategy, msg.id)
+        content = msg.content
+        n_blocks = -1 if isinstance(content, str) else len(content)
+
+        # The lookup is not locked, since reading and reordering the cache
+        # are atomic, and locking costs as much as formatting a short text
+        entry = cls._format_cache.get(key, None)
+        if (
+            entry is not None
+            and entry[0] is content
+            and entry[1] == n_blocks
+            and entry[2] == msg.role
+            and entry[3] == msg.name
+        ):
+            try:
+                cls._format_cache.move_to_end(key)
+            except KeyError:
+                # evicted by another thread
+                pass
+            return _copy_formatted(entry[4])
+
+        formatted = format_func(msg)
+        if n_blocks >= 0 and any(
+            isinstance(block, dict) and block.get("type") in _MEDIA_BLOCK_TYPES
+            for block in content
+        ):
+            return formatted
+
+        with cls._format_cache_lock:
+            cls._format_cache[key] = (
+                content,
+                n_blocks,
+                msg.role,
+                msg.name,
+                formatted,
+            )
+            while len(cls._format_cache) > _DEFAULT_FORMATTER_CACHE_MAX_SIZE:
+                cls._format_cache.popitem(last=False)
+
+        return _copy_formatted(formatted)
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Clear the cached formatted messages of all formatters."""
+        with FormatterBase._format_cache_lock:
+            FormatterBase._format_cache.clear()
+
     @classmethod
     def is_supported_model(cls, model_name: str) -> bool:
-        """Check if the provided model_name is supported by the formatter."""
-        for regex in cls.supported_model_regexes:
-            if re.match(regex, model_name):
-                return True
-        return False
+        """Check if the provided model_name is supported by the formatter.
+
+        The regexes are compiled once, and the results are memoised by the
+        model name. If `supported_model_regexes` is modified, they are
+        compiled again in the next check.
+        """
+        regexes = tuple(cls.supported_model_regexes)
+        compiled = cls.__dict__.get("_compiled_regexes", None)
+        if compiled is None or compiled[0] != regexes:
+            compiled = (regexes, [re.compile(_) for _ in regexes], {})
+            cls._compiled_regexes = compiled
+
+        _, patterns, results = compiled
+        result = results.get(model_name, None)
+        if result is None:
+            result = any(_.match(model_name) for _ in patterns)
+            if len(results) < _DEFAULT_FORMATTER_DISPATCH_MAX_SIZE:
+                results[model_name] = result
+        return result
 
     @classmethod
     def format_auto(
@@ -200,11 +328,9 @@ class FormatterBase(ABC):
 
             else:
                 # Merge all messages into a conversation history prompt
-                text_content = msg.get_text_content()
-                if text_content is not None:
-                    dialogue.append(
-                        f"{msg.name}: {msg.get_text_content()}",
-                    )
+                line = cls._format_dialogue_line(msg)
+                if line is not None:
+                    dialogue.append(line)
 
         content_components = []
 
@@ -225,6 +351,15 @@ class FormatterBase(ABC):
 
         return messages
 
+    @staticmethod
+    def _format_dialogue_line(msg: Msg) -> Union[str, None]:
+        """Format the text content of a message into a line of the
+        conversation history, or `None` if no text content."""
+        text_content = msg.get_text_content()
+        if text_content is None:
+            return None
+        return f"{msg.name}: {text_content}"
+
     @staticmethod
     def check_and_flat_messages(
         *msgs: Union[Msg, list[Msg], None],
@@ -253,3 +388,92 @@ class FormatterBase(ABC):
             f"The method `format_tools_json_schemas` is not implemented yet "
             f"in {cls.__name__}.",
         )
+
+
+_registered_formatters: list[Type[FormatterBase]] = []
+"""The registered formatter classes, where the latter registered ones take
+precedence over the former ones."""
+
+_dispatch_table: dict[str, Optional[Type[FormatterBase]]] = {}
+"""The memoised mapping from the model names to the formatter classes."""
+
+_registry_lock = threading.Lock()
+
+
+def register_formatter(
+    formatter_class: Type[FormatterBase],
+    exist_ok: bool = False,
+) -> None:
+    """Register the formatter class, so that it can be found by
+    `get_formatter` for the model names matching its
+    `supported_model_regexes`. The formatter registered later takes
+    precedence over the former ones, e.g. a custom formatter can override
+    the built-in one for some models.
+
+    Args:
+        formatter_class (`Type[FormatterBase]`):
+            The formatter class to be registered, which must inherit from
+            `FormatterBase` and have the `supported_model_regexes` attribute.
+        exist_ok (`bool`, defaults to `False`):
+            Whether to register the formatter again if it's already
+            registered, which also makes it take precedence over the others.
+    """
+    if not (
+        isinstance(formatter_class, type)
+        and issubclass(formatter_class, FormatterBase)
+    ):
+        raise TypeError(
+            f"The formatter class should inherit from FormatterBase, but got "
+            f"{formatter_class}.",
+        )
+
+    if not getattr(formatter_class, "supported_model_regexes", None):
+        raise ValueError(
+            f"The formatter class `{formatter_class.__name__}` should have a "
+            f"non-empty `supported_model_regexes` attribute.",
+        )
+
+    with _registry_lock:
+        if formatter_class in _registered_formatters:
+            if not exist_ok:
+                raise ValueError(
+                    f'Formatter "{formatter_class.__name__}" is already '
+                    f"registered, please set `exist_ok=True` to register it "
+                    f"again.",
+                )
+            _registered_formatters.remove(formatter_class)
+
+        _registered_formatters.insert(0, formatter_class)
+        _dispatch_table.clear()
+
+
+def get_formatter(model_name: str) -> Optional[Type[FormatterBase]]:
+    """Get the registered formatter class for the given model name. The
+    result is memoised, so the registered formatters are only scanned for
+    the first time of each model name.
+
+    Args:
+        model_name (`str`):
+            The name of the model.
+
+    Returns:
+        `Optional[Type[FormatterBase]]`:
+            The formatter class, or `None` if no registered formatter
+            supports the model, where `CommonFormatter` can be used as the
+            fallback.
+    """
+    if model_name in _dispatch_table:
+        return _dispatch_table[model_name]
+
+    with _registry_lock:
+        formatter = None
+        for formatter_class in _registered_formatters:
+            if formatter_class.is_supported_model(model_name):
+                formatter = formatter_class
+                break
+
+        if len(_dispatch_table) >= _DEFAULT_FORMATTER_DISPATCH_MAX_SIZE:
+            _dispatch_table.clear()
+        _dispatch_table[model_name] = formatter
+
+    return formatter
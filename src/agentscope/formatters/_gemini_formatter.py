@@ -27,22 +27,27 @@ class GeminiFormatter(FormatterBase):
         for msg in msgs:
             if msg is None:
                 continue
-            if msg.role in ["user", "system"]:
-                formatted_msgs.append(
-                    {
-                        "role": "user",
-                        "parts": msg.get_text_content(),
-                    },
-                )
-            elif msg.role == "assistant":
-                formatted_msgs.append(
-                    {
-                        "role": "model",
-                        "parts": msg.get_text_content(),
-                    },
-                )
+            formatted_msg = cls._format_chat_msg(msg)
+            if formatted_msg is not None:
+                formatted_msgs.append(formatted_msg)
         return formatted_msgs
 
+    @staticmethod
+    def _format_chat_msg(msg: Msg) -> Union[dict, None]:
+        """Format a single message in chat scenario, or `None` if the role
+        is not supported."""
+        if msg.role in ["user", "system"]:
+            return {
+                "role": "user",
+                "parts": msg.get_text_content(),
+            }
+        elif msg.role == "assistant":
+            return {
+                "role": "model",
+                "parts": msg.get_text_content(),
+            }
+        return None
+
     @classmethod
     def format_multi_agent(
         cls,
@@ -84,11 +89,9 @@ class GeminiFormatter(FormatterBase):
                 sys_prompt = unit.get_text_content()
             else:
                 # Merge all messages into a conversation history prompt
-                text_content = unit.get_text_content()
-                if text_content is not None:
-                    dialogue.append(
-                        f"{unit.name}: {text_content}",
-                    )
+                line = cls._format_dialogue_line(unit)
+                if line is not None:
+                    dialogue.append(line)
 
         prompt_components = []
         if sys_prompt is not None:
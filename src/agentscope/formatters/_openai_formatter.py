@@ -44,75 +44,88 @@ class OpenAIFormatter(FormatterBase):
         are involved.
 
         For OpenAI models, the `name` field can be used to distinguish
-        different agents (even with the same role as `"assistant"`).
+        different agents (even with the same role as `"assistant"`). The
+        formatted messages are cached, so only the new messages in the
+        history are formatted in each call.
         """
 
         msgs = cls.check_and_flat_messages(*msgs)
 
         messages = []
         for msg in msgs:
-            content_blocks = []
-            tool_calls = []
-            for block in msg.get_content_blocks():
-                typ = block.get("type")
-                if typ == "text":
-                    content_blocks.append({**block})
-
-                elif typ == "tool_use":
-                    tool_calls.append(
-                        {
-                            "id": block.get("id"),
-                            "type": "function",
-                            "function": {
-                                "name": block.get("name"),
-                                "arguments": json.dumps(
-                                    block.get("input", {}),
-                                    ensure_ascii=False,
-                                ),
-                            },
-                        },
-                    )
-
-                elif typ == "tool_result":
-                    messages.append(
-                        {
-                            "role": "tool",
-                            "tool_call_id": block.get("id"),
-                            "content": str(block.get("output")),
+            messages.extend(
+                cls._format_msg_cached("multi_agent", msg, cls._format_msg),
+            )
+
+        return messages
+
+    @staticmethod
+    def _format_msg(msg: Msg) -> list[dict]:
+        """Format a single message into the OpenAI messages, where the tool
+        results are formatted into separate tool messages."""
+        messages = []
+        content_blocks = []
+        tool_calls = []
+        for block in msg.get_content_blocks():
+            typ = block.get("type")
+            if typ == "text":
+                content_blocks.append({**block})
+
+            elif typ == "tool_use":
+                tool_calls.append(
+                    {
+                        "id": block.get("id"),
+                        "type": "function",
+                        "function": {
                             "name": block.get("name"),
+                            "arguments": json.dumps(
+                                block.get("input", {}),
+                                ensure_ascii=False,
+                            ),
                         },
-                    )
-
-                elif typ == "image":
-                    content_blocks.append(
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": _to_openai_image_url(
-                                    str(block.get("url")),
-                                ),
-                            },
+                    },
+                )
+
+            elif typ == "tool_result":
+                messages.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": block.get("id"),
+                        "content": str(block.get("output")),
+                        "name": block.get("name"),
+                    },
+                )
+
+            elif typ == "image":
+                content_blocks.append(
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": _to_openai_image_url(
+                                str(block.get("url")),
+                            ),
                         },
-                    )
-
-                else:
-                    logger.warning(
-                        f"Unsupported block type {typ} in the message, "
-                        f"skipped.",
-                    )
-
-            msg_openai = {
-                "role": msg.role,
-                "name": msg.name,
-                "content": content_blocks or None,
-            }
-
-            if tool_calls:
-                msg_openai["tool_calls"] = tool_calls
-
-            # When both content and tool_calls are None, skipped
-            if msg_openai["content"] or msg_openai.get("tool_calls"):
-                messages.append(msg_openai)
+                    },
+                )
+
+            else:
+                logger.warning(
+                    f"Unsupported block type {typ} in the message, "
+                    f"skipped.",
+                )
+
+        msg_openai = {
+            "role": msg.role,
+            "name": msg.name,
+            "content": content_blocks or None,
+        }
+
+        if tool_calls:
+            msg_openai["tool_calls"] = tool_calls
+
+        # When both content and tool_calls are None, skipped
+        if msg_openai["content"] or msg_openai.get("tool_calls"):
+            messages.append(msg_openai)
 
         return messages
 
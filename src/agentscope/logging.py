@@ -82,33 +82,49 @@ def _formatted_str(msg: Msg, colored: bool = False) -> str:
     return "\n".join(colored_strs)
 
 
-def log_stream_msg(msg: Msg, last: bool = True) -> None:
+def log_stream_msg(
+    msg: Msg,
+    last: bool = True,
+    delta: Optional[str] = None,
+) -> None:
     """Print the message in different streams, including terminal, studio, and
     gradio if it is active.
 
     Args:
         msg (`Msg`):
-            The message object to be printed.
+            The message object to be printed. If `delta` is given, only the
+            last message (with the complete content) is required to be
+            complete, since it's saved into files.
         last (`bool`, defaults to `True`):
             True if this is the last message in the stream or a single message.
             Otherwise, False.
+        delta (`Optional[str]`, defaults to `None`):
+            The increment of the text content since the previous chunk of
+            the same message. If given, only the increment is printed,
+            otherwise the printed prefix is sliced off from the formatted
+            message, which costs quadratic time for long streams.
     """
     global _PREFIX_DICT
 
     # Print msg to terminal
-    formatted_str = _formatted_str(msg, colored=True)
-
-    print_str = formatted_str[_PREFIX_DICT.get(msg.id, 0) :]
+    if delta is not None:
+        if msg.id not in _PREFIX_DICT:
+            m1, m2 = _map_string_to_color_mark(msg.name)
+            delta = f"{m1}{msg.name}{m2}: {delta}"
+        print_str = delta
+        # Mark the message as being printed
+        _PREFIX_DICT[msg.id] = 0
+    else:
+        formatted_str = _formatted_str(msg, colored=True)
+        print_str = formatted_str[_PREFIX_DICT.get(msg.id, 0) :]
+        _PREFIX_DICT[msg.id] = len(formatted_str)
 
     if last:
         # Remove the prefix from the dictionary
-        del _PREFIX_DICT[msg.id]
+        _PREFIX_DICT.pop(msg.id, None)
 
         print(print_str)
     else:
-        # Update the prefix in the dictionary
-        _PREFIX_DICT[msg.id] = len(formatted_str)
-
         print(print_str, end="")
 
     if last:
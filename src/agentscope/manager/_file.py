@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 """Manage the file system for saving files, code and logs."""
+
 import io
 import json
 import os
@@ -20,6 +21,7 @@ from ..constants import (
     _DEFAULT_SUBDIR_INVOKE,
     _DEFAULT_IMAGE_NAME,
     _DEFAULT_CFG_NAME,
+    _DEFAULT_SUBDIR_RESPONSE_CACHE,
 )
 
 
@@ -145,6 +147,21 @@ class FileManager:
         os.makedirs(dir_cache_embedding, exist_ok=True)
         return dir_cache_embedding
 
+    @property
+    def response_cache_dir(self) -> str:
+        """Obtain the model response cache directory."""
+        if self.cache_dir is None:
+            raise ValueError(
+                "The cache directory is not specified. Please specify the "
+                "cache directory when initializing the file manager.",
+            )
+        dir_cache_response = os.path.join(
+            self.cache_dir,
+            _DEFAULT_SUBDIR_RESPONSE_CACHE,
+        )
+        os.makedirs(dir_cache_response, exist_ok=True)
+        return dir_cache_response
+
     @property
     def file_dir(self) -> str:
         """The directory for saving files, including images, audios and
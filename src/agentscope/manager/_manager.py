@@ -2,6 +2,7 @@
 # pylint: disable=too-many-statements
 """A manager for AgentScope."""
 import os
+import time
 from typing import Union, Any, Optional
 from copy import deepcopy
 
@@ -22,7 +23,11 @@ from ..utils.common import (
     _get_process_creation_time,
     _get_timestamp,
 )
-from ..constants import _RUNTIME_ID_FORMAT, _RUNTIME_TIMESTAMP_FORMAT
+from ..constants import (
+    _RUNTIME_ID_FORMAT,
+    _RUNTIME_TIMESTAMP_FORMAT,
+    _DEFAULT_STUDIO_STREAM_PUSH_INTERVAL,
+)
 
 
 class ASManager:
@@ -207,6 +212,10 @@ class ASManager:
     def _register_studio_hooks(self, studio_url: str) -> None:
         """Register studio related hooks within AgentScope."""
 
+        # The accumulated texts and the last pushing time of the streaming
+        # messages, keyed by the message id
+        stream_buffers: dict[str, tuple[list[str], float]] = {}
+
         # register agent hook
         def studio_pre_speak_hook(
             _obj: AgentBase,
@@ -219,6 +228,22 @@ class ASManager:
             message_data.pop("__module__")
             message_data.pop("__name__")
 
+            # In streaming mode, the message only contains the increment of
+            # the text. Studio replaces the message with the same id, so the
+            # accumulated text is pushed at most once per interval.
+            if _stream and isinstance(msg.content, str):
+                texts, pushed_at = stream_buffers.get(msg.id, ([], 0.0))
+                texts.append(msg.content)
+                now = time.monotonic()
+                if _last:
+                    stream_buffers.pop(msg.id, None)
+                elif now - pushed_at < _DEFAULT_STUDIO_STREAM_PUSH_INTERVAL:
+                    stream_buffers[msg.id] = (texts, pushed_at)
+                    return
+                else:
+                    stream_buffers[msg.id] = (texts, now)
+                message_data["content"] = "".join(texts)
+
             if hasattr(_obj, "_reply_id"):
                 reply_id = getattr(_obj, "_reply_id")
             else:
@@ -1,13 +1,20 @@
 # -*- coding: utf-8 -*-
 """The model manager for AgentScope."""
+
 import importlib
 import json
 import os
-from typing import Any, Union, Type
+import threading
+from typing import Any, Union, Type, Optional
 
 from loguru import logger
 
-from ..models import ModelWrapperBase, _BUILD_IN_MODEL_WRAPPERS
+from ..models import (
+    ModelWrapperBase,
+    MicroBatcher,
+    RateLimiter,
+    _BUILD_IN_MODEL_WRAPPERS,
+)
 
 
 class ModelManager:
@@ -22,6 +29,17 @@ class ModelManager:
     model_wrapper_mapping: dict[str, Type[ModelWrapperBase]] = {}
     """The registered model wrapper classes."""
 
+    shared_models: dict[str, ModelWrapperBase] = {}
+    """The shared model wrapper instances, keyed by the config name."""
+
+    rate_limiters: dict[str, RateLimiter] = {}
+    """The rate limiters shared by the model wrappers of the same config,
+    keyed by the config name."""
+
+    batchers: dict[str, MicroBatcher] = {}
+    """The micro-batchers shared by the model wrappers of the same config,
+    keyed by the config name."""
+
     def __new__(cls, *args: Any, **kwargs: Any) -> Any:
         """Create a singleton instance."""
         if cls._instance is None:
@@ -49,6 +67,12 @@ class ModelManager:
         """Initialize the model manager with model configs"""
         self.model_configs = {}
         self.model_wrapper_mapping = {}
+        self.shared_models = {}
+        self.rate_limiters = {}
+        self.batchers = {}
+        # Re-entrant since a model (e.g. router) may load other shared models
+        self._shared_models_lock = threading.RLock()
+        self._config_states_lock = threading.Lock()
 
         for cls_name in _BUILD_IN_MODEL_WRAPPERS:
             models_module = importlib.import_module("agentscope.models")
@@ -65,8 +89,12 @@ class ModelManager:
             self.load_model_configs(model_configs)
 
     def clear_model_configs(self) -> None:
-        """Clear the loaded model configs."""
+        """Clear the loaded model configs, and close the shared model
+        wrappers built from them."""
         self.model_configs.clear()
+        self.close_models()
+        self.rate_limiters.clear()
+        self.batchers.clear()
 
     def load_model_configs(
         self,
@@ -140,8 +168,48 @@ class ModelManager:
             ", ".join(self.model_configs.keys()),
         )
 
-    def get_model_by_config_name(self, config_name: str) -> ModelWrapperBase:
-        """Load the model by config name, and return the model wrapper."""
+    def get_model_by_config_name(
+        self,
+        config_name: str,
+        shared: Optional[bool] = None,
+    ) -> ModelWrapperBase:
+        """Load the model by config name, and return the model wrapper.
+
+        Args:
+            config_name (`str`):
+                The name of the model config.
+            shared (`Optional[bool]`, defaults to `None`):
+                Whether to return the model wrapper shared by all callers with
+                the same config name. The shared model wrapper is built on the
+                first request, so that e.g. thousands of agents with the same
+                model config share one API client and connection pool. Note
+                the attributes modified by one caller are seen by all the
+                others. If `False`, a new model wrapper will be built. If
+                `None`, the `shared` field of the model config is used,
+                which defaults to `False`.
+
+        Returns:
+            `ModelWrapperBase`: The model wrapper.
+        """
+        if shared is None:
+            shared = self.model_configs.get(config_name, {}).get(
+                "shared",
+                False,
+            )
+        if not shared:
+            return self._build_model(config_name)
+
+        model = self.shared_models.get(config_name, None)
+        if model is None:
+            with self._shared_models_lock:
+                model = self.shared_models.get(config_name, None)
+                if model is None:
+                    model = self._build_model(config_name)
+                    self.shared_models[config_name] = model
+        return model
+
+    def _build_model(self, config_name: str) -> ModelWrapperBase:
+        """Build a new model wrapper by the config name."""
         if len(self.model_configs) == 0:
             raise ValueError(
                 "No model configs loaded, please call "
@@ -160,6 +228,27 @@ class ModelManager:
                 f"Cannot find [{config_name}] in loaded configurations.",
             )
 
+        return self.build_model_from_config(config)
+
+    def build_model_from_config(self, config: dict) -> ModelWrapperBase:
+        """Build a new model wrapper from a model config dict, which needn't
+        be loaded into the model manager.
+
+        Args:
+            config (`dict`):
+                The model config, which requires the `config_name` and
+                `model_type` fields.
+
+        Returns:
+            `ModelWrapperBase`: The model wrapper.
+        """
+        if "config_name" not in config or "model_type" not in config:
+            raise ValueError(
+                "The `config_name` and `model_type` fields are required "
+                f"for model config, but got: {config}",
+            )
+
+        config_name = config["config_name"]
         model_type = config["model_type"]
         if model_type not in self.model_wrapper_mapping:
             raise ValueError(
@@ -168,9 +257,75 @@ class ModelManager:
                 f"{', '.join(list(self.model_wrapper_mapping.keys()))}. ",
             )
 
-        kwargs = {k: v for k, v in config.items() if k != "model_type"}
+        kwargs = {
+            k: v
+            for k, v in config.items()
+            if k
+            not in [
+                "model_type",
+                "response_cache",
+                "rate_limit",
+                "batching",
+                "shared",
+            ]
+        }
+
+        model = self.model_wrapper_mapping[model_type](**kwargs)
+
+        # Enable the response cache if specified in the model config, which
+        # can be `True` or a dict of arguments for `enable_response_cache`
+        response_cache = config.get("response_cache", None)
+        if response_cache:
+            if isinstance(response_cache, dict):
+                model.enable_response_cache(**response_cache)
+            else:
+                model.enable_response_cache()
+
+        # Enable the rate limiter shared by all the model wrappers with the
+        # same config if specified, e.g. {"requests_per_minute": 60}
+        rate_limit = config.get("rate_limit", None)
+        if rate_limit:
+            with self._config_states_lock:
+                if config_name not in self.rate_limiters:
+                    self.rate_limiters[config_name] = RateLimiter(
+                        **rate_limit,
+                    )
+            model.enable_rate_limiter(self.rate_limiters[config_name])
+
+        # Enable the micro-batcher shared by all the model wrappers with the
+        # same config if specified, e.g. {"max_batch_size": 16}
+        batching = config.get("batching", None)
+        if batching:
+            with self._config_states_lock:
+                if config_name not in self.batchers:
+                    self.batchers[config_name] = MicroBatcher(
+                        **(batching if isinstance(batching, dict) else {}),
+                    )
+            model.enable_batching(self.batchers[config_name])
+
+        return model
+
+    def close_models(self, config_name: Optional[str] = None) -> None:
+        """Close the API clients of the shared model wrappers and remove them
+        from the registry. The model wrappers held by callers can still be
+        used, and their clients will be re-created on the next call.
+
+        Args:
+            config_name (`Optional[str]`, defaults to `None`):
+                The config name of the shared model wrapper to be closed. If
+                `None`, all the shared model wrappers will be closed.
+        """
+        with self._shared_models_lock:
+            if config_name is None:
+                models = list(self.shared_models.values())
+                self.shared_models.clear()
+            elif config_name in self.shared_models:
+                models = [self.shared_models.pop(config_name)]
+            else:
+                models = []
 
-        return self.model_wrapper_mapping[model_type](**kwargs)
+        for model in models:
+            model.close()
 
     def get_config_by_name(self, config_name: str) -> Union[dict, None]:
         """Load the model config by name, and return the config dict."""
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """The manager of monitor module."""
+
 import os
+import threading
 from typing import Any, Optional, List, Union
 from pathlib import Path
 
@@ -79,6 +81,10 @@ class MonitorManager:
         self.view_chat_and_embedding = "view_chat_and_embedding"
         self.view_image = "view_image"
 
+        # The in-memory counters of the model response cache
+        self.response_cache_counters: dict[str, dict[str, int]] = {}
+        self._counter_lock = threading.Lock()
+
     def initialize(self, use_monitor: bool) -> None:
         """Initialize the monitor manager.
 
@@ -243,6 +249,50 @@ class MonitorManager:
             sess.add(new_record)
             sess.commit()
 
+    def update_response_cache_counter(
+        self,
+        config_name: str,
+        hit: bool,
+    ) -> None:
+        """Update the hit/miss counters of the model response cache.
+
+        Args:
+            config_name (`str`):
+                The name of the model configuration.
+            hit (`bool`):
+                Whether the cache lookup is a hit or a miss.
+        """
+        if not self.use_monitor:
+            return
+
+        with self._counter_lock:
+            counter = self.response_cache_counters.setdefault(
+                config_name,
+                {"hits": 0, "misses": 0},
+            )
+            counter["hits" if hit else "misses"] += 1
+
+    def show_response_cache_stats(self) -> List[dict]:
+        """Show the hit/miss counters of the model response cache."""
+        with self._counter_lock:
+            stats = [
+                {
+                    "config_name": config_name,
+                    "hits": counter["hits"],
+                    "misses": counter["misses"],
+                }
+                for config_name, counter in (
+                    self.response_cache_counters.items()
+                )
+            ]
+
+        usage = [["CONFIG NAME", "HITS", "MISSES"]] + [
+            [_["config_name"], _["hits"], _["misses"]] for _ in stats
+        ]
+        self._print_table("Model Response Cache:", usage)
+
+        return stats
+
     def print_llm_usage(self) -> dict:
         """Print the usage of all different model APIs."""
         text_and_embedding = self.show_text_and_embedding_tokens()
@@ -348,3 +398,6 @@ class MonitorManager:
         # The name of the views
         self.view_chat_and_embedding = "view_chat_and_embedding"
         self.view_image = "view_image"
+
+        with self._counter_lock:
+            self.response_cache_counters.clear()
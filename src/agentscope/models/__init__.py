@@ -2,7 +2,7 @@
 """ Import modules in models package."""
 
 from .model import ModelWrapperBase
-from .response import ModelResponse
+from .response import ModelResponse, ResponseStream
 from .post_model import (
     PostAPIModelWrapperBase,
     PostAPIChatWrapper,
@@ -39,7 +39,10 @@ from .yi_model import (
     YiChatWrapper,
 )
 from .anthropic_model import AnthropicChatWrapper
+from .router_model import RouterModelWrapper
 from ._model_usage import ChatUsage
+from ._rate_limiter import RateLimiter
+from ._batching import MicroBatcher
 
 
 _BUILD_IN_MODEL_WRAPPERS = [
@@ -61,12 +64,16 @@ _BUILD_IN_MODEL_WRAPPERS = [
     "LiteLLMChatWrapper",
     "YiChatWrapper",
     "AnthropicChatWrapper",
+    "RouterModelWrapper",
 ]
 
 __all__ = [
     "ModelWrapperBase",
     "ModelResponse",
+    "ResponseStream",
     "ChatUsage",
+    "RateLimiter",
+    "MicroBatcher",
     "PostAPIModelWrapperBase",
     "PostAPIChatWrapper",
     "OpenAIWrapperBase",
@@ -87,4 +94,5 @@ __all__ = [
     "LiteLLMChatWrapper",
     "YiChatWrapper",
     "AnthropicChatWrapper",
+    "RouterModelWrapper",
 ]
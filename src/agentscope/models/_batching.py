@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""The client-side micro-batching for model wrappers, which collects the
+concurrent calls within a small time window, and merges them into batched
+requests where the API supports it (e.g. embedding APIs that accept a list
+of inputs)."""
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Union
+
+from loguru import logger
+
+from .response import ModelResponse
+from ..constants import (
+    _DEFAULT_BATCH_MAX_SIZE,
+    _DEFAULT_BATCH_MAX_WAIT,
+    _DEFAULT_BATCH_MAX_WORKERS,
+)
+
+
+class _BatchRequest:
+    """A model call waiting in the micro-batcher."""
+
+    def __init__(self, call: Callable, args: tuple, kwargs: dict) -> None:
+        """Initialize the request.
+
+        Args:
+            call (`Callable`):
+                The model call that sends the request alone, i.e. the
+                `__call__` function of the model wrapper bound to the model
+                wrapper object without micro-batching.
+            args (`tuple`):
+                The positional arguments of the call.
+            kwargs (`dict`):
+                The keyword arguments of the call.
+        """
+        self.call = call
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+
+    def run(self) -> None:
+        """Send the request alone and set the result."""
+        try:
+            self.future.set_result(self.call(*self.args, **self.kwargs))
+        except Exception as e:
+            self.future.set_exception(e)
+
+
+class MicroBatcher:
+    """The micro-batcher that collects the concurrent calls of the model
+    wrappers with the same model configuration within `max_wait` seconds
+    (or until `max_batch_size` calls are collected), and dispatches them as
+    a batch. The results are then demultiplexed to the callers, which are
+    blocked until their own results are ready.
+
+    The batch is passed to the `_call_batch` of the model wrapper to be
+    merged into batched requests. The model wrappers without `_call_batch`
+    send their calls directly instead.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = _DEFAULT_BATCH_MAX_SIZE,
+        max_wait: float = _DEFAULT_BATCH_MAX_WAIT,
+        max_workers: int = _DEFAULT_BATCH_MAX_WORKERS,
+    ) -> None:
+        """Initialize the micro-batcher.
+
+        Args:
+            max_batch_size (`int`, defaults to `8`):
+                The maximum number of calls in a batch.
+            max_wait (`float`, defaults to `0.01`):
+                The maximum time in seconds to wait for more calls after the
+                first call of a batch arrives.
+            max_workers (`int`, defaults to `32`):
+                The maximum number of threads to send the requests.
+        """
+        if max_batch_size < 1:
+            raise ValueError(
+                f"The max_batch_size should be positive, but got "
+                f"{max_batch_size}.",
+            )
+
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_workers = max_workers
+
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # The metrics
+        self.total_requests = 0
+        self.total_batches = 0
+        self.max_batch_size_seen = 0
+
+    def _start(self) -> None:
+        """Start the collecting thread and the sending threads if they are
+        not started yet."""
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="micro-batcher",
+            )
+            self._thread = threading.Thread(
+                target=self._collect,
+                name="micro-batcher-collector",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def submit(
+        self,
+        call: Callable,
+        args: tuple,
+        kwargs: dict,
+        batch_call: Optional[Callable] = None,
+    ) -> Any:
+        """Submit a model call to the micro-batcher, and block until its
+        result is ready.
+
+        Args:
+            call (`Callable`):
+                The model call that sends the request alone.
+            args (`tuple`):
+                The positional arguments of the call.
+            kwargs (`dict`):
+                The keyword arguments of the call.
+            batch_call (`Optional[Callable]`, defaults to `None`):
+                The function that takes a list of `_BatchRequest` objects
+                and returns their results (or exceptions) in order. Only the
+                calls with the same `batch_call` are batched together. If
+                `None`, the call is sent alone.
+
+        Returns:
+            `Any`: The result of the call.
+        """
+        self._start()
+        request = _BatchRequest(call, args, kwargs)
+        self._queue.put((batch_call, request))
+        return request.future.result()
+
+    def _collect(self) -> None:
+        """Collect the calls into batches and dispatch them."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            with self._lock:
+                self.total_requests += len(batch)
+                self.total_batches += 1
+                self.max_batch_size_seen = max(
+                    self.max_batch_size_seen,
+                    len(batch),
+                )
+                executor = self._executor
+
+            groups: dict = {}
+            for batch_call, request in batch:
+                groups.setdefault(batch_call, []).append(request)
+
+            for batch_call, requests in groups.items():
+                if batch_call is None or len(requests) == 1:
+                    for request in requests:
+                        executor.submit(request.run)
+                else:
+                    executor.submit(self._dispatch, batch_call, requests)
+
+    @staticmethod
+    def _dispatch(
+        batch_call: Callable,
+        requests: List[_BatchRequest],
+    ) -> None:
+        """Send the batched requests and demultiplex the results."""
+        try:
+            results = batch_call(requests)
+        except Exception as e:
+            results = [e] * len(requests)
+
+        if len(results) != len(requests):
+            results = [
+                RuntimeError(
+                    f"Expect {len(requests)} results from the batched "
+                    f"call, but got {len(results)}.",
+                ),
+            ] * len(requests)
+
+        for request, result in zip(requests, results):
+            if isinstance(result, Exception):
+                request.future.set_exception(result)
+            else:
+                request.future.set_result(result)
+
+    @property
+    def stats(self) -> dict:
+        """The metrics of the micro-batcher."""
+        with self._lock:
+            return {
+                "requests": self.total_requests,
+                "batches": self.total_batches,
+                "avg_batch_size": self.total_requests
+                / max(1, self.total_batches),
+                "max_batch_size": self.max_batch_size_seen,
+            }
+
+
+def _merge_embedding_requests(
+    requests: List[_BatchRequest],
+    input_name: str,
+) -> List[Union[ModelResponse, Exception]]:
+    """Merge the batched calls of an embedding model wrapper, whose first
+    argument is a text or a list of texts, into one request per group of
+    identical keyword arguments, and split the embeddings of the merged
+    response to the callers.
+
+    Args:
+        requests (`List[_BatchRequest]`):
+            The batched requests.
+        input_name (`str`):
+            The name of the input argument, which may be passed by keyword.
+
+    Returns:
+        `List[Union[ModelResponse, Exception]]`:
+            The responses (or exceptions) of the requests in order.
+    """
+    results: List[Union[ModelResponse, Exception, None]] = [None] * len(
+        requests,
+    )
+
+    groups: dict = {}
+    for index, request in enumerate(requests):
+        kwargs = dict(request.kwargs)
+        if len(request.args) == 1 and input_name not in kwargs:
+            inputs = request.args[0]
+        elif len(request.args) == 0 and input_name in kwargs:
+            inputs = kwargs.pop(input_name)
+        else:
+            inputs = None
+
+        if not isinstance(inputs, (str, list)):
+            # Cannot be merged, send it alone
+            try:
+                results[index] = request.call(*request.args, **request.kwargs)
+            except Exception as e:
+                results[index] = e
+            continue
+
+        if isinstance(inputs, str):
+            inputs = [inputs]
+
+        key = json.dumps(kwargs, sort_keys=True, default=str)
+        group = groups.setdefault(key, (request.call, kwargs, []))
+        group[2].append((index, inputs))
+
+    for call, kwargs, items in groups.values():
+        merged = [text for _, inputs in items for text in inputs]
+        try:
+            response = call(merged, **kwargs)
+            if len(response.embedding) != len(merged):
+                raise RuntimeError(
+                    f"Expect {len(merged)} embeddings from the merged "
+                    f"request, but got {len(response.embedding)}.",
+                )
+        except Exception as e:
+            for index, _ in items:
+                results[index] = e
+            continue
+
+        logger.debug(f"Merge {len(items)} calls into one embedding request.")
+
+        offset = 0
+        for index, inputs in items:
+            results[index] = ModelResponse(
+                embedding=response.embedding[offset : offset + len(inputs)],
+                raw=response.raw,
+            )
+            offset += len(inputs)
+
+    return results
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""The response cache for model wrappers, which reuses the responses of
+identical model invocations (e.g. deterministic calls in evaluation runs and
+regression tests) instead of calling the model API again."""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Generator
+
+from loguru import logger
+
+from .response import ModelResponse
+from ..manager import FileManager
+from ..utils.common import _hash_string, _is_json_serializable
+from ..constants import (
+    _DEFAULT_RESPONSE_CACHE_MAX_SIZE,
+    _DEFAULT_RESPONSE_CACHE_REPLAY_CHUNK_SIZE,
+)
+
+
+def _get_response_cache_key(identity: dict, args: tuple, kwargs: dict) -> str:
+    """Get the canonical hash of a model invocation.
+
+    Args:
+        identity (`dict`):
+            The identity of the model wrapper, e.g. the model type, config
+            name, model name and the generation arguments.
+        args (`tuple`):
+            The positional arguments of the model invocation, e.g. the
+            formatted messages.
+        kwargs (`dict`):
+            The keyword arguments of the model invocation, e.g. the tools
+            and the generation keyword arguments.
+
+    Returns:
+        `str`: The sha256 hash of the invocation.
+    """
+    record = {
+        "identity": identity,
+        "args": list(args),
+        "kwargs": kwargs,
+    }
+    serialized = json.dumps(
+        record,
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return _hash_string(serialized, "sha256")
+
+
+def _serialize_response(response: ModelResponse) -> dict:
+    """Serialize a non-stream model response into a JSON-compatible dict."""
+    raw = response.raw if _is_json_serializable(response.raw) else None
+    return {
+        "text": response.text,
+        "embedding": response.embedding,
+        "image_urls": response.image_urls,
+        "raw": raw,
+        "tool_calls": response.tool_calls,
+    }
+
+
+def _replay_stream(text: str) -> Generator[str, None, None]:
+    """Replay a cached text as a stream of increments."""
+    chunk_size = _DEFAULT_RESPONSE_CACHE_REPLAY_CHUNK_SIZE
+    for start in range(0, len(text), chunk_size):
+        yield text[start : start + chunk_size]
+
+
+class ResponseCache:
+    """A two-tier (in-memory LRU and on-disk) cache for model responses.
+
+    The entries are keyed by the canonical hash of the model invocation,
+    and expire after `ttl` seconds if `ttl` is specified. The on-disk tier is
+    stored under the `model_response` sub-directory of the cache directory in
+    the file manager, so that the cached responses can be shared across
+    runs.
+    """
+
+    def __init__(
+        self,
+        max_size: int = _DEFAULT_RESPONSE_CACHE_MAX_SIZE,
+        ttl: Optional[float] = None,
+        use_disk: bool = True,
+    ) -> None:
+        """Initialize the response cache.
+
+        Args:
+            max_size (`int`, defaults to `1024`):
+                The maximum number of entries in the in-memory tier. The least
+                recently used entries will be evicted first.
+            ttl (`Optional[float]`, defaults to `None`):
+                The time-to-live of the cached entries in seconds. If `None`,
+                the entries never expire.
+            use_disk (`bool`, defaults to `True`):
+                Whether to persist the cached entries on disk.
+        """
+        if max_size <= 0:
+            raise ValueError(
+                f"The max_size of the response cache should be positive, "
+                f"but got {max_size}.",
+            )
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.use_disk = use_disk
+
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: OrderedDict[
+            str, tuple[Optional[float], dict]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_disk_path(self, key: str) -> str:
+        """Get the path of the on-disk entry."""
+        return os.path.join(
+            FileManager.get_instance().response_cache_dir,
+            f"{key}.json",
+        )
+
+    def _put_memory(
+        self,
+        key: str,
+        expires_at: Optional[float],
+        record: dict,
+    ) -> None:
+        """Put the record into the in-memory tier, evicting the least
+        recently used entries if needed."""
+        with self._lock:
+            self._memory[key] = (expires_at, record)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        """Get the cached record by key, or `None` if it doesn't exist or
+        has expired."""
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key, None)
+            if entry is not None:
+                expires_at, record = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return record
+                self._memory.pop(key)
+
+        if self.use_disk:
+            path = self._get_disk_path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    entry = json.load(file)
+            except (FileNotFoundError, json.JSONDecodeError):
+                entry = None
+
+            if entry is not None:
+                expires_at = entry.get("expires_at", None)
+                if expires_at is None or expires_at > now:
+                    self._put_memory(key, expires_at, entry["response"])
+                    with self._lock:
+                        self.hits += 1
+                    return entry["response"]
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, record: dict) -> None:
+        """Put a record into the cache."""
+        expires_at = None if self.ttl is None else time.time() + self.ttl
+        self._put_memory(key, expires_at, record)
+
+        if self.use_disk:
+            try:
+                serialized = json.dumps(
+                    {"expires_at": expires_at, "response": record},
+                    ensure_ascii=False,
+                )
+            except (TypeError, ValueError) as e:
+                logger.warning(
+                    f"Fail to save the model response into disk cache: {e}",
+                )
+                return
+
+            with open(self._get_disk_path(key), "w", encoding="utf-8") as file:
+                file.write(serialized)
+
+    def clear(self) -> None:
+        """Clear the in-memory tier of the cache and reset the counters.
+        The on-disk entries are kept to be shared across runs."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def to_response(self, record: dict, stream: bool) -> ModelResponse:
+        """Rebuild the model response from a cached record.
+
+        Args:
+            record (`dict`):
+                The cached record.
+            stream (`bool`):
+                Whether to replay the cached text as a stream.
+        """
+        if stream and record.get("text", None):
+            return ModelResponse(
+                stream=_replay_stream(record["text"]),
+                stream_delta=True,
+                raw=record.get("raw", None),
+                tool_calls=record.get("tool_calls", None),
+            )
+
+        return ModelResponse(**record)
+
+    def record_stream(
+        self,
+        key: str,
+        response: ModelResponse,
+    ) -> ModelResponse:
+        """Wrap the stream of a fresh model response, so that the complete
+        text is cached once the stream is exhausted."""
+        # pylint: disable=protected-access
+        original_stream = response._stream
+
+        stream_delta = response._stream_delta
+
+        def _recording_generator() -> Generator[str, None, None]:
+            # The increments, or only the latest accumulated text
+            chunks: list = []
+            try:
+                for chunk in original_stream:
+                    if stream_delta:
+                        chunks.append(chunk)
+                    else:
+                        chunks = [chunk]
+                    yield chunk
+            except GeneratorExit:
+                # Stop the model stream, and don't cache the partial text
+                if hasattr(original_stream, "close"):
+                    original_stream.close()
+                raise
+            if chunks:
+                self.put(
+                    key,
+                    {
+                        "text": "".join(chunks),
+                        "embedding": None,
+                        "image_urls": None,
+                        "raw": None,
+                        "tool_calls": response.tool_calls,
+                    },
+                )
+
+        response._stream = _recording_generator()
+        return response
+
+    def cache(self, key: str, response: ModelResponse) -> ModelResponse:
+        """Cache the fresh model response and return it."""
+        # pylint: disable=protected-access
+        if response._stream is not None:
+            return self.record_stream(key, response)
+
+        self.put(key, _serialize_response(response))
+        return response
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""The client-side rate limiter for model wrappers, which throttles the
+requests and tokens sent to the model API per model configuration, and
+adapts its rate (AIMD) when the API responds with rate limit errors."""
+import asyncio
+import random
+import re
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+from ..constants import (
+    _DEFAULT_RATE_LIMIT_BURST_SECONDS,
+    _DEFAULT_RATE_LIMIT_COOLDOWN,
+    _DEFAULT_RATE_LIMIT_DECREASE_FACTOR,
+    _DEFAULT_RATE_LIMIT_INCREASE_STEP,
+    _DEFAULT_RATE_LIMIT_MIN_FACTOR,
+    _DEFAULT_RATE_LIMIT_POLL_INTERVAL,
+    _DEFAULT_MAX_RETRIES,
+)
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Check if the exception raised by the model API indicates that the
+    rate limit is exceeded (HTTP status code 429)."""
+    for obj in [error, getattr(error, "response", None)]:
+        for attr in ["status_code", "http_status", "status"]:
+            if getattr(obj, attr, None) == 429:
+                return True
+
+    # Some wrappers (e.g. DashScope) raise RuntimeError with the status code
+    # in the error message
+    return (
+        re.search(r"status[ _]code:?\s*429", str(error), re.IGNORECASE)
+        is not None
+    )
+
+
+def _get_retry_after(error: Exception) -> Optional[float]:
+    """Get the `retry-after` header (in seconds) from the exception if
+    provided."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is None:
+        return None
+
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _RateLimitedStream:
+    """The stream of a model response that holds a slot of the rate limiter
+    until the stream is exhausted, fails or is closed, so that the streaming
+    calls are counted as in-flight while the model is still generating."""
+
+    def __init__(self, stream: Iterator, rate_limiter: "RateLimiter") -> None:
+        self._stream = stream
+        self._iterator: Optional[Iterator] = None
+        self._rate_limiter = rate_limiter
+        self._released = False
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> "_RateLimitedStream":
+        return self
+
+    def __next__(self) -> Any:
+        if self._iterator is None:
+            self._iterator = iter(self._stream)
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            self._release(success=True)
+            raise
+        except Exception as e:
+            rate_limited = _is_rate_limit_error(e)
+            self._release(
+                success=False,
+                rate_limited=rate_limited,
+                retry_after=_get_retry_after(e) if rate_limited else None,
+            )
+            raise
+
+    def close(self) -> None:
+        """Close the underlying stream and release the slot."""
+        try:
+            if hasattr(self._stream, "close"):
+                self._stream.close()
+        finally:
+            self._release(success=True)
+
+    def __del__(self) -> None:
+        # The stream is dropped without being consumed
+        self._release(success=False)
+
+    def _release(self, **kwargs: Any) -> None:
+        """Release the slot once."""
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._rate_limiter.release(**kwargs)
+
+
+class _TokenBucket:
+    """A token bucket refilled at a constant rate. The level is allowed to
+    be negative, so that the usage reported after a call (e.g. the consumed
+    tokens) is paid back before the next call is admitted."""
+
+    def __init__(self, per_minute: float, burst_seconds: float) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.timestamp = time.monotonic()
+
+    def refill(self, now: float, factor: float) -> None:
+        """Refill the bucket according to the elapsed time."""
+        self.level = min(
+            self.capacity,
+            self.level + (now - self.timestamp) * self.rate * factor,
+        )
+        self.timestamp = now
+
+    def wait_time(self, amount: float, factor: float) -> float:
+        """The time to wait until `amount` can be taken from the bucket."""
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / (self.rate * factor)
+
+
+class RateLimiter:
+    """A client-side rate limiter and concurrency governor shared by all
+    the model wrappers of the same model configuration.
+
+    It limits the requests per minute and tokens per minute with token
+    buckets, and the number of in-flight requests. When the model API
+    responds with a rate limit error (429), the refill rate is decreased
+    multiplicatively and all callers pause for a jittered cooldown; each
+    successful call increases the rate additively until the configured limits
+    are reached again (AIMD). It's safe to be used across threads, and
+    asyncio tasks can wait without blocking the event loop by
+    `acquire_async`.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        burst_seconds: float = _DEFAULT_RATE_LIMIT_BURST_SECONDS,
+        decrease_factor: float = _DEFAULT_RATE_LIMIT_DECREASE_FACTOR,
+        increase_step: float = _DEFAULT_RATE_LIMIT_INCREASE_STEP,
+        min_factor: float = _DEFAULT_RATE_LIMIT_MIN_FACTOR,
+        cooldown: float = _DEFAULT_RATE_LIMIT_COOLDOWN,
+        max_retries: int = _DEFAULT_MAX_RETRIES,
+    ) -> None:
+        """Initialize the rate limiter.
+
+        Args:
+            requests_per_minute (`Optional[float]`, defaults to `None`):
+                The maximum number of requests per minute. If `None`, the
+                requests are not limited.
+            tokens_per_minute (`Optional[float]`, defaults to `None`):
+                The maximum number of tokens (prompt and completion) per
+                minute, which is counted by the usage reported by the model
+                API. If `None`, the tokens are not limited.
+            max_concurrency (`Optional[int]`, defaults to `None`):
+                The maximum number of in-flight requests. If `None`, the
+                concurrency is not limited.
+            burst_seconds (`float`, defaults to `1.0`):
+                The capacity of the buckets in seconds of refilling, i.e. how
+                many requests/tokens can be sent in a burst.
+            decrease_factor (`float`, defaults to `0.5`):
+                The multiplicative factor applied to the rate on a rate limit
+                error.
+            increase_step (`float`, defaults to `0.05`):
+                The additive increase of the rate factor (relative to the
+                configured limits) on a successful call.
+            min_factor (`float`, defaults to `0.05`):
+                The lower bound of the rate factor.
+            cooldown (`float`, defaults to `1.0`):
+                The base time in seconds that all callers pause after a rate
+                limit error, if the API doesn't provide `retry-after`.
+            max_retries (`int`, defaults to `3`):
+                The maximum number of retries on rate limit errors.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.min_factor = min_factor
+        self.cooldown = cooldown
+        self.max_retries = max_retries
+
+        self._request_bucket = (
+            _TokenBucket(requests_per_minute, burst_seconds)
+            if requests_per_minute
+            else None
+        )
+        self._token_bucket = (
+            _TokenBucket(tokens_per_minute, burst_seconds)
+            if tokens_per_minute
+            else None
+        )
+
+        self.factor = 1.0
+        self._cooldown_until = 0.0
+        self._in_flight = 0
+
+        # The metrics
+        self.total_requests = 0
+        self.total_rate_limited = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+
+    def _try_acquire(self) -> float:
+        """Try to acquire a slot for a request. Return 0 if acquired,
+        otherwise the time to wait before trying again. Note the lock must
+        be held by the caller."""
+        now = time.monotonic()
+        wait = max(0.0, self._cooldown_until - now)
+
+        if (
+            self.max_concurrency is not None
+            and self._in_flight >= self.max_concurrency
+        ):
+            wait = max(wait, _DEFAULT_RATE_LIMIT_POLL_INTERVAL)
+
+        if self._request_bucket is not None:
+            self._request_bucket.refill(now, self.factor)
+            wait = max(wait, self._request_bucket.wait_time(1, self.factor))
+
+        if self._token_bucket is not None:
+            self._token_bucket.refill(now, self.factor)
+            wait = max(wait, self._token_bucket.wait_time(0, self.factor))
+
+        if wait > 0:
+            return wait
+
+        if self._request_bucket is not None:
+            self._request_bucket.level -= 1
+        self._in_flight += 1
+        self.total_requests += 1
+        return 0.0
+
+    def _record_wait(self, waited: float) -> None:
+        """Record the queue wait time. Note the lock must be held by the
+        caller."""
+        self.total_wait_time += waited
+        self.max_wait_time = max(self.max_wait_time, waited)
+
+    def acquire(self) -> float:
+        """Block until a request is allowed to be sent, and return the
+        waited time in seconds."""
+        start = time.monotonic()
+        with self._condition:
+            while True:
+                wait = self._try_acquire()
+                if wait <= 0:
+                    break
+                self._condition.wait(wait)
+            waited = time.monotonic() - start
+            self._record_wait(waited)
+        return waited
+
+    async def acquire_async(self) -> float:
+        """Wait without blocking the event loop until a request is allowed
+        to be sent, and return the waited time in seconds."""
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._try_acquire()
+                if wait <= 0:
+                    waited = time.monotonic() - start
+                    self._record_wait(waited)
+                    return waited
+            await asyncio.sleep(wait)
+
+    def release(
+        self,
+        success: bool = True,
+        rate_limited: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Release the slot of a finished request, and adapt the rate
+        according to its result.
+
+        Args:
+            success (`bool`, defaults to `True`):
+                Whether the request succeeded, which increases the rate
+                additively.
+            rate_limited (`bool`, defaults to `False`):
+                Whether the request failed due to the rate limit, which
+                decreases the rate multiplicatively and pauses all callers.
+            retry_after (`Optional[float]`, defaults to `None`):
+                The time in seconds to pause suggested by the model API.
+        """
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+
+            if rate_limited:
+                self.total_rate_limited += 1
+                self.factor = max(
+                    self.min_factor,
+                    self.factor * self.decrease_factor,
+                )
+                # Jitter the cooldown to avoid retrying in lockstep
+                pause = retry_after or self.cooldown * random.uniform(1, 2)
+                self._cooldown_until = max(
+                    self._cooldown_until,
+                    time.monotonic() + pause,
+                )
+            elif success:
+                self.factor = min(1.0, self.factor + self.increase_step)
+
+            self._condition.notify_all()
+
+    def record_usage(self, tokens: int) -> None:
+        """Take the tokens consumed by a finished request from the token
+        bucket."""
+        if self._token_bucket is None:
+            return
+
+        with self._lock:
+            self._token_bucket.refill(time.monotonic(), self.factor)
+            self._token_bucket.level -= tokens
+
+    @property
+    def stats(self) -> dict:
+        """The metrics of the rate limiter, including the queue wait time."""
+        with self._lock:
+            return {
+                "requests": self.total_requests,
+                "rate_limited": self.total_rate_limited,
+                "in_flight": self._in_flight,
+                "rate_factor": self.factor,
+                "total_wait_time": self.total_wait_time,
+                "max_wait_time": self.max_wait_time,
+                "avg_wait_time": self.total_wait_time
+                / max(1, self.total_requests),
+            }
@@ -40,21 +40,26 @@ class AnthropicChatWrapper(ModelWrapperBase):
         super().__init__(config_name, model_name)
 
         try:
-            import anthropic
+            import anthropic  # pylint: disable=unused-import
         except ImportError as e:
             raise ImportError(
                 "Please install the `anthropic` package by running "
                 "`pip install anthropic`.",
             ) from e
 
-        client_kwargs = client_kwargs or {}
-
-        self.client = anthropic.Anthropic(
-            api_key=api_key,
-            **client_kwargs,
-        )
+        # The client is created lazily in `_create_client`
+        self._client_kwargs = {
+            "api_key": api_key,
+            **(client_kwargs or {}),
+        }
         self.stream = stream
 
+    def _create_client(self) -> Any:
+        """Create the anthropic client."""
+        import anthropic
+
+        return anthropic.Anthropic(**self._client_kwargs)
+
     def format(
         self,
         *args: Union[Msg, list[Msg], None],
@@ -184,50 +189,53 @@ class AnthropicChatWrapper(ModelWrapperBase):
                 # Used in model invocation recording
                 gathered_response = {}
 
-                text = ""
                 current_block = {}
-                for chunk in response:
-                    chunk = chunk.model_dump()
-                    chunk_type = chunk.get("type", None)
-
-                    if chunk_type == "message_start":
-                        gathered_response.update(**chunk["message"])
-
-                    if chunk_type == "message_delta":
-                        for key, cost in chunk.get("usage", {}).items():
-                            gathered_response["usage"][key] = (
-                                gathered_response["usage"].get(key, 0) + cost
-                            )
-
-                    if chunk_type == "content_block_start":
-                        # Refresh the current block
-                        current_block = chunk["content_block"]
-
-                    if chunk_type == "content_block_delta":
-                        delta = chunk.get("delta", {})
-                        if delta.get("type", None) == "text_delta":
-                            # To recover the complete response with multiple
-                            # blocks in its content field
-                            current_block["text"] = current_block.get(
-                                "text",
-                                "",
-                            ) + delta.get("text", "")
-                            # Used for feedback
-                            text += delta.get("text", "")
-                            yield text
-
-                        # TODO: Support tool calls in streaming mode
-
-                    if chunk_type == "content_block_stop":
-                        gathered_response["content"].append(current_block)
-
-                self._save_model_invocation_and_update_monitor(
-                    kwargs,
-                    gathered_response,
-                )
+                block_texts = []
+                try:
+                    for chunk in response:
+                        chunk = chunk.model_dump()
+                        chunk_type = chunk.get("type", None)
+
+                        if chunk_type == "message_start":
+                            gathered_response.update(**chunk["message"])
+
+                        if chunk_type == "message_delta":
+                            for key, cost in chunk.get("usage", {}).items():
+                                gathered_response["usage"][key] = (
+                                    gathered_response["usage"].get(key, 0)
+                                    + cost
+                                )
+
+                        if chunk_type == "content_block_start":
+                            # Refresh the current block
+                            current_block = chunk["content_block"]
+                            block_texts = [current_block.get("text", "")]
+
+                        if chunk_type == "content_block_delta":
+                            delta = chunk.get("delta", {})
+                            if delta.get("type", None) == "text_delta":
+                                # To recover the complete response with
+                                # multiple blocks in its content field
+                                block_texts.append(delta.get("text", ""))
+                                yield delta.get("text", "")
+
+                            # TODO: Support tool calls in streaming mode
+
+                        if chunk_type == "content_block_stop":
+                            if current_block.get("type", None) == "text":
+                                current_block["text"] = "".join(block_texts)
+                            gathered_response["content"].append(current_block)
+                finally:
+                    # Record the invocation even if the stream is closed early
+                    if gathered_response:
+                        self._save_model_invocation_and_update_monitor(
+                            kwargs,
+                            gathered_response,
+                        )
 
             return ModelResponse(
                 stream=generator(),
+                stream_delta=True,
             )
 
         else:
@@ -7,6 +7,7 @@ from typing import Any, Union, List, Optional, Generator
 
 from loguru import logger
 
+from ._batching import _BatchRequest, _merge_embedding_requests
 from ._model_usage import ChatUsage
 from ..formatters import DashScopeFormatter
 from ..manager import FileManager
@@ -257,33 +258,44 @@ class DashScopeChatWrapper(DashScopeWrapperBase):
 
             def generator() -> Generator[str, None, None]:
                 last_chunk = None
-                text = ""
-                for chunk in response:
-                    if chunk.status_code != HTTPStatus.OK:
-                        error_msg = (
-                            f"Request id: {chunk.request_id}\n"
-                            f"Status code: {chunk.status_code}\n"
-                            f"Error code: {chunk.code}\n"
-                            f"Error message: {chunk.message}"
+                deltas = []
+                try:
+                    for chunk in response:
+                        if chunk.status_code != HTTPStatus.OK:
+                            error_msg = (
+                                f"Request id: {chunk.request_id}\n"
+                                f"Status code: {chunk.status_code}\n"
+                                f"Error code: {chunk.code}\n"
+                                f"Error message: {chunk.message}"
+                            )
+                            raise RuntimeError(error_msg)
+
+                        delta = chunk.output["choices"][0]["message"][
+                            "content"
+                        ]
+                        deltas.append(delta)
+                        yield delta
+                        last_chunk = chunk
+                finally:
+                    # Record the invocation even if the stream is closed early
+                    if last_chunk is not None:
+                        # Replace the last chunk with the full text
+                        last_chunk.output["choices"][0]["message"][
+                            "content"
+                        ] = "".join(
+                            deltas,
                         )
-                        raise RuntimeError(error_msg)
-
-                    text += chunk.output["choices"][0]["message"]["content"]
-                    yield text
-                    last_chunk = chunk
 
-                # Replace the last chunk with the full text
-                last_chunk.output["choices"][0]["message"]["content"] = text
-
-                # Save the model invocation and update the monitor
-                self._save_model_invocation_and_update_monitor(
-                    kwargs,
-                    last_chunk,
-                )
+                        # Save the model invocation and update the monitor
+                        self._save_model_invocation_and_update_monitor(
+                            kwargs,
+                            last_chunk,
+                        )
 
             return ModelResponse(
                 stream=generator(),
                 raw=response,
+                stream_delta=True,
             )
 
         else:
@@ -722,6 +734,14 @@ class DashScopeTextEmbeddingWrapper(DashScopeWrapperBase):
             raw=response,
         )
 
+    def _call_batch(
+        self,
+        requests: List[_BatchRequest],
+    ) -> List[Union[ModelResponse, Exception]]:
+        """Merge the texts of the batched calls into one embedding request,
+        since the embedding API accepts a list of inputs."""
+        return _merge_embedding_requests(requests, "texts")
+
 
 class DashScopeMultiModalWrapper(DashScopeWrapperBase):
     """The model wrapper for DashScope Multimodal API, refer to
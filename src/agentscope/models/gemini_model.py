@@ -176,27 +176,33 @@ class GeminiChatWrapper(GeminiWrapperBase):
         if stream:
 
             def generator() -> Generator[str, None, None]:
-                text = ""
+                deltas = []
                 last_chunk = None
-                for chunk in response:
-                    text += self._extract_text_content_from_response(
-                        contents,
-                        chunk,
-                    )
-                    yield text
-                    last_chunk = chunk
-
-                # Update the last chunk
-                last_chunk.candidates[0].content.parts[0].text = text
-
-                self._save_model_invocation_and_update_monitor(
-                    contents,
-                    kwargs,
-                    last_chunk,
-                )
+                try:
+                    for chunk in response:
+                        delta = self._extract_text_content_from_response(
+                            contents,
+                            chunk,
+                        )
+                        deltas.append(delta)
+                        yield delta
+                        last_chunk = chunk
+                finally:
+                    # Record the invocation even if the stream is closed early
+                    if last_chunk is not None:
+                        # Update the last chunk
+                        text = "".join(deltas)
+                        last_chunk.candidates[0].content.parts[0].text = text
+
+                        self._save_model_invocation_and_update_monitor(
+                            contents,
+                            kwargs,
+                            last_chunk,
+                        )
 
             return ModelResponse(
                 stream=generator(),
+                stream_delta=True,
             )
 
         else:
@@ -218,33 +218,39 @@ class LiteLLMChatWrapper(LiteLLMWrapperBase):
         if stream:
 
             def generator() -> Generator[str, None, None]:
-                text = ""
+                deltas = []
                 last_chunk = {}
-                for chunk in response:
-                    # In litellm, the content maybe `None` for the last second
-                    # chunk
-                    chunk = chunk.model_dump()
-                    if _verify_text_content_in_openai_delta_response(chunk):
-                        text += chunk["choices"][0]["delta"]["content"]
-                        yield text
-                    last_chunk = chunk
-
-                # Update the last chunk to save locally
-                if last_chunk.get("choices", []) in [None, []]:
-                    last_chunk["choices"] = [{}]
-
-                last_chunk["choices"][0]["message"] = {
-                    "role": "assistant",
-                    "content": text,
-                }
+                try:
+                    for chunk in response:
+                        # In litellm, the content maybe `None` for the last
+                        # second chunk
+                        chunk = chunk.model_dump()
+                        if _verify_text_content_in_openai_delta_response(
+                            chunk,
+                        ):
+                            delta = chunk["choices"][0]["delta"]["content"]
+                            deltas.append(delta)
+                            yield delta
+                        last_chunk = chunk
+                finally:
+                    # Update the last chunk to save locally, even if the
+                    # stream is closed early
+                    if last_chunk.get("choices", []) in [None, []]:
+                        last_chunk["choices"] = [{}]
+
+                    last_chunk["choices"][0]["message"] = {
+                        "role": "assistant",
+                        "content": "".join(deltas),
+                    }
 
-                self._save_model_invocation_and_update_monitor(
-                    kwargs,
-                    last_chunk,
-                )
+                    self._save_model_invocation_and_update_monitor(
+                        kwargs,
+                        last_chunk,
+                    )
 
             return ModelResponse(
                 stream=generator(),
+                stream_delta=True,
             )
 
         else:
@@ -3,15 +3,25 @@
 
 from __future__ import annotations
 import inspect
+import random
+import threading
 import time
 from abc import ABC, abstractmethod
 from collections import OrderedDict
-from functools import wraps
+from functools import partial, wraps
 from typing import Any, Callable, Union, List, Optional
 
 from loguru import logger
 
+from ._batching import MicroBatcher
+from ._model_cache import ResponseCache, _get_response_cache_key
 from ._model_usage import ChatUsage
+from ._rate_limiter import (
+    RateLimiter,
+    _RateLimitedStream,
+    _is_rate_limit_error,
+    _get_retry_after,
+)
 from .response import ModelResponse
 from ..exception import ResponseParsingError
 
@@ -21,6 +31,14 @@ from ..message import Msg
 from ..utils.common import _get_timestamp
 from ..constants import _DEFAULT_MAX_RETRIES
 from ..constants import _DEFAULT_RETRY_INTERVAL
+from ..constants import _DEFAULT_RESPONSE_CACHE_MAX_SIZE
+
+_RESPONSE_CACHE_EXCLUDED_KWARGS = [
+    "stream",
+    "parse_func",
+    "fault_handler",
+    "max_retries",
+]
 
 
 def _response_parse_decorator(
@@ -79,7 +97,12 @@ def _response_parse_decorator(
                         f"{response}.\n"
                         f"{e.__class__.__name__}: {e}",
                     )
-                    time.sleep(_DEFAULT_RETRY_INTERVAL * itr)
+                    # Jitter the interval to avoid retrying in lockstep
+                    time.sleep(
+                        _DEFAULT_RETRY_INTERVAL
+                        * itr
+                        * random.uniform(0.5, 1.5),
+                    )
                 else:
                     if fault_handler is not None and callable(fault_handler):
                         return fault_handler(response)
@@ -90,6 +113,154 @@ def _response_parse_decorator(
     return checking_wrapper
 
 
+def _rate_limit_decorator(
+    model_call: Callable,
+) -> Callable:
+    """A decorator for throttling the model calls by the rate limiter of the
+    model wrapper. It takes effect only when the rate limiter is set by
+    `enable_rate_limiter` or the `rate_limit` field in the model config. The
+    detailed process is as follows:
+
+        1. Wait in the rate limiter until the request is allowed to be sent.
+
+        2. Call the model. If the model API responds with a rate limit error
+        (429), the rate limiter decreases its rate and pauses all callers,
+        then the call is retried for at most `max_retries` times.
+
+        3. Release the slot when the call returns, or for stream mode, when
+        the stream is exhausted or closed.
+
+    Note the batched calls merged by `_call_batch` are sent by the
+    `call` of the `_BatchRequest` objects, which passes through this
+    decorator, so they're throttled as one request per merged request.
+    """
+
+    @wraps(model_call)
+    def rate_limiting_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        rate_limiter = self.rate_limiter
+        if rate_limiter is None:
+            return model_call(self, *args, **kwargs)
+
+        for itr in range(rate_limiter.max_retries + 1):
+            rate_limiter.acquire()
+            try:
+                response = model_call(self, *args, **kwargs)
+            except Exception as e:
+                rate_limited = _is_rate_limit_error(e)
+                rate_limiter.release(
+                    success=False,
+                    rate_limited=rate_limited,
+                    retry_after=_get_retry_after(e) if rate_limited else None,
+                )
+                if not rate_limited or itr == rate_limiter.max_retries:
+                    raise
+                logger.warning(
+                    f"Rate limit exceeded for model [{self.config_name}] "
+                    f"({itr + 1}/{rate_limiter.max_retries}), retrying: {e}",
+                )
+                continue
+
+            # pylint: disable=protected-access
+            if (
+                isinstance(response, ModelResponse)
+                and response._stream is not None
+                and not response._is_stream_started
+            ):
+                # Hold the slot until the stream is consumed
+                response._stream = _RateLimitedStream(
+                    response._stream,
+                    rate_limiter,
+                )
+            else:
+                rate_limiter.release(success=True)
+            return response
+
+        return None
+
+    return rate_limiting_wrapper
+
+
+def _batching_decorator(
+    model_call: Callable,
+) -> Callable:
+    """A decorator for collecting the concurrent model calls into batches by
+    the micro-batcher of the model wrapper. It takes effect only when the
+    micro-batcher is set by `enable_batching` or the `batching` field in the
+    model config, and the model wrapper implements `_call_batch` to merge the
+    calls. Otherwise, the calls are sent directly, since holding them in the
+    micro-batcher only adds latency."""
+
+    @wraps(model_call)
+    def batching_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        batcher = self.batcher
+        if batcher is None or self._call_batch is None:
+            return model_call(self, *args, **kwargs)
+
+        return batcher.submit(
+            partial(model_call, self),
+            args,
+            kwargs,
+            batch_call=self._call_batch,  # pylint: disable=W0212
+        )
+
+    return batching_wrapper
+
+
+def _response_cache_decorator(
+    model_call: Callable,
+) -> Callable:
+    """A decorator for reusing the responses of identical model invocations.
+    It takes effect only when the response cache of the model wrapper is
+    enabled by `enable_response_cache`. The detailed process is as follows:
+
+        1. The invocation is hashed with the identity of the model wrapper
+        (model type, config name, model name and generation arguments) and
+        the arguments of the call (formatted messages, tools and generation
+        keyword arguments).
+
+        2. If the hash is found in the cache, the cached response is returned
+        directly, and replayed as a stream if stream mode is required.
+
+        3. Otherwise, the model is called and its response (the complete text
+        for stream mode) is cached.
+    """
+
+    @wraps(model_call)
+    def caching_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        cache = self.response_cache
+        if cache is None:
+            return model_call(self, *args, **kwargs)
+
+        stream = kwargs.get("stream", None)
+        if stream is None:
+            stream = getattr(self, "stream", False)
+
+        key = _get_response_cache_key(
+            self._get_response_cache_identity(),  # pylint: disable=W0212
+            args,
+            {
+                k: v
+                for k, v in kwargs.items()
+                if k not in _RESPONSE_CACHE_EXCLUDED_KWARGS
+            },
+        )
+
+        record = cache.get(key)
+        self.monitor.update_response_cache_counter(
+            self.config_name,
+            hit=record is not None,
+        )
+
+        if record is not None:
+            return cache.to_response(record, stream=bool(stream))
+
+        return cache.cache(key, model_call(self, *args, **kwargs))
+
+    setattr(caching_wrapper, "_is_response_cached", True)
+
+    return caching_wrapper
+
+
 class ModelWrapperBase(ABC):
     """The base class for model wrapper."""
 
@@ -121,6 +292,53 @@ class ModelWrapperBase(ABC):
     wrapper object, model invocation id, timestamp, arguments, response,
      and usage as input"""
 
+    response_cache: Optional[ResponseCache] = None
+    """The response cache of the model wrapper, which is disabled (`None`) by
+    default and can be enabled by `enable_response_cache`."""
+
+    rate_limiter: Optional[RateLimiter] = None
+    """The client-side rate limiter of the model wrapper, which is disabled
+    (`None`) by default and can be enabled by `enable_rate_limiter`."""
+
+    batcher: Optional[MicroBatcher] = None
+    """The micro-batcher of the model wrapper, which is disabled (`None`) by
+    default and can be enabled by `enable_batching`."""
+
+    _call_batch: Optional[Callable] = None
+    """The function to merge the batched calls collected by the
+    micro-batcher into batched requests, which takes a list of
+    `_BatchRequest` objects and returns their responses (or exceptions) in
+    order. The model wrappers whose API supports batched inputs can
+    implement it as a method, and the merged requests should be sent by the
+    `call` of the requests. If `None`, micro-batching is skipped."""
+
+    _client: Any = None
+    """The API client, which is created lazily by `_create_client` when
+    it's accessed for the first time."""
+
+    _client_lock: Optional[threading.Lock] = None
+    """The lock of each model wrapper to avoid creating the API client
+    repeatedly in concurrent calls."""
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Wrap the `__call__` function of the subclasses with the response
+        cache, micro-batching and rate limit decorators."""
+        super().__init_subclass__(**kwargs)
+
+        model_call = cls.__dict__.get("__call__", None)
+        if (
+            model_call is not None
+            and not getattr(model_call, "__isabstractmethod__", False)
+            and not getattr(model_call, "_is_response_cached", False)
+        ):
+            setattr(
+                cls,
+                "__call__",
+                _response_cache_decorator(
+                    _batching_decorator(_rate_limit_decorator(model_call)),
+                ),
+            )
+
     def __init__(
         self,  # pylint: disable=W0613
         config_name: Optional[str] = None,
@@ -142,6 +360,7 @@ class ModelWrapperBase(ABC):
         self.monitor = MonitorManager.get_instance()
 
         self.config_name = config_name
+        self._client_lock = threading.Lock()
 
         if model_name is None:
             raise ValueError(
@@ -162,6 +381,152 @@ class ModelWrapperBase(ABC):
             f" method.",
         )
 
+    @property
+    def client(self) -> Any:
+        """The API client of the model wrapper. It's created on the first
+        access, so that constructing (and sharing) model wrappers doesn't
+        set up HTTP clients and connection pools until they're used."""
+        if self._client is None:
+            with self._get_client_lock():
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    @client.setter
+    def client(self, value: Any) -> None:
+        """Set the API client."""
+        self._client = value
+
+    def _get_client_lock(self) -> threading.Lock:
+        """Get the client lock of the model wrapper, which is created here
+        for the subclasses that don't call the base `__init__`."""
+        if self._client_lock is None:
+            self.__dict__.setdefault("_client_lock", threading.Lock())
+        return self._client_lock
+
+    def _create_client(self) -> Any:
+        """Create the API client. The model wrappers that rely on an API
+        client should override this function."""
+        raise RuntimeError(
+            f"Model Wrapper [{type(self).__name__}] doesn't have an API "
+            f"client.",
+        )
+
+    def close(self) -> None:
+        """Close the API client (and its connection pool) if it has been
+        created. The client will be re-created if the model wrapper is
+        called again."""
+        with self._get_client_lock():
+            client, self._client = self._client, None
+
+        if client is not None and hasattr(client, "close"):
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(
+                    f"Fail to close the client of model wrapper "
+                    f"[{self.config_name}]: {e}",
+                )
+
+    def enable_response_cache(
+        self,
+        max_size: int = _DEFAULT_RESPONSE_CACHE_MAX_SIZE,
+        ttl: Optional[float] = None,
+        use_disk: bool = True,
+    ) -> None:
+        """Enable the response cache, so that identical invocations (same
+        model configuration, formatted messages, tools and generation
+        arguments) reuse the cached response instead of calling the model
+        API again. Note it's only suitable for deterministic calls, e.g.
+        with temperature 0.
+
+        Args:
+            max_size (`int`, defaults to `1024`):
+                The maximum number of entries in the in-memory LRU tier.
+            ttl (`Optional[float]`, defaults to `None`):
+                The time-to-live of the cached entries in seconds. If `None`,
+                the entries never expire.
+            use_disk (`bool`, defaults to `True`):
+                Whether to persist the cached responses under the cache
+                directory of the file manager.
+        """
+        self.response_cache = ResponseCache(
+            max_size=max_size,
+            ttl=ttl,
+            use_disk=use_disk,
+        )
+
+    def disable_response_cache(self) -> None:
+        """Disable the response cache."""
+        self.response_cache = None
+
+    def enable_rate_limiter(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Enable the client-side rate limiter, which throttles the requests
+        and tokens sent to the model API, and adapts the rate when the API
+        responds with rate limit errors.
+
+        Args:
+            rate_limiter (`Optional[RateLimiter]`, defaults to `None`):
+                The rate limiter to use, which can be shared by multiple
+                model wrappers. If `None`, a new rate limiter will be created
+                with the given keyword arguments.
+            **kwargs (`Any`):
+                The keyword arguments to create the rate limiter, e.g.
+                `requests_per_minute`, `tokens_per_minute` and
+                `max_concurrency`.
+        """
+        self.rate_limiter = rate_limiter or RateLimiter(**kwargs)
+
+    def disable_rate_limiter(self) -> None:
+        """Disable the client-side rate limiter."""
+        self.rate_limiter = None
+
+    def enable_batching(
+        self,
+        batcher: Optional[MicroBatcher] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Enable the micro-batching, which collects the concurrent calls
+        within a small time window and merges them into batched requests by
+        `_call_batch`, e.g. for the embedding APIs that accept a list of
+        inputs. It takes no effect for the model wrappers that don't
+        implement `_call_batch`.
+
+        Args:
+            batcher (`Optional[MicroBatcher]`, defaults to `None`):
+                The micro-batcher to use, which can be shared by multiple
+                model wrappers. If `None`, a new micro-batcher will be created
+                with the given keyword arguments.
+            **kwargs (`Any`):
+                The keyword arguments to create the micro-batcher, e.g.
+                `max_batch_size` and `max_wait`.
+        """
+        if self._call_batch is None:
+            logger.warning(
+                f"Model wrapper [{type(self).__name__}] doesn't support "
+                f"merging the batched calls, so the calls of model "
+                f"[{self.config_name}] are sent directly.",
+            )
+        self.batcher = batcher or MicroBatcher(**kwargs)
+
+    def disable_batching(self) -> None:
+        """Disable the micro-batching."""
+        self.batcher = None
+
+    def _get_response_cache_identity(self) -> dict:
+        """Get the identity of the model wrapper used in the response cache
+        key. Note the secrets (e.g. API keys) are excluded."""
+        return {
+            "model_type": getattr(self, "model_type", type(self).__name__),
+            "config_name": self.config_name,
+            "model_name": self.model_name,
+            "generate_args": getattr(self, "generate_args", None),
+        }
+
     def format(
         self,
         *args: Union[Msg, list[Msg], None],
@@ -233,6 +598,10 @@ class ModelWrapperBase(ABC):
 
         usage_dict = usage.model_dump() if usage else {}
 
+        # Take the consumed tokens from the rate limiter
+        if self.rate_limiter is not None and usage is not None:
+            self.rate_limiter.record_usage(usage.usage.total_tokens)
+
         invocation_record = {
             "model_class": model_class,
             "timestamp": timestamp,
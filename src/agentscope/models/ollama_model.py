@@ -65,14 +65,21 @@ class OllamaWrapperBase(ModelWrapperBase, ABC):
         self.keep_alive = keep_alive
 
         try:
-            import ollama
+            import ollama  # pylint: disable=unused-import
         except ImportError as e:
             raise ImportError(
                 "The package ollama is not found. Please install it by "
                 'running command `pip install "ollama>=0.1.7"`',
             ) from e
 
-        self.client = ollama.Client(host=host, **kwargs)
+        # The client is created lazily in `_create_client`
+        self._client_kwargs = {"host": host, **kwargs}
+
+    def _create_client(self) -> Any:
+        """Create the ollama client."""
+        import ollama
+
+        return ollama.Client(**self._client_kwargs)
 
 
 class OllamaChatWrapper(OllamaWrapperBase):
@@ -203,23 +210,27 @@ class OllamaChatWrapper(OllamaWrapperBase):
 
             def generator() -> Generator[str, None, None]:
                 last_chunk = {}
-                text = ""
-                for chunk in response:
-                    text += chunk["message"]["content"]
-                    yield text
-                    last_chunk = chunk
-
-                # Replace the last chunk with the full text
-                last_chunk["message"]["content"] = text
-
-                self._save_model_invocation_and_update_monitor(
-                    kwargs,
-                    last_chunk,
-                )
+                deltas = []
+                try:
+                    for chunk in response:
+                        deltas.append(chunk["message"]["content"])
+                        yield chunk["message"]["content"]
+                        last_chunk = chunk
+                finally:
+                    # Record the invocation even if the stream is closed early
+                    if last_chunk:
+                        # Replace the last chunk with the full text
+                        last_chunk["message"]["content"] = "".join(deltas)
+
+                        self._save_model_invocation_and_update_monitor(
+                            kwargs,
+                            last_chunk,
+                        )
 
             return ModelResponse(
                 stream=generator(),
                 raw=response,
+                stream_delta=True,
             )
 
         else:
@@ -12,13 +12,21 @@ from typing import (
 
 from loguru import logger
 
+from ._batching import _BatchRequest, _merge_embedding_requests
 from ._model_usage import ChatUsage
 from ._model_utils import (
     _verify_text_content_in_openai_delta_response,
     _verify_text_content_in_openai_message_response,
 )
 from .model import ModelWrapperBase, ModelResponse
-from ..formatters import OpenAIFormatter, CommonFormatter
+from ..formatters import (
+    OpenAIFormatter,
+    CommonFormatter,
+    AnthropicFormatter,
+    DashScopeFormatter,
+    GeminiFormatter,
+    get_formatter,
+)
 from ..manager import FileManager
 from ..message import Msg, ToolUseBlock
 from ..utils.token_utils import get_openai_max_length
@@ -97,18 +105,19 @@ class OpenAIWrapperBase(ModelWrapperBase, ABC):
         self.generate_args = generate_args or {}
 
         try:
-            import openai
+            import openai  # pylint: disable=unused-import
         except ImportError as e:
             raise ImportError(
                 "Cannot find openai package, please install it by "
                 "`pip install openai`",
             ) from e
 
-        self.client = openai.OpenAI(
-            api_key=api_key,
-            organization=organization,
+        # The client is created lazily in `_create_client`
+        self._client_kwargs = {
+            "api_key": api_key,
+            "organization": organization,
             **(client_args or {}),
-        )
+        }
 
         # Set the max length of OpenAI model
         try:
@@ -119,6 +128,12 @@ class OpenAIWrapperBase(ModelWrapperBase, ABC):
             )
             self.max_length = None
 
+    def _create_client(self) -> Any:
+        """Create the OpenAI client."""
+        import openai
+
+        return openai.OpenAI(**self._client_kwargs)
+
 
 class OpenAIChatWrapper(OpenAIWrapperBase):
     """The model wrapper for OpenAI's chat API."""
@@ -270,31 +285,37 @@ class OpenAIChatWrapper(OpenAIWrapperBase):
         if stream:
 
             def generator() -> Generator[str, None, None]:
-                text = ""
+                deltas = []
                 last_chunk = {}
-                for chunk in response:
-                    chunk = chunk.model_dump()
-                    if _verify_text_content_in_openai_delta_response(chunk):
-                        text += chunk["choices"][0]["delta"]["content"]
-                        yield text
-                    last_chunk = chunk
-
-                # Update the last chunk to save locally
-                if last_chunk.get("choices", []) in [None, []]:
-                    last_chunk["choices"] = [{}]
-
-                last_chunk["choices"][0]["message"] = {
-                    "role": "assistant",
-                    "content": text,
-                }
+                try:
+                    for chunk in response:
+                        chunk = chunk.model_dump()
+                        if _verify_text_content_in_openai_delta_response(
+                            chunk,
+                        ):
+                            delta = chunk["choices"][0]["delta"]["content"]
+                            deltas.append(delta)
+                            yield delta
+                        last_chunk = chunk
+                finally:
+                    # Update the last chunk to save locally, even if the
+                    # stream is closed early
+                    if last_chunk.get("choices", []) in [None, []]:
+                        last_chunk["choices"] = [{}]
+
+                    last_chunk["choices"][0]["message"] = {
+                        "role": "assistant",
+                        "content": "".join(deltas),
+                    }
 
-                self._save_model_invocation_and_update_monitor(
-                    kwargs,
-                    last_chunk,
-                )
+                    self._save_model_invocation_and_update_monitor(
+                        kwargs,
+                        last_chunk,
+                    )
 
             return ModelResponse(
                 stream=generator(),
+                stream_delta=True,
             )
         else:
             response = response.model_dump()
@@ -397,19 +418,24 @@ class OpenAIChatWrapper(OpenAIWrapperBase):
                 required.
         """
 
+        # Format messages according to the model name, where the custom
+        # formatters registered by `register_formatter` take precedence
+        formatter = get_formatter(self.model_name)
+        if formatter is None or formatter in (
+            AnthropicFormatter,
+            DashScopeFormatter,
+            GeminiFormatter,
+        ):
+            # The formats of the other APIs don't apply to OpenAI API, e.g.
+            # the Qwen models served by vLLM
+            formatter = CommonFormatter
+
         # Multi agent scenario
         if multi_agent_mode:
-            # Format messages according to the model name
-            if OpenAIFormatter.is_supported_model(self.model_name):
-                return OpenAIFormatter.format_multi_agent(*args)
-
-            return CommonFormatter.format_multi_agent(*args)
+            return formatter.format_multi_agent(*args)
 
         # Chat scenario
-        if OpenAIFormatter.is_supported_model(self.model_name):
-            return OpenAIFormatter.format_chat(*args)
-
-        return CommonFormatter.format_chat(*args)
+        return formatter.format_chat(*args)
 
     def format_tools_json_schemas(
         self,
@@ -683,3 +709,11 @@ class OpenAIEmbeddingWrapper(OpenAIWrapperBase):
             embedding=[_["embedding"] for _ in response_json["data"]],
             raw=response_json,
         )
+
+    def _call_batch(
+        self,
+        requests: List[_BatchRequest],
+    ) -> List[Union[ModelResponse, Exception]]:
+        """Merge the texts of the batched calls into one embedding request,
+        since the embedding API accepts a list of inputs."""
+        return _merge_embedding_requests(requests, "texts")
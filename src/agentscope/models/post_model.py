@@ -8,11 +8,17 @@ from typing import Any, Union, List, Optional
 import requests
 from loguru import logger
 
+from ._batching import _BatchRequest, _merge_embedding_requests
 from .model import ModelWrapperBase, ModelResponse
 from ..constants import _DEFAULT_MAX_RETRIES
 from ..constants import _DEFAULT_MESSAGES_KEY
 from ..constants import _DEFAULT_RETRY_INTERVAL
-from ..formatters import OpenAIFormatter, GeminiFormatter, CommonFormatter
+from ..formatters import (
+    CommonFormatter,
+    AnthropicFormatter,
+    DashScopeFormatter,
+    get_formatter,
+)
 from ..message import Msg
 
 
@@ -101,12 +107,17 @@ class PostAPIModelWrapperBase(ModelWrapperBase, ABC):
         self.messages_key = messages_key
         self.retry_interval = retry_interval
 
+    def _create_client(self) -> Any:
+        """Create the HTTP session, which keeps the connections alive and
+        reuses them across the calls."""
+        return requests.Session()
+
     def _parse_response(self, response: dict) -> ModelResponse:
         """Parse the response json data into ModelResponse"""
         return ModelResponse(raw=response)
 
     def __call__(self, input_: str, **kwargs: Any) -> ModelResponse:
-        """Calling the model with requests.post.
+        """Calling the model with a post request.
 
         Args:
             input_ (`str`):
@@ -142,7 +153,7 @@ class PostAPIModelWrapperBase(ModelWrapperBase, ABC):
 
         # step2: prepare post requests
         for i in range(1, self.max_retries + 1):
-            response = requests.post(**request_kwargs)
+            response = self.client.post(**request_kwargs)
 
             if response.status_code == requests.codes.ok:
                 break
@@ -222,18 +233,19 @@ class PostAPIChatWrapper(PostAPIModelWrapperBase):
             self.json_args.get("model_name", None),
         )
 
-        # OpenAI
-        if OpenAIFormatter.is_supported_model(model_name or ""):
-            return OpenAIFormatter.format_multi_agent(*args)
-
-        # Gemini
-        if GeminiFormatter.is_supported_model(model_name or ""):
-            return GeminiFormatter.format_multi_agent(*args)
+        # OpenAI, Gemini and the custom formatters registered by
+        # `register_formatter`
+        formatter = get_formatter(model_name or "")
 
         # Include DashScope, ZhipuAI, Ollama, the other models supported by
         # litellm and unknown models
-        else:
-            return CommonFormatter.format_multi_agent(*args)
+        if formatter is None or formatter in (
+            AnthropicFormatter,
+            DashScopeFormatter,
+        ):
+            formatter = CommonFormatter
+
+        return formatter.format_multi_agent(*args)
 
 
 class PostAPIDALLEWrapper(PostAPIModelWrapperBase):
@@ -260,6 +272,33 @@ class PostAPIEmbeddingWrapper(PostAPIModelWrapperBase):
 
     model_type: str = "post_api_embedding"
 
+    def __init__(
+        self,
+        config_name: str,
+        api_url: str,
+        batch_inputs: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the model wrapper.
+
+        Args:
+            config_name (`str`):
+                The id of the model.
+            api_url (`str`):
+                The url of the post request api.
+            batch_inputs (`bool`, defaults to `False`):
+                Whether the API accepts a list of inputs as OpenAI's, so that
+                the concurrent calls can be merged into one request when
+                micro-batching is enabled.
+            **kwargs (`Any`):
+                The other arguments of `PostAPIModelWrapperBase`.
+        """
+        super().__init__(config_name=config_name, api_url=api_url, **kwargs)
+        self.batch_inputs = batch_inputs
+        if not batch_inputs:
+            # Not to send a list of inputs to the API that may not accept it
+            self._call_batch = None
+
     def _parse_response(self, response: dict) -> ModelResponse:
         """
         Parse the response json data into ModelResponse with embedding.
@@ -301,3 +340,11 @@ class PostAPIEmbeddingWrapper(PostAPIModelWrapperBase):
             embedding=embeddings,
             raw=response,
         )
+
+    def _call_batch(
+        self,
+        batch: List[_BatchRequest],
+    ) -> List[Union[ModelResponse, Exception]]:
+        """Merge the inputs of the batched calls into one embedding request,
+        which requires the API to accept a list of inputs as OpenAI's."""
+        return _merge_embedding_requests(batch, "input_")
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 """Parser for model response."""
+from __future__ import annotations
+
 import json
 from typing import Optional, Sequence, Any, Generator, Union, Tuple
 
@@ -7,6 +9,46 @@ from ..message import ToolUseBlock
 from ..utils.common import _is_json_serializable
 
 
+class ResponseStream:
+    """The stream of a model response.
+
+    Iterating over it yields `(last, text)` tuples, where `text` is the
+    accumulated text so far, as the stream generators of the previous
+    versions. The consumers that handle the increments (e.g. the `speak`
+    function of agents) should iterate over `deltas()` instead, which yields
+    `(last, delta)` tuples and avoids rebuilding the accumulated text on
+    every chunk.
+    """
+
+    def __init__(self, response: ModelResponse) -> None:
+        """Initialize the stream of the given model response."""
+        self._response = response
+        self._accumulated: Optional[Generator] = None
+
+    def __iter__(self) -> ResponseStream:
+        return self
+
+    def __next__(self) -> Tuple[bool, str]:
+        if self._accumulated is None:
+            self._accumulated = self._accumulate()
+        return next(self._accumulated)
+
+    def _accumulate(self) -> Generator[Tuple[bool, str], None, None]:
+        """Yield the accumulated text on each chunk."""
+        for last, _ in self.deltas():
+            yield last, self._response.text or ""
+
+    def deltas(self) -> Generator[Tuple[bool, str], None, None]:
+        """Yield the increments of the text, where the first element of each
+        tuple indicates whether it's the last chunk. Note the stream can only
+        be consumed once, after which the complete text is available in the
+        `text` field of the model response. If the generator is closed before
+        the last chunk, the model stream is closed, and the text received so
+        far is kept in the `text` field."""
+        # pylint: disable=protected-access
+        return self._response._iter_deltas()
+
+
 class ModelResponse:
     """Encapsulation of data returned by the model.
 
@@ -23,6 +65,7 @@ class ModelResponse:
         parsed: Optional[Any] = None,
         stream: Optional[Generator[str, None, None]] = None,
         tool_calls: Optional[list[ToolUseBlock]] = None,
+        stream_delta: bool = False,
     ) -> None:
         """Initialize the model response.
 
@@ -41,6 +84,9 @@ class ModelResponse:
                 The stream data returned by the model.
             tool_calls (`Optional[list[dict]]`, defaults to `None`):
                 The tool calls made by the model.
+            stream_delta (`bool`, defaults to `False`):
+                Whether the stream generator yields the increments of the
+                text. If `False`, it should yield the accumulated text.
         """
         self._text = text
         self.embedding = embedding
@@ -48,17 +94,23 @@ class ModelResponse:
         self.raw = raw
         self.parsed = parsed
         self._stream = stream
+        self._stream_delta = stream_delta
         self.tool_calls = tool_calls
+        self._is_stream_started = False
         self._is_stream_exhausted = False
+        self._parts: list[str] = []
 
     @property
     def text(self) -> Union[str, None]:
         """Return the text field. If the stream field is available, the text
         field will be updated accordingly."""
-        if self._text is None:
-            if self.stream is not None:
-                for _, chunk in self.stream:
-                    self._text = chunk
+        if self._text is None and self._stream is not None:
+            if not self._is_stream_started:
+                for _ in self._iter_deltas():
+                    pass
+            elif not self._is_stream_exhausted:
+                # The text accumulated so far during streaming
+                return "".join(self._parts)
         return self._text
 
     @text.setter
@@ -67,47 +119,75 @@ class ModelResponse:
         self._text = value
 
     @property
-    def stream(self) -> Union[None, Generator[Tuple[bool, str], None, None]]:
-        """Return the stream generator if it exists."""
+    def stream(self) -> Union[None, ResponseStream]:
+        """Return the stream if it exists, which yields `(last, text)`
+        tuples with the accumulated text, and the increments by its `deltas`
+        function."""
         if self._stream is None:
-            return self._stream
-        else:
-            return self._stream_generator_wrapper()
+            return None
+        return ResponseStream(self)
 
     @property
     def is_stream_exhausted(self) -> bool:
         """Whether the stream has been processed already."""
         return self._is_stream_exhausted
 
-    def _stream_generator_wrapper(
-        self,
-    ) -> Generator[Tuple[bool, str], None, None]:
-        """During processing the stream generator, the text field is updated
-        accordingly."""
-        if self._is_stream_exhausted:
+    def _iter_deltas(self) -> Generator[Tuple[bool, str], None, None]:
+        """Consume the stream generator and yield the increments of the
+        text, during which the text field is accumulated accordingly."""
+        if self._is_stream_started:
             raise RuntimeError(
                 "The stream has been processed already. Try to obtain the "
                 "result from the text field.",
             )
+        self._is_stream_started = True
 
         # These two lines are used to avoid mypy checking error
         if self._stream is None:
             return
 
+        # Hold back one chunk to know whether it's the last one
+        pending = None
+        length = 0
         try:
-            last_text = next(self._stream)
-
-            for text in self._stream:
-                self._text = last_text
-                yield False, last_text
-                last_text = text
-            self._text = last_text
-            yield True, last_text
-
-            return
-        except StopIteration:
+            for chunk in self._stream:
+                if self._stream_delta:
+                    delta = chunk
+                else:
+                    delta = chunk[length:]
+                    length = len(chunk)
+
+                if pending is not None:
+                    self._parts.append(pending)
+                    yield False, pending
+                pending = delta
+
+            if pending is not None:
+                self._parts.append(pending)
+                self._text = "".join(self._parts)
+            self._is_stream_exhausted = True
+        finally:
+            # The consumer stops early (e.g. the parser has got all the
+            # required fields), or the stream fails
+            self.close()
+
+        if pending is not None:
+            yield True, pending
+
+    def close(self) -> None:
+        """Close the stream if it's not exhausted, which stops the
+        generation of the model, and keeps the text received so far in the
+        `text` field. The model wrappers record the invocation (and the
+        usage) when their stream generators are closed."""
+        if self._stream is None or self._is_stream_exhausted:
             return
 
+        self._is_stream_started = True
+        self._is_stream_exhausted = True
+        self._text = "".join(self._parts)
+        if hasattr(self._stream, "close"):
+            self._stream.close()
+
     def __str__(self) -> str:
         if _is_json_serializable(self.raw):
             raw = self.raw
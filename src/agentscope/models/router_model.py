@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""The model wrapper that routes the requests to multiple model endpoints,
+e.g. several vLLM servers deployed with `openai_chat` or `post_api_chat`
+model configs."""
+import threading
+import time
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from typing import Any, Union, List, Optional, Literal, Sequence
+
+from loguru import logger
+
+from .model import ModelWrapperBase, ModelResponse
+from ..message import Msg
+from ..constants import (
+    _DEFAULT_ROUTER_EWMA_ALPHA,
+    _DEFAULT_ROUTER_FAILURE_COOLDOWN,
+    _DEFAULT_ROUTER_HEDGE_WORKERS,
+)
+
+
+class _Endpoint:
+    """The runtime state of a model endpoint in the router."""
+
+    def __init__(self, model: ModelWrapperBase, owned: bool) -> None:
+        self.model = model
+        self.owned = owned
+        self.outstanding = 0
+        self.latency_ewma: Optional[float] = None
+        self.unhealthy_until = 0.0
+        self.n_requests = 0
+        self.n_failures = 0
+
+
+class RouterModelWrapper(ModelWrapperBase):
+    """The model wrapper that dispatches each call to one of the endpoint
+    model wrappers, which should be compatible with each other (e.g. the
+    same model deployed on different servers).
+
+    The endpoint is selected by the least outstanding requests, or by the
+    exponentially weighted moving average (EWMA) of latency. If the call
+    fails, the endpoint is marked unhealthy for a while and the call fails
+    over to the next endpoint. Optionally, if the selected endpoint doesn't
+    respond within `hedge_delay` seconds, a duplicate request is sent to the
+    next endpoint and the first successful response is returned, which
+    reduces the tail latency.
+
+    Example of the model config:
+
+        .. code-block:: python
+
+            {
+                "config_name": "vllm_pool",
+                "model_type": "router",
+                "endpoints": [
+                    # The config names of the loaded model configs
+                    "vllm_server_1",
+                    # Or the model configs directly
+                    {
+                        "config_name": "vllm_server_2",
+                        "model_type": "openai_chat",
+                        "model_name": "llama3",
+                        "api_key": "EMPTY",
+                        "client_args": {
+                            "base_url": "http://worker2:8000/v1/"
+                        },
+                    },
+                ],
+                "strategy": "least_outstanding",
+                "hedge_delay": 10,
+            }
+    """
+
+    model_type: str = "router"
+
+    def __init__(
+        self,
+        config_name: str,
+        endpoints: Sequence[Union[str, dict, ModelWrapperBase]],
+        model_name: Optional[str] = None,
+        strategy: Literal[
+            "least_outstanding",
+            "latency_ewma",
+        ] = "least_outstanding",
+        max_attempts: Optional[int] = None,
+        failure_cooldown: float = _DEFAULT_ROUTER_FAILURE_COOLDOWN,
+        hedge_delay: Optional[float] = None,
+        ewma_alpha: float = _DEFAULT_ROUTER_EWMA_ALPHA,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the router model wrapper.
+
+        Args:
+            config_name (`str`):
+                The name of the model config.
+            endpoints (`Sequence[Union[str, dict, ModelWrapperBase]]`):
+                The endpoints to route the requests to, each of which can be
+                the config name of a loaded model config, a model config
+                dict, or a model wrapper object.
+            model_name (`Optional[str]`, defaults to `None`):
+                The name of the model. If `None`, the config name will be
+                used.
+            strategy (`Literal["least_outstanding", "latency_ewma"]`,
+            defaults to `"least_outstanding"`):
+                The strategy to select the endpoint. `"least_outstanding"`
+                selects the endpoint with the least in-flight requests, and
+                `"latency_ewma"` selects the endpoint with the lowest EWMA
+                latency weighted by its in-flight requests.
+            max_attempts (`Optional[int]`, defaults to `None`):
+                The maximum number of endpoints tried in a call. If `None`,
+                all the endpoints can be tried.
+            failure_cooldown (`float`, defaults to `5`):
+                The time in seconds that a failed endpoint is skipped unless
+                all the endpoints are unhealthy.
+            hedge_delay (`Optional[float]`, defaults to `None`):
+                The time in seconds to wait for the selected endpoint before
+                sending a duplicate request to the next endpoint. If `None`,
+                hedged requests are disabled.
+            ewma_alpha (`float`, defaults to `0.3`):
+                The smoothing factor of the latency EWMA.
+        """
+        super().__init__(
+            config_name=config_name,
+            model_name=model_name or config_name,
+        )
+
+        if len(endpoints) == 0:
+            raise ValueError(
+                f"At least one endpoint is required for the router model "
+                f"config [{config_name}].",
+            )
+
+        if strategy not in ["least_outstanding", "latency_ewma"]:
+            raise ValueError(
+                f"Unsupported routing strategy `{strategy}`, expected "
+                f"`least_outstanding` or `latency_ewma`.",
+            )
+
+        self.strategy = strategy
+        self.max_attempts = max_attempts or len(endpoints)
+        self.failure_cooldown = failure_cooldown
+        self.hedge_delay = hedge_delay
+        self.ewma_alpha = ewma_alpha
+
+        self._endpoints = [self._load_endpoint(_) for _ in endpoints]
+        self._round = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def _load_endpoint(
+        endpoint: Union[str, dict, ModelWrapperBase],
+    ) -> _Endpoint:
+        """Load the endpoint model wrapper."""
+        if isinstance(endpoint, ModelWrapperBase):
+            return _Endpoint(endpoint, owned=False)
+
+        from ..manager import ModelManager
+
+        model_manager = ModelManager.get_instance()
+        if isinstance(endpoint, str):
+            model = model_manager.get_model_by_config_name(endpoint)
+            # the shared model wrappers are closed by the model manager
+            return _Endpoint(
+                model,
+                owned=model is not model_manager.shared_models.get(endpoint),
+            )
+
+        if isinstance(endpoint, dict):
+            return _Endpoint(
+                model_manager.build_model_from_config(endpoint),
+                owned=True,
+            )
+
+        raise TypeError(
+            f"The endpoint should be a config name, a model config dict or a "
+            f"model wrapper, but got {type(endpoint)}.",
+        )
+
+    def _rank_endpoints(self) -> List[_Endpoint]:
+        """Rank the endpoints by the routing strategy, where the unhealthy
+        endpoints are put at the end for failover."""
+        now = time.monotonic()
+        with self._lock:
+            # Rotate the endpoints to break the ties evenly
+            self._round = (self._round + 1) % len(self._endpoints)
+            rotated = (
+                self._endpoints[self._round :] + self._endpoints[: self._round]
+            )
+
+            if self.strategy == "least_outstanding":
+                ranked = sorted(rotated, key=lambda _: _.outstanding)
+            else:
+                ranked = sorted(
+                    rotated,
+                    key=lambda _: (_.latency_ewma or 0.0)
+                    * (_.outstanding + 1),
+                )
+
+        healthy = [_ for _ in ranked if _.unhealthy_until <= now]
+        unhealthy = [_ for _ in ranked if _.unhealthy_until > now]
+        return (healthy + unhealthy)[: self.max_attempts]
+
+    def _call_endpoint(
+        self,
+        endpoint: _Endpoint,
+        args: tuple,
+        kwargs: dict,
+    ) -> ModelResponse:
+        """Call the endpoint and update its state."""
+        with self._lock:
+            endpoint.outstanding += 1
+            endpoint.n_requests += 1
+
+        start = time.monotonic()
+        try:
+            response = endpoint.model(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                endpoint.outstanding -= 1
+                endpoint.n_failures += 1
+                endpoint.unhealthy_until = (
+                    time.monotonic() + self.failure_cooldown
+                )
+            raise
+
+        latency = time.monotonic() - start
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.unhealthy_until = 0.0
+            if endpoint.latency_ewma is None:
+                endpoint.latency_ewma = latency
+            else:
+                endpoint.latency_ewma = (
+                    self.ewma_alpha * latency
+                    + (1 - self.ewma_alpha) * endpoint.latency_ewma
+                )
+        return response
+
+    def _hedged_call(
+        self,
+        primary: _Endpoint,
+        secondary: _Endpoint,
+        args: tuple,
+        kwargs: dict,
+    ) -> ModelResponse:
+        """Call the primary endpoint, and send a duplicate request to the
+        secondary endpoint if the primary one doesn't succeed within
+        `hedge_delay` seconds. The first successful response is returned."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=_DEFAULT_ROUTER_HEDGE_WORKERS,
+                    thread_name_prefix=f"router-{self.config_name}",
+                )
+            executor = self._executor
+
+        futures = [
+            executor.submit(self._call_endpoint, primary, args, kwargs),
+        ]
+        done, _ = wait(futures, timeout=self.hedge_delay)
+        if done and futures[0].exception() is None:
+            return futures[0].result()
+
+        logger.debug(
+            f"Send hedged request to [{secondary.model.config_name}] in "
+            f"router [{self.config_name}].",
+        )
+        futures.append(
+            executor.submit(self._call_endpoint, secondary, args, kwargs),
+        )
+
+        for future in as_completed(futures):
+            if future.exception() is None:
+                return future.result()
+        # Both failed, raise the error of the primary endpoint
+        return futures[0].result()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        """Route the call to the endpoints, with the same arguments as the
+        endpoint model wrappers.
+
+        Returns:
+            `ModelResponse`:
+                The response of the first endpoint that succeeds.
+        """
+        attempts = self._rank_endpoints()
+
+        error: Optional[Exception] = None
+        index = 0
+        while index < len(attempts):
+            try:
+                if self.hedge_delay is not None and index + 1 < len(attempts):
+                    return self._hedged_call(
+                        attempts[index],
+                        attempts[index + 1],
+                        args,
+                        kwargs,
+                    )
+                return self._call_endpoint(attempts[index], args, kwargs)
+            except Exception as e:
+                error = e
+                logger.warning(
+                    f"Router [{self.config_name}] failed to call "
+                    f"[{attempts[index].model.config_name}]: {e}",
+                )
+                index += 2 if self.hedge_delay is not None else 1
+
+        raise RuntimeError(
+            f"All the endpoints of router [{self.config_name}] failed.",
+        ) from error
+
+    @property
+    def stats(self) -> List[dict]:
+        """The statistics of the endpoints."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "config_name": _.model.config_name,
+                    "outstanding": _.outstanding,
+                    "latency_ewma": _.latency_ewma,
+                    "requests": _.n_requests,
+                    "failures": _.n_failures,
+                    "healthy": _.unhealthy_until <= now,
+                }
+                for _ in self._endpoints
+            ]
+
+    def close(self) -> None:
+        """Shut down the hedging threads and close the endpoints built from
+        the model config dicts."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+        for endpoint in self._endpoints:
+            if endpoint.owned:
+                endpoint.model.close()
+
+    def format(
+        self,
+        *args: Union[Msg, list[Msg], None],
+        multi_agent_mode: bool = True,
+    ) -> Union[List[dict], str]:
+        """Format the input messages by the first endpoint, since all the
+        endpoints are expected to accept the same input format."""
+        return self._endpoints[0].model.format(
+            *args,
+            multi_agent_mode=multi_agent_mode,
+        )
+
+    def format_tools_json_schemas(
+        self,
+        schemas: dict[str, dict],
+    ) -> list[dict]:
+        """Format the JSON schemas of the tool functions by the first
+        endpoint."""
+        return self._endpoints[0].model.format_tools_json_schemas(schemas)
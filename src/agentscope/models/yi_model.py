@@ -149,44 +149,45 @@ class YiChatWrapper(ModelWrapperBase):
         if stream:
 
             def generator() -> Generator[str, None, None]:
-                text = ""
                 last_chunk = {}
-                for line in response.iter_lines():
-                    if line:
-                        line_str = line.decode("utf-8").strip()
+                try:
+                    for line in response.iter_lines():
+                        if line:
+                            line_str = line.decode("utf-8").strip()
+
+                            # Remove prefix "data: " if exists
+                            json_str = line_str.removeprefix("data: ")
+
+                            # The last response is "data: [DONE]"
+                            if json_str == "[DONE]":
+                                continue
+
+                            try:
+                                chunk = json.loads(json_str)
+                            except json.decoder.JSONDecodeError as e:
+                                raise json.decoder.JSONDecodeError(
+                                    f"Invalid JSON: {json_str}",
+                                    e.doc,
+                                    e.pos,
+                                ) from e
 
-                        # Remove prefix "data: " if exists
-                        json_str = line_str.removeprefix("data: ")
-
-                        # The last response is "data: [DONE]"
-                        if json_str == "[DONE]":
-                            continue
-
-                        try:
-                            chunk = json.loads(json_str)
                             if _verify_text_content_in_openai_delta_response(
                                 chunk,
                             ):
-                                text += chunk["choices"][0]["delta"]["content"]
-                                yield text
+                                yield chunk["choices"][0]["delta"]["content"]
                             last_chunk = chunk
-
-                        except json.decoder.JSONDecodeError as e:
-                            raise json.decoder.JSONDecodeError(
-                                f"Invalid JSON: {json_str}",
-                                e.doc,
-                                e.pos,
-                            ) from e
-
-                # In Yi Chat API, the last valid chunk will save all the text
-                # in this message
-                self._save_model_invocation_and_update_monitor(
-                    kwargs,
-                    last_chunk,
-                )
+                finally:
+                    # Record the invocation even if the stream is closed
+                    # early. In Yi Chat API, the last valid chunk will save
+                    # all the text in this message
+                    self._save_model_invocation_and_update_monitor(
+                        kwargs,
+                        last_chunk,
+                    )
 
             return ModelResponse(
                 stream=generator(),
+                stream_delta=True,
             )
         else:
             response = response.json()
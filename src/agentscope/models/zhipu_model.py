@@ -64,10 +64,15 @@ class ZhipuAIWrapperBase(ModelWrapperBase, ABC):
         self.model_name = model_name
         self.generate_args = generate_args or {}
 
-        self.client = zhipuai.ZhipuAI(
-            api_key=api_key,
+        # The client is created lazily in `_create_client`
+        self._client_kwargs = {
+            "api_key": api_key,
             **(client_args or {}),
-        )
+        }
+
+    def _create_client(self) -> Any:
+        """Create the ZhipuAI client."""
+        return zhipuai.ZhipuAI(**self._client_kwargs)
 
 
 class ZhipuAIChatWrapper(ZhipuAIWrapperBase):
@@ -220,31 +225,37 @@ class ZhipuAIChatWrapper(ZhipuAIWrapperBase):
 
             def generator() -> Generator[str, None, None]:
                 """The generator of response text"""
-                text = ""
+                deltas = []
                 last_chunk = {}
-                for chunk in response:
-                    chunk = chunk.model_dump()
-                    if _verify_text_content_in_openai_delta_response(chunk):
-                        text += chunk["choices"][0]["delta"]["content"]
-                        yield text
-                    last_chunk = chunk
-
-                # Update the last chunk to save locally
-                if last_chunk.get("choices", []) in [None, []]:
-                    last_chunk["choices"] = [{}]
-
-                last_chunk["choices"][0]["message"] = {
-                    "role": "assistant",
-                    "content": text,
-                }
+                try:
+                    for chunk in response:
+                        chunk = chunk.model_dump()
+                        if _verify_text_content_in_openai_delta_response(
+                            chunk,
+                        ):
+                            delta = chunk["choices"][0]["delta"]["content"]
+                            deltas.append(delta)
+                            yield delta
+                        last_chunk = chunk
+                finally:
+                    # Update the last chunk to save locally, even if the
+                    # stream is closed early
+                    if last_chunk.get("choices", []) in [None, []]:
+                        last_chunk["choices"] = [{}]
+
+                    last_chunk["choices"][0]["message"] = {
+                        "role": "assistant",
+                        "content": "".join(deltas),
+                    }
 
-                self._save_model_invocation_and_update_monitor(
-                    kwargs,
-                    last_chunk,
-                )
+                    self._save_model_invocation_and_update_monitor(
+                        kwargs,
+                        last_chunk,
+                    )
 
             return ModelResponse(
                 stream=generator(),
+                stream_delta=True,
             )
 
         else:
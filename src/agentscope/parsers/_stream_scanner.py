@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""The scanners used to parse the streamed model responses incrementally,
+which consume the increments of the text, and emit the fields as soon as
+they are complete. The tag and JSON scanners only keep a small window of
+the text besides the content being extracted, so the cost of scanning is
+linear in the length of the response. The regex scanner searches the text
+after the last match again on each increment instead, see `RegexScanner`."""
+import json
+import re
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+class StreamScannerBase:
+    """The base class of the stream scanners."""
+
+    required: set
+    """The names of the fields required to be complete before the stream can
+    be stopped early."""
+
+    emitted: set
+    """The names of the emitted fields."""
+
+    def feed(self, delta: str) -> List[Tuple[str, Any]]:
+        """Consume an increment of the text, and return the newly completed
+        fields as `(name, value)` tuples."""
+        raise NotImplementedError
+
+    @property
+    def complete(self) -> bool:
+        """Whether all the required fields are complete. It's always `False`
+        if no required field is specified."""
+        return len(self.required) > 0 and self.required <= self.emitted
+
+
+class _TagField:
+    """The state of extracting the content between a pair of tags."""
+
+    def __init__(self, tag_begin: str, tag_end: str) -> None:
+        self.tag_begin = tag_begin
+        self.tag_end = tag_end
+        self.found_begin = False
+        self.done = False
+        self._tail = ""
+        self._parts: List[str] = []
+
+    def feed(self, delta: str) -> Optional[str]:
+        """Consume an increment, and return the content once the end tag is
+        found."""
+        if self.done:
+            return None
+
+        window = self._tail + delta
+        if not self.found_begin:
+            index = window.find(self.tag_begin)
+            if index == -1:
+                # Keep the possible prefix of the beginning tag
+                self._tail = window[
+                    max(0, len(window) - len(self.tag_begin) + 1) :
+                ]
+                return None
+            self.found_begin = True
+            self._tail = ""
+            window = window[index + len(self.tag_begin) :]
+
+        index = window.find(self.tag_end)
+        if index == -1:
+            # Keep the possible prefix of the end tag for the next increment
+            keep = len(window) - len(self.tag_end) + 1
+            if keep > 0:
+                self._parts.append(window[:keep])
+                self._tail = window[keep:]
+            else:
+                self._tail = window
+            return None
+
+        self._parts.append(window[:index])
+        self.done = True
+        return "".join(self._parts)
+
+    @property
+    def content(self) -> str:
+        """The content received so far."""
+        return "".join(self._parts) + self._tail
+
+
+class TagScanner(StreamScannerBase):
+    """The scanner that extracts the content between the tags of each field,
+    where each field is searched independently, the same as
+    `ParserBase._extract_first_content_by_tag`."""
+
+    def __init__(
+        self,
+        fields: Sequence[Tuple[str, str, str, Optional[Callable]]],
+        required: Sequence[str],
+    ) -> None:
+        """Initialize the scanner.
+
+        Args:
+            fields (`Sequence[Tuple[str, str, str, Optional[Callable]]]`):
+                The fields as `(name, tag_begin, tag_end, parse_func)`
+                tuples, where `parse_func` converts the extracted content
+                (e.g. by `json.loads`). If it raises an exception, the field
+                is not emitted and is left to the final parsing.
+            required (`Sequence[str]`):
+                The names of the required fields.
+        """
+        self._fields = [
+            (name, _TagField(tag_begin, tag_end), parse_func)
+            for name, tag_begin, tag_end, parse_func in fields
+        ]
+        self.required = set(required)
+        self.emitted = set()
+
+    def feed(self, delta: str) -> List[Tuple[str, Any]]:
+        """Consume an increment of the text."""
+        completed = []
+        for name, field, parse_func in self._fields:
+            content = field.feed(delta)
+            if content is None:
+                continue
+
+            if parse_func is not None:
+                try:
+                    content = parse_func(content)
+                except Exception:
+                    continue
+
+            self.emitted.add(name)
+            completed.append((name, content))
+        return completed
+
+
+class JsonDictScanner(StreamScannerBase):
+    """The scanner that extracts the top-level members of the JSON
+    dictionary between the tags, e.g. the "speak" field of a ReAct response
+    is emitted before the "function" field is generated."""
+
+    def __init__(
+        self,
+        tag_begin: str,
+        tag_end: str,
+        loads: Callable[[str], Any] = json.loads,
+    ) -> None:
+        """Initialize the scanner.
+
+        Args:
+            tag_begin (`str`):
+                The beginning tag of the JSON dictionary.
+            tag_end (`str`):
+                The ending tag of the JSON dictionary.
+            loads (`Callable[[str], Any]`, defaults to `json.loads`):
+                The function to parse a JSON dictionary from a string.
+        """
+        self._field = _TagField(tag_begin, tag_end)
+        self._loads = loads
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member: List[str] = []
+        self._closed = False
+        self.required = set()
+        self.emitted = set()
+
+    @property
+    def complete(self) -> bool:
+        """Whether the JSON dictionary is closed."""
+        return self._closed
+
+    def feed(  # pylint: disable=too-many-branches
+        self,
+        delta: str,
+    ) -> List[Tuple[str, Any]]:
+        """Consume an increment of the text."""
+        if self._closed:
+            return []
+
+        if not self._field.found_begin:
+            self._field.feed(delta)
+            if not self._field.found_begin:
+                return []
+            # Scan the content received after the beginning tag
+            delta = self._field.content
+
+        completed: List[Tuple[str, Any]] = []
+        start = 0
+        for index, char in enumerate(delta):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    start = index + 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._member.append(delta[start:index])
+                    self._emit_member(completed)
+                    self._closed = True
+                    return completed
+            elif char == "," and self._depth == 1:
+                self._member.append(delta[start:index])
+                self._emit_member(completed)
+                start = index + 1
+
+        if self._depth >= 1:
+            self._member.append(delta[start:])
+        return completed
+
+    def _emit_member(self, completed: List[Tuple[str, Any]]) -> None:
+        """Parse the buffered member and add it into the completed fields."""
+        member = "".join(self._member).strip()
+        self._member = []
+        if not member:
+            return
+        try:
+            parsed = self._loads("{" + member + "}")
+        except Exception:
+            return
+        if isinstance(parsed, dict):
+            for key, value in parsed.items():
+                self.emitted.add(key)
+                completed.append((key, value))
+
+
+class RegexScanner(StreamScannerBase):
+    """The scanner that extracts the matches of a regex pattern from the
+    text after the last match. It assumes a match found in the text received
+    so far is also a match in the complete text, which holds for the lazy
+    patterns ending with a closing tag.
+
+    Since a match of an arbitrary pattern may start anywhere in the text
+    after the last match, the text is searched again on each increment, so
+    the cost is quadratic in the length of the text between two matches in
+    the worst case. Prefer `TagScanner` for the long fields with fixed tags.
+    """
+
+    def __init__(
+        self,
+        pattern: str,
+        required: Sequence[str],
+        parse_func: Optional[Callable] = None,
+    ) -> None:
+        """Initialize the scanner.
+
+        Args:
+            pattern (`str`):
+                The regex pattern with the named groups `name` and `content`.
+            required (`Sequence[str]`):
+                The names of the required fields.
+            parse_func (`Optional[Callable]`, defaults to `None`):
+                The function to convert the extracted content. If it raises
+                an exception, the content is emitted as it is.
+        """
+        self._pattern = re.compile(pattern, flags=re.DOTALL)
+        self._parse_func = parse_func
+        self._pending = ""
+        self.required = set(required)
+        self.emitted = set()
+
+    def feed(self, delta: str) -> List[Tuple[str, Any]]:
+        """Consume an increment of the text."""
+        self._pending += delta
+        completed = []
+        while True:
+            match = self._pattern.search(self._pending)
+            if match is None or match.end() == 0:
+                break
+            name = match.group("name")
+            if name not in self.emitted:
+                content = match.group("content")
+                if self._parse_func is not None:
+                    try:
+                        content = self._parse_func(content)
+                    except Exception:
+                        pass
+                self.emitted.add(name)
+                completed.append((name, content))
+            self._pending = self._pending[match.end() :]
+        return completed
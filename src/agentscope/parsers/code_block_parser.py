@@ -4,6 +4,7 @@ from typing import Optional
 
 from agentscope.models import ModelResponse
 from agentscope.parsers import ParserBase
+from agentscope.parsers._stream_scanner import StreamScannerBase, TagScanner
 
 
 class MarkdownCodeBlockParser(ParserBase):
@@ -70,3 +71,10 @@ class MarkdownCodeBlockParser(ParserBase):
         )
         response.parsed = extract_text
         return response
+
+    def _create_stream_scanner(self) -> StreamScannerBase:
+        """The code is emitted once the closing tag is generated."""
+        return TagScanner(
+            [(self.name, self.tag_begin, self.tag_end, None)],
+            required=[self.name],
+        )
@@ -2,7 +2,6 @@
 """The parser for JSON object in the model response."""
 import inspect
 import json
-from copy import deepcopy
 from typing import Optional, Any, List, Sequence, Union
 
 from loguru import logger
@@ -17,7 +16,17 @@ from ..exception import (
 from ..models import ModelResponse
 from ..parsers import ParserBase
 from ..parsers.parser_base import DictFilterMixin
+from ..parsers._stream_scanner import (
+    StreamScannerBase,
+    TagScanner,
+    JsonDictScanner,
+)
 from ..utils.common import _join_str_with_comma_and
+from ..utils.json_utils import loads_tolerant
+from ..utils.schema_utils import (
+    format_schema_instruction,
+    validate_and_dump,
+)
 
 
 class MarkdownJsonObjectParser(ParserBase):
@@ -79,7 +88,9 @@ class MarkdownJsonObjectParser(ParserBase):
         except TagNotFoundError as e:
             # Try to fix the missing tag error by adding the tag
             try:
-                response_copy = deepcopy(response)
+                # Only copy the text, since the response may hold a
+                # generator of the stream, which cannot be deep copied
+                response_copy = ModelResponse(text=response.text)
 
                 # Fix the missing tags
                 if e.missing_begin_tag:
@@ -107,7 +118,7 @@ class MarkdownJsonObjectParser(ParserBase):
 
         # Parse the content into JSON object
         try:
-            parsed_json = json.loads(extract_text)
+            parsed_json = loads_tolerant(extract_text)
             response.parsed = parsed_json
             return response
         except json.decoder.JSONDecodeError as e:
@@ -119,6 +130,13 @@ class MarkdownJsonObjectParser(ParserBase):
                 raw_response=raw_response,
             ) from None
 
+    def _create_stream_scanner(self) -> StreamScannerBase:
+        """The JSON object is emitted once the closing tag is generated."""
+        return TagScanner(
+            [(self.name, self.tag_begin, self.tag_end, loads_tolerant)],
+            required=[self.name],
+        )
+
     @property
     def format_instruction(self) -> str:
         """Get the format instruction for the json object, if the
@@ -252,11 +270,22 @@ class MarkdownJsonDictParser(MarkdownJsonObjectParser, DictFilterMixin):
                 content_hint=self.content_hint,
             )
         else:
-            return self._format_instruction_with_schema.format(
-                content_hint=self.content_hint,
-                schema=self.pydantic_class.model_json_schema(),
+            return format_schema_instruction(
+                self._format_instruction_with_schema,
+                self.content_hint,
+                self.pydantic_class,
             )
 
+    def _create_stream_scanner(self) -> StreamScannerBase:
+        """The top-level fields of the JSON dictionary are emitted once they
+        are complete, and the stream can be stopped once the dictionary is
+        closed."""
+        return JsonDictScanner(
+            self.tag_begin,
+            self.tag_end,
+            loads=loads_tolerant,
+        )
+
     def parse(self, response: ModelResponse) -> ModelResponse:
         """Parse the text field of the response to a JSON dictionary object,
         store it in the parsed field of the response object, and check if the
@@ -276,9 +305,10 @@ class MarkdownJsonDictParser(MarkdownJsonObjectParser, DictFilterMixin):
         # Requirement checking by Pydantic
         if self.pydantic_class is not None:
             try:
-                response.parsed = self.pydantic_class(
-                    **response.parsed,
-                ).model_dump()
+                response.parsed = validate_and_dump(
+                    self.pydantic_class,
+                    response.parsed,
+                )
             except Exception as e:
                 raise JsonParsingError(
                     message=str(e),
@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 """The base class for model response parser."""
 from abc import ABC, abstractmethod
-from typing import Union, Sequence
+from typing import Union, Sequence, Generator, Tuple, Any, Optional
 
 from loguru import logger
 
 from agentscope.exception import TagNotFoundError
 from agentscope.models import ModelResponse
+from ._stream_scanner import StreamScannerBase
 
 # TODO: Support one-time warning in logger rather than setting global variable
 _FIRST_TIME_TO_REPORT_CONTENT = True
@@ -21,6 +22,77 @@ class ParserBase(ABC):
         """Parse the response text to a specific object, and stored in the
         parsed field of the response object."""
 
+    def parse_stream(
+        self,
+        response: ModelResponse,
+        stop_early: bool = True,
+    ) -> Generator[Tuple[str, Any], None, None]:
+        """Parse the streamed response incrementally, and yield the fields
+        as `(name, value)` tuples as soon as they are complete, e.g. the
+        content between a pair of tags once the end tag is generated. So the
+        agent can act on a field (e.g. speak it) before the whole response
+        is generated.
+
+        After the stream ends, the response is parsed by `parse` as usual,
+        so the `parsed` field of the response and the raised errors are the
+        same as `parse`, and the fields not emitted yet are yielded. For the
+        parsers of dictionaries, the fields are the items of the parsed
+        dictionary, otherwise the parsed object is yielded as a single field
+        named by the `name` attribute of the parser.
+
+        Example:
+
+            .. code-block:: python
+
+                response = model(prompt)
+                for name, value in parser.parse_stream(response):
+                    print(name, value)
+                print(response.parsed)
+
+        Args:
+            response (`ModelResponse`):
+                The response to be parsed, whose stream hasn't been consumed.
+                If it's not a streamed response, the fields are yielded after
+                parsing.
+            stop_early (`bool`, defaults to `True`):
+                Whether to stop the model stream once all the required fields
+                are complete, which saves the tokens and latency of the
+                trailing text. Note the `text` field of the response will be
+                truncated accordingly.
+
+        Returns:
+            `Generator[Tuple[str, Any], None, None]`:
+                The generator of the completed fields.
+        """
+        emitted = set()
+        # pylint: disable=assignment-from-none
+        scanner = self._create_stream_scanner()
+        if response.stream is not None and scanner is not None:
+            deltas = response.stream.deltas()
+            for _, delta in deltas:
+                for name, value in scanner.feed(delta):
+                    emitted.add(name)
+                    yield name, value
+
+                if stop_early and scanner.complete:
+                    # Close the model stream
+                    deltas.close()
+                    break
+
+        response = self.parse(response)
+
+        if isinstance(self, DictFilterMixin):
+            for name, value in response.parsed.items():
+                if name not in emitted:
+                    yield name, value
+        elif len(emitted) == 0:
+            yield getattr(self, "name", "parsed"), response.parsed
+
+    def _create_stream_scanner(self) -> Optional[StreamScannerBase]:
+        """Create the scanner to parse the streamed response incrementally.
+        If `None`, the streamed response is parsed after it's complete."""
+        return None
+
     def _extract_first_content_by_tag(
         self,
         response: ModelResponse,
@@ -10,6 +10,8 @@ from ..exception import TagNotFoundError
 from ..models import ModelResponse
 from ..parsers import ParserBase
 from ..parsers.parser_base import DictFilterMixin
+from ..parsers._stream_scanner import StreamScannerBase, RegexScanner
+from ..utils.json_utils import loads_tolerant
 
 
 class RegexTaggedContentParser(ParserBase, DictFilterMixin):
@@ -158,7 +160,7 @@ class RegexTaggedContentParser(ParserBase, DictFilterMixin):
             keys_failed = []
             for key in results:
                 try:
-                    results[key] = json.loads(results[key])
+                    results[key] = loads_tolerant(results[key])
                 except json.JSONDecodeError:
                     keys_failed.append(key)
 
@@ -169,3 +171,12 @@ class RegexTaggedContentParser(ParserBase, DictFilterMixin):
 
         response.parsed = results
         return response
+
+    def _create_stream_scanner(self) -> StreamScannerBase:
+        """The tagged contents are emitted once they match the pattern, and
+        the stream can be stopped once all the required keys are found."""
+        return RegexScanner(
+            self.tagged_content_pattern,
+            required=self.required_keys,
+            parse_func=loads_tolerant if self.try_parse_json else None,
+        )
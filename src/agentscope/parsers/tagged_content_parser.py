@@ -7,6 +7,8 @@ from agentscope.exception import JsonParsingError, TagNotFoundError
 from agentscope.models import ModelResponse
 from agentscope.parsers import ParserBase
 from agentscope.parsers.parser_base import DictFilterMixin
+from agentscope.parsers._stream_scanner import StreamScannerBase, TagScanner
+from agentscope.utils.json_utils import loads_tolerant
 
 
 class TaggedContent:
@@ -165,7 +167,7 @@ class MultiTaggedContentParser(ParserBase, DictFilterMixin):
         """Parse the response text by tags, and return a dict of their content
         in the parsed field of the model response object. If the tagged content
         requires to parse as a JSON object by `parse_json` equals to `True`, it
-        will be parsed as a JSON object by `json.loads`."""
+        will be parsed as a JSON object by `loads_tolerant`."""
 
         tag_to_content = {}
         for tagged_content in self.tagged_contents:
@@ -181,7 +183,7 @@ class MultiTaggedContentParser(ParserBase, DictFilterMixin):
 
                 if tagged_content.parse_json:
                     try:
-                        extract_content = json.loads(extract_content)
+                        extract_content = loads_tolerant(extract_content)
                     except json.decoder.JSONDecodeError as e:
                         raw_response = f"{tag_begin}{extract_content}{tag_end}"
                         raise JsonParsingError(
@@ -207,3 +209,25 @@ class MultiTaggedContentParser(ParserBase, DictFilterMixin):
 
         response.parsed = tag_to_content
         return response
+
+    def _create_stream_scanner(self) -> StreamScannerBase:
+        """The tagged contents are emitted once their end tags are
+        generated, and the stream can be stopped once all the tagged contents
+        that are not allowed to be missing are complete."""
+        keys_allow_missing = self.keys_allow_missing or []
+        return TagScanner(
+            [
+                (
+                    _.name,
+                    _.tag_begin,
+                    _.tag_end,
+                    loads_tolerant if _.parse_json else None,
+                )
+                for _ in self.tagged_contents
+            ],
+            required=[
+                _.name
+                for _ in self.tagged_contents
+                if _.name not in keys_allow_missing
+            ],
+        )
@@ -4,9 +4,13 @@ Knowledge bank for making Knowledge objects easier to use
 """
 import copy
 import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, Union, Type, Any
 from loguru import logger
 from agentscope.agents import AgentBase
+from agentscope.constants import DEFAULT_KNOWLEDGE_WARM_UP_WORKERS
 from .knowledge import Knowledge
 
 DEFAULT_INDEX_CONFIG = {
@@ -34,13 +38,17 @@ class KnowledgeBank:
     """
     KnowledgeBank enables
     1) provide an easy and fast way to initialize the Knowledge object;
-    2) make Knowledge object reusable and sharable for multiple agents.
+    2) make Knowledge object reusable and sharable for multiple agents;
+    3) load the Knowledge objects lazily on demand, and unload the least
+    recently used ones when too many are loaded.
     """
 
     def __init__(
         self,
         configs: Union[dict, str, list, None] = None,
         new_knowledge_types: Union[type[Knowledge], list, None] = None,
+        lazy: bool = False,
+        max_loaded_knowledge: Optional[int] = None,
     ) -> None:
         """
         Initialize the knowledge bank
@@ -55,6 +63,15 @@ class KnowledgeBank:
             new_knowledge_types (`Union[type[Knowledge], list, None]`):
                 User-defined new knowledge classes that are
                 not in the AgentScope repo.
+            lazy (`bool`, defaults to `False`):
+                Whether to build the knowledge instances on the first
+                `get_knowledge` or `equip` instead of at initialization,
+                so that the knowledge never used doesn't load its index.
+                Use `warm_up` to load them in the background.
+            max_loaded_knowledge (`Optional[int]`, defaults to `None`):
+                The maximum number of loaded knowledge instances. If
+                exceeded, the least recently used ones are unloaded and
+                built again on their next use. `None` means no limit.
         """
         if configs is None:
             knowledge_configs = []
@@ -69,12 +86,28 @@ class KnowledgeBank:
         else:
             knowledge_configs = configs
 
-        self.stored_knowledge: dict[str, Knowledge] = {}
+        if max_loaded_knowledge is not None and max_loaded_knowledge < 1:
+            raise ValueError(
+                "max_loaded_knowledge should be a positive integer, but got "
+                f"{max_loaded_knowledge}.",
+            )
+        self.lazy = lazy
+        self.max_loaded_knowledge = max_loaded_knowledge
+
+        # the loaded knowledge in the order of the last use
+        self.stored_knowledge: dict[str, Knowledge] = OrderedDict()
         self.known_knowledge_types: dict[str, type[Knowledge]] = {}
+        # the arguments to build each knowledge, kept to build the knowledge
+        # lazily or again after unloading
+        self._knowledge_args: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._build_locks: dict[str, threading.Lock] = {}
 
         from .llama_index_knowledge import LlamaIndexKnowledge
+        from .local_ann_knowledge import LocalANNKnowledge
 
         self.register_knowledge_type(LlamaIndexKnowledge)
+        self.register_knowledge_type(LocalANNKnowledge)
 
         if new_knowledge_types is not None:
             if not isinstance(new_knowledge_types, list):
@@ -154,6 +187,7 @@ class KnowledgeBank:
         knowledge_id: str,
         knowledge_type: str,
         knowledge_config: Optional[dict] = None,
+        lazy: Optional[bool] = None,
         **kwargs: Any,
     ) -> None:
         """
@@ -184,20 +218,154 @@ class KnowledgeBank:
                     - ...
                     Examples can refer to
                     ../examples/conversation_with_RAG_agents/
+            lazy (`Optional[bool]`, defaults to `None`):
+                Whether to build the knowledge on its first use. If `None`,
+                the `lazy` setting of the knowledge bank is used.
             kwargs (`Any`):
                 Additional keyword arguments to initialize knowledge.
         """
-        if knowledge_id in self.stored_knowledge:
-            raise ValueError(f"knowledge_id {knowledge_id} already exists.")
-
-        self.stored_knowledge[knowledge_id] = self.known_knowledge_types[
-            knowledge_type
-        ].build_knowledge_instance(
-            knowledge_id=knowledge_id,
-            knowledge_config=knowledge_config,
-            **kwargs,
+        if knowledge_type not in self.known_knowledge_types:
+            raise ValueError(
+                f"Unknown knowledge type {knowledge_type}, please register "
+                "it by `register_knowledge_type` first.",
+            )
+        with self._lock:
+            if (
+                knowledge_id in self.stored_knowledge
+                or knowledge_id in self._knowledge_args
+            ):
+                raise ValueError(
+                    f"knowledge_id {knowledge_id} already exists.",
+                )
+            self._knowledge_args[knowledge_id] = {
+                "knowledge_type": knowledge_type,
+                "knowledge_config": knowledge_config,
+                "kwargs": kwargs,
+            }
+
+        if lazy is None:
+            lazy = self.lazy
+        if not lazy:
+            self._load_knowledge(knowledge_id)
+
+    def _load_knowledge(self, knowledge_id: str) -> Knowledge:
+        """
+        Get the loaded knowledge, or build it if it's not loaded yet. The
+        knowledge is built only once when requested by multiple threads.
+
+        Args:
+            knowledge_id (`str`):
+                Unique id for the Knowledge object
+
+        Returns:
+            `Knowledge`: The loaded Knowledge object
+        """
+        with self._lock:
+            if knowledge_id in self.stored_knowledge:
+                self.stored_knowledge.move_to_end(knowledge_id)
+                return self.stored_knowledge[knowledge_id]
+            if knowledge_id not in self._knowledge_args:
+                raise ValueError(
+                    f"{knowledge_id} does not exist in the knowledge bank.",
+                )
+            build_lock = self._build_locks.setdefault(
+                knowledge_id,
+                threading.Lock(),
+            )
+
+        with build_lock:
+            with self._lock:
+                knowledge = self.stored_knowledge.get(knowledge_id)
+            if knowledge is not None:
+                return knowledge
+
+            args = self._knowledge_args[knowledge_id]
+            knowledge = self.known_knowledge_types[
+                args["knowledge_type"]
+            ].build_knowledge_instance(
+                knowledge_id=knowledge_id,
+                knowledge_config=args["knowledge_config"],
+                **args["kwargs"],
+            )
+            logger.info(f"data loaded for knowledge_id = {knowledge_id}.")
+
+            with self._lock:
+                self.stored_knowledge[knowledge_id] = knowledge
+                self._evict_knowledge()
+        return knowledge
+
+    def _evict_knowledge(self) -> None:
+        """Unload the least recently used knowledge until the number of
+        loaded knowledge is within `max_loaded_knowledge`. The knowledge
+        stored without building arguments can't be built again, and thus
+        is never unloaded."""
+        if self.max_loaded_knowledge is None:
+            return
+        evictable = [
+            knowledge_id
+            for knowledge_id in self.stored_knowledge
+            if knowledge_id in self._knowledge_args
+        ]
+        n_exceeded = len(self.stored_knowledge) - self.max_loaded_knowledge
+        for knowledge_id in evictable[: max(n_exceeded, 0)]:
+            self.stored_knowledge.pop(knowledge_id)
+            logger.info(f"knowledge unloaded: {knowledge_id}.")
+
+    def unload_knowledge(self, knowledge_id: str) -> None:
+        """
+        Unload a knowledge object to release its memory, which is built
+        again on its next use. Note the agents equipped with the knowledge
+        still hold their references.
+
+        Args:
+            knowledge_id (`str`):
+                Unique id for the Knowledge object
+        """
+        with self._lock:
+            if knowledge_id not in self._knowledge_args:
+                raise ValueError(
+                    f"{knowledge_id} can't be built again after unloading.",
+                )
+            if self.stored_knowledge.pop(knowledge_id, None) is not None:
+                logger.info(f"knowledge unloaded: {knowledge_id}.")
+
+    def warm_up(
+        self,
+        knowledge_id_list: Optional[list[str]] = None,
+        background: bool = True,
+        max_workers: int = DEFAULT_KNOWLEDGE_WARM_UP_WORKERS,
+    ) -> list[Future]:
+        """
+        Load the knowledge objects before their first use.
+
+        Args:
+            knowledge_id_list (`Optional[list[str]]`, defaults to `None`):
+                The ids of the knowledge to load. If `None`, all the
+                knowledge in the knowledge bank are loaded.
+            background (`bool`, defaults to `True`):
+                Whether to return immediately and load the knowledge in
+                background threads.
+            max_workers (`int`, defaults to
+            `DEFAULT_KNOWLEDGE_WARM_UP_WORKERS`):
+                The maximum number of knowledge loaded concurrently.
+
+        Returns:
+            `list[Future]`: The futures of the loaded knowledge objects.
+        """
+        if knowledge_id_list is None:
+            with self._lock:
+                knowledge_id_list = list(self._knowledge_args)
+
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="knowledge-warm-up",
         )
-        logger.info(f"data loaded for knowledge_id = {knowledge_id}.")
+        futures = [
+            executor.submit(self._load_knowledge, knowledge_id)
+            for knowledge_id in knowledge_id_list
+        ]
+        executor.shutdown(wait=not background)
+        return futures
 
     def get_knowledge(
         self,
@@ -205,7 +373,8 @@ class KnowledgeBank:
         duplicate: bool = False,
     ) -> Knowledge:
         """
-        Get a Knowledge object from the knowledge bank.
+        Get a Knowledge object from the knowledge bank, which is built
+        first if it's not loaded yet.
 
         Args:
             knowledge_id (`str`):
@@ -216,11 +385,7 @@ class KnowledgeBank:
             Knowledge:
                 The Knowledge object defined with Llama-index
         """
-        if knowledge_id not in self.stored_knowledge:
-            raise ValueError(
-                f"{knowledge_id} does not exist in the knowledge bank.",
-            )
-        knowledge = self.stored_knowledge[knowledge_id]
+        knowledge = self._load_knowledge(knowledge_id)
         if duplicate:
             knowledge = copy.deepcopy(knowledge)
         logger.info(f"knowledge bank loaded: {knowledge_id}.")
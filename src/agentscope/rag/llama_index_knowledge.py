@@ -4,9 +4,21 @@ This module is an integration of the Llama index RAG
 into AgentScope package
 """
 
+import asyncio
 import copy
+import hashlib
+import heapq
+import inspect
+import json
+import math
 import os.path
-from typing import Any, Optional, List, Union
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, List, Union, Literal, Tuple
+import numpy as np
 from loguru import logger
 
 try:
@@ -18,7 +30,7 @@ try:
     )
     from llama_index.core.ingestion import IngestionPipeline
     from llama_index.core.storage.docstore import SimpleDocumentStore
-    from llama_index.retrievers.bm25 import BM25Retriever
+    from llama_index.core.storage.docstore.types import BaseDocumentStore
 
     from llama_index.core.vector_stores.types import VectorStore
     from llama_index.core.bridge.pydantic import PrivateAttr
@@ -32,6 +44,9 @@ try:
         Document,
         TransformComponent,
         BaseNode,
+        MetadataMode,
+        NodeWithScore,
+        QueryBundle,
     )
 except ImportError:
     llama_index = None
@@ -40,7 +55,7 @@ except ImportError:
     Embedding = None
     IngestionPipeline = None
     SimpleDocumentStore = None
-    BM25Retriever = None
+    BaseDocumentStore = None
     VectorStore = None
     SentenceSplitter = None
     VectorStoreIndex = None
@@ -50,6 +65,9 @@ except ImportError:
     Document = None
     TransformComponent = None
     BaseNode = None
+    MetadataMode = None
+    NodeWithScore = None
+    QueryBundle = None
 
 from agentscope.manager import FileManager, ModelManager
 from agentscope.models import ModelWrapperBase
@@ -57,9 +75,203 @@ from agentscope.constants import (
     DEFAULT_TOP_K,
     DEFAULT_CHUNK_SIZE,
     DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_EMBED_BATCH_SIZE,
+    DEFAULT_EMBED_MAX_CONCURRENCY,
+    DEFAULT_RETRIEVER_CACHE_MAX_SIZE,
+    DEFAULT_RRF_K,
+    DEFAULT_INGESTION_BATCH_SIZE,
 )
 from agentscope.rag import Knowledge, RetrievedChunk
 
+# The file name of the persisted BM25 index within the persist directory
+_BM25_PERSIST_FNAME = "bm25_index.json"
+
+# The file name of the manifest recording the indexed files and documents
+_MANIFEST_FNAME = "refresh_manifest.json"
+
+# Single CJK characters or runs of other word characters
+_TOKEN_PATTERN = re.compile(r"[\u4e00-\u9fff]|[^\W\u4e00-\u9fff]+")
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split the text into lowercase tokens for the sparse retrieval."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _chunk_hash(node: BaseNode) -> str:
+    """The hash of the content to embed of a chunk, which is unchanged if
+    the embedding of the chunk is unchanged."""
+    return hashlib.sha256(
+        node.get_content(metadata_mode=MetadataMode.EMBED).encode("utf-8"),
+    ).hexdigest()
+
+
+def _file_stat(path: str) -> list:
+    """The modification time and size of a file to detect changes."""
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class _QueryCache:
+    """
+    An LRU cache of the retrieved chunks for the queries. The queries are
+    matched exactly by their hashes, and optionally the near-duplicate
+    queries are matched by the cosine similarity of their embeddings.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        similarity_threshold: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            max_size (`int`):
+                The maximum number of cached queries, the least recently
+                used ones are evicted when exceeded.
+            similarity_threshold (`Optional[float]`):
+                The minimum cosine similarity for a query to reuse the
+                chunks of a cached query. If `None`, only the exactly same
+                queries are matched.
+        """
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        # query hash -> (embedding slot, retrieved chunks)
+        self._entries: OrderedDict = OrderedDict()
+        # the normalized query embeddings and the top k of each slot, with
+        # the free slots marked by top k 0
+        self._embeddings: Optional[np.ndarray] = None
+        self._slot_top_ks = np.zeros(max_size, dtype=np.int64)
+        self._slot_keys: list = [None] * max_size
+        self._free_slots = list(range(max_size - 1, -1, -1))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash(query: str, similarity_top_k: int) -> str:
+        """The hash of the query and the top k."""
+        return hashlib.sha256(
+            f"{similarity_top_k}:{query}".encode("utf-8"),
+        ).hexdigest()
+
+    def get(
+        self,
+        query: str,
+        similarity_top_k: int,
+        embedding: Optional[List[float]] = None,
+    ) -> Optional[list]:
+        """
+        Get the cached chunks of the same query, or of the most similar
+        query if the embedding is given.
+
+        Args:
+            query (`str`):
+                The query string.
+            similarity_top_k (`int`):
+                The number of the retrieved chunks.
+            embedding (`Optional[List[float]]`):
+                The embedding of the query to match the similar queries.
+
+        Returns:
+            `Optional[list]`: A copy of the cached chunks, or `None` if
+            missed.
+        """
+        key = self._hash(query, similarity_top_k)
+        with self._lock:
+            if key not in self._entries and (
+                embedding is not None
+                and self.similarity_threshold is not None
+                and self._embeddings is not None
+            ):
+                query_emb = np.asarray(embedding, dtype=np.float32)
+                scores = self._embeddings.dot(
+                    query_emb / (np.linalg.norm(query_emb) or 1.0),
+                )
+                scores[self._slot_top_ks != similarity_top_k] = -np.inf
+                slot = int(np.argmax(scores))
+                if scores[slot] < self.similarity_threshold:
+                    return None
+                key = self._slot_keys[slot]
+                self.semantic_hits += 1
+            elif key not in self._entries:
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return [copy.copy(_) for _ in self._entries[key][1]]
+
+    def put(
+        self,
+        query: str,
+        similarity_top_k: int,
+        chunks: list,
+        embedding: Optional[List[float]] = None,
+    ) -> None:
+        """
+        Cache the chunks retrieved for a query, which is counted as a
+        cache miss.
+
+        Args:
+            query (`str`):
+                The query string.
+            similarity_top_k (`int`):
+                The number of the retrieved chunks.
+            chunks (`list`):
+                The retrieved chunks.
+            embedding (`Optional[List[float]]`):
+                The embedding of the query to match the similar queries.
+        """
+        key = self._hash(query, similarity_top_k)
+        with self._lock:
+            self.misses += 1
+            if self.max_size <= 0 or key in self._entries:
+                return
+            if len(self._entries) >= self.max_size:
+                _, (slot, _) = self._entries.popitem(last=False)
+                self._slot_top_ks[slot] = 0
+                self._free_slots.append(slot)
+
+            slot = self._free_slots.pop()
+            if embedding is not None and self.similarity_threshold is not None:
+                query_emb = np.asarray(embedding, dtype=np.float32)
+                if self._embeddings is None:
+                    self._embeddings = np.zeros(
+                        (self.max_size, len(query_emb)),
+                        dtype=np.float32,
+                    )
+                self._embeddings[slot] = query_emb / (
+                    np.linalg.norm(query_emb) or 1.0
+                )
+                self._slot_top_ks[slot] = similarity_top_k
+            self._slot_keys[slot] = key
+            self._entries[key] = (
+                slot,
+                [copy.copy(_) for _ in chunks],
+            )
+
+    def clear(self) -> None:
+        """Drop all the cached queries, e.g., after the index is
+        modified."""
+        with self._lock:
+            self._entries.clear()
+            self._slot_top_ks[:] = 0
+            self._free_slots = list(range(self.max_size - 1, -1, -1))
+
+    def stats(self) -> dict:
+        """The size and the hit metrics of the cache."""
+        with self._lock:
+            n_lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / n_lookups if n_lookups else 0.0,
+            }
+
 
 try:
 
@@ -67,14 +279,24 @@ try:
         """
         Wrapper for ModelWrapperBase to an embedding model can be used
         in Llama Index pipeline.
+
+        The texts are embedded in batches if the model wrapper accepts a list
+        of texts, and the batches are sent concurrently. The embeddings are
+        cached by the file manager, so that the unchanged chunks are not
+        embedded again when the index is rebuilt.
         """
 
         _emb_model_wrapper: ModelWrapperBase = PrivateAttr()
+        _request_batch_size: int = PrivateAttr()
+        _max_concurrency: int = PrivateAttr()
+        _use_cache: bool = PrivateAttr()
 
         def __init__(
             self,
             emb_model: ModelWrapperBase,
-            embed_batch_size: int = 1,
+            embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+            max_concurrency: int = DEFAULT_EMBED_MAX_CONCURRENCY,
+            use_cache: bool = True,
         ) -> None:
             """
             Dummy wrapper to convert a ModelWrapperBase to llama Index
@@ -84,13 +306,102 @@ try:
                 emb_model (`ModelWrapperBase`):
                     Embedding model in ModelWrapperBase
                 embed_batch_size (`int`):
-                    Batch size, defaults to 1
+                    The number of texts in one embedding request, defaults
+                    to 10. It's ignored if the model wrapper only accepts a
+                    single text.
+                max_concurrency (`int`):
+                    The maximum number of concurrent embedding requests,
+                    defaults to 4
+                use_cache (`bool`):
+                    Whether to cache the embeddings by the file manager,
+                    defaults to `True`
             """
+            # Llama Index passes `embed_batch_size` texts at a time, which
+            # are split into concurrent requests
             super().__init__(
                 model_name="Temporary_embedding_wrapper",
-                embed_batch_size=embed_batch_size,
+                embed_batch_size=embed_batch_size * max_concurrency,
             )
             self._emb_model_wrapper = emb_model
+            self._max_concurrency = max_concurrency
+            self._use_cache = use_cache
+            # The model wrappers that merge the batched calls by
+            # `_call_batch` accept a list of texts in one request
+            if getattr(emb_model, "_call_batch", None) is not None:
+                self._request_batch_size = embed_batch_size
+            else:
+                self._request_batch_size = 1
+
+        @property
+        def _cache_key(self) -> Optional[dict]:
+            """The key of the embedding model in the file manager cache, or
+            `None` if the embeddings shouldn't be cached."""
+            model_name = getattr(self._emb_model_wrapper, "model_name", None)
+            if not self._use_cache or model_name is None:
+                return None
+            if FileManager.get_instance().cache_dir is None:
+                return None
+            return {
+                "model_type": self._emb_model_wrapper.model_type,
+                "model_name": model_name,
+            }
+
+        def _embed_batch(self, texts: List[str]) -> List[Embedding]:
+            """Embed a batch of texts in one request if supported."""
+            if self._request_batch_size == 1:
+                return [
+                    list(self._emb_model_wrapper(t).embedding[0])
+                    for t in texts
+                ]
+
+            embeddings = self._emb_model_wrapper(texts).embedding
+            if len(embeddings) != len(texts):
+                raise ValueError(
+                    f"Expect {len(texts)} embeddings from the model wrapper, "
+                    f"but got {len(embeddings)}.",
+                )
+            return [list(_) for _ in embeddings]
+
+        def _embed_texts(self, texts: List[str]) -> List[Embedding]:
+            """Embed the texts by fetching the cached embeddings first, and
+            sending the concurrent batched requests for the rest."""
+            file_manager = FileManager.get_instance()
+            cache_key = self._cache_key
+
+            embeddings: dict = {}
+            if cache_key is not None:
+                for text in set(texts):
+                    cached = file_manager.fetch_cached_text_embedding(
+                        text=text,
+                        embedding_model=cache_key,
+                    )
+                    if cached is not None:
+                        embeddings[text] = list(cached)
+
+            missing = [_ for _ in dict.fromkeys(texts) if _ not in embeddings]
+            batches = [
+                missing[i : i + self._request_batch_size]
+                for i in range(0, len(missing), self._request_batch_size)
+            ]
+            if len(batches) > 1 and self._max_concurrency > 1:
+                with ThreadPoolExecutor(
+                    max_workers=min(self._max_concurrency, len(batches)),
+                ) as executor:
+                    results = list(executor.map(self._embed_batch, batches))
+            else:
+                results = [self._embed_batch(_) for _ in batches]
+
+            for batch, batch_embeddings in zip(batches, results):
+                for text, embedding in zip(batch, batch_embeddings):
+                    embeddings[text] = embedding
+                    if cache_key is not None:
+                        file_manager.cache_text_embedding(
+                            text=text,
+                            embedding=embedding,
+                            embedding_model=cache_key,
+                        )
+
+            return [embeddings[_] for _ in texts]
 
         def _get_query_embedding(self, query: str) -> List[float]:
             """
@@ -116,10 +427,7 @@ try:
             Returns:
                 `List[float]`: List of embeddings
             """
-            results = [
-                list(self._emb_model_wrapper(t).embedding[0]) for t in texts
-            ]
-            return results
+            return self._embed_texts(texts)
 
         def _get_text_embedding(self, text: str) -> Embedding:
             """
@@ -130,23 +438,24 @@ try:
             Returns:
                 `List[float]`: Embedding
             """
-            return list(self._emb_model_wrapper(text).embedding[0])
+            return self._embed_texts([text])[0]
 
-        # TODO: use proper async methods, but depends on model wrapper
+        # The model wrappers are synchronous, so they're called in separate
+        # threads to avoid blocking the event loop
         async def _aget_query_embedding(self, query: str) -> List[float]:
             """The asynchronous version of _get_query_embedding."""
-            return self._get_query_embedding(query)
+            return await asyncio.to_thread(self._get_query_embedding, query)
 
         async def _aget_text_embedding(self, text: str) -> List[float]:
             """Asynchronously get text embedding."""
-            return self._get_text_embedding(text)
+            return await asyncio.to_thread(self._get_text_embedding, text)
 
         async def _aget_text_embeddings(
             self,
             texts: List[str],
         ) -> List[List[float]]:
             """Asynchronously get text embeddings."""
-            return self._get_text_embeddings(texts)
+            return await asyncio.to_thread(self._get_text_embeddings, texts)
 
 except Exception:
 
@@ -160,6 +469,192 @@ except Exception:
             self._emb_model_wrapper = emb_model
 
 
+try:
+
+    class _BM25Retriever(BaseRetriever):
+        """
+        A BM25 retriever over the nodes in the docstore, whose inverted index
+        can be updated incrementally when nodes are inserted into or deleted
+        from the index, and persisted alongside the vector store.
+        """
+
+        def __init__(
+            self,
+            docstore: BaseDocumentStore,
+            similarity_top_k: int = DEFAULT_TOP_K,
+            k1: float = 1.5,
+            b: float = 0.75,
+        ) -> None:
+            """
+            Initialize an empty BM25 index.
+
+            Args:
+                docstore (`BaseDocumentStore`):
+                    The docstore to look up the retrieved nodes.
+                similarity_top_k (`int`):
+                    The number of nodes returned by the retriever.
+                k1 (`float`):
+                    The term frequency saturation of BM25.
+                b (`float`):
+                    The document length normalization of BM25.
+            """
+            super().__init__()
+            self.docstore = docstore
+            self.similarity_top_k = similarity_top_k
+            self.k1 = k1
+            self.b = b
+
+            # node id -> {term: term frequency}
+            self._doc_terms: dict[str, dict[str, int]] = {}
+            # term -> {node id: term frequency}
+            self._postings: dict[str, dict[str, int]] = {}
+            # node id -> number of tokens
+            self._doc_lengths: dict[str, int] = {}
+            self._total_length = 0
+            self._lock = threading.RLock()
+
+        @property
+        def node_ids(self) -> set:
+            """The ids of the indexed nodes."""
+            return set(self._doc_terms)
+
+        def add_nodes(self, nodes: List[BaseNode]) -> None:
+            """Add the nodes into the index, replacing the indexed nodes
+            with the same ids."""
+            with self._lock:
+                for node in nodes:
+                    terms: dict[str, int] = {}
+                    for token in _tokenize(node.get_content()):
+                        terms[token] = terms.get(token, 0) + 1
+                    self._add_terms(node.node_id, terms)
+
+        def delete_nodes(self, node_ids: List[str]) -> None:
+            """Delete the nodes from the index."""
+            with self._lock:
+                for node_id in node_ids:
+                    terms = self._doc_terms.pop(node_id, None)
+                    if terms is None:
+                        continue
+                    self._total_length -= self._doc_lengths.pop(node_id)
+                    for term in terms:
+                        postings = self._postings[term]
+                        postings.pop(node_id)
+                        if not postings:
+                            del self._postings[term]
+
+        def _add_terms(self, node_id: str, terms: dict[str, int]) -> None:
+            """Add the term frequencies of a node into the index."""
+            self.delete_nodes([node_id])
+            self._doc_terms[node_id] = terms
+            self._doc_lengths[node_id] = sum(terms.values())
+            self._total_length += self._doc_lengths[node_id]
+            for term, freq in terms.items():
+                self._postings.setdefault(term, {})[node_id] = freq
+
+        def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+            """Score the nodes containing the query terms by BM25."""
+            return self.retrieve_top_k(
+                query_bundle.query_str,
+                self.similarity_top_k,
+            )
+
+        def retrieve_top_k(
+            self,
+            query: str,
+            similarity_top_k: int,
+        ) -> List[NodeWithScore]:
+            """
+            Score the nodes containing the query terms by BM25, and return
+            the given number of nodes. Unlike `retrieve`, the retriever is
+            not modified, so that it can be shared by concurrent queries
+            with different top k.
+
+            Args:
+                query (`str`):
+                    The query to retrieve for.
+                similarity_top_k (`int`):
+                    The number of nodes returned.
+            """
+            with self._lock:
+                n_docs = len(self._doc_terms)
+                if n_docs == 0:
+                    return []
+                avg_length = self._total_length / n_docs
+
+                scores: dict[str, float] = {}
+                for term in set(_tokenize(query)):
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    df = len(postings)
+                    idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                    for node_id, freq in postings.items():
+                        length = self._doc_lengths[node_id]
+                        scores[node_id] = scores.get(node_id, 0.0) + (
+                            idf
+                            * freq
+                            * (self.k1 + 1)
+                            / (
+                                freq
+                                + self.k1
+                                * (1 - self.b + self.b * length / avg_length)
+                            )
+                        )
+
+                top_scores = heapq.nlargest(
+                    similarity_top_k,
+                    scores.items(),
+                    key=lambda _: _[1],
+                )
+
+            return [
+                NodeWithScore(
+                    node=self.docstore.get_node(node_id),
+                    score=score,
+                )
+                for node_id, score in top_scores
+            ]
+
+        def persist(self, path: str) -> None:
+            """Save the index into a json file."""
+            with self._lock:
+                data = {
+                    "k1": self.k1,
+                    "b": self.b,
+                    "doc_terms": self._doc_terms,
+                }
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+
+        @classmethod
+        def from_persist_path(
+            cls,
+            path: str,
+            docstore: BaseDocumentStore,
+            similarity_top_k: int = DEFAULT_TOP_K,
+        ) -> "_BM25Retriever":
+            """Load the index from a json file."""
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            retriever = cls(
+                docstore=docstore,
+                similarity_top_k=similarity_top_k,
+                k1=data["k1"],
+                b=data["b"],
+            )
+            for node_id, terms in data["doc_terms"].items():
+                retriever._add_terms(node_id, terms)
+            return retriever
+
+except Exception:
+
+    class _BM25Retriever:  # type: ignore[no-redef]
+        """
+        A dummy BM25 retriever for passing tests when
+        llama-index is not install
+        """
+
+
 class LlamaIndexKnowledge(Knowledge):
     """
     This class is a wrapper with the llama index RAG.
@@ -177,6 +672,8 @@ class LlamaIndexKnowledge(Knowledge):
         additional_sparse_retrieval: Optional[bool] = False,
         overwrite_index: Optional[bool] = False,
         showprogress: Optional[bool] = True,
+        hybrid_retrieval: Optional[bool] = False,
+        fusion_mode: Literal["rrf", "relative_score"] = "rrf",
         **kwargs: Any,
     ) -> None:
         """
@@ -201,15 +698,28 @@ class LlamaIndexKnowledge(Knowledge):
                 The embedding model used for generate embeddings
             knowledge_config (`dict`):
                 The configuration for llama-index to
-                generate or load the index.
+                generate or load the index. The retrieved chunks are cached
+                for up to `query_cache_size` queries if it's set, and the
+                queries with a cosine similarity no less than
+                `query_cache_similarity` reuse the cached chunks.
             model (`ModelWrapperBase`):
                 The language model used for final synthesis
             persist_root (`str`):
                 The root directory for index persisting
+            additional_sparse_retrieval (`Optional[bool]`):
+                Whether to append the BM25 retrieved chunks after the dense
+                retrieved ones
             overwrite_index (`Optional[bool]`):
                 Whether to overwrite the index while refreshing
             showprogress (`Optional[bool]`):
                 Whether to show the indexing progress
+            hybrid_retrieval (`Optional[bool]`):
+                Whether to fuse the dense and BM25 retrieved chunks into one
+                ranking, deduplicated by the chunk hash
+            fusion_mode (`Literal["rrf", "relative_score"]`):
+                How to fuse the rankings in hybrid retrieval, either by
+                reciprocal rank fusion, or by blending the min-max
+                normalized scores
         """
         super().__init__(
             knowledge_id=knowledge_id,
@@ -238,9 +748,44 @@ class LlamaIndexKnowledge(Knowledge):
         self.additional_sparse_retrieval = additional_sparse_retrieval
         self.bm25_retriever = None
 
+        # if fuse the dense and bm25 retrieval into one ranking
+        if fusion_mode not in ["rrf", "relative_score"]:
+            raise ValueError(
+                f"Unsupported fusion mode `{fusion_mode}`, expected `rrf` or "
+                f"`relative_score`.",
+            )
+        self.hybrid_retrieval = hybrid_retrieval
+        self.fusion_mode = fusion_mode
+
+        # the retrievers built for different top k and arguments, which are
+        # reused across queries until the index is modified
+        self._retriever_cache: OrderedDict = OrderedDict()
+        self._retriever_cache_lock = threading.Lock()
+
+        # the retrieved chunks cached by the queries, which are dropped
+        # together with the retrievers
+        self._query_cache: Optional[_QueryCache] = None
+        if self.knowledge_config.get("query_cache_size"):
+            self._query_cache = _QueryCache(
+                max_size=self.knowledge_config["query_cache_size"],
+                similarity_threshold=self.knowledge_config.get(
+                    "query_cache_similarity",
+                ),
+            )
+
         # ensure the emb_model is compatible with LlamaIndex
         if isinstance(emb_model, ModelWrapperBase):
-            self.emb_model = _EmbeddingModel(emb_model)
+            self.emb_model = _EmbeddingModel(
+                emb_model,
+                embed_batch_size=self.knowledge_config.get(
+                    "embed_batch_size",
+                    DEFAULT_EMBED_BATCH_SIZE,
+                ),
+                max_concurrency=self.knowledge_config.get(
+                    "embed_max_concurrency",
+                    DEFAULT_EMBED_MAX_CONCURRENCY,
+                ),
+            )
         elif isinstance(self.emb_model, BaseEmbedding):
             pass
         else:
@@ -274,6 +819,10 @@ class LlamaIndexKnowledge(Knowledge):
                 f"index loading error: {str(e)}, recomputing index...",
             )
             self._data_to_index()
+        else:
+            if not self._load_manifest().get("complete", True):
+                logger.info("resuming the interrupted indexing...")
+                self.refresh_index()
         self._get_retriever()
         logger.info(
             f"RAG with knowledge ids: {self.knowledge_id} "
@@ -285,7 +834,7 @@ class LlamaIndexKnowledge(Knowledge):
         Load the persisted index from persist_dir.
         """
         # load the storage_context
-        storage_context = StorageContext.from_defaults(
+        storage_context = self._build_storage_context(
             persist_dir=self.persist_dir,
         )
         # construct index from
@@ -295,6 +844,21 @@ class LlamaIndexKnowledge(Knowledge):
         )
         logger.info(f"index loaded from {self.persist_dir}")
 
+    def _build_storage_context(
+        self,
+        persist_dir: Optional[str] = None,
+    ) -> StorageContext:
+        """
+        Build the storage context of the index, which can be overridden to
+        use another vector store.
+
+        Args:
+            persist_dir (`Optional[str]`):
+                The directory to load the persisted storage from. If `None`,
+                an empty storage context is built.
+        """
+        return StorageContext.from_defaults(persist_dir=persist_dir)
+
     def _data_to_index(
         self,
         vector_store: Optional[VectorStore] = None,
@@ -310,6 +874,9 @@ class LlamaIndexKnowledge(Knowledge):
         Notes:
             As each selected file type may need to use a different loader
             and transformations, knowledge_config is a list of configs.
+            Without a given vector store, an empty index is persisted first,
+            and the data are ingested in batches by `refresh_index`, so that
+            an interrupted indexing is resumed at the next initialization.
 
         Args:
             vector_store (`Optional[VectorStore]`):
@@ -318,11 +885,35 @@ class LlamaIndexKnowledge(Knowledge):
         Returns:
            ` List[BaseNode]`: list of processed nodes
         """
+        if vector_store is None:
+            self.index = VectorStoreIndex(
+                nodes=[],
+                storage_context=self._build_storage_context(),
+                embed_model=self.emb_model,
+            )
+            self.index.storage_context.persist(persist_dir=self.persist_dir)
+            # the indexing is incomplete until all the data are ingested
+            self._save_manifest({"files": {}, "docs": {}, "complete": False})
+            self.refresh_index()
+            logger.info("index calculation completed.")
+
+            # the nodes in docstore are stored without embeddings, which are
+            # attached to the copies if the vector store keeps them
+            nodes = list(self.index.docstore.docs.values())
+            vector_store = self.index.vector_store
+            if callable(getattr(vector_store, "get", None)):
+                nodes = [copy.copy(node) for node in nodes]
+                for node in nodes:
+                    node.embedding = vector_store.get(node.node_id)
+            return nodes
+
         nodes = []
+        manifest: dict = {"files": {}, "docs": {}}
         # load data to documents and set transformations
         # using information in knowledge_config
         for config in self.knowledge_config.get("data_processing"):
             documents = self._data_to_docs(config=config)
+            self._record_docs(manifest, documents)
             transformations = self._set_transformations(config=config).get(
                 "transformations",
             )
@@ -332,31 +923,22 @@ class LlamaIndexKnowledge(Knowledge):
             )
             nodes = nodes + nodes_docs
         # convert nodes to index
-        if vector_store is None:
-            self.index = VectorStoreIndex(
-                nodes=nodes,
-                embed_model=self.emb_model,
-            )
-            logger.info("index calculation completed.")
-            # persist the calculated index
-            self.index.storage_context.persist(persist_dir=self.persist_dir)
-            logger.info("index persisted.")
-        else:
-            docstore = SimpleDocumentStore()
-            docstore.add_documents(nodes)
-            storage_context = StorageContext.from_defaults(
-                docstore=docstore,
-                vector_store=vector_store,
-            )
-            self.index = VectorStoreIndex(
-                nodes,
-                storage_context=storage_context,
-                embed_model=self.emb_model,
-            )
-            logger.info("[Update Mode] Added documents to VDB")
-            storage_context.docstore.persist(
-                os.path.join(self.persist_dir, "docstore.json"),
-            )
+        docstore = SimpleDocumentStore()
+        docstore.add_documents(nodes)
+        storage_context = StorageContext.from_defaults(
+            docstore=docstore,
+            vector_store=vector_store,
+        )
+        self.index = VectorStoreIndex(
+            nodes,
+            storage_context=storage_context,
+            embed_model=self.emb_model,
+        )
+        logger.info("[Update Mode] Added documents to VDB")
+        storage_context.docstore.persist(
+            os.path.join(self.persist_dir, "docstore.json"),
+        )
+        self._save_manifest(manifest)
 
         return nodes
 
@@ -364,6 +946,7 @@ class LlamaIndexKnowledge(Knowledge):
         self,
         query: Optional[str] = None,
         config: dict = None,
+        loader: Any = None,
     ) -> Any:
         """
         This method set the loader as needed, or just use the
@@ -381,13 +964,22 @@ class LlamaIndexKnowledge(Knowledge):
                 Optional, used when the data is in a database.
             config (`dict`):
                 Optional, used when the loader config is in a config file.
+            loader (`Any`):
+                Optional, the loader already set from the config.
         Returns:
             `Any`: loaded documents
         """
-        loader = self._set_loader(config=config).get("loader")
+        if loader is None:
+            loader = self._set_loader(config=config).get("loader")
         # let the doc_id be the filename for each document
         loader.filename_as_id = True
-        if query is None:
+        num_workers = self.knowledge_config.get("ingestion_workers")
+        if query is None and num_workers and (
+            "num_workers" in inspect.signature(loader.load_data).parameters
+        ):
+            # load and parse the files in a process pool
+            documents = loader.load_data(num_workers=num_workers)
+        elif query is None:
             documents = loader.load_data()
         else:
             # this is for querying a database,
@@ -422,13 +1014,22 @@ class LlamaIndexKnowledge(Knowledge):
             transformations=transformations,
         )
         # stack up the nodes from the pipeline
+        start = time.perf_counter()
         nodes = pipeline.run(
             documents=documents,
             show_progress=self.showprogress,
         )
-        logger.info("nodes generated.")
+        self._log_throughput(len(nodes), time.perf_counter() - start)
         return nodes
 
+    @staticmethod
+    def _log_throughput(n_nodes: int, elapsed: float) -> None:
+        """Log the ingestion throughput of chunking and embedding."""
+        logger.info(
+            f"nodes generated: {n_nodes} chunks in {elapsed:.2f}s "
+            f"({n_nodes / max(elapsed, 1e-6):.1f} chunks/sec).",
+        )
+
     def _set_loader(self, config: dict) -> Any:
         """
         Set the loader as needed, or just use the default setting.
@@ -497,36 +1098,140 @@ class LlamaIndexKnowledge(Knowledge):
         **kwargs: Any,
     ) -> BaseRetriever:
         """
-        Set the retriever as needed, or just use the default setting.
+        Get the retriever as needed, or just use the default setting. The
+        retrievers are cached by the similarity top k and the arguments, and
+        reused until the index is modified.
 
         Args:
-            retriever (`Optional[BaseRetriever]`):
-                Passing a retriever in LlamaIndexKnowledge
-            rag_config (`dict`):
-                RAG configuration, including similarity top k index.
+            similarity_top_k (`int`):
+                The number of most similar data returned by the retriever.
+            kwargs (`Any`):
+                Other arguments passed to `index.as_retriever`.
         """
-        # set the retriever
-        logger.info(
-            f"similarity_top_k" f"={similarity_top_k or DEFAULT_TOP_K}",
-        )
-        retriever = self.index.as_retriever(
-            embed_model=self.emb_model,
-            similarity_top_k=similarity_top_k or DEFAULT_TOP_K,
-            **kwargs,
-        )
+        similarity_top_k = similarity_top_k or DEFAULT_TOP_K
+        try:
+            key = (similarity_top_k, frozenset(kwargs.items()))
+            hash(key)
+        except TypeError:
+            # The retriever cannot be cached with unhashable arguments
+            key = None
+
+        with self._retriever_cache_lock:
+            retriever = self._retriever_cache.get(key) if key else None
+            if retriever is not None:
+                self._retriever_cache.move_to_end(key)
+            else:
+                logger.info(f"similarity_top_k={similarity_top_k}")
+                retriever = self.index.as_retriever(
+                    embed_model=self.emb_model,
+                    similarity_top_k=similarity_top_k,
+                    **kwargs,
+                )
+                if key is not None:
+                    self._retriever_cache[key] = retriever
+                    if (
+                        len(self._retriever_cache)
+                        > DEFAULT_RETRIEVER_CACHE_MAX_SIZE
+                    ):
+                        self._retriever_cache.popitem(last=False)
+                logger.info("retriever is ready.")
+
+            if self.bm25_retriever is None and (
+                self.additional_sparse_retrieval or self.hybrid_retrieval
+            ):
+                self.bm25_retriever = self._load_bm25_retriever(
+                    similarity_top_k,
+                )
+
+        return retriever
+
+    def _invalidate_retrievers(self) -> None:
+        """Drop the cached dense retrievers and the cached queries after the
+        index is modified, so that they are rebuilt on the next query."""
+        with self._retriever_cache_lock:
+            self._retriever_cache.clear()
+        if self._query_cache is not None:
+            self._query_cache.clear()
+
+    def query_cache_stats(self) -> dict:
+        """
+        The size and the hit metrics of the query cache.
+
+        Returns:
+            `dict`: The number of the cached queries, the numbers of the
+            hits (including the semantic hits of the similar queries) and
+            the misses, and the hit rate. Empty if the cache is disabled.
+        """
+        if self._query_cache is None:
+            return {}
+        return self._query_cache.stats()
 
-        if not self.bm25_retriever:
-            self.bm25_retriever = BM25Retriever.from_defaults(
-                nodes=self.index.docstore.docs.values(),
+    def _load_bm25_retriever(self, similarity_top_k: int) -> BaseRetriever:
+        """
+        Load the persisted BM25 index, and synchronize it with the nodes in
+        the docstore, so that only the changed nodes are (re-)indexed.
+
+        Args:
+            similarity_top_k (`int`):
+                The number of most similar data returned by the retriever.
+        """
+        path = os.path.join(self.persist_dir, _BM25_PERSIST_FNAME)
+        docstore = self.index.docstore
+
+        retriever = None
+        if os.path.exists(path):
+            try:
+                retriever = _BM25Retriever.from_persist_path(
+                    path,
+                    docstore=docstore,
+                    similarity_top_k=similarity_top_k,
+                )
+            except Exception as e:
+                logger.warning(
+                    f"bm25 index loading error: {str(e)}, recomputing...",
+                )
+        if retriever is None:
+            retriever = _BM25Retriever(
+                docstore=docstore,
                 similarity_top_k=similarity_top_k,
             )
-        else:
-            self.bm25_retriever.similarity_top_k = similarity_top_k
-
-        logger.info("retriever is ready.")
 
+        node_ids = set(docstore.docs.keys())
+        stale_ids = retriever.node_ids - node_ids
+        missing_ids = node_ids - retriever.node_ids
+        if stale_ids or missing_ids or not os.path.exists(path):
+            retriever.delete_nodes(list(stale_ids))
+            retriever.add_nodes([docstore.get_node(_) for _ in missing_ids])
+            retriever.persist(path)
+            logger.info(
+                f"bm25 index updated: {len(missing_ids)} added, "
+                f"{len(stale_ids)} deleted.",
+            )
         return retriever
 
+    def _update_bm25_index(
+        self,
+        deleted_node_ids: List[str],
+        inserted_nodes: List[BaseNode],
+    ) -> None:
+        """
+        Apply the changes of the index to the loaded BM25 index and persist
+        it. If not loaded yet, it's synchronized when loaded.
+
+        Args:
+            deleted_node_ids (`List[str]`):
+                The ids of the nodes deleted from the index.
+            inserted_nodes (`List[BaseNode]`):
+                The nodes inserted into the index.
+        """
+        if not isinstance(self.bm25_retriever, _BM25Retriever):
+            return
+        self.bm25_retriever.delete_nodes(deleted_node_ids)
+        self.bm25_retriever.add_nodes(inserted_nodes)
+        self.bm25_retriever.persist(
+            os.path.join(self.persist_dir, _BM25_PERSIST_FNAME),
+        )
+
     def retrieve(
         self,
         query: str,
@@ -549,19 +1254,154 @@ class LlamaIndexKnowledge(Knowledge):
                 Whether returns the list of strings;
                 if False, return list of RetrievedChunk
             retriever (`BaseRetriever`):
-                For advanced usage, user can pass their own retriever.
+                For advanced usage, user can pass their own retriever,
+                whose results are not cached.
         Return:
             `list[Union[RetrievedChunk, str]]`: List of retrieved content
 
         More advanced query processing can refer to
         https://docs.llamaindex.ai/en/stable/examples/query_transformations/query_transform_cookbook.html
         """
+        if retriever is None and self._query_cache is not None:
+            return self.retrieve_many(
+                [query],
+                similarity_top_k,
+                to_list_strs,
+            )[0]
         if retriever is None:
             retriever = self._get_retriever(similarity_top_k)
         dense_retrieved = retriever.retrieve(str(query))
-        retrieved_res = []
+        return self._to_retrieved_chunks(
+            query,
+            dense_retrieved,
+            similarity_top_k,
+            to_list_strs,
+        )
+
+    def retrieve_many(
+        self,
+        queries: List[str],
+        similarity_top_k: int = None,
+        to_list_strs: bool = False,
+        **kwargs: Any,
+    ) -> list[list[Union[RetrievedChunk, str]]]:
+        """
+        Retrieve for a batch of queries. The queries are embedded in one
+        call of the embedding model, and searched by the same cached
+        retriever. The queries found in the query cache are neither
+        embedded nor searched.
+
+        Args:
+            queries (`List[str]`):
+                The queries to retrieve for.
+            similarity_top_k (`int`):
+                The number of most similar data returned by the
+                retriever for each query.
+            to_list_strs (`bool`):
+                Whether returns the lists of strings;
+                if False, return lists of RetrievedChunk
 
-        for node in dense_retrieved:
+        Return:
+            `list[list[Union[RetrievedChunk, str]]]`: List of retrieved
+            content for each query, in the order of the queries.
+        """
+        queries = [str(_) for _ in queries]
+        if len(queries) == 0:
+            return []
+
+        top_k = similarity_top_k or DEFAULT_TOP_K
+        cache = self._query_cache
+        results: list = [
+            cache.get(query, top_k) if cache is not None else None
+            for query in queries
+        ]
+        missed = [i for i, res in enumerate(results) if res is None]
+        if missed:
+            retriever = self._get_retriever(similarity_top_k)
+            embeddings = self._embed_queries([queries[i] for i in missed])
+        else:
+            embeddings = []
+
+        for i, embedding in zip(missed, embeddings):
+            if cache is not None:
+                # match the near-duplicate queries by the embedding
+                results[i] = cache.get(queries[i], top_k, embedding)
+            if results[i] is None:
+                results[i] = self._to_retrieved_chunks(
+                    queries[i],
+                    retriever.retrieve(
+                        QueryBundle(query_str=queries[i], embedding=embedding),
+                    ),
+                    similarity_top_k,
+                    to_list_strs=False,
+                )
+                if cache is not None:
+                    cache.put(queries[i], top_k, results[i], embedding)
+
+        if to_list_strs:
+            return [[str(chunk.content) for chunk in res] for res in results]
+        return results
+
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed the queries, in batches if supported by the model."""
+        if isinstance(self.emb_model, _EmbeddingModel):
+            # The query and text embeddings are the same for the wrapped
+            # model, so that the queries can be embedded in batches
+            return self.emb_model.get_text_embedding_batch(queries)
+        return [self.emb_model.get_query_embedding(_) for _ in queries]
+
+    def _to_retrieved_chunks(
+        self,
+        query: str,
+        dense_retrieved: List[NodeWithScore],
+        similarity_top_k: Optional[int],
+        to_list_strs: bool,
+    ) -> list[Union[RetrievedChunk, str]]:
+        """
+        Convert the dense retrieved nodes into retrieved chunks, combined
+        with the results of the sparse retrieval if enabled.
+
+        Args:
+            query (`str`):
+                The query for the sparse retrieval.
+            dense_retrieved (`List[NodeWithScore]`):
+                The nodes retrieved by the dense retriever.
+            similarity_top_k (`Optional[int]`):
+                The number of chunks kept after the hybrid retrieval.
+            to_list_strs (`bool`):
+                Whether returns the list of strings.
+        """
+        nodes = list(dense_retrieved)
+        if self.bm25_retriever and (
+            self.additional_sparse_retrieval or self.hybrid_retrieval
+        ):
+            if isinstance(self.bm25_retriever, _BM25Retriever):
+                # pass the top k per query instead of setting it on the
+                # retriever shared by the concurrent queries
+                bm25_retrieved = self.bm25_retriever.retrieve_top_k(
+                    str(query),
+                    similarity_top_k or DEFAULT_TOP_K,
+                )
+            else:
+                bm25_retrieved = self.bm25_retriever.retrieve(str(query))
+            sparse_retrieved = [x for x in bm25_retrieved if x.score > 0]
+            bm25_scores = [x.score for x in bm25_retrieved]
+            logger.info(f"bm25 scores {bm25_scores}")
+            if self.hybrid_retrieval:
+                nodes = self._fuse_retrieved(
+                    [dense_retrieved, sparse_retrieved],
+                    similarity_top_k or DEFAULT_TOP_K,
+                )
+            else:
+                # append the sparse retrieved nodes that are not retrieved by
+                # the dense retriever
+                hashes = {x.node.hash for x in nodes}
+                nodes.extend(
+                    x for x in sparse_retrieved if x.node.hash not in hashes
+                )
+
+        retrieved_res = []
+        for node in nodes:
             retrieved_res.append(
                 RetrievedChunk(
                     score=node.score,
@@ -572,22 +1412,6 @@ class LlamaIndexKnowledge(Knowledge):
                 ),
             )
 
-        if self.additional_sparse_retrieval and self.bm25_retriever:
-            bm25_retrieved = self.bm25_retriever.retrieve(str(query))
-            sparse_retrieved = [x for x in bm25_retrieved if x.score > 0]
-            bm25_scores = [x.score for x in bm25_retrieved]
-            logger.info(f"bm25 scores {bm25_scores}")
-            for node in sparse_retrieved:
-                retrieved_res.append(
-                    RetrievedChunk(
-                        score=node.score,
-                        content=node.get_content(),
-                        metadata=node.metadata,
-                        embedding=node.embedding,
-                        hash=node.node.hash,
-                    ),
-                )
-
         if to_list_strs:
             results = []
             for chunk in retrieved_res:
@@ -596,20 +1420,237 @@ class LlamaIndexKnowledge(Knowledge):
 
         return retrieved_res
 
+    def _fuse_retrieved(
+        self,
+        rankings: List[List[NodeWithScore]],
+        similarity_top_k: int,
+    ) -> List[NodeWithScore]:
+        """
+        Fuse the rankings of different retrievers into one ranking, where the
+        nodes with the same hash are merged.
+
+        Args:
+            rankings (`List[List[NodeWithScore]]`):
+                The retrieved nodes of each retriever, sorted by the scores.
+            similarity_top_k (`int`):
+                The number of nodes kept after fusion.
+
+        Returns:
+            `List[NodeWithScore]`: The fused nodes with the fused scores.
+        """
+        fused_scores: dict[str, float] = {}
+        fused_nodes: dict[str, NodeWithScore] = {}
+        for ranking in rankings:
+            if self.fusion_mode == "rrf":
+                scores = [
+                    1.0 / (DEFAULT_RRF_K + rank + 1)
+                    for rank in range(len(ranking))
+                ]
+            else:
+                raw_scores = [x.score or 0.0 for x in ranking]
+                low = min(raw_scores, default=0.0)
+                high = max(raw_scores, default=0.0)
+                if high > low:
+                    scores = [(x - low) / (high - low) for x in raw_scores]
+                else:
+                    scores = [1.0] * len(raw_scores)
+                # average over the rankings to keep the scores in [0, 1]
+                scores = [x / len(rankings) for x in scores]
+
+            seen = set()
+            for node, score in zip(ranking, scores):
+                key = node.node.hash
+                if key in seen:
+                    continue
+                seen.add(key)
+                fused_nodes.setdefault(key, node)
+                fused_scores[key] = fused_scores.get(key, 0.0) + score
+
+        top_scores = heapq.nlargest(
+            similarity_top_k,
+            fused_scores.items(),
+            key=lambda _: _[1],
+        )
+        return [
+            NodeWithScore(node=fused_nodes[key].node, score=score)
+            for key, score in top_scores
+        ]
+
     def refresh_index(self) -> None:
         """
-        Refresh the index when needed.
+        Refresh the index incrementally, so that the cost is proportional
+        to the changes since the last refresh:
+            * the files with unchanged modification time and size are
+              skipped without loading
+            * the documents with unchanged content hash are skipped without
+              chunking
+            * only the changed chunks of the changed documents are embedded
+            * the documents of the removed files are deleted
+
+        Notes:
+            The indexed files and documents are recorded in a manifest
+            within the persist_dir. If `overwrite_index` is enabled, all the
+            loaded documents are re-chunked and re-embedded.
+
+            The changed files are ingested in batches of
+            `ingestion_batch_size` files in the knowledge config, and the
+            index and the manifest are persisted after each batch, so that
+            an interrupted refresh is resumed from the last batch. If
+            `ingestion_workers` is set, the files are loaded and chunked in
+            process pools.
         """
+        manifest = self._load_manifest()
+        # the manifest is saved as a checkpoint after each batch
+        checkpoint: dict = {
+            "files": {},
+            "docs": dict(manifest["docs"]),
+            "complete": False,
+        }
+        unchanged_files: set = set()
+        loaded_doc_ids: set = set()
+        ref_doc_ids = set(self.index.ref_doc_info.keys())
+        batch_size = self.knowledge_config.get(
+            "ingestion_batch_size",
+            DEFAULT_INGESTION_BATCH_SIZE,
+        )
         for config in self.knowledge_config.get("data_processing"):
-            documents = self._data_to_docs(config=config)
-            # store and indexing for each file type
+            loader = self._set_loader(config=config).get("loader")
             transformations = self._set_transformations(config=config).get(
                 "transformations",
             )
-            self._insert_docs_to_index(
-                documents=documents,
-                transformations=transformations,
+            unchanged_stats, changed_files = self._skip_unchanged_files(
+                loader,
+                manifest["files"],
             )
+            checkpoint["files"].update(unchanged_stats)
+            unchanged_files |= set(unchanged_stats)
+
+            if changed_files is None:
+                # the loader does not load from files
+                batches: list = [None]
+            else:
+                batches = [
+                    changed_files[i : i + batch_size]
+                    for i in range(0, len(changed_files), batch_size)
+                ]
+
+            for batch in batches:
+                file_stats = {}
+                if batch is not None:
+                    loader.input_files = batch
+                    file_stats = {str(_): _file_stat(str(_)) for _ in batch}
+                documents = self._data_to_docs(config=config, loader=loader)
+                loaded_doc_ids |= {doc.doc_id for doc in documents}
+
+                # store and indexing the changed documents
+                changed_docs = [
+                    doc
+                    for doc in documents
+                    if self.overwrite_index
+                    or doc.doc_id not in ref_doc_ids
+                    or manifest["docs"].get(doc.doc_id, {}).get("hash")
+                    != doc.hash
+                ]
+                logger.info(
+                    f"{len(documents) - len(changed_docs)} documents "
+                    f"unchanged, {len(changed_docs)} documents to update.",
+                )
+                self._insert_docs_to_index(
+                    documents=changed_docs,
+                    transformations=transformations,
+                )
+
+                self._record_docs(checkpoint, documents, record_files=False)
+                checkpoint["files"].update(file_stats)
+                self._save_manifest(checkpoint)
+
+        # the documents of the skipped files are still valid, while the
+        # other documents not loaded again are removed
+        removed_doc_ids = [
+            doc_id
+            for doc_id, record in manifest["docs"].items()
+            if doc_id not in loaded_doc_ids
+            and record.get("file_path") not in unchanged_files
+        ]
+        for doc_id in removed_doc_ids:
+            checkpoint["docs"].pop(doc_id)
+        if removed_doc_ids:
+            self._delete_ref_docs(removed_doc_ids)
+
+        checkpoint["complete"] = True
+        self._save_manifest(checkpoint)
+        self._invalidate_retrievers()
+
+    @staticmethod
+    def _skip_unchanged_files(
+        loader: Any,
+        file_stats: dict,
+    ) -> Tuple[dict, Optional[list]]:
+        """
+        Split the input files of the loader (e.g., SimpleDirectoryReader)
+        into the files unchanged since the last refresh and the changed
+        ones.
+
+        Args:
+            loader (`Any`):
+                The loader to load the documents.
+            file_stats (`dict`):
+                The stats of the files recorded at the last refresh.
+
+        Returns:
+            `Tuple[dict, Optional[list]]`: The stats of the unchanged files,
+            and the changed input files, which is `None` if the loader
+            doesn't load from a list of files.
+        """
+        if not isinstance(getattr(loader, "input_files", None), list):
+            return {}, None
+
+        unchanged_stats, changed_files = {}, []
+        for input_file in loader.input_files:
+            path = str(input_file)
+            stat = _file_stat(path)
+            if file_stats.get(path) == stat:
+                unchanged_stats[path] = stat
+            else:
+                changed_files.append(input_file)
+        logger.info(
+            f"{len(unchanged_stats)} files unchanged, "
+            f"{len(changed_files)} files to load.",
+        )
+        return unchanged_stats, changed_files
+
+    @staticmethod
+    def _record_docs(
+        manifest: dict,
+        documents: List[Document],
+        record_files: bool = True,
+    ) -> None:
+        """
+        Record the content hashes of the documents, and the stats of their
+        files if `record_files` is `True`, into the manifest.
+        """
+        for doc in documents:
+            file_path = doc.metadata.get("file_path")
+            manifest["docs"][doc.doc_id] = {
+                "hash": doc.hash,
+                "file_path": file_path,
+            }
+            if record_files and file_path and os.path.isfile(file_path):
+                manifest["files"][file_path] = _file_stat(file_path)
+
+    def _load_manifest(self) -> dict:
+        """Load the manifest of the indexed files and documents."""
+        path = os.path.join(self.persist_dir, _MANIFEST_FNAME)
+        if not os.path.exists(path):
+            return {"files": {}, "docs": {}}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: dict) -> None:
+        """Save the manifest of the indexed files and documents."""
+        path = os.path.join(self.persist_dir, _MANIFEST_FNAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
 
     def _insert_docs_to_index(
         self,
@@ -617,12 +1658,12 @@ class LlamaIndexKnowledge(Knowledge):
         transformations: TransformComponent,
     ) -> None:
         """
-        Add documents to the index. Given a list of documents, we first test if
-        the doc_id is already in the index. If not, we add the doc to the
-        list. If yes, and the over-write flag is enabled,
-        we delete the old doc and add the new doc to the list.
-        Lastly, we generate nodes for all documents on the list, and insert
-        the nodes to the index.
+        Add documents to the index. The documents are chunked first. For
+        the documents already in the index, the chunks are compared with the
+        indexed ones by content hash, and only the changed chunks are
+        embedded and inserted, while the stale ones are deleted. If the
+        over-write flag is enabled, the old documents are deleted, and all
+        the chunks are embedded again.
 
         Args:
             documents (`List[Document]`):
@@ -630,41 +1671,112 @@ class LlamaIndexKnowledge(Knowledge):
             transformations (`TransformComponent`):
                 Transformations that onvert the documents into nodes.
         """
-        # this is the pipeline that generate the nodes
+        if len(documents) == 0:
+            return
+
+        # this is the pipeline that chunk the documents, where the embedding
+        # is postponed to the insertion, so that only the changed chunks are
+        # embedded
         pipeline = IngestionPipeline(
-            transformations=transformations,
+            transformations=[
+                _
+                for _ in transformations
+                if not isinstance(_, BaseEmbedding)
+            ],
         )
-        # we need to generate nodes from this list of documents
-        insert_docs_list = []
+        start = time.perf_counter()
+        nodes = pipeline.run(
+            documents=documents,
+            show_progress=self.showprogress,
+            num_workers=self.knowledge_config.get("ingestion_workers"),
+        )
+        nodes_of_docs: dict[str, list] = {}
+        for node in nodes:
+            nodes_of_docs.setdefault(node.ref_doc_id, []).append(node)
+
+        ref_doc_info = self.index.ref_doc_info
+        insert_nodes, deleted_node_ids, replaced_doc_ids = [], [], []
         for doc in documents:
-            if doc.doc_id not in self.index.ref_doc_info.keys():
-                # if the doc_id is not in the index, we add it to the list
-                insert_docs_list.append(doc)
+            doc_nodes = nodes_of_docs.get(doc.doc_id, [])
+            if doc.doc_id not in ref_doc_info:
+                # if the doc_id is not in the index, we add all its chunks
+                insert_nodes.extend(doc_nodes)
                 logger.info(
                     f"add new documents to index, " f"doc_id={doc.doc_id}",
                 )
+            elif self.overwrite_index:
+                # if we enable overwrite index, we delete the old doc
+                replaced_doc_ids.append(doc.doc_id)
+                insert_nodes.extend(doc_nodes)
+                logger.info(
+                    f"replace document in index, " f"doc_id={doc.doc_id}",
+                )
             else:
-                if self.overwrite_index:
-                    # if we enable overwrite index, we delete the old doc
-                    self.index.delete_ref_doc(
-                        ref_doc_id=doc.doc_id,
-                        delete_from_docstore=True,
-                    )
-                    # then add the same doc to the list
-                    insert_docs_list.append(doc)
-                    logger.info(
-                        f"replace document in index, " f"doc_id={doc.doc_id}",
-                    )
+                # keep the indexed chunks with the same content, and delete
+                # the stale ones
+                old_node_ids: dict[str, list] = {}
+                for node_id in ref_doc_info[doc.doc_id].node_ids:
+                    old_node = self.index.docstore.get_node(node_id)
+                    old_node_ids.setdefault(
+                        _chunk_hash(old_node),
+                        [],
+                    ).append(node_id)
+                n_changed = 0
+                for node in doc_nodes:
+                    node_hash = _chunk_hash(node)
+                    if old_node_ids.get(node_hash):
+                        old_node_ids[node_hash].pop()
+                    else:
+                        insert_nodes.append(node)
+                        n_changed += 1
+                stale_node_ids = sum(old_node_ids.values(), [])
+                deleted_node_ids.extend(stale_node_ids)
+                logger.info(
+                    f"update document in index, doc_id={doc.doc_id}, "
+                    f"{n_changed} chunks changed, "
+                    f"{len(stale_node_ids)} chunks removed",
+                )
         logger.info("documents scan completed.")
-        # we generate nodes for documents on the list
-        nodes = pipeline.run(
-            documents=insert_docs_list,
-            show_progress=True,
-        )
-        logger.info("nodes generated.")
-        # insert the new nodes to index
-        self.index.insert_nodes(nodes=nodes)
+
+        try:
+            if deleted_node_ids:
+                self.index.delete_nodes(
+                    deleted_node_ids,
+                    delete_from_docstore=True,
+                )
+        except NotImplementedError:
+            # the vector store cannot delete single chunks, so we replace the
+            # updated documents entirely
+            updated_doc_ids = {
+                node.ref_doc_id
+                for node in insert_nodes
+                if node.ref_doc_id in ref_doc_info
+            } | {
+                self.index.docstore.get_node(_).ref_doc_id
+                for _ in deleted_node_ids
+            }
+            replaced_doc_ids.extend(updated_doc_ids - set(replaced_doc_ids))
+            deleted_node_ids = []
+            insert_nodes = [
+                node
+                for node in nodes
+                if node.ref_doc_id not in ref_doc_info
+                or node.ref_doc_id in replaced_doc_ids
+            ]
+
+        for doc_id in replaced_doc_ids:
+            deleted_node_ids.extend(ref_doc_info[doc_id].node_ids)
+            self.index.delete_ref_doc(
+                ref_doc_id=doc_id,
+                delete_from_docstore=True,
+            )
+
+        # embed and insert the new chunks to index
+        self.index.insert_nodes(nodes=insert_nodes)
+        self._log_throughput(len(insert_nodes), time.perf_counter() - start)
         logger.info("nodes inserted to index.")
+        self._invalidate_retrievers()
+        self._update_bm25_index(deleted_node_ids, insert_nodes)
         # persist the updated index
         self.index.storage_context.persist(persist_dir=self.persist_dir)
 
@@ -678,14 +1790,26 @@ class LlamaIndexKnowledge(Knowledge):
         Args:
             documents (`List[Document]`): List of documents to be deleted.
         """
-        doc_id_list = [doc.doc_id for doc in documents]
-        for key in self.index.ref_doc_info.keys():
+        self._delete_ref_docs([doc.doc_id for doc in documents])
+
+    def _delete_ref_docs(self, doc_id_list: List[str]) -> None:
+        """
+        Delete the nodes that are associated with the document ids.
+
+        Args:
+            doc_id_list (`List[str]`): List of document ids to be deleted.
+        """
+        deleted_node_ids = []
+        for key, ref_doc_info in self.index.ref_doc_info.items():
             if key in doc_id_list:
+                deleted_node_ids.extend(ref_doc_info.node_ids)
                 self.index.delete_ref_doc(
                     ref_doc_id=key,
                     delete_from_docstore=True,
                 )
                 logger.info(f"docs deleted from index, doc_id={key}")
+        self._invalidate_retrievers()
+        self._update_bm25_index(deleted_node_ids, [])
         # persist the updated index
         self.index.storage_context.persist(persist_dir=self.persist_dir)
         logger.info("nodes delete completed.")
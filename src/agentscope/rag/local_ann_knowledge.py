@@ -0,0 +1,511 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a knowledge with a built-in local approximate nearest
+neighbor (ANN) vector index, which keeps the embeddings in a memory-mapped
+float32 matrix rather than the JSON files of the default llama-index vector
+store, so that the index is loaded fast and searched without scanning all
+the embeddings.
+"""
+import json
+import math
+import os
+import threading
+from itertools import chain
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+try:
+    from llama_index.core import StorageContext
+    from llama_index.core.bridge.pydantic import PrivateAttr
+    from llama_index.core.schema import BaseNode
+    from llama_index.core.vector_stores.types import (
+        BasePydanticVectorStore,
+        MetadataFilters,
+        VectorStoreQuery,
+        VectorStoreQueryResult,
+    )
+except ImportError:
+    StorageContext = None
+    PrivateAttr = None
+    BaseNode = None
+    BasePydanticVectorStore = None
+    MetadataFilters = None
+    VectorStoreQuery = None
+    VectorStoreQueryResult = None
+
+from agentscope.constants import DEFAULT_ANN_NPROBE, DEFAULT_ANN_TRAIN_SIZE
+from agentscope.rag.llama_index_knowledge import LlamaIndexKnowledge
+
+# The files of the persisted index within the persist directory
+_VECTORS_FNAME = "ann_vectors.npy"
+_CENTROIDS_FNAME = "ann_centroids.npy"
+_META_FNAME = "ann_index.json"
+
+# The k-means iterations and the samples per cluster to train the index
+_KMEANS_ITERS = 10
+_KMEANS_SAMPLES_PER_LIST = 32
+_ASSIGN_BATCH_SIZE = 65536
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Normalize the rows into unit vectors, so that the inner product is
+    the cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _save_atomic(path: str, array: np.ndarray) -> None:
+    """Save the array into a temporary file and replace the target, so that
+    the memory-mapped old file stays valid."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+try:
+
+    class LocalANNVectorStore(BasePydanticVectorStore):
+        """
+        A local vector store with an inverted file (IVF) index. The
+        normalized embeddings are stored in a float32 matrix, which is
+        memory-mapped when loaded from disk. Once the store holds
+        `train_size` embeddings, they are clustered by k-means, and a query
+        only scores the embeddings in the `nprobe` nearest clusters. The
+        smaller stores are searched exhaustively.
+
+        The nodes are inserted and deleted incrementally, and the clusters
+        are re-trained when the store grows by four times. Note that the
+        memory-mapped matrix is copied into memory by the first insert that
+        doesn't reuse the slot of a deleted node (see `_reserve`), so that
+        a loaded store only stays memory-mapped while it's read-mostly.
+        """
+
+        stores_text: bool = False
+        nprobe: int = DEFAULT_ANN_NPROBE
+        train_size: int = DEFAULT_ANN_TRAIN_SIZE
+
+        _vectors: Optional[np.ndarray] = PrivateAttr(default=None)
+        _node_ids: list = PrivateAttr(default_factory=list)
+        _ref_doc_ids: list = PrivateAttr(default_factory=list)
+        _assignments: list = PrivateAttr(default_factory=list)
+        _slots: dict = PrivateAttr(default_factory=dict)
+        # ref doc id -> {slot}
+        _doc_slots: dict = PrivateAttr(default_factory=dict)
+        _free_slots: list = PrivateAttr(default_factory=list)
+        _centroids: Optional[np.ndarray] = PrivateAttr(default=None)
+        _lists: list = PrivateAttr(default_factory=list)
+        _trained_size: int = PrivateAttr(default=0)
+        _lock: Any = PrivateAttr(default_factory=threading.RLock)
+
+        @property
+        def client(self) -> None:
+            """No client for the local vector store."""
+            return None
+
+        @property
+        def size(self) -> int:
+            """The number of the stored embeddings."""
+            return len(self._slots)
+
+        def add(
+            self,
+            nodes: Sequence[BaseNode],
+            **kwargs: Any,
+        ) -> List[str]:
+            """Add the embeddings of the nodes, replacing the stored ones
+            with the same node ids."""
+            if len(nodes) == 0:
+                return []
+
+            vectors = _normalize([node.get_embedding() for node in nodes])
+            with self._lock:
+                if (
+                    self._vectors is not None
+                    and vectors.shape[1] != self._vectors.shape[1]
+                ):
+                    raise ValueError(
+                        f"Expect embeddings of dimension "
+                        f"{self._vectors.shape[1]}, but got "
+                        f"{vectors.shape[1]}.",
+                    )
+
+                slots = []
+                for node in nodes:
+                    if node.node_id in self._slots:
+                        self._remove_slot(self._slots[node.node_id])
+                    if self._free_slots:
+                        slot = self._free_slots.pop()
+                    else:
+                        slot = len(self._node_ids)
+                        self._node_ids.append(None)
+                        self._ref_doc_ids.append(None)
+                        self._assignments.append(-1)
+                    self._node_ids[slot] = node.node_id
+                    self._ref_doc_ids[slot] = node.ref_doc_id
+                    self._slots[node.node_id] = slot
+                    if node.ref_doc_id is not None:
+                        self._doc_slots.setdefault(
+                            node.ref_doc_id,
+                            set(),
+                        ).add(slot)
+                    slots.append(slot)
+
+                self._reserve(len(self._node_ids), vectors.shape[1])
+                self._vectors[slots] = vectors
+
+                if self._centroids is not None:
+                    self._assign(np.asarray(slots))
+
+                if self.size >= self.train_size and (
+                    self._centroids is None
+                    or self.size > 4 * self._trained_size
+                ):
+                    self._train()
+
+            return [node.node_id for node in nodes]
+
+        def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+            """Delete the embeddings of the nodes of the document."""
+            with self._lock:
+                for slot in list(self._doc_slots.get(ref_doc_id, ())):
+                    self._remove_slot(slot)
+
+        def delete_nodes(
+            self,
+            node_ids: Optional[List[str]] = None,
+            filters: Optional[MetadataFilters] = None,
+            **delete_kwargs: Any,
+        ) -> None:
+            """Delete the embeddings of the nodes."""
+            if filters is not None:
+                raise NotImplementedError(
+                    "Metadata filters are not supported by "
+                    "LocalANNVectorStore.",
+                )
+            with self._lock:
+                for node_id in node_ids or []:
+                    if node_id in self._slots:
+                        self._remove_slot(self._slots[node_id])
+
+        def clear(self) -> None:
+            """Delete all the embeddings and the clusters."""
+            with self._lock:
+                self._vectors = None
+                self._node_ids = []
+                self._ref_doc_ids = []
+                self._assignments = []
+                self._slots = {}
+                self._doc_slots = {}
+                self._free_slots = []
+                self._centroids = None
+                self._lists = []
+                self._trained_size = 0
+
+        def query(
+            self,
+            query: VectorStoreQuery,
+            **kwargs: Any,
+        ) -> VectorStoreQueryResult:
+            """Search the nodes with the most similar embeddings."""
+            if query.filters is not None:
+                raise NotImplementedError(
+                    "Metadata filters are not supported by "
+                    "LocalANNVectorStore.",
+                )
+
+            with self._lock:
+                if self.size == 0 or query.query_embedding is None:
+                    return VectorStoreQueryResult(ids=[], similarities=[])
+
+                query_vector = _normalize(query.query_embedding)
+                candidates = self._get_candidates(query, query_vector)
+                if candidates is None:
+                    scores = self._vectors[: len(self._node_ids)].dot(
+                        query_vector,
+                    )
+                    scores[self._free_slots] = -np.inf
+                    candidates = np.arange(len(scores))
+                    n_valid = self.size
+                else:
+                    scores = self._vectors[candidates].dot(query_vector)
+                    n_valid = len(candidates)
+
+                top_k = min(query.similarity_top_k, n_valid)
+                if top_k <= 0:
+                    return VectorStoreQueryResult(ids=[], similarities=[])
+                top = np.argpartition(-scores, top_k - 1)[:top_k]
+                top = top[np.argsort(-scores[top])]
+
+                return VectorStoreQueryResult(
+                    ids=[self._node_ids[_] for _ in candidates[top]],
+                    similarities=scores[top].tolist(),
+                )
+
+        def _get_candidates(
+            self,
+            query: VectorStoreQuery,
+            query_vector: np.ndarray,
+        ) -> Optional[np.ndarray]:
+            """Get the slots to score for the query, or `None` to score all
+            the stored embeddings."""
+            if query.node_ids or query.doc_ids:
+                slots = {
+                    self._slots[node_id]
+                    for node_id in query.node_ids or []
+                    if node_id in self._slots
+                }
+                for doc_id in query.doc_ids or []:
+                    slots.update(self._doc_slots.get(doc_id, ()))
+                return np.asarray(sorted(slots), dtype=np.int64)
+
+            if self._centroids is None:
+                return None
+
+            # Probe the nearest clusters until enough candidates are found
+            order = np.argsort(-self._centroids.dot(query_vector))
+            probed, n_candidates = [], 0
+            for index in order:
+                if (
+                    len(probed) >= self.nprobe
+                    and n_candidates >= query.similarity_top_k
+                ):
+                    break
+                probed.append(self._lists[index])
+                n_candidates += len(self._lists[index])
+            return np.fromiter(
+                chain.from_iterable(probed),
+                dtype=np.int64,
+                count=n_candidates,
+            )
+
+        def _reserve(self, n_slots: int, dim: int) -> None:
+            """Grow the matrix by doubling to hold `n_slots` embeddings. A
+            memory-mapped matrix is exactly sized when loaded, so that it's
+            copied into memory once it grows."""
+            if self._vectors is None:
+                self._vectors = np.zeros((max(n_slots, 64), dim), np.float32)
+            elif n_slots > len(self._vectors):
+                vectors = np.zeros(
+                    (max(n_slots, 2 * len(self._vectors)), dim),
+                    np.float32,
+                )
+                vectors[: len(self._vectors)] = self._vectors
+                self._vectors = vectors
+
+        def _remove_slot(self, slot: int) -> None:
+            """Free the slot of the matrix."""
+            del self._slots[self._node_ids[slot]]
+            doc_slots = self._doc_slots.get(self._ref_doc_ids[slot])
+            if doc_slots is not None:
+                doc_slots.discard(slot)
+                if not doc_slots:
+                    del self._doc_slots[self._ref_doc_ids[slot]]
+            self._node_ids[slot] = None
+            self._ref_doc_ids[slot] = None
+            if self._assignments[slot] >= 0:
+                self._lists[self._assignments[slot]].discard(slot)
+                self._assignments[slot] = -1
+            self._vectors[slot] = 0
+            self._free_slots.append(slot)
+
+        def _assign(self, slots: np.ndarray) -> None:
+            """Assign the embeddings to their nearest clusters."""
+            for start in range(0, len(slots), _ASSIGN_BATCH_SIZE):
+                batch = slots[start : start + _ASSIGN_BATCH_SIZE]
+                labels = np.argmax(
+                    self._vectors[batch].dot(self._centroids.T),
+                    axis=1,
+                )
+                for slot, label in zip(batch.tolist(), labels.tolist()):
+                    self._lists[label].add(slot)
+                    self._assignments[slot] = label
+
+        def _train(self) -> None:
+            """Cluster the stored embeddings by spherical k-means, and
+            assign them to the clusters."""
+            slots = np.fromiter(self._slots.values(), dtype=np.int64)
+            n_lists = max(1, int(math.sqrt(len(slots))))
+            rng = np.random.default_rng(0)
+            sample = self._vectors[
+                np.sort(
+                    rng.choice(
+                        slots,
+                        size=min(
+                            len(slots),
+                            n_lists * _KMEANS_SAMPLES_PER_LIST,
+                        ),
+                        replace=False,
+                    ),
+                )
+            ]
+
+            centroids = sample[
+                rng.choice(len(sample), n_lists, replace=False)
+            ].copy()
+            for _ in range(_KMEANS_ITERS):
+                labels = np.argmax(sample.dot(centroids.T), axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, sample)
+                counts = np.bincount(labels, minlength=n_lists)
+                # Keep the centroids of the empty clusters unchanged
+                centroids[counts > 0] = _normalize(sums[counts > 0])
+
+            self._centroids = centroids
+            self._lists = [set() for _ in range(n_lists)]
+            self._assignments = [-1] * len(self._node_ids)
+            self._assign(slots)
+            self._trained_size = len(slots)
+            logger.info(
+                f"ANN index trained with {n_lists} clusters over "
+                f"{len(slots)} embeddings.",
+            )
+
+        def persist(
+            self,
+            persist_path: str,
+            fs: Optional[Any] = None,
+        ) -> None:
+            """Persist the index into the directory of the given path, which
+            is the path of the default vector store in the storage
+            context."""
+            self.persist_to_dir(os.path.dirname(persist_path))
+
+        def persist_to_dir(self, persist_dir: str) -> None:
+            """Persist the embedding matrix, the centroids and the metadata
+            of the index into the directory."""
+            os.makedirs(persist_dir, exist_ok=True)
+            with self._lock:
+                if self._vectors is not None:
+                    _save_atomic(
+                        os.path.join(persist_dir, _VECTORS_FNAME),
+                        self._vectors[: len(self._node_ids)],
+                    )
+                centroids_path = os.path.join(persist_dir, _CENTROIDS_FNAME)
+                if self._centroids is not None:
+                    _save_atomic(centroids_path, self._centroids)
+                elif os.path.exists(centroids_path):
+                    os.remove(centroids_path)
+
+                meta = {
+                    "node_ids": self._node_ids,
+                    "ref_doc_ids": self._ref_doc_ids,
+                    "assignments": self._assignments,
+                    "trained_size": self._trained_size,
+                }
+                tmp_path = os.path.join(persist_dir, _META_FNAME + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+                os.replace(tmp_path, os.path.join(persist_dir, _META_FNAME))
+
+        @classmethod
+        def from_persist_dir(
+            cls,
+            persist_dir: str,
+            **kwargs: Any,
+        ) -> "LocalANNVectorStore":
+            """Load the index from the directory, where the embedding matrix
+            is memory-mapped in copy-on-write mode."""
+            with open(
+                os.path.join(persist_dir, _META_FNAME),
+                "r",
+                encoding="utf-8",
+            ) as f:
+                meta = json.load(f)
+
+            store = cls(**kwargs)
+            store._node_ids = meta["node_ids"]
+            store._ref_doc_ids = meta["ref_doc_ids"]
+            store._assignments = meta["assignments"]
+            store._trained_size = meta["trained_size"]
+            store._slots = {
+                node_id: slot
+                for slot, node_id in enumerate(store._node_ids)
+                if node_id is not None
+            }
+            for slot, ref_doc_id in enumerate(store._ref_doc_ids):
+                if ref_doc_id is not None:
+                    store._doc_slots.setdefault(ref_doc_id, set()).add(slot)
+            store._free_slots = [
+                slot
+                for slot, node_id in enumerate(store._node_ids)
+                if node_id is None
+            ]
+
+            if store._node_ids:
+                store._vectors = np.load(
+                    os.path.join(persist_dir, _VECTORS_FNAME),
+                    mmap_mode="c",
+                )
+            centroids_path = os.path.join(persist_dir, _CENTROIDS_FNAME)
+            if os.path.exists(centroids_path):
+                store._centroids = np.load(centroids_path)
+                store._lists = [set() for _ in range(len(store._centroids))]
+                for slot, label in enumerate(store._assignments):
+                    if label >= 0:
+                        store._lists[label].add(slot)
+
+            logger.info(
+                f"ANN index loaded with {store.size} embeddings from "
+                f"{persist_dir}",
+            )
+            return store
+
+except Exception:
+
+    class LocalANNVectorStore:  # type: ignore[no-redef]
+        """
+        A dummy vector store for passing tests when
+        llama-index is not install
+        """
+
+
+class LocalANNKnowledge(LlamaIndexKnowledge):
+    """
+    The llama-index knowledge whose embeddings are indexed by the built-in
+    `LocalANNVectorStore`, without any external vector database.
+
+    The search can be tuned by the `ann_nprobe` and `ann_train_size` keys in
+    the knowledge config, i.e. the number of clusters to probe for a query,
+    and the number of embeddings to start clustering.
+    """
+
+    knowledge_type: str = "local_ann_knowledge"
+
+    def _build_storage_context(
+        self,
+        persist_dir: Optional[str] = None,
+    ) -> StorageContext:
+        """
+        Build the storage context with the local ANN vector store.
+
+        Args:
+            persist_dir (`Optional[str]`):
+                The directory to load the persisted storage from. If `None`,
+                an empty storage context is built.
+        """
+        store_kwargs = {
+            "nprobe": self.knowledge_config.get(
+                "ann_nprobe",
+                DEFAULT_ANN_NPROBE,
+            ),
+            "train_size": self.knowledge_config.get(
+                "ann_train_size",
+                DEFAULT_ANN_TRAIN_SIZE,
+            ),
+        }
+        if persist_dir is None:
+            vector_store = LocalANNVectorStore(**store_kwargs)
+        else:
+            vector_store = LocalANNVectorStore.from_persist_dir(
+                persist_dir,
+                **store_kwargs,
+            )
+        return StorageContext.from_defaults(
+            persist_dir=persist_dir,
+            vector_store=vector_store,
+        )
@@ -50,7 +50,10 @@ from .service_response import ServiceResponse
 from .service_toolkit import ServiceToolkit
 from .retrieval.similarity import cos_sim
 from .text_processing.summarization import summarization
-from .retrieval.retrieval_from_list import retrieve_from_list
+from .retrieval.retrieval_from_list import (
+    retrieve_from_list,
+    retrieve_from_embeddings,
+)
 from .service_status import ServiceExecStatus
 from .web.web_digest import digest_webpage, load_web, parse_html_to_text
 from .web.download import download_from_url
@@ -102,6 +105,7 @@ __all__ = [
     "cos_sim",
     "summarization",
     "retrieve_from_list",
+    "retrieve_from_embeddings",
     "digest_webpage",
     "load_web",
     "parse_html_to_text",
@@ -12,7 +12,6 @@ import shutil
 import traceback
 from contextlib import AsyncExitStack
 from typing import Any, Optional, Callable
-import nest_asyncio
 from loguru import logger
 
 try:
@@ -24,20 +23,110 @@ except ImportError:
     mcp = None
 
 from .service_response import ServiceResponse, ServiceExecStatus
+from ..constants import (
+    _DEFAULT_MCP_MAX_CONCURRENCY,
+    _DEFAULT_MCP_CLEANUP_TIMEOUT,
+)
 
 
-# Apply nest_asyncio to allow nested event loops
-# This step enables running event loops multiple times within the same thread
-# Note: There is a known issue with uvloop, referenced here:
-# https://github.com/MagicStack/uvloop/issues/405
-# Users might encounter conflicts with uvloop when using nested event loops
-# with the following lines.
-# nest_asyncio.apply()
+# The event loop running in a dedicated daemon thread, which owns all the MCP
+# sessions, so that they can be shared by the threads and event loops of the
+# callers without nesting the running event loops
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_loop_lock = threading.Lock()
+
+# The MCP session handlers to be cleaned up at exit
+_session_handlers: set = set()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Get the background event loop, which is started in a daemon thread on
+    the first call.
+
+    Returns:
+        `asyncio.AbstractEventLoop`: The background event loop.
+    """
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None or _background_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever,
+                name="agentscope-mcp-loop",
+                daemon=True,
+            ).start()
+            _background_loop = loop
+        return _background_loop
+
+
+def _in_background_loop() -> bool:
+    """Check if the current thread is running the background event loop."""
+    try:
+        return asyncio.get_running_loop() is _background_loop
+    except RuntimeError:
+        return False
+
+
+def run_in_background(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run the coroutine function in the background event loop, and block the
+    current thread until it's done.
+
+    Args:
+        func (`Callable`):
+            The coroutine function to run.
+        *args (`Any`):
+            Positional arguments to pass to the function.
+        **kwargs (`Any`):
+            Keyword arguments to pass to the function.
+
+    Returns:
+        `Any`: The result of the function execution.
+    """
+    if _in_background_loop():
+        raise RuntimeError(
+            "Cannot block the background event loop to wait for itself, "
+            "await the coroutine function directly instead.",
+        )
+    return asyncio.run_coroutine_threadsafe(
+        func(*args, **kwargs),
+        get_background_loop(),
+    ).result()
+
+
+async def await_in_background(
+    func: Callable,
+    *args: Any,
+    **kwargs: Any,
+) -> Any:
+    """Await the coroutine function running in the background event loop
+    from any event loop.
+
+    Args:
+        func (`Callable`):
+            The coroutine function to run.
+        *args (`Any`):
+            Positional arguments to pass to the function.
+        **kwargs (`Any`):
+            Keyword arguments to pass to the function.
+
+    Returns:
+        `Any`: The result of the function execution.
+    """
+    if _in_background_loop():
+        return await func(*args, **kwargs)
+    return await asyncio.wrap_future(
+        asyncio.run_coroutine_threadsafe(
+            func(*args, **kwargs),
+            get_background_loop(),
+        ),
+    )
 
 
 def sync_exec(func: Callable, *args: Any, **kwargs: Any) -> Any:
     """
-    Execute a function synchronously.
+    Execute a function synchronously. If an event loop is already running in
+    the current thread (e.g. in jupyter notebook), the function is executed
+    in the background event loop rather than nesting the running one.
 
     Args:
         func (Callable): The asynchronous function to execute.
@@ -47,6 +136,13 @@ def sync_exec(func: Callable, *args: Any, **kwargs: Any) -> Any:
     Returns:
         Any: The result of the function execution.
     """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        return run_in_background(func, *args, **kwargs)
+
     try:
         loop = asyncio.get_event_loop()
     except RuntimeError as e:
@@ -57,17 +153,31 @@ def sync_exec(func: Callable, *args: Any, **kwargs: Any) -> Any:
         else:
             raise
 
-    try:
-        result = loop.run_until_complete(func(*args, **kwargs))
-    except RuntimeError as e:
-        if "event loop is already running" in str(e):
-            # Apply nest_asyncio to allow nested event loops
-            # To support jupyter notebook, etc.
-            nest_asyncio.apply()
-            result = loop.run_until_complete(func(*args, **kwargs))
-        else:
-            raise
-    return result
+    return loop.run_until_complete(func(*args, **kwargs))
+
+
+def _cleanup_session_handlers() -> None:
+    """Close all the MCP sessions and stop the background event loop at
+    exit."""
+    loop = _background_loop
+    if loop is None or loop.is_closed():
+        return
+
+    for handler in list(_session_handlers):
+        try:
+            asyncio.run_coroutine_threadsafe(
+                handler.cleanup(),
+                loop,
+            ).result(timeout=_DEFAULT_MCP_CLEANUP_TIMEOUT)
+        except Exception as e:
+            logger.warning(
+                f"Failed to clean up MCP server `{handler.name}`: {e}",
+            )
+
+    loop.call_soon_threadsafe(loop.stop)
+
+
+atexit.register(_cleanup_session_handlers)
 
 
 class MCPSessionHandler:
@@ -78,6 +188,7 @@ class MCPSessionHandler:
         name: str,
         config: dict[str, Any],
         sync: bool = True,
+        max_concurrency: int = _DEFAULT_MCP_MAX_CONCURRENCY,
     ) -> None:
         """
         Initialize an MCPSessionHandler instance.
@@ -111,6 +222,14 @@ class MCPSessionHandler:
         sync (bool, default=True): A boolean flag indicating whether the
             MCPSessionHandler should operate in synchronous mode. If True,
             the stdio server will initialize in `__init__` in a sync mode.
+
+        max_concurrency (int, default=16): The maximum number of tool calls
+            executed concurrently over the persistent session.
+
+        Note:
+        The session lives in a background event loop shared by all handlers,
+        so it can be used from any thread or event loop, and is kept alive
+        until `cleanup` is called or the program exits.
         """
         if mcp is None:
             raise ModuleNotFoundError(
@@ -122,22 +241,42 @@ class MCPSessionHandler:
         self.name: str = name
         self.config: dict[str, Any] = config
         self.session: Optional[mcp.ClientSession] = None
+        self.max_concurrency = max_concurrency
 
-        self._exit_stack: AsyncExitStack = AsyncExitStack()
-        self._cleanup_lock: asyncio.Lock = asyncio.Lock()
+        # The task owning the session in the background event loop, which
+        # enters and exits the transport contexts within the same task
+        self._owner_task: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
 
         # Initialize
         if sync:
             sync_exec(self.initialize)
-            if threading.current_thread().name == "MainThread":
-                # No need to do it at subthread, which will block the main
-                # thread
-                atexit.register(lambda: sync_exec(self.cleanup))
 
     async def initialize(self) -> None:
         """
-        Initialize `stdio_transport`
+        Initialize `stdio_transport` in the background event loop
         """
+        await await_in_background(self._initialize)
+
+    async def _initialize(self) -> None:
+        """Start the owner task of the session and wait until it's ready."""
+        if self._owner_task is not None:
+            return
+
+        ready = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._owner_task = asyncio.create_task(self._serve(ready))
+        try:
+            await ready
+        except Exception:
+            self._owner_task = None
+            raise
+        _session_handlers.add(self)
+
+    async def _serve(self, ready: asyncio.Future) -> None:
+        """Connect the server and keep the session alive until closing."""
         command = (
             shutil.which("npx")
             if self.config.get("command") == "npx"
@@ -147,86 +286,69 @@ class MCPSessionHandler:
         env = self.config.get("env", {})
 
         try:
-            if command:
-                server_params = mcp.StdioServerParameters(
-                    command=command,
-                    args=args,
-                    env={**os.environ, **env},
+            async with AsyncExitStack() as exit_stack:
+                if command:
+                    server_params = mcp.StdioServerParameters(
+                        command=command,
+                        args=args,
+                        env={**os.environ, **env},
+                    )
+                    # If an error happens in the process after
+                    # `anyio.open_process` in `stdio_client`, it might not
+                    # raise an exception, please make sure your mcp server is
+                    # well-configured and the command is correct before you
+                    # using this function.
+                    streams = await exit_stack.enter_async_context(
+                        stdio_client(server_params),
+                    )
+                else:
+                    streams = await exit_stack.enter_async_context(
+                        sse_client(url=self.config["url"]),
+                    )
+                session = await exit_stack.enter_async_context(
+                    mcp.ClientSession(*streams),
                 )
-                # If an error happens in the process after `anyio.open_process`
-                # in `stdio_client`, it might not raise an exception, please
-                # make sure your mcp server is well-configured and the
-                # command is correct before you using this function.
-                streams = await self._exit_stack.enter_async_context(
-                    stdio_client(server_params),
-                )
-            else:
-                streams = await self._exit_stack.enter_async_context(
-                    sse_client(url=self.config["url"]),
-                )
-            session = await self._exit_stack.enter_async_context(
-                mcp.ClientSession(*streams),
-            )
-            await session.initialize()
-            self.session = session
+                await session.initialize()
+                self.session = session
+                ready.set_result(None)
+
+                await self._closing.wait()
         except Exception as e:
-            logger.error(f"Error initializing server {self.name}: {e}")
-            await self.cleanup()
-            raise
+            if not ready.done():
+                logger.error(f"Error initializing server {self.name}: {e}")
+                ready.set_exception(e)
+            else:
+                logger.error(f"Error in server {self.name}: {e}")
+        finally:
+            self.session = None
 
     async def cleanup(self) -> None:
         """
         Clean up server stream resources.
         """
-        async with self._cleanup_lock:
-            try:
-                await self._exit_stack.aclose()
-                self.session = None
-                self._exit_stack = None
-            except Exception:
-                pass
-            finally:
-                logger.info(f"Clean up MCP Server `{self.name}` finished.")
-
-    def __del__(self) -> None:
-        """
-        Close all resources using a potentially risky synchronous execution
-        method.
-
-        Notes:
-        This method attempts to close resources across different threads and
-        event loops. While it may raise a RuntimeError due to task/event
-        loop boundary crossing, the underlying AsyncExitStack mechanism
-        ensures resource cleanup. Please use `self.close()` in async mode.
-
-        Behavior:
-        - Attempts to synchronously execute the async close method
-        - May trigger a RuntimeError during execution
-        - Resource cleanup is still performed due to AsyncExitStack's
-        internal mechanism
-        - Error is effectively suppressed, ensuring no resource leaks
-
-        Caution:
-        This is a temporary workaround that relies on implementation-specific
-        behavior of AsyncExitStack and sync_exec. Future versions should
-        implement a more robust resource management strategy.
-
-        Warning:
-        Do not modify this method without careful consideration of its
-        subtle resource management implications.
-        """
-        if asyncio is None or asyncio.get_event_loop is None:
-            # When the code is executed directly at the top level in a script,
-            # the `asyncio` will recycle before the instance. In such case,
-            # when the function is triggered by `__del__`, there is nothing to
-            # delete. Unless you call `del` in the end.
+        await await_in_background(self._cleanup)
+
+    async def _cleanup(self) -> None:
+        """Notify the owner task to close the session and wait for it."""
+        if self._owner_task is None:
             return
 
-        if self._exit_stack:
-            sync_exec(self.cleanup)
+        owner_task, self._owner_task = self._owner_task, None
+        self._closing.set()
+        try:
+            await owner_task
+        except Exception:
+            pass
+        finally:
+            _session_handlers.discard(self)
+            logger.info(f"Clean up MCP Server `{self.name}` finished.")
 
     async def list_tools(self) -> list[Any]:
         """List available tools from the server."""
+        return await await_in_background(self._list_tools)
+
+    async def _list_tools(self) -> list[Any]:
+        """List available tools in the background event loop."""
         if not self.session:
             raise RuntimeError(f"Session {self.name} not initialized")
 
@@ -245,14 +367,29 @@ class MCPSessionHandler:
         tool_name: str,
         **kwargs: Any,
     ) -> ServiceResponse:
-        """Execute a tool and return ServiceResponse"""
+        """Execute a tool and return ServiceResponse. The calls from
+        different threads and event loops are sent concurrently over the
+        persistent session, at most `max_concurrency` at a time."""
+        return await await_in_background(
+            self._execute_tool,
+            tool_name,
+            **kwargs,
+        )
+
+    async def _execute_tool(
+        self,
+        tool_name: str,
+        **kwargs: Any,
+    ) -> ServiceResponse:
+        """Execute a tool in the background event loop."""
         if not self.session:
             raise RuntimeError(f"Session {self.name} not initialized")
 
         logger.info(f"Executing {tool_name}...")
 
         try:
-            result = await self.session.call_tool(tool_name, kwargs)
+            async with self._semaphore:
+                result = await self.session.call_tool(tool_name, kwargs)
             # TODO: consider support image data and embedding resources
             content, is_error = (
                 [x.model_dump() for x in result.content],
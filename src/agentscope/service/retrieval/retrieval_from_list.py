@@ -1,11 +1,18 @@
 # -*- coding: utf-8 -*-
 """Retrieve service working with memory specially."""
-from typing import Callable, Optional, Any, Sequence
+from typing import Callable, Optional, Any, Sequence, Union
 from loguru import logger
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from agentscope.service.service_response import ServiceResponse
 from agentscope.service.service_status import ServiceExecStatus
+from agentscope.service.retrieval.similarity import normalize_embeddings
 from agentscope.models import ModelWrapperBase
+from agentscope.constants import Embedding
 
 
 def retrieve_from_list(
@@ -78,3 +85,104 @@ def retrieve_from_list(
         status=ServiceExecStatus.SUCCESS,
         content=content,
     )
+
+
+def retrieve_from_embeddings(
+    query: Union[Embedding, Sequence[Embedding], "np.ndarray"],
+    embeddings: Union[Sequence[Embedding], "np.ndarray"],
+    top_k: int = None,
+    knowledge: Optional[Sequence] = None,
+    preserve_order: bool = True,
+    normalized: bool = False,
+) -> ServiceResponse:
+    """
+    Retrieve data in a list by the cosine similarity of the embeddings.
+
+    A vectorised alternative of `retrieve_from_list` with `cos_sim` as the
+    score function, which scores all the data in one matrix product and
+    selects the top-k ones without sorting the whole list. A batch of
+    queries can be retrieved at once by passing a 2D query.
+
+    Args:
+        query (`Union[Embedding, Sequence[Embedding], np.ndarray]`):
+            The embedding of the query, or a list or 2D array of the
+            embeddings of a batch of queries.
+        embeddings (`Union[Sequence[Embedding], np.ndarray]`):
+            The embeddings of the data to be retrieved from, as a list or
+            a 2D array.
+        top_k (`int`, defaults to `None`):
+            Maximum number of data returned for each query.
+        knowledge (`Optional[Sequence]`, defaults to `None`):
+            The data corresponding to the embeddings, which are returned
+            in the results. If not given, the embeddings are returned.
+        preserve_order (`bool`, defaults to `True`):
+            Whether to preserve the original order of the retrieved data.
+        normalized (`bool`, defaults to `False`):
+            Whether the embeddings are already normalized, e.g., by
+            `normalize_embeddings`, so that they can be cached and reused
+            across the calls.
+
+    Returns:
+        `ServiceResponse`: The top-k triples of (score, index, object) with
+        HIGHEST scores, or a list of them for each query in a batch.
+    """
+    if knowledge is not None and len(knowledge) != len(embeddings):
+        return ServiceResponse(
+            ServiceExecStatus.ERROR,
+            f"The numbers of the knowledge ({len(knowledge)}) and the "
+            f"embeddings ({len(embeddings)}) are not equal.",
+        )
+
+    queries = normalize_embeddings(query)
+    is_batch = queries.ndim == 2
+    queries = np.atleast_2d(queries)
+    if normalized:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+    else:
+        matrix = normalize_embeddings(embeddings)
+    if len(matrix) == 0:
+        content = [[] for _ in queries]
+        return ServiceResponse(
+            ServiceExecStatus.SUCCESS,
+            content if is_batch else content[0],
+        )
+    if matrix.ndim != 2 or matrix.shape[1] != queries.shape[1]:
+        return ServiceResponse(
+            ServiceExecStatus.ERROR,
+            "embedding length not equal",
+        )
+
+    scores = queries.dot(matrix.T)
+    n = scores.shape[1]
+    top_k = n if top_k is None else max(min(top_k, n), 0)
+    if top_k == n:
+        indices = np.broadcast_to(np.arange(n), scores.shape)
+    elif top_k == 0:
+        indices = np.zeros((len(scores), 0), dtype=np.int64)
+    else:
+        # select the top-k in linear time, and sort only them
+        indices = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+
+    content = []
+    for query_scores, query_indices in zip(scores, indices):
+        if preserve_order:
+            query_indices = np.sort(query_indices)
+        else:
+            query_indices = query_indices[
+                np.lexsort((query_indices, -query_scores[query_indices]))
+            ]
+        content.append(
+            [
+                (
+                    float(query_scores[i]),
+                    int(i),
+                    knowledge[i] if knowledge is not None else embeddings[i],
+                )
+                for i in query_indices
+            ],
+        )
+
+    return ServiceResponse(
+        status=ServiceExecStatus.SUCCESS,
+        content=content if is_batch else content[0],
+    )
@@ -2,6 +2,8 @@
 """
 Similarity functions for retrieval
 """
+from typing import Sequence, Union
+
 try:
     import numpy as np
 except ImportError:
@@ -37,3 +39,22 @@ def cos_sim(
         ServiceExecStatus.SUCCESS,
         np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)),
     )
+
+
+def normalize_embeddings(
+    embeddings: Union[Sequence[Embedding], "np.ndarray"],
+) -> "np.ndarray":
+    """Stack the embeddings into a float32 array with unit L2 norm along
+    the last axis, so that their dot products are the cosine similarities.
+    The zero embeddings are kept as zeros.
+
+    Args:
+        embeddings (`Union[Sequence[Embedding], np.ndarray]`):
+            An embedding, or a list or 2D array of embeddings.
+
+    Returns:
+        `np.ndarray`: The normalized embeddings.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1.0, norms)
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 """Service Toolkit for service function usage."""
+import asyncio
+import collections
+import copy
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as _Timeout
 from functools import partial
 import inspect
 from typing import (
@@ -25,6 +31,11 @@ from ..exception import (
 from .service_response import ServiceResponse
 from .service_response import ServiceExecStatus
 from .mcp_manager import MCPSessionHandler, sync_exec
+from ..utils.json_utils import loads_tolerant
+from ..constants import (
+    _DEFAULT_SCHEMA_CACHE_MAX_SIZE,
+    _DEFAULT_TOOL_MAX_WORKERS,
+)
 from ..message import (
     Msg,
     ToolUseBlock,
@@ -84,6 +95,12 @@ class ServiceToolkit:
     service_funcs: dict[str, ServiceFunction]
     """The registered functions in the service toolkit."""
 
+    _func_schema_cache: collections.OrderedDict = collections.OrderedDict()
+    """The JSON schemas of the service functions shared by all toolkits,
+    keyed by the function and the arguments of `get`."""
+
+    _func_schema_cache_lock = threading.Lock()
+
     _tools_instruction_format: str = (
         "## Tool Functions:\n"
         "The following tool functions are available in the format of\n"
@@ -350,12 +367,8 @@ class ServiceToolkit:
                 }
                 self.service_funcs[tool.name] = ServiceFunction(
                     name=tool.name,
-                    original_func=partial(
-                        sync_exec,
-                        sever.execute_tool,
-                    ),
+                    original_func=sever.execute_tool,
                     processed_func=partial(
-                        sync_exec,
                         sever.execute_tool,
                         tool.name,
                     ),
@@ -439,10 +452,15 @@ class ServiceToolkit:
                 f"Cannot find a tool function named `{func_name}`.",
             )
 
-        # If it is json(str) convert to json(dict)
+        # If it is json(str) convert to json(dict). The truncated arguments
+        # are not repaired, since the function shouldn't be executed with
+        # partial arguments
         if isinstance(tool_call["input"], str):
             try:
-                tool_call["input"] = json.loads(tool_call["input"])
+                tool_call["input"] = loads_tolerant(
+                    tool_call["input"],
+                    allow_truncated=False,
+                )
             except json.decoder.JSONDecodeError:
                 logger.debug(
                     f"Fail to parse the arguments: {tool_call['input']}",
@@ -473,6 +491,9 @@ class ServiceToolkit:
         func = self.service_funcs[tool_call["name"]]
         kwargs = tool_call["input"]
 
+        if inspect.iscoroutinefunction(func.processed_func):
+            return sync_exec(self._execute_func_async, tool_call)
+
         try:
             func_res = func.processed_func(**kwargs)
         except Exception as e:
@@ -488,11 +509,162 @@ class ServiceToolkit:
             output=func_res.content,
         )
 
+    async def _execute_func_async(
+        self,
+        tool_call: ToolUseBlock,
+    ) -> ToolResultBlock:
+        """Execute the function with the arguments asynchronously. The
+        coroutine functions (e.g. the MCP tools) are awaited directly, while
+        the sync functions run in a separate thread.
+
+        Args:
+            tool_call (`ToolUseBlock`):
+                A tool use block indicating the called function and arguments.
+
+        Returns:
+            `ToolResultBlock`:
+                The result block of the function execution.
+        """
+        func = self.service_funcs[tool_call["name"]]
+        kwargs = tool_call["input"]
+
+        if not inspect.iscoroutinefunction(func.processed_func):
+            return await asyncio.to_thread(self._execute_func, tool_call)
+
+        try:
+            func_res = await func.processed_func(**kwargs)
+        except Exception as e:
+            func_res = ServiceResponse(
+                status=ServiceExecStatus.ERROR,
+                content=str(e),
+            )
+
+        return ToolResultBlock(
+            type="tool_result",
+            id=tool_call["id"],
+            name=tool_call["name"],
+            output=func_res.content,
+        )
+
+    @staticmethod
+    def _timeout_result(
+        tool_call: ToolUseBlock,
+        timeout: float,
+    ) -> ToolResultBlock:
+        """The result block of the function execution that times out."""
+        return ToolResultBlock(
+            type="tool_result",
+            id=tool_call["id"],
+            name=tool_call["name"],
+            output=f"TimeoutError: The function `{tool_call['name']}` "
+            f"didn't finish within {timeout} seconds.",
+        )
+
+    async def _execute_func_with_timeout_async(
+        self,
+        tool_call: ToolUseBlock,
+        timeout: Optional[float],
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> ToolResultBlock:
+        """Execute the function asynchronously within the timeout. If the
+        semaphore is given, the time waiting for it is counted in the
+        timeout."""
+
+        async def _execute() -> ToolResultBlock:
+            if semaphore is None:
+                return await self._execute_func_async(tool_call)
+            async with semaphore:
+                return await self._execute_func_async(tool_call)
+
+        if timeout is None:
+            return await _execute()
+        try:
+            return await asyncio.wait_for(_execute(), timeout)
+        except asyncio.TimeoutError:
+            return self._timeout_result(tool_call, timeout)
+
+    def _execute_funcs_concurrently(
+        self,
+        tool_calls: list[ToolUseBlock],
+        max_workers: int,
+        timeout: Optional[float],
+    ) -> list[ToolResultBlock]:
+        """Execute the checked tool calls concurrently, and return the
+        results in the same order as the tool calls. The sync functions run
+        in a thread pool, while the coroutine functions (e.g. the MCP tools,
+        whose sessions live in a background event loop) are awaited together.
+
+        Note the timeout of each function is counted from the moment it's
+        submitted, including the time waiting for a free worker, so the whole
+        execution finishes within the timeout. A timed-out function that
+        hasn't started is cancelled, while a running sync function cannot be
+        interrupted, and keeps occupying its worker thread until it returns.
+        """
+        results: list = [None] * len(tool_calls)
+        sync_indices, async_indices = [], []
+        for i, tool_call in enumerate(tool_calls):
+            func = self.service_funcs[tool_call["name"]]
+            if inspect.iscoroutinefunction(func.processed_func):
+                async_indices.append(i)
+            else:
+                sync_indices.append(i)
+
+        # Submit the sync functions first, so that they run while the
+        # coroutine functions are awaited
+        executor = None
+        futures = {}
+        if sync_indices:
+            executor = ThreadPoolExecutor(
+                max_workers=min(max_workers, len(sync_indices)),
+                thread_name_prefix="agentscope-tool",
+            )
+            for i in sync_indices:
+                futures[i] = executor.submit(self._execute_func, tool_calls[i])
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        async def _gather() -> list[ToolResultBlock]:
+            semaphore = asyncio.Semaphore(max_workers)
+            return await asyncio.gather(
+                *[
+                    self._execute_func_with_timeout_async(
+                        tool_calls[i],
+                        timeout,
+                        semaphore,
+                    )
+                    for i in async_indices
+                ],
+            )
+
+        if async_indices:
+            for i, result in zip(async_indices, sync_exec(_gather)):
+                results[i] = result
+
+        try:
+            for i, future in futures.items():
+                if deadline is None:
+                    results[i] = future.result()
+                    continue
+                remaining = deadline - time.monotonic()
+                try:
+                    results[i] = future.result(timeout=max(remaining, 0))
+                except _Timeout:
+                    future.cancel()
+                    results[i] = self._timeout_result(tool_calls[i], timeout)
+        finally:
+            if executor is not None:
+                # Don't wait for the timed-out functions
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
     def parse_and_call_func(
         self,
         tool_calls: Union[ToolUseBlock, list[ToolUseBlock]],
         tools_api_mode: bool = False,
         raise_exception: bool = False,
+        parallel: bool = False,
+        max_workers: int = _DEFAULT_TOOL_MAX_WORKERS,
+        timeout: Optional[float] = None,
     ) -> Msg:
         """Execute the tool functions with the given arguments, and return the
         execution results.
@@ -508,6 +680,19 @@ class ServiceToolkit:
                 Whether to raise exceptions when the function call fails. If
                 set to `False`, the error message will be wrapped in the
                 `ToolResultBlock` and returned.
+            parallel (`bool`, defaults to `False`):
+                Whether to execute the tool calls concurrently. The sync
+                functions run in a thread pool, and the coroutine functions
+                (e.g. the MCP tools) run together in an event loop. The
+                results are in the same order as the tool calls either way.
+            max_workers (`int`, defaults to `8`):
+                The maximum number of tool calls executed at the same time in
+                parallel mode.
+            timeout (`Optional[float]`, defaults to `None`):
+                The timeout in seconds for each tool call, which includes
+                the time waiting for a free worker in parallel mode. If a
+                tool call times out, an error message will be returned as its
+                result. `None` means no timeout.
 
         Returns:
             `list[ToolResultBlock]`:
@@ -522,16 +707,113 @@ class ServiceToolkit:
         ), f"tool_calls should be a list of dict, but got {tool_calls}."
 
         tool_results: list[ContentBlock] = []
+        # The indices of the checked tool calls to be executed concurrently
+        to_execute: list[int] = []
         for tool_call in tool_calls:
             try:
                 # --- Step 1: Parse the text according to the tools_call_format
                 self._check_tool_use_block(tool_call)
 
                 # --- Step 2: Call the service function ---
+                if parallel:
+                    to_execute.append(len(tool_results))
+                    tool_results.append(None)
+                elif timeout is not None:
+                    tool_results.extend(
+                        self._execute_funcs_concurrently(
+                            [tool_call],
+                            1,
+                            timeout,
+                        ),
+                    )
+                else:
+                    tool_results.append(
+                        self._execute_func(tool_call),
+                    )
+
+            except FunctionCallError as e:
+                if raise_exception:
+                    raise e from None
+
                 tool_results.append(
-                    self._execute_func(tool_call),
+                    ToolResultBlock(
+                        type="tool_result",
+                        id=str(tool_call["id"]),
+                        name=str(tool_call["name"]),
+                        output=str(e),
+                    ),
                 )
 
+        if to_execute:
+            results = self._execute_funcs_concurrently(
+                [tool_calls[i] for i in to_execute],
+                max_workers,
+                timeout,
+            )
+            for i, result in zip(to_execute, results):
+                tool_results[i] = result
+
+        return self._assemble_result_msg(
+            tool_calls,
+            tool_results,
+            tools_api_mode,
+        )
+
+    async def parse_and_call_func_async(
+        self,
+        tool_calls: Union[ToolUseBlock, list[ToolUseBlock]],
+        tools_api_mode: bool = False,
+        raise_exception: bool = False,
+        parallel: bool = False,
+        max_workers: int = _DEFAULT_TOOL_MAX_WORKERS,
+        timeout: Optional[float] = None,
+    ) -> Msg:
+        """The async version of `parse_and_call_func`, which can be awaited
+        in an event loop without blocking it. The coroutine functions (e.g.
+        the MCP tools) are awaited natively, while the sync functions run in
+        separate threads.
+
+        Args:
+            tool_calls (`Union[ToolUseBlock, list[ToolUseBlock]]`):
+                A or a list of tool use blocks indicating the function calls.
+            tools_api_mode (`bool`, defaults to `False`):
+                If `False`, the execution results will be combined into a
+                string content. If `True`, the results will be `ContentBlock`
+                objects.
+            raise_exception (`bool`, defaults to `False`):
+                Whether to raise exceptions when the function call fails. If
+                set to `False`, the error message will be wrapped in the
+                `ToolResultBlock` and returned.
+            parallel (`bool`, defaults to `False`):
+                Whether to execute the tool calls concurrently. The results
+                are in the same order as the tool calls either way.
+            max_workers (`int`, defaults to `8`):
+                The maximum number of tool calls executed at the same time in
+                parallel mode.
+            timeout (`Optional[float]`, defaults to `None`):
+                The timeout in seconds for each tool call, which includes
+                the time waiting for a free worker in parallel mode. `None`
+                means no timeout.
+
+        Returns:
+            `Msg`:
+                A message containing the results of the function calls.
+        """
+        if isinstance(tool_calls, dict):
+            tool_calls = [tool_calls]
+
+        assert isinstance(tool_calls, list) and all(
+            isinstance(_, dict) for _ in tool_calls
+        ), f"tool_calls should be a list of dict, but got {tool_calls}."
+
+        tool_results: list[ContentBlock] = []
+        to_execute: list[int] = []
+        for tool_call in tool_calls:
+            try:
+                self._check_tool_use_block(tool_call)
+                to_execute.append(len(tool_results))
+                tool_results.append(None)
+
             except FunctionCallError as e:
                 if raise_exception:
                     raise e from None
@@ -545,6 +827,43 @@ class ServiceToolkit:
                     ),
                 )
 
+        if parallel:
+            semaphore = asyncio.Semaphore(max_workers)
+            results = await asyncio.gather(
+                *[
+                    self._execute_func_with_timeout_async(
+                        tool_calls[i],
+                        timeout,
+                        semaphore,
+                    )
+                    for i in to_execute
+                ],
+            )
+        else:
+            results = [
+                await self._execute_func_with_timeout_async(
+                    tool_calls[i],
+                    timeout,
+                )
+                for i in to_execute
+            ]
+
+        for i, result in zip(to_execute, results):
+            tool_results[i] = result
+
+        return self._assemble_result_msg(
+            tool_calls,
+            tool_results,
+            tools_api_mode,
+        )
+
+    def _assemble_result_msg(
+        self,
+        tool_calls: list[ToolUseBlock],
+        tool_results: list[ContentBlock],
+        tools_api_mode: bool,
+    ) -> Msg:
+        """Assemble the execution results into a message."""
         if not tools_api_mode:
             # When you're managing tools calling prompt manually, the blocks
             # should be transformed into string format. So that in the format
@@ -581,6 +900,13 @@ class ServiceToolkit:
                 role="system",
             )
 
+    @staticmethod
+    def clear_cache() -> None:
+        """Clear the cached JSON schemas of the service functions, e.g. after
+        their docstrings or signatures are modified."""
+        with ServiceToolkit._func_schema_cache_lock:
+            ServiceToolkit._func_schema_cache.clear()
+
     @staticmethod
     def _remove_title_field(schema: dict) -> None:
         """Remove the title field from the JSON schema to avoid
@@ -680,6 +1006,86 @@ class ServiceToolkit:
         # Get the function for agent to use
         tool_func = partial(service_func, **kwargs)
 
+        func_schema = cls._get_func_schema(
+            service_func,
+            func_description,
+            include_long_description,
+            include_var_positional,
+            include_var_keyword,
+            frozenset(kwargs),
+        )
+
+        return tool_func, func_schema
+
+    @classmethod
+    def _get_func_schema(
+        cls,
+        service_func: Callable[..., Any],
+        func_description: Optional[str],
+        include_long_description: bool,
+        include_var_positional: bool,
+        include_var_keyword: bool,
+        preset_keys: frozenset,
+    ) -> dict:
+        """Get the JSON schema of the service function from the cache, so
+        that the dynamic pydantic model is only created once for the same
+        function and arguments. A deep copy is returned since the schema may
+        be modified by the caller."""
+        key = (
+            service_func,
+            func_description,
+            include_long_description,
+            include_var_positional,
+            include_var_keyword,
+            preset_keys,
+        )
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable callable objects are not cached
+            key = None
+
+        cached = None
+        if key is not None:
+            with cls._func_schema_cache_lock:
+                cached = cls._func_schema_cache.get(key, None)
+                if cached is not None:
+                    cls._func_schema_cache.move_to_end(key)
+
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        func_schema = cls._build_func_schema(
+            service_func,
+            func_description,
+            include_long_description,
+            include_var_positional,
+            include_var_keyword,
+            preset_keys,
+        )
+
+        if key is not None:
+            with cls._func_schema_cache_lock:
+                cls._func_schema_cache[key] = func_schema
+                while (
+                    len(cls._func_schema_cache)
+                    > _DEFAULT_SCHEMA_CACHE_MAX_SIZE
+                ):
+                    cls._func_schema_cache.popitem(last=False)
+
+        return copy.deepcopy(func_schema)
+
+    @staticmethod
+    def _build_func_schema(
+        service_func: Callable[..., Any],
+        func_description: Optional[str],
+        include_long_description: bool,
+        include_var_positional: bool,
+        include_var_keyword: bool,
+        preset_keys: frozenset,
+    ) -> dict:
+        """Build the JSON schema of the service function from its signature
+        and docstring by a dynamic pydantic model."""
         docstring = parse(service_func.__doc__)
         params_docstring = {
             _.arg_name: _.description for _ in docstring.params
@@ -702,7 +1108,7 @@ class ServiceToolkit:
 
         fields = {}
         for name, param in inspect.signature(service_func).parameters.items():
-            if name in kwargs or name in ["self", "cls"]:
+            if name in preset_keys or name in ["self", "cls"]:
                 # Skip the given keyword arguments and self/cls
                 continue
 
@@ -782,4 +1188,4 @@ class ServiceToolkit:
         if extracted_func_description not in [None, ""]:
             func_schema["function"]["description"] = extracted_func_description
 
-        return tool_func, func_schema
+        return func_schema
@@ -1,16 +1,137 @@
 # -*- coding: utf-8 -*-
 """The tokens interface for agentscope."""
+import hashlib
+import json
+import math
 import os
+import re
+import threading
+from collections import OrderedDict
 from http import HTTPStatus
-from typing import Callable, Union, Optional, Any
+from typing import Callable, Union, Optional, Any, Tuple
 
 from loguru import logger
 
+from .constants import (
+    _DEFAULT_TOKENS_CACHE_MAX_SIZE,
+    _DEFAULT_TOKENS_MESSAGE_KEYS_MAX_SIZE,
+    _DEFAULT_TOKENS_APPROX_CHARS_PER_TOKEN,
+)
+
 
 __register_models = {}
 # The dictionary to store the model names and token counting functions.
 # TODO: a more elegant way to store the model names and functions.
 
+__tokenizers: dict[tuple, Any] = {}
+# The loaded tokenizers (encoders), keyed by the tokenizer kind and its
+# loading arguments, so that they're loaded only once per process.
+
+__message_tokens: OrderedDict[str, int] = OrderedDict()
+# The LRU cache of the number of tokens per message, keyed by the hash of
+# the model (or encoding) name and the message content.
+
+__message_keys: OrderedDict[tuple, Tuple[dict, dict, str]] = OrderedDict()
+# The cache keys of the recently counted message objects, keyed by the
+# namespace and the id of the message object, so that the messages passed
+# again (e.g. the history kept by the caller) are not re-serialized. The
+# message object and its shallow copy are kept to make sure the id is not
+# reused and the fields are not replaced since then. Note the in-place
+# modification of the nested values (e.g. the content list) is not detected.
+
+__lock = threading.Lock()
+
+
+def _get_tokenizer(key: tuple, loader: Callable[[], Any]) -> Any:
+    """Get the tokenizer from the registry, or load it by `loader` if it's
+    not loaded yet.
+
+    Args:
+        key (`tuple`):
+            The key of the tokenizer, e.g. `("tiktoken", "gpt-4o")`.
+        loader (`Callable[[], Any]`):
+            The function to load the tokenizer.
+
+    Returns:
+        `Any`: The tokenizer object.
+    """
+    tokenizer = __tokenizers.get(key, None)
+    if tokenizer is None:
+        with __lock:
+            tokenizer = __tokenizers.get(key, None)
+            if tokenizer is None:
+                tokenizer = loader()
+                __tokenizers[key] = tokenizer
+    return tokenizer
+
+
+def _count_message_tokens(
+    namespace: str,
+    message: dict,
+    count_func: Callable[[dict], int],
+) -> int:
+    """Count the tokens of a single message with the per-message cache, so
+    that the unchanged messages in a growing history are not re-encoded.
+
+    Args:
+        namespace (`str`):
+            The namespace of the counting, e.g. the model name, which
+            distinguishes the counts of the same message for different
+            tokenizers.
+        message (`dict`):
+            The message to be counted.
+        count_func (`Callable[[dict], int]`):
+            The function to count the tokens of the message on cache miss.
+
+    Returns:
+        `int`: The number of tokens.
+    """
+    with __lock:
+        entry = __message_keys.get((namespace, id(message)), None)
+    if entry is not None and entry[0] is message and entry[1] == message:
+        key = entry[2]
+    else:
+        key = hashlib.sha256(
+            json.dumps(
+                [namespace, message],
+                sort_keys=True,
+                ensure_ascii=False,
+                default=str,
+            ).encode("utf-8"),
+        ).hexdigest()
+        with __lock:
+            __message_keys[(namespace, id(message))] = (
+                message,
+                dict(message),
+                key,
+            )
+            __message_keys.move_to_end((namespace, id(message)))
+            while len(__message_keys) > _DEFAULT_TOKENS_MESSAGE_KEYS_MAX_SIZE:
+                __message_keys.popitem(last=False)
+
+    with __lock:
+        if key in __message_tokens:
+            __message_tokens.move_to_end(key)
+            return __message_tokens[key]
+
+    num_tokens = count_func(message)
+
+    with __lock:
+        __message_tokens[key] = num_tokens
+        while len(__message_tokens) > _DEFAULT_TOKENS_CACHE_MAX_SIZE:
+            __message_tokens.popitem(last=False)
+
+    return num_tokens
+
+
+def clear_cache() -> None:
+    """Clear the cached per-message token counts and the loaded
+    tokenizers."""
+    with __lock:
+        __message_tokens.clear()
+        __message_keys.clear()
+        __tokenizers.clear()
+
 
 def count(model_name: str, messages: list[dict[str, str]]) -> int:
     """Count the number of tokens for the given model and messages.
@@ -63,6 +184,33 @@ def count(model_name: str, messages: list[dict[str, str]]) -> int:
         )
 
 
+def count_many(
+    model_name: str,
+    messages_list: list[list[dict[str, str]]],
+) -> list[int]:
+    """Count the number of tokens for a batch of message lists with the same
+    model, e.g. the prompts of multiple agents, or a growing conversation
+    history counted on every turn. The tokenizer is loaded only once, and
+    for OpenAI models the messages shared across the lists are encoded only
+    once.
+
+    Args:
+        model_name (`str`):
+            The name of the model.
+        messages_list (`list[list[dict[str, str]]]`):
+            A list of message lists, each of which is counted as in `count`.
+
+    Returns:
+        `list[int]`: The number of tokens for each message list.
+    """
+    if not isinstance(messages_list, list):
+        raise TypeError(
+            f"Expected messages_list to be a list, but got "
+            f"{type(messages_list)}.",
+        )
+    return [count(model_name, messages) for messages in messages_list]
+
+
 def _count_content_tokens_for_openai_vision_model(
     content: list[dict],
     encoding: Any,
@@ -133,30 +281,10 @@ def _count_content_tokens_for_openai_vision_model(
     return num_tokens
 
 
-def count_openai_tokens(  # pylint: disable=too-many-branches
-    model_name: str,
-    messages: list[dict[str, str]],
-) -> int:
-    """Count the number of tokens for the given OpenAI Chat model and
-    messages.
-
-    Refer to https://platform.openai.com/docs/advanced-usage/managing-tokens
-
-    Args:
-        model_name (`str`):
-            The name of the OpenAI Chat model, e.g. "gpt-4o".
-        messages (`list[dict[str, str]]`):
-            A list of dictionaries. Each dictionary should have the keys
-            of "role" and "content", and an optional key of "name". For vision
-            LLMs, the value of "content" should be a list of dictionaries.
-    """
-    import tiktoken
-
-    try:
-        encoding = tiktoken.encoding_for_model(model_name)
-    except KeyError:
-        encoding = tiktoken.get_encoding("o200k_base")
-
+def _resolve_openai_model(model_name: str) -> Tuple[str, int, int]:
+    """Resolve the OpenAI model name to the snapshot whose message format is
+    known, and return the snapshot name, the number of tokens per message,
+    and the number of tokens per name."""
     if model_name in {
         "gpt-3.5-turbo-0125",
         "gpt-4-0314",
@@ -166,34 +294,60 @@ def count_openai_tokens(  # pylint: disable=too-many-branches
         "gpt-4o-mini-2024-07-18",
         "gpt-4o-2024-08-06",
     }:
-        tokens_per_message = 3
-        tokens_per_name = 1
+        return model_name, 3, 1
     elif "gpt-3.5-turbo" in model_name:
-        return count_openai_tokens(
-            model_name="gpt-3.5-turbo-0125",
-            messages=messages,
-        )
+        return _resolve_openai_model("gpt-3.5-turbo-0125")
     elif "gpt-4o-mini" in model_name:
-        return count_openai_tokens(
-            model_name="gpt-4o-mini-2024-07-18",
-            messages=messages,
-        )
+        return _resolve_openai_model("gpt-4o-mini-2024-07-18")
     elif "gpt-4o" in model_name:
-        return count_openai_tokens(
-            model_name="gpt-4o-2024-08-06",
-            messages=messages,
-        )
+        return _resolve_openai_model("gpt-4o-2024-08-06")
     elif "gpt-4" in model_name:
-        return count_openai_tokens(model_name="gpt-4-0613", messages=messages)
+        return _resolve_openai_model("gpt-4-0613")
     else:
         raise NotImplementedError(
             f"count_openai_tokens() is not implemented for "
             f"model {model_name}.",
         )
 
-    num_tokens = 3  # every reply is primed with <|start|>assistant<|message|>
-    for message in messages:
-        num_tokens += tokens_per_message
+
+def _load_openai_encoding(model_name: str) -> Any:
+    """Load the tiktoken encoding for the OpenAI model."""
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_openai_tokens(
+    model_name: str,
+    messages: list[dict[str, str]],
+) -> int:
+    """Count the number of tokens for the given OpenAI Chat model and
+    messages. The encoding is loaded once per model, and the token counts
+    of the messages are cached by their content.
+
+    Refer to https://platform.openai.com/docs/advanced-usage/managing-tokens
+
+    Args:
+        model_name (`str`):
+            The name of the OpenAI Chat model, e.g. "gpt-4o".
+        messages (`list[dict[str, str]]`):
+            A list of dictionaries. Each dictionary should have the keys
+            of "role" and "content", and an optional key of "name". For vision
+            LLMs, the value of "content" should be a list of dictionaries.
+    """
+    model_name, tokens_per_message, tokens_per_name = _resolve_openai_model(
+        model_name,
+    )
+    encoding = _get_tokenizer(
+        ("tiktoken", model_name),
+        lambda: _load_openai_encoding(model_name),
+    )
+
+    def _count(message: dict) -> int:
+        num_tokens = tokens_per_message
         for key, value in message.items():
             # Considering vision models
             if key == "content" and isinstance(value, list):
@@ -212,6 +366,11 @@ def count_openai_tokens(  # pylint: disable=too-many-branches
 
             if key == "name":
                 num_tokens += tokens_per_name
+        return num_tokens
+
+    num_tokens = 3  # every reply is primed with <|start|>assistant<|message|>
+    for message in messages:
+        num_tokens += _count_message_tokens(model_name, message, _count)
 
     return num_tokens
 
@@ -226,6 +385,11 @@ def count_gemini_tokens(
         model_name (`str`):
             The name of the Gemini model, e.g. "gemini-1.5-pro".
         messages (`list[dict[str, str]]`):
+
+    Note:
+        This function calls the Gemini API. To count the tokens offline,
+        register a local tokens counting function created by
+        `local_tokens_counter` for the model.
     """
     try:
         import google.generativeai as genai
@@ -250,7 +414,9 @@ def count_dashscope_tokens(
 ) -> int:
     """Count the number of tokens for the given Dashscope model and messages.
 
-    Note this function will call the Dashscope API to count the tokens.
+    Note this function will call the Dashscope API to count the tokens. To
+    count the tokens offline, register a local tokens counting function
+    created by `local_tokens_counter` for the model.
     Refer to
     https://help.aliyun.com/zh/dashscope/developer-reference/token-api?spm=5176.28197632.console-base_help.dexternal.1c407e06Y2bQVB&disableWebsiteRedirect=true
     for more details.
@@ -361,6 +527,10 @@ def count_huggingface_tokens(
 
     Returns:
         `int`: The number of tokens.
+
+    Note:
+        The tokenizer is loaded only once for the same arguments, and reused
+        in the following calls.
     """
     if enable_mirror:
         os.environ["HF_ENDPOINT"] = "https://hf-mirror.com"
@@ -372,10 +542,18 @@ def count_huggingface_tokens(
             "The package `transformers` is required for downloading tokenizer",
         ) from exc
 
-    tokenizer = AutoTokenizer.from_pretrained(
-        pretrained_model_name_or_path,
-        use_fast=use_fast,
-        trust_remote_code=trust_remote_code,
+    tokenizer = _get_tokenizer(
+        (
+            "huggingface",
+            pretrained_model_name_or_path,
+            use_fast,
+            trust_remote_code,
+        ),
+        lambda: AutoTokenizer.from_pretrained(
+            pretrained_model_name_or_path,
+            use_fast=use_fast,
+            trust_remote_code=trust_remote_code,
+        ),
     )
 
     if tokenizer.chat_template is None:
@@ -392,3 +570,196 @@ def count_huggingface_tokens(
     )[0]
 
     return len(tokenized_msgs)
+
+
+# The CJK characters are usually encoded into one token each
+_CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+_APPROX_PATTERN = re.compile(
+    rf"[{_CJK_CHARS}]|\d|[^\W\d{_CJK_CHARS}]+|[^\w\s]|_",
+)
+
+
+def count_approximate_tokens(
+    text: str,
+    chars_per_token: float = _DEFAULT_TOKENS_APPROX_CHARS_PER_TOKEN,
+) -> int:
+    """Estimate the number of tokens of the text without any tokenizer.
+
+    The text is split into CJK characters, digits, words and punctuations.
+    Each CJK character, digit and punctuation is counted as one token (as
+    Qwen and Gemini tokenizers do), and each word is counted as one token
+    per `chars_per_token` characters. For English and Chinese chat messages,
+    the estimation is usually within 20% of the exact count.
+
+    Args:
+        text (`str`):
+            The text to be counted.
+        chars_per_token (`float`, defaults to `8`):
+            The number of characters per token for the words.
+
+    Returns:
+        `int`: The estimated number of tokens.
+    """
+    num_tokens = 0
+    for piece in _APPROX_PATTERN.findall(text):
+        num_tokens += math.ceil(len(piece) / chars_per_token)
+    return num_tokens
+
+
+def _load_local_encoder(tokenizer_path: str) -> Callable[[str], int]:
+    """Load the local tokenizer from the given path, and return a function
+    counting the tokens of a text.
+
+    Args:
+        tokenizer_path (`str`):
+            The path to a `tokenizer.json` file (e.g. from the Qwen model
+            repository), a SentencePiece model file ending with `.model`
+            (e.g. the Gemma tokenizer, which shares the vocabulary with
+            Gemini), or a directory containing one of them or the tokenizer
+            files of transformers.
+
+    Returns:
+        `Callable[[str], int]`: The function counting the tokens of a text.
+    """
+    if os.path.isdir(tokenizer_path):
+        for filename in ["tokenizer.json", "tokenizer.model"]:
+            if os.path.isfile(os.path.join(tokenizer_path, filename)):
+                return _load_local_encoder(
+                    os.path.join(tokenizer_path, filename),
+                )
+
+        try:
+            from transformers import AutoTokenizer
+        except ImportError as exc:
+            raise ImportError(
+                "The package `transformers` is required for loading the "
+                f"tokenizer from {tokenizer_path}.",
+            ) from exc
+
+        hf_tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
+        return lambda text: len(
+            hf_tokenizer.encode(text, add_special_tokens=False),
+        )
+
+    if not os.path.isfile(tokenizer_path):
+        raise FileNotFoundError(
+            f"The tokenizer file {tokenizer_path} does not exist.",
+        )
+
+    if tokenizer_path.endswith(".model"):
+        try:
+            import sentencepiece
+        except ImportError as exc:
+            raise ImportError(
+                "The package `sentencepiece` is required for loading the "
+                "SentencePiece tokenizer. Install it with "
+                "`pip install sentencepiece`.",
+            ) from exc
+
+        processor = sentencepiece.SentencePieceProcessor(
+            model_file=tokenizer_path,
+        )
+        return lambda text: len(processor.encode(text))
+
+    try:
+        from tokenizers import Tokenizer
+    except ImportError as exc:
+        raise ImportError(
+            "The package `tokenizers` is required for loading the tokenizer "
+            "file. Install it with `pip install tokenizers`.",
+        ) from exc
+
+    tokenizer = Tokenizer.from_file(tokenizer_path)
+    return lambda text: len(
+        tokenizer.encode(text, add_special_tokens=False).ids,
+    )
+
+
+def _extract_texts(message: dict) -> list[str]:
+    """Extract the texts from a message in the formats of OpenAI, DashScope
+    and Gemini, i.e. the "content" or "parts" field, which can be a string,
+    or a list of strings or dictionaries with the key "text"."""
+    texts = []
+    for key in ["content", "parts"]:
+        value = message.get(key, None)
+        if value is None:
+            continue
+
+        if not isinstance(value, list):
+            value = [value]
+
+        for item in value:
+            if isinstance(item, str):
+                texts.append(item)
+            elif isinstance(item, dict) and isinstance(item.get("text"), str):
+                texts.append(item["text"])
+    return texts
+
+
+def local_tokens_counter(
+    tokenizer_path: Optional[str] = None,
+    tokens_per_message: int = 0,
+    chars_per_token: float = _DEFAULT_TOKENS_APPROX_CHARS_PER_TOKEN,
+) -> Callable[[str, list[dict]], int]:
+    """Create a tokens counting function that counts the tokens locally,
+    which can be registered by `register_model` to replace the remote
+    counting APIs of DashScope and Gemini, e.g.
+
+    .. code-block:: python
+
+        from agentscope.tokens import register_model, local_tokens_counter
+
+        # Download the tokenizer.json from the Qwen model repository
+        register_model(
+            ["qwen-max", "qwen-plus"],
+            local_tokens_counter("/path/to/qwen/tokenizer.json"),
+        )
+
+        # Or estimate the number of tokens without tokenizer
+        register_model("gemini-1.5-pro", local_tokens_counter())
+
+    Args:
+        tokenizer_path (`Optional[str]`, defaults to `None`):
+            The path to the local tokenizer, i.e. a `tokenizer.json` file,
+            a SentencePiece `.model` file, or a directory containing the
+            tokenizer files. If `None`, the number of tokens is estimated by
+            `count_approximate_tokens`.
+        tokens_per_message (`int`, defaults to `0`):
+            The number of extra tokens per message, e.g. `5` for the role and
+            the special tokens of the ChatML template used by Qwen models.
+        chars_per_token (`float`, defaults to `8`):
+            The number of characters per token for the words in the
+            approximation mode.
+
+    Returns:
+        `Callable[[str, list[dict]], int]`:
+            The tokens counting function, which takes the model name and a
+            list of messages, and returns the number of tokens.
+    """
+    if tokenizer_path is None:
+        namespace = f"approximate:{chars_per_token}"
+
+        def encode(text: str) -> int:
+            return count_approximate_tokens(text, chars_per_token)
+
+    else:
+        tokenizer_path = os.path.abspath(os.path.expanduser(tokenizer_path))
+        namespace = f"local:{tokenizer_path}"
+        # Load the tokenizer eagerly, so that errors are raised on creation
+        encode = _get_tokenizer(
+            ("local", tokenizer_path),
+            lambda: _load_local_encoder(tokenizer_path),
+        )
+
+    def _count(message: dict) -> int:
+        return tokens_per_message + sum(
+            encode(text) for text in _extract_texts(message)
+        )
+
+    def tokens_counter(_: str, messages: list[dict]) -> int:
+        return sum(
+            _count_message_tokens(namespace, message, _count)
+            for message in messages
+        )
+
+    return tokens_counter
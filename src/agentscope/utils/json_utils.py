@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""JSON utils for parsing the JSON objects generated by LLMs, which may
+contain minor syntax errors, e.g. trailing commas, unescaped newlines in
+strings, or a truncated object."""
+import json
+from typing import Any, Generator, List
+
+from loguru import logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+_VALID_ESCAPES = set('"\\/bfnrtu')
+
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def _fast_loads(text: str) -> Any:
+    """Parse the JSON text by `orjson` if it's installed, otherwise by the
+    standard library."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _close_containers(text: str, stack: List[list]) -> str:
+    """Strip the trailing comma of the text and close the open containers in
+    the stack."""
+    text = text.rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    return text + "".join(_CLOSERS[_[0]] for _ in reversed(stack))
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    """Remove the trailing comma (followed by whitespaces) in the output."""
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ",":
+        del out[index]
+
+
+def _repair_candidates(  # pylint: disable=too-many-branches
+    text: str,
+    allow_truncated: bool = True,
+) -> Generator[str, None, None]:
+    """Repair the JSON object or array in the text in a single pass, and
+    generate the candidates to be parsed in order.
+
+    The repairs include:
+    - escaping the control characters (e.g. newlines) and the invalid escape
+      sequences (e.g. "\\d") within the strings,
+    - removing the trailing commas before the closing brackets,
+    - ignoring the text after the top-level container is closed, and
+    - closing the truncated strings and containers. If the truncated text
+      cannot be closed directly, it's cut at the end of the last complete
+      member of each open container from the innermost one.
+
+    Args:
+        text (`str`):
+            The text to be repaired.
+        allow_truncated (`bool`, defaults to `True`):
+            Whether to close the truncated text. If `False`, no candidate is
+            generated for the truncated text.
+
+    Returns:
+        `Generator[str, None, None]`:
+            The candidates of the repaired JSON text.
+    """
+    text = text.strip()
+    if not text or text[0] not in _CLOSERS:
+        return
+
+    out: List[str] = []
+    # The open containers, each of which is [opener, cut, start], where
+    # `out[:cut]` ends with the last complete member of the container, and
+    # `start` is the position after the opener
+    stack: List[list] = []
+    in_string = False
+    escape = False
+    for char in text:
+        if in_string:
+            if escape:
+                escape = False
+                if char not in _VALID_ESCAPES:
+                    # Escape the backslash itself, e.g. "\d" -> "\\d"
+                    out[-1] = "\\\\"
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            elif char in _CONTROL_ESCAPES:
+                char = _CONTROL_ESCAPES[char]
+            elif ord(char) < 0x20:
+                char = f"\\u{ord(char):04x}"
+            out.append(char)
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append([char, len(out) + 1, len(out) + 1])
+        elif char in "}]":
+            if len(stack) == 0 or _CLOSERS[stack[-1][0]] != char:
+                # Mismatched brackets cannot be repaired
+                return
+            _strip_trailing_comma(out)
+            stack.pop()
+            if len(stack) == 0:
+                out.append(char)
+                break
+        elif char == "," and len(stack) > 0:
+            stack[-1][1] = len(out)
+        out.append(char)
+
+    repaired = "".join(out)
+    if len(stack) == 0:
+        yield repaired
+        return
+
+    if not allow_truncated:
+        return
+
+    # The text is truncated
+    if in_string:
+        if escape:
+            repaired = repaired[:-1]
+        yield _close_containers(repaired + '"', stack)
+    else:
+        yield _close_containers(repaired, stack)
+
+    for level in range(len(stack) - 1, -1, -1):
+        _, cut, start = stack[level]
+        if level == 0 and cut == start:
+            # Don't reduce the whole text into an empty container
+            break
+        yield _close_containers(repaired[:cut], stack[: level + 1])
+
+
+def loads_tolerant(text: str, allow_truncated: bool = True) -> Any:
+    """Parse the JSON text generated by LLMs, which tolerates the minor
+    syntax errors, e.g. trailing commas, unescaped newlines in strings, and
+    truncated objects. The valid JSON text is parsed directly, by `orjson` if
+    it's installed (`pip install orjson`), and the malformed one is repaired
+    in a single pass before parsing.
+
+    Args:
+        text (`str`):
+            The JSON text to be parsed.
+        allow_truncated (`bool`, defaults to `True`):
+            Whether to parse the truncated text by closing the open strings
+            and containers. It should be disabled where acting on a partial
+            object is harmful, e.g. the arguments of tool calls.
+
+    Returns:
+        `Any`: The parsed JSON object.
+
+    Raises:
+        `json.decoder.JSONDecodeError`: If the text cannot be repaired.
+    """
+    try:
+        return _fast_loads(text)
+    except ValueError:
+        pass
+
+    for candidate in _repair_candidates(text, allow_truncated):
+        try:
+            parsed = json.loads(candidate)
+        except ValueError:
+            continue
+        if candidate != text.strip():
+            logger.debug(f"Repair the malformed JSON text: {text}")
+        return parsed
+
+    # Raise the error of the standard library
+    return json.loads(text)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Schema utils for the pydantic-based structured output. Generating the
+JSON schema and the validator of a pydantic model is costly, so they're
+cached by the model class and shared across the parsers and agents."""
+import copy
+from functools import lru_cache
+from typing import Any, Type
+
+from pydantic import BaseModel, TypeAdapter
+
+from ..constants import _DEFAULT_SCHEMA_CACHE_MAX_SIZE
+
+
+@lru_cache(maxsize=_DEFAULT_SCHEMA_CACHE_MAX_SIZE)
+def _get_json_schema(pydantic_class: Type[BaseModel]) -> dict:
+    """Generate the JSON schema of the pydantic model class once."""
+    return pydantic_class.model_json_schema()
+
+
+@lru_cache(maxsize=_DEFAULT_SCHEMA_CACHE_MAX_SIZE)
+def get_type_adapter(pydantic_class: Type[BaseModel]) -> TypeAdapter:
+    """Get the cached `TypeAdapter` of the pydantic model class, whose
+    validator and serializer are compiled only once.
+
+    Args:
+        pydantic_class (`Type[BaseModel]`):
+            The pydantic model class.
+
+    Returns:
+        `TypeAdapter`: The type adapter of the pydantic model class.
+    """
+    return TypeAdapter(pydantic_class)
+
+
+def get_json_schema(pydantic_class: Type[BaseModel]) -> dict:
+    """Get the JSON schema of the pydantic model class, which is generated
+    only once for each class.
+
+    Args:
+        pydantic_class (`Type[BaseModel]`):
+            The pydantic model class.
+
+    Returns:
+        `dict`:
+            A copy of the cached JSON schema, which can be modified by the
+            caller safely.
+    """
+    return copy.deepcopy(_get_json_schema(pydantic_class))
+
+
+@lru_cache(maxsize=_DEFAULT_SCHEMA_CACHE_MAX_SIZE)
+def format_schema_instruction(
+    template: str,
+    content_hint: str,
+    pydantic_class: Type[BaseModel],
+) -> str:
+    """Render the format instruction with the JSON schema of the pydantic
+    model class, which is cached by the template, the content hint and the
+    class.
+
+    Args:
+        template (`str`):
+            The instruction template with `content_hint` and `schema`
+            placeholders.
+        content_hint (`str`):
+            The hint of the content.
+        pydantic_class (`Type[BaseModel]`):
+            The pydantic model class.
+
+    Returns:
+        `str`: The rendered format instruction.
+    """
+    return template.format(
+        content_hint=content_hint,
+        schema=_get_json_schema(pydantic_class),
+    )
+
+
+def validate_and_dump(pydantic_class: Type[BaseModel], data: Any) -> Any:
+    """Validate the data by the cached validator of the pydantic model class,
+    and dump the validated model into python objects.
+
+    Args:
+        pydantic_class (`Type[BaseModel]`):
+            The pydantic model class.
+        data (`Any`):
+            The data to be validated.
+
+    Returns:
+        `Any`: The dumped python objects of the validated model.
+
+    Raises:
+        `pydantic.ValidationError`: If the data is invalid.
+    """
+    adapter = get_type_adapter(pydantic_class)
+    return adapter.dump_python(adapter.validate_python(data))
+
+
+def clear_schema_cache() -> None:
+    """Clear the cached schemas, validators and instructions, e.g. after the
+    pydantic model classes are rebuilt."""
+    _get_json_schema.cache_clear()
+    get_type_adapter.cache_clear()
+    format_schema_instruction.cache_clear()
@@ -265,6 +265,9 @@ def run_app() -> None:
             _GradioUserInput(uid=uid),
         )
 
+        # The increments of the streaming messages, keyed by the message id
+        stream_buffers: dict[str, list[str]] = {}
+
         # Use a hook to forward messages to gradio web interface
         def gradio_pre_speak_hook(
             self: AgentBase,
@@ -276,7 +279,16 @@ def run_app() -> None:
 
             TODO: support streaming output
             """
-            if stream and not last:
+            if stream and isinstance(msg.content, str):
+                # Gather the increments until the last chunk
+                texts = stream_buffers.setdefault(msg.id, [])
+                texts.append(msg.content)
+                if not last:
+                    return None
+                msg = msg.model_copy(
+                    update={"content": "".join(stream_buffers.pop(msg.id))},
+                )
+            elif stream and not last:
                 return None
 
             # User Agent doesn't need the pre_speak_hook, because gradio will
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Unit test for the formatter registry and dispatching."""
+import unittest
+from typing import Union
+from unittest.mock import patch
+
+from agentscope.formatters import (
+    FormatterBase,
+    CommonFormatter,
+    OpenAIFormatter,
+    DashScopeFormatter,
+    AnthropicFormatter,
+    GeminiFormatter,
+    register_formatter,
+    get_formatter,
+)
+from agentscope.formatters._formatter_base import (
+    _registered_formatters,
+    _dispatch_table,
+)
+from agentscope.message import Msg
+from agentscope.models import OpenAIChatWrapper, PostAPIChatWrapper
+
+
+class FormatterRegistryTest(unittest.TestCase):
+    """Unit test for the formatter registry and dispatching."""
+
+    def setUp(self) -> None:
+        """Define a custom formatter."""
+
+        class MyFormatter(FormatterBase):  # pylint: disable=W0223
+            """A custom formatter."""
+
+            supported_model_regexes = ["my-model-.*", "gpt-4o-my"]
+
+            @classmethod
+            def format_chat(cls, *msgs: Union[Msg, list[Msg]]) -> list[dict]:
+                return CommonFormatter.format_chat(*msgs)
+
+            @classmethod
+            def format_multi_agent(
+                cls,
+                *msgs: Union[Msg, list[Msg]],
+            ) -> list[dict]:
+                return CommonFormatter.format_multi_agent(*msgs)
+
+        self.formatter = MyFormatter
+        self.registered = list(_registered_formatters)
+
+    def test_builtin_formatters(self) -> None:
+        """Test dispatching the model names to the built-in formatters."""
+        for model_name, formatter in [
+            ("gpt-4o", OpenAIFormatter),
+            ("o1", OpenAIFormatter),
+            ("claude-3-5-sonnet", AnthropicFormatter),
+            ("gemini-1.5-pro", GeminiFormatter),
+            ("qwen-max", DashScopeFormatter),
+            ("llama3", None),
+        ]:
+            # The second time is memoised
+            self.assertIs(get_formatter(model_name), formatter)
+            self.assertIs(get_formatter(model_name), formatter)
+
+        self.assertTrue(OpenAIFormatter.is_supported_model("gpt-4o"))
+        self.assertFalse(OpenAIFormatter.is_supported_model("llama3"))
+
+    def test_register_formatter(self) -> None:
+        """Test the registered formatter taking precedence."""
+        self.assertIs(get_formatter("gpt-4o-my"), OpenAIFormatter)
+        self.assertIsNone(get_formatter("my-model-1"))
+
+        register_formatter(self.formatter)
+        self.assertIs(get_formatter("gpt-4o-my"), self.formatter)
+        self.assertIs(get_formatter("my-model-1"), self.formatter)
+        self.assertIs(get_formatter("gpt-4o"), OpenAIFormatter)
+
+        self.assertRaises(ValueError, register_formatter, self.formatter)
+        self.assertRaises(ValueError, register_formatter, CommonFormatter)
+        self.assertRaises(TypeError, register_formatter, Msg)
+
+    def test_model_wrapper_dispatch(self) -> None:
+        """Test the model wrappers formatting by the registered
+        formatters."""
+        msgs = [Msg("user", "Hi!", "user"), Msg("assistant", "Hi!", "user")]
+        register_formatter(self.formatter)
+
+        for model_name, formatter in [
+            ("my-model-1", self.formatter),
+            ("gpt-4o", OpenAIFormatter),
+            # The DashScope format doesn't apply to OpenAI API
+            ("qwen-max", CommonFormatter),
+        ]:
+            model = OpenAIChatWrapper(
+                config_name="openai",
+                model_name=model_name,
+                api_key="xxx",
+            )
+            with patch.object(
+                formatter,
+                "format_multi_agent",
+                return_value=[],
+            ) as mock_format:
+                self.assertListEqual(model.format(msgs), [])
+                mock_format.assert_called_once()
+
+        model = PostAPIChatWrapper(
+            config_name="post",
+            api_url="http://localhost",
+            json_args={"model": "my-model-1"},
+        )
+        with patch.object(
+            self.formatter,
+            "format_multi_agent",
+            return_value=[],
+        ) as mock_format:
+            self.assertListEqual(model.format(msgs), [])
+            mock_format.assert_called_once()
+
+    def test_modified_regexes(self) -> None:
+        """Test the modified regexes are compiled again."""
+        self.assertFalse(self.formatter.is_supported_model("your-model"))
+        self.formatter.supported_model_regexes = ["your-model"]
+        self.assertTrue(self.formatter.is_supported_model("your-model"))
+        self.assertFalse(self.formatter.is_supported_model("my-model-1"))
+
+    def tearDown(self) -> None:
+        """Restore the registry."""
+        _registered_formatters[:] = self.registered
+        _dispatch_table.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,24 @@
 # -*- coding: utf-8 -*-
 """Unit test for prompt engineering strategies in format function."""
+import json
 import unittest
 from unittest import mock
 from unittest.mock import MagicMock, patch
 
 import agentscope
 from agentscope.formatters import (
+    FormatterBase,
     CommonFormatter,
     OpenAIFormatter,
     DashScopeFormatter,
     AnthropicFormatter,
+    GeminiFormatter,
 )
 from agentscope.message import (
     Msg,
     TextBlock,
     AudioBlock,
+    ImageBlock,
     ToolUseBlock,
     ToolResultBlock,
 )
@@ -858,5 +862,153 @@ class FormatTest(unittest.TestCase):
         self.assertListEqual(prompt, ground_truth)
 
 
+class FormatterCacheTest(unittest.TestCase):
+    """Unit test for the cache of formatted messages."""
+
+    def setUp(self) -> None:
+        """Init the conversation history."""
+        FormatterBase.clear_cache()
+        self.history = [
+            Msg("system", "You are a helpful assistant", role="system"),
+            Msg("user", "What is the weather today?", role="user"),
+            Msg(
+                "assistant",
+                [
+                    TextBlock(type="text", text="Let's try bing search"),
+                    ToolUseBlock(
+                        type="tool_use",
+                        id="xxx",
+                        name="bing_search",
+                        input={"query": "Beijing weather"},
+                    ),
+                ],
+                "assistant",
+            ),
+            Msg(
+                "system",
+                [
+                    ToolResultBlock(
+                        type="tool_result",
+                        id="xxx",
+                        name="bing_search",
+                        output="It is sunny today",
+                    ),
+                ],
+                "system",
+            ),
+            Msg("Bob", "Nice weather!", role="assistant"),
+        ]
+        self.format_funcs = [
+            formatter.format_chat
+            for formatter in [
+                OpenAIFormatter,
+                DashScopeFormatter,
+                AnthropicFormatter,
+                GeminiFormatter,
+                CommonFormatter,
+            ]
+        ] + [
+            formatter.format_multi_agent
+            for formatter in [
+                OpenAIFormatter,
+                DashScopeFormatter,
+                AnthropicFormatter,
+                GeminiFormatter,
+                CommonFormatter,
+            ]
+        ]
+
+    def test_consistency(self) -> None:
+        """Test the cached results are the same as the uncached ones for
+        a growing conversation history."""
+        for format_func in self.format_funcs:
+            for n in range(1, len(self.history) + 1):
+                cached = format_func(self.history[:n])
+                FormatterBase.clear_cache()
+                self.assertListEqual(
+                    cached,
+                    format_func(self.history[:n]),
+                    f"{format_func.__qualname__} with {n} messages",
+                )
+                # Formatted again with the cache
+                self.assertListEqual(cached, format_func(self.history[:n]))
+
+    def test_incremental(self) -> None:
+        """Test only the new messages are formatted."""
+        format_msg = OpenAIFormatter._format_msg  # pylint: disable=W0212
+        with patch.object(
+            OpenAIFormatter,
+            "_format_msg",
+            side_effect=format_msg,
+        ) as mock_format_msg:
+            OpenAIFormatter.format_multi_agent(self.history[:3])
+            self.assertEqual(mock_format_msg.call_count, 3)
+
+            OpenAIFormatter.format_multi_agent(self.history)
+            self.assertEqual(mock_format_msg.call_count, 5)
+
+    def test_modification(self) -> None:
+        """Test the modified messages and the modified results don't hit the
+        stale cache."""
+        for format_func in self.format_funcs:
+            formatted = format_func(self.history)
+            expected = json.dumps(formatted, sort_keys=True)
+
+            # Modify the returned messages
+            for msg in formatted:
+                msg["role"] = "modified"
+                msg["content"] = "modified"
+            self.assertEqual(
+                json.dumps(format_func(self.history), sort_keys=True),
+                expected,
+            )
+
+        # Replace the content of the message
+        self.history[1].content = "What about tomorrow?"
+        for format_func in self.format_funcs:
+            self.assertIn(
+                "What about tomorrow?",
+                json.dumps(format_func(self.history)),
+            )
+
+        # Extend the content of the message in place
+        self.history[2].content.append(
+            TextBlock(type="text", text="And then google search"),
+        )
+        for format_func in self.format_funcs:
+            self.assertIn(
+                "And then google search",
+                json.dumps(format_func(self.history)),
+            )
+
+    def test_media_not_cached(self) -> None:
+        """Test the messages with media blocks are formatted every time."""
+        history = self.history + [
+            Msg(
+                "user",
+                [
+                    TextBlock(type="text", text="What's in the image?"),
+                    ImageBlock(type="image", url="https://xxx.png"),
+                ],
+                "user",
+            ),
+        ]
+        format_msg = OpenAIFormatter._format_msg  # pylint: disable=W0212
+        with patch.object(
+            OpenAIFormatter,
+            "_format_msg",
+            side_effect=format_msg,
+        ) as mock_format_msg:
+            OpenAIFormatter.format_multi_agent(history)
+            self.assertEqual(mock_format_msg.call_count, 6)
+
+            OpenAIFormatter.format_multi_agent(history)
+            self.assertEqual(mock_format_msg.call_count, 7)
+
+    def tearDown(self) -> None:
+        """Clean up the cache."""
+        FormatterBase.clear_cache()
+
+
 if __name__ == "__main__":
     unittest.main()
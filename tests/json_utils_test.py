@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the tolerant JSON parsing."""
+import json
+import unittest
+from unittest.mock import patch
+
+from agentscope.exception import JsonParsingError
+from agentscope.models import ModelResponse
+from agentscope.parsers import MarkdownJsonDictParser
+from agentscope.utils import json_utils
+from agentscope.utils.json_utils import loads_tolerant
+
+# The responses that `json.loads` can parse
+_VALID_CORPUS = [
+    '{"speak": "Hello, world!", "thought": "xxx", "end_discussion": true}',
+    '{"function": [{"name": "search", "input": {"query": "AgentScope"}}]}',
+    '[1, 2.5, -3e2, null, false, "\\u4f60\\u597d"]',
+    '{"nested": {"a": [{"b": [{"c": {}}]}]}, "empty": []}',
+]
+
+# The malformed responses and the expected parsed objects
+_MALFORMED_CORPUS = [
+    ('{"a": 1, "b": 2,}', {"a": 1, "b": 2}),
+    ('{"a": [1, 2, ], }', {"a": [1, 2]}),
+    ('{"speak": "line 1\nline 2"}', {"speak": "line 1\nline 2"}),
+    ('{"code": "if x:\n\tpass"}', {"code": "if x:\n\tpass"}),
+    ('{"regex": "\\d+\\.\\d+"}', {"regex": "\\d+\\.\\d+"}),
+    ('{"a": 1}\nHope it helps!', {"a": 1}),
+    (
+        '{"speak": "Hi", "thought": "I should',
+        {"speak": "Hi", "thought": "I should"},
+    ),
+    (
+        '{"speak": "Hi", "function": [{"name": "f"',
+        {"speak": "Hi", "function": [{"name": "f"}]},
+    ),
+    ('{"speak": "Hi", "thought"', {"speak": "Hi"}),
+    ('{"speak": "Hi", "score": tr', {"speak": "Hi"}),
+    ("[1, 2, 3", [1, 2, 3]),
+]
+
+# The texts that are not JSON
+_INVALID_CORPUS = [
+    "Hello, world!",
+    "[see below",
+    '{"a": 1]',
+    '{"a": tr',
+]
+
+
+class LoadsTolerantTest(unittest.TestCase):
+    """Test cases for `loads_tolerant`."""
+
+    def test_valid(self) -> None:
+        """Test parsing the valid JSON texts the same as `json.loads`."""
+        for text in _VALID_CORPUS:
+            self.assertEqual(loads_tolerant(text), json.loads(text))
+
+        # Without orjson
+        with patch.object(json_utils, "orjson", None):
+            for text in _VALID_CORPUS:
+                self.assertEqual(loads_tolerant(text), json.loads(text))
+
+        # The values unsupported by orjson fall back to the standard library
+        self.assertEqual(
+            loads_tolerant("[NaN, 18446744073709551616]")[1], 2**64
+        )
+
+    def test_malformed(self) -> None:
+        """Test repairing the malformed JSON texts."""
+        for text, expected in _MALFORMED_CORPUS:
+            self.assertEqual(loads_tolerant(text), expected, text)
+
+    def test_invalid(self) -> None:
+        """Test raising the error of the standard library."""
+        for text in _INVALID_CORPUS:
+            with self.assertRaises(json.decoder.JSONDecodeError):
+                loads_tolerant(text)
+
+    def test_disallow_truncated(self) -> None:
+        """Test only repairing the complete texts if the truncated ones are
+        disallowed, e.g. for the arguments of tool calls."""
+        self.assertDictEqual(
+            loads_tolerant('{"a": 1, "b": 2,}', allow_truncated=False),
+            {"a": 1, "b": 2},
+        )
+        for text in ['{"query": "Agent', '{"a": 1, "b": [1, 2']:
+            with self.assertRaises(json.decoder.JSONDecodeError):
+                loads_tolerant(text, allow_truncated=False)
+
+    def test_parser(self) -> None:
+        """Test the JSON parser with a malformed and truncated response."""
+        parser = MarkdownJsonDictParser(required_keys=["speak"])
+        response = parser.parse(
+            ModelResponse(
+                text='```json\n{"speak": "Hi\nthere", "thought": "xx'
+            ),
+        )
+        self.assertDictEqual(
+            response.parsed,
+            {"speak": "Hi\nthere", "thought": "xx"},
+        )
+
+        with self.assertRaises(JsonParsingError):
+            parser.parse(ModelResponse(text="```json\n{speak: Hi}\n```"))
+
+    def test_success_rate(self) -> None:
+        """Test the parse success rate over the corpus."""
+        corpus = (
+            _VALID_CORPUS + [_[0] for _ in _MALFORMED_CORPUS] + _INVALID_CORPUS
+        )
+
+        rates = {}
+        for name, loads in [
+            ("json.loads", json.loads),
+            ("tolerant", loads_tolerant),
+        ]:
+            n_success = 0
+            for text in corpus:
+                try:
+                    loads(text)
+                    n_success += 1
+                except ValueError:
+                    pass
+            rates[name] = n_success / len(corpus)
+
+        self.assertEqual(
+            rates["tolerant"],
+            (len(_VALID_CORPUS) + len(_MALFORMED_CORPUS)) / len(corpus),
+        )
+        self.assertEqual(rates["json.loads"], len(_VALID_CORPUS) / len(corpus))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@
 Unit tests for knowledge (RAG module in AgentScope)
 """
 
+import asyncio
 import os
 import unittest
 from typing import Any, Optional
@@ -11,6 +12,7 @@ import shutil
 import agentscope
 from agentscope.manager import ASManager
 from agentscope.models import OpenAIEmbeddingWrapper, ModelResponse
+from agentscope.models.post_model import PostAPIEmbeddingWrapper
 from agentscope.rag import Knowledge
 
 
@@ -22,9 +24,10 @@ class DummyModel(OpenAIEmbeddingWrapper):
     def __init__(self) -> None:
         """dummy init"""
 
-    def __call__(self, *args: Any, **kwargs: Any) -> ModelResponse:
+    def __call__(self, texts: Any, **kwargs: Any) -> ModelResponse:
         """dummy call"""
-        return ModelResponse(embedding=[[1.0, 2.0]])
+        n_texts = 1 if isinstance(texts, str) else len(texts)
+        return ModelResponse(embedding=[[1.0, 2.0]] * n_texts)
 
 
 class DummyKnowledge(Knowledge):
@@ -66,7 +69,8 @@ class KnowledgeTest(unittest.TestCase):
 
     def setUp(self) -> None:
         """Set up test data"""
-        agentscope.init(disable_saving=True)
+        self.cache_dir = "tmp_cache_dir"
+        agentscope.init(disable_saving=True, cache_dir=self.cache_dir)
 
         self.data_dir = "tmp_data_dir"
         if not os.path.exists(self.data_dir):
@@ -82,6 +86,8 @@ class KnowledgeTest(unittest.TestCase):
         try:
             if os.path.exists(self.data_dir):
                 shutil.rmtree(self.data_dir)
+            if os.path.exists(self.cache_dir):
+                shutil.rmtree(self.cache_dir)
             if os.path.exists("./runs"):
                 shutil.rmtree("./runs")
             if os.path.exists("./test_knowledge"):
@@ -129,6 +135,404 @@ class KnowledgeTest(unittest.TestCase):
             [self.content],
         )
 
+        # The retriever is reused until the index is refreshed
+        retriever = knowledge._get_retriever(2)
+        self.assertIs(knowledge._get_retriever(2), retriever)
+        self.assertIsNot(knowledge._get_retriever(3), retriever)
+        knowledge.refresh_index()
+        self.assertIsNot(knowledge._get_retriever(2), retriever)
+
+        self.assertListEqual(
+            knowledge.retrieve_many(
+                ["testing", "file"],
+                similarity_top_k=2,
+                to_list_strs=True,
+            ),
+            [[self.content], [self.content]],
+        )
+
+        # the subclasses get the indexed nodes with embeddings
+        class EmbeddingsKnowledge(LlamaIndexKnowledge):
+            """Knowledge recording the indexed nodes"""
+
+            def _data_to_index(self, vector_store: Any = None) -> list:
+                self.indexed_nodes = super()._data_to_index(vector_store)
+                return self.indexed_nodes
+
+        knowledge = EmbeddingsKnowledge(
+            knowledge_id="test_embeddings_knowledge",
+            emb_model=dummy_model,
+            knowledge_config=knowledge_config,
+        )
+        self.assertListEqual(
+            [_.embedding for _ in knowledge.indexed_nodes],
+            [[1.0, 2.0]],
+        )
+        self.assertTrue(
+            all(
+                _.embedding is None
+                for _ in knowledge.index.docstore.docs.values()
+            ),
+        )
+
+    def test_hybrid_retrieval(self) -> None:
+        """Test fusing the dense and BM25 retrieval with incremental BM25
+        index"""
+        from agentscope.rag.llama_index_knowledge import (
+            LlamaIndexKnowledge,
+            _BM25_PERSIST_FNAME,
+        )
+
+        with open("tmp_data_dir/file2.txt", "w", encoding="utf-8") as f:
+            f.write("apple pie recipe")
+
+        knowledge_config = {
+            "knowledge_id": "",
+            "data_processing": [
+                {
+                    "load_data": {
+                        "loader": {
+                            "create_object": True,
+                            "module": "llama_index.core",
+                            "class": "SimpleDirectoryReader",
+                            "init_args": {
+                                "input_dir": self.data_dir,
+                                "required_exts": ".txt",
+                            },
+                        },
+                    },
+                },
+            ],
+        }
+        knowledge = LlamaIndexKnowledge(
+            knowledge_id="test_knowledge",
+            emb_model=DummyModel(),
+            knowledge_config=knowledge_config,
+            hybrid_retrieval=True,
+        )
+
+        # The dense scores are tied, so the BM25 ranking decides the order
+        self.assertListEqual(
+            knowledge.retrieve("apple", 2, to_list_strs=True),
+            ["apple pie recipe", self.content],
+        )
+
+        # The top k is passed per query without modifying the retriever
+        # shared by the concurrent queries
+        top_k = knowledge.bm25_retriever.similarity_top_k
+        knowledge.retrieve("apple", 1)
+        self.assertEqual(knowledge.bm25_retriever.similarity_top_k, top_k)
+
+        # The duplicated chunks after refreshing are merged
+        knowledge.refresh_index()
+        retrieved = knowledge.retrieve("apple", 3, to_list_strs=True)
+        self.assertEqual(len(retrieved), len(set(retrieved)))
+        self.assertIn("apple pie recipe", retrieved)
+
+        # The new chunks are added into the persisted BM25 index
+        with open("tmp_data_dir/file3.txt", "w", encoding="utf-8") as f:
+            f.write("banana bread")
+        knowledge.refresh_index()
+        self.assertIn(
+            "banana bread",
+            knowledge.retrieve("banana", 2, to_list_strs=True),
+        )
+        self.assertSetEqual(
+            knowledge.bm25_retriever.node_ids,
+            set(knowledge.index.docstore.docs.keys()),
+        )
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(knowledge.persist_dir, _BM25_PERSIST_FNAME),
+            ),
+        )
+
+    def test_incremental_refresh(self) -> None:
+        """Test refreshing the index by the changed files and chunks"""
+        from agentscope.rag.llama_index_knowledge import LlamaIndexKnowledge
+
+        class CountingModel(DummyModel):
+            """Dummy model recording the embedded texts"""
+
+            def __init__(self) -> None:
+                """dummy init"""
+                self.texts = []
+
+            def __call__(self, texts: Any, **kwargs: Any) -> ModelResponse:
+                """dummy call"""
+                texts = [texts] if isinstance(texts, str) else texts
+                self.texts.extend(texts)
+                return super().__call__(texts, **kwargs)
+
+        sentences = [
+            f"The sentence number {i} is written here to fill a chunk of "
+            f"the document for testing the incremental refresh."
+            for i in range(3)
+        ]
+        file_name_2 = "tmp_data_dir/file2.txt"
+        with open(file_name_2, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(sentences))
+
+        model = CountingModel()
+        knowledge = LlamaIndexKnowledge(
+            knowledge_id="test_knowledge",
+            emb_model=model,
+            knowledge_config={
+                "knowledge_id": "",
+                "chunk_size": 64,
+                "chunk_overlap": 0,
+                "data_processing": [
+                    {
+                        "load_data": {
+                            "loader": {
+                                "create_object": True,
+                                "module": "llama_index.core",
+                                "class": "SimpleDirectoryReader",
+                                "init_args": {
+                                    "input_dir": self.data_dir,
+                                    "required_exts": ".txt",
+                                },
+                            },
+                        },
+                    },
+                ],
+            },
+        )
+        n_chunks = len(knowledge.index.docstore.docs)
+        self.assertGreater(n_chunks, 2)
+
+        # Nothing is embedded if unchanged
+        model.texts.clear()
+        knowledge.refresh_index()
+        self.assertListEqual(model.texts, [])
+        self.assertEqual(len(knowledge.index.docstore.docs), n_chunks)
+
+        # Only the edited chunk is embedded
+        sentences[1] = sentences[1].replace("written", "rewritten")
+        with open(file_name_2, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(sentences))
+        knowledge.refresh_index()
+        self.assertEqual(len(model.texts), 1)
+        self.assertIn("rewritten", model.texts[0])
+        self.assertEqual(len(knowledge.index.docstore.docs), n_chunks)
+        self.assertTrue(
+            any(
+                sentences[1] in _
+                for _ in knowledge.retrieve(
+                    "rewritten",
+                    n_chunks,
+                    to_list_strs=True,
+                )
+            ),
+        )
+
+        # The nodes of the removed file are deleted
+        model.texts.clear()
+        os.remove(file_name_2)
+        knowledge.refresh_index()
+        self.assertListEqual(model.texts, [])
+        self.assertListEqual(
+            list(knowledge.index.ref_doc_info.keys()),
+            [os.path.abspath(self.file_name_1)],
+        )
+        self.assertEqual(len(knowledge.index.docstore.docs), 1)
+
+    def test_resume_ingestion(self) -> None:
+        """Test ingesting the files in batches, and resuming the
+        interrupted indexing"""
+        from agentscope.rag.llama_index_knowledge import LlamaIndexKnowledge
+
+        class FlakyModel(DummyModel):
+            """Dummy model failing after the first request"""
+
+            def __init__(self, n_success: int) -> None:
+                """dummy init"""
+                self.n_success = n_success
+                self.texts = []
+
+            def __call__(self, texts: Any, **kwargs: Any) -> ModelResponse:
+                """dummy call"""
+                if self.n_success == 0:
+                    raise RuntimeError("interrupted")
+                self.n_success -= 1
+                texts = [texts] if isinstance(texts, str) else texts
+                self.texts.extend(texts)
+                return super().__call__(texts, **kwargs)
+
+        contents = [self.content] + [f"content {i}" for i in range(4)]
+        for i, content in enumerate(contents[1:]):
+            with open(
+                os.path.join(self.data_dir, f"file_{i}.txt"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write(content)
+
+        knowledge_config = {
+            "knowledge_id": "",
+            "ingestion_batch_size": 2,
+            "data_processing": [
+                {
+                    "load_data": {
+                        "loader": {
+                            "create_object": True,
+                            "module": "llama_index.core",
+                            "class": "SimpleDirectoryReader",
+                            "init_args": {
+                                "input_dir": self.data_dir,
+                                "required_exts": ".txt",
+                            },
+                        },
+                    },
+                },
+            ],
+        }
+
+        # Interrupted in the second batch
+        with self.assertRaises(RuntimeError):
+            LlamaIndexKnowledge(
+                knowledge_id="test_knowledge",
+                emb_model=FlakyModel(1),
+                knowledge_config=knowledge_config,
+            )
+
+        # Only the remaining files are ingested
+        model = FlakyModel(-1)
+        knowledge = LlamaIndexKnowledge(
+            knowledge_id="test_knowledge",
+            emb_model=model,
+            knowledge_config=knowledge_config,
+        )
+        self.assertEqual(len(model.texts), 3)
+        self.assertListEqual(
+            sorted(knowledge.retrieve("content", 5, to_list_strs=True)),
+            sorted(contents),
+        )
+
+    def test_query_cache(self) -> None:
+        """Test caching the retrieved chunks by the exact and the similar
+        queries"""
+        from agentscope.rag.llama_index_knowledge import LlamaIndexKnowledge
+
+        class LetterCountModel(DummyModel):
+            """Dummy model embedding the texts by the letter counts"""
+
+            def __call__(self, texts: Any, **kwargs: Any) -> ModelResponse:
+                """dummy call"""
+                texts = [texts] if isinstance(texts, str) else texts
+                return ModelResponse(
+                    embedding=[
+                        [float(text.count(_)) for _ in "efgnist"]
+                        for text in texts
+                    ],
+                )
+
+        knowledge_config = {
+            "knowledge_id": "",
+            "query_cache_size": 2,
+            "query_cache_similarity": 0.99,
+            "data_processing": [
+                {
+                    "load_data": {
+                        "loader": {
+                            "create_object": True,
+                            "module": "llama_index.core",
+                            "class": "SimpleDirectoryReader",
+                            "init_args": {
+                                "input_dir": self.data_dir,
+                                "required_exts": ".txt",
+                            },
+                        },
+                    },
+                },
+            ],
+        }
+        knowledge = LlamaIndexKnowledge(
+            knowledge_id="test_knowledge",
+            emb_model=LetterCountModel(),
+            knowledge_config=knowledge_config,
+        )
+
+        for query in ["testing", "testing", "testing!", "fine"]:
+            self.assertListEqual(
+                knowledge.retrieve(query, 1, to_list_strs=True),
+                [self.content],
+            )
+        stats = knowledge.query_cache_stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["semantic_hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["size"], 2)
+
+        # the queries with another top k are not matched
+        knowledge.retrieve("testing", 2)
+        self.assertEqual(knowledge.query_cache_stats()["misses"], 3)
+
+        knowledge.refresh_index()
+        self.assertEqual(knowledge.query_cache_stats()["size"], 0)
+
+    def test_batched_embedding(self) -> None:
+        """Test embedding the texts in concurrent batches with cache"""
+        from agentscope.rag.llama_index_knowledge import _EmbeddingModel
+
+        class BatchModel(DummyModel):
+            """Dummy model accepting a list of texts"""
+
+            model_name = "dummy_batch_embedding"
+
+            def __init__(self) -> None:
+                """dummy init"""
+                self.calls = []
+
+            def __call__(self, texts: Any, **kwargs: Any) -> ModelResponse:
+                """dummy call"""
+                self.calls.append(texts)
+                return ModelResponse(
+                    embedding=[[float(len(_)), 1.0] for _ in texts],
+                )
+
+        model = BatchModel()
+        emb_model = _EmbeddingModel(
+            model,
+            embed_batch_size=2,
+            max_concurrency=2,
+        )
+        texts = ["a", "bb", "ccc", "a", "dddd", "eeeee"]
+        self.assertListEqual(
+            emb_model.get_text_embedding_batch(texts),
+            [[float(len(_)), 1.0] for _ in texts],
+        )
+        # The duplicated text is embedded once, in batches of 2
+        self.assertListEqual(
+            sorted(_ for batch in model.calls for _ in batch),
+            ["a", "bb", "ccc", "dddd", "eeeee"],
+        )
+        self.assertTrue(all(len(_) <= 2 for _ in model.calls))
+
+        # The cached embeddings are not requested again
+        model.calls.clear()
+        self.assertListEqual(
+            asyncio.run(emb_model.aget_text_embedding_batch(texts[:3])),
+            [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]],
+        )
+        self.assertListEqual(model.calls, [])
+
+        # The batch support is detected from the model wrapper
+        for batch_inputs, request_batch_size in [(True, 2), (False, 1)]:
+            emb_model = _EmbeddingModel(
+                PostAPIEmbeddingWrapper(
+                    "post",
+                    api_url="http://localhost",
+                    model_name="embedding",
+                    batch_inputs=batch_inputs,
+                ),
+                embed_batch_size=2,
+            )
+            self.assertEqual(
+                emb_model._request_batch_size,  # pylint: disable=W0212
+                request_batch_size,
+            )
+
     def test_knowledge_bank(self) -> None:
         """Test knowledge bank"""
         dummy_knowledge_id = "test_dummy_knowledge"
@@ -157,6 +561,68 @@ class KnowledgeTest(unittest.TestCase):
             False,
         )
 
+    def test_lazy_knowledge_bank(self) -> None:
+        """Test loading the knowledge lazily and unloading the least
+        recently used ones"""
+        from agentscope.rag.knowledge_bank import KnowledgeBank
+
+        built_ids = []
+
+        class CountingKnowledge(DummyKnowledge):
+            """Dummy knowledge class recording the builds"""
+
+            knowledge_type = "counting_knowledge_class"
+
+            @classmethod
+            def build_knowledge_instance(
+                cls,
+                knowledge_id: str,
+                knowledge_config: Optional[dict] = None,
+                **kwargs: Any,
+            ) -> Knowledge:
+                built_ids.append(knowledge_id)
+                return cls(knowledge_id=knowledge_id)
+
+        knowledge_bank = KnowledgeBank(
+            configs=[
+                {
+                    "knowledge_id": f"knowledge_{i}",
+                    "knowledge_type": "counting_knowledge_class",
+                }
+                for i in range(3)
+            ],
+            new_knowledge_types=[CountingKnowledge],
+            lazy=True,
+            max_loaded_knowledge=2,
+        )
+        self.assertListEqual(built_ids, [])
+
+        knowledge = knowledge_bank.get_knowledge("knowledge_0")
+        self.assertIs(knowledge_bank.get_knowledge("knowledge_0"), knowledge)
+        self.assertListEqual(built_ids, ["knowledge_0"])
+
+        # the least recently used knowledge_1 is unloaded
+        knowledge_bank.get_knowledge("knowledge_1")
+        knowledge_bank.get_knowledge("knowledge_0")
+        knowledge_bank.get_knowledge("knowledge_2")
+        self.assertListEqual(
+            list(knowledge_bank.stored_knowledge),
+            ["knowledge_0", "knowledge_2"],
+        )
+
+        # warm up in the background, and build the unloaded one again
+        for future in knowledge_bank.warm_up(["knowledge_1"]):
+            future.result()
+        self.assertListEqual(
+            built_ids,
+            ["knowledge_0", "knowledge_1", "knowledge_2", "knowledge_1"],
+        )
+        self.assertRaises(
+            ValueError,
+            knowledge_bank.get_knowledge,
+            "knowledge_3",
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the local ANN vector store and knowledge
+"""
+import os
+import shutil
+import unittest
+from typing import Any
+
+import numpy as np
+from llama_index.core.schema import (
+    NodeRelationship,
+    RelatedNodeInfo,
+    TextNode,
+)
+from llama_index.core.vector_stores.types import VectorStoreQuery
+
+import agentscope
+from agentscope.manager import ASManager
+from agentscope.models import OpenAIEmbeddingWrapper, ModelResponse
+from agentscope.rag import KnowledgeBank
+from agentscope.rag.local_ann_knowledge import (
+    LocalANNKnowledge,
+    LocalANNVectorStore,
+)
+
+
+class DummyModel(OpenAIEmbeddingWrapper):
+    """
+    Dummy model wrapper embedding the texts by the letter counts
+    """
+
+    def __init__(self) -> None:
+        """dummy init"""
+
+    def __call__(self, texts: Any, **kwargs: Any) -> ModelResponse:
+        """dummy call"""
+        if isinstance(texts, str):
+            texts = [texts]
+        return ModelResponse(
+            embedding=[
+                [float(text.count(_)) for _ in "abcdefghijklmnopqrstuvwxyz"]
+                for text in texts
+            ],
+        )
+
+
+class LocalANNTest(unittest.TestCase):
+    """
+    Test cases for the local ANN vector store and knowledge
+    """
+
+    def setUp(self) -> None:
+        """Set up test data"""
+        self.cache_dir = "tmp_cache_dir"
+        agentscope.init(disable_saving=True, cache_dir=self.cache_dir)
+
+        self.data_dir = "tmp_ann_data_dir"
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.contents = ["apple banana", "zebra zoo", "quick quiz"]
+        for index, content in enumerate(self.contents):
+            with open(
+                os.path.join(self.data_dir, f"file{index}.txt"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write(content)
+
+    def tearDown(self) -> None:
+        """Clean up before & after tests."""
+        ASManager.get_instance().flush()
+        for path in [self.data_dir, self.cache_dir]:
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def test_vector_store(self) -> None:
+        """Test the recall, incremental updates and persistence of the
+        vector store"""
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(20, 16))
+        vectors = centers[rng.integers(0, 20, 1000)] + 0.3 * rng.normal(
+            size=(1000, 16),
+        )
+        store = LocalANNVectorStore(train_size=256, nprobe=4)
+        store.add(
+            [
+                TextNode(id_=str(i), text="", embedding=vector.tolist())
+                for i, vector in enumerate(vectors)
+            ],
+        )
+        self.assertEqual(store.size, 1000)
+        self.assertIsNotNone(store._centroids)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        recall = 0.0
+        for query in vectors[:50]:
+            res = store.query(
+                VectorStoreQuery(
+                    query_embedding=query.tolist(),
+                    similarity_top_k=5,
+                ),
+            )
+            exact = np.argsort(-normalized.dot(query))[:5]
+            recall += len(set(res.ids) & {str(_) for _ in exact}) / 5
+        self.assertGreaterEqual(recall / 50, 0.9)
+
+        # Persist, load and update incrementally
+        store.persist(os.path.join(self.cache_dir, "vector_store.json"))
+        loaded = LocalANNVectorStore.from_persist_dir(self.cache_dir)
+        self.assertEqual(loaded.size, 1000)
+        query = VectorStoreQuery(
+            query_embedding=vectors[0].tolist(),
+            similarity_top_k=1,
+        )
+        self.assertListEqual(loaded.query(query).ids, ["0"])
+
+        loaded.delete_nodes(["0"])
+        loaded.add([TextNode(id_="new", text="", embedding=[1.0] * 16)])
+        self.assertEqual(loaded.size, 1000)
+        self.assertNotIn("0", loaded.query(query).ids)
+        self.assertListEqual(
+            loaded.query(
+                VectorStoreQuery(
+                    query_embedding=[2.0] * 16,
+                    similarity_top_k=1,
+                ),
+            ).ids,
+            ["new"],
+        )
+
+        # Delete the nodes of a document, including the loaded ones
+        loaded.add(
+            [
+                TextNode(
+                    id_=f"doc_{i}",
+                    text="",
+                    embedding=[float(i + 1)] * 16,
+                    relationships={
+                        NodeRelationship.SOURCE: RelatedNodeInfo(
+                            node_id="doc",
+                        ),
+                    },
+                )
+                for i in range(3)
+            ],
+        )
+        self.assertEqual(loaded.size, 1003)
+        self.assertEqual(
+            len(
+                loaded.query(
+                    VectorStoreQuery(
+                        query_embedding=[1.0] * 16,
+                        similarity_top_k=10,
+                        doc_ids=["doc"],
+                    ),
+                ).ids,
+            ),
+            3,
+        )
+        loaded.delete("doc")
+        self.assertEqual(loaded.size, 1000)
+        self.assertDictEqual(loaded._doc_slots, {})
+
+    def test_local_ann_knowledge(self) -> None:
+        """Test the knowledge with the local ANN vector store"""
+        knowledge_config = {
+            "knowledge_id": "test_ann_knowledge",
+            "knowledge_type": "local_ann_knowledge",
+            "emb_model_config_name": "",
+            "data_processing": [
+                {
+                    "load_data": {
+                        "loader": {
+                            "create_object": True,
+                            "module": "llama_index.core",
+                            "class": "SimpleDirectoryReader",
+                            "init_args": {
+                                "input_dir": self.data_dir,
+                                "required_exts": ".txt",
+                            },
+                        },
+                    },
+                },
+            ],
+        }
+        knowledge_bank = KnowledgeBank()
+        self.assertIs(
+            knowledge_bank.known_knowledge_types["local_ann_knowledge"],
+            LocalANNKnowledge,
+        )
+
+        for _ in range(2):
+            # The second knowledge loads the persisted index
+            knowledge = LocalANNKnowledge(
+                knowledge_id="test_ann_knowledge",
+                emb_model=DummyModel(),
+                knowledge_config=knowledge_config,
+            )
+            self.assertIsInstance(
+                knowledge.index.vector_store,
+                LocalANNVectorStore,
+            )
+            self.assertListEqual(
+                knowledge.retrieve("zoo zebra", 1, to_list_strs=True),
+                ["zebra zoo"],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
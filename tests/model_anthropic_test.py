@@ -22,6 +22,7 @@ class AnthropicModelWrapperTest(unittest.TestCase):
                 "stream": False,
             },
             save_api_invoke=False,
+            disable_saving=True,
         )
         self.mock_response = {
             "id": "msg_018zRB2VgEx2hS5TGxMhLz6Y",
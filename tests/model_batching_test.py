@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the micro-batching of model wrappers."""
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Union
+
+import agentscope
+from agentscope.manager import ASManager, ModelManager
+from agentscope.models import ModelResponse, ModelWrapperBase
+from agentscope.models._batching import (
+    _BatchRequest,
+    _merge_embedding_requests,
+)
+from agentscope.models.post_model import PostAPIEmbeddingWrapper
+
+
+class EchoModelWrapper(ModelWrapperBase):  # pylint: disable=W0223
+    """A chat model wrapper that echoes the input."""
+
+    model_type: str = "echo_model"
+
+    def __init__(self, config_name: str, model_name: str, **kwargs: Any):
+        super().__init__(config_name=config_name, model_name=model_name)
+        self.threads = set()
+
+    def __call__(self, messages: str, **kwargs: Any) -> ModelResponse:
+        self.threads.add(threading.current_thread().name)
+        time.sleep(0.01)
+        return ModelResponse(text=messages)
+
+
+class BatchEmbeddingModelWrapper(ModelWrapperBase):  # pylint: disable=W0223
+    """An embedding model wrapper that accepts a list of inputs."""
+
+    model_type: str = "batch_embedding_model"
+
+    def __init__(self, config_name: str, model_name: str, **kwargs: Any):
+        super().__init__(config_name=config_name, model_name=model_name)
+        self.inputs = []
+
+    def __call__(
+        self,
+        texts: Union[str, List[str]],
+        **kwargs: Any,
+    ) -> ModelResponse:
+        if isinstance(texts, str):
+            texts = [texts]
+        if "error" in texts:
+            raise ValueError("Invalid input")
+        self.inputs.append(texts)
+        return ModelResponse(embedding=[[len(_)] for _ in texts])
+
+    def _call_batch(
+        self,
+        requests: List[_BatchRequest],
+    ) -> List[Union[ModelResponse, Exception]]:
+        return _merge_embedding_requests(requests, "texts")
+
+
+class MicroBatchingTest(unittest.TestCase):
+    """Test cases for the micro-batching."""
+
+    def setUp(self) -> None:
+        """Init the environment."""
+        agentscope.init(disable_saving=True)
+        for cls in [EchoModelWrapper, BatchEmbeddingModelWrapper]:
+            agentscope.register_model_wrapper_class(cls, exist_ok=True)
+
+        ModelManager.get_instance().load_model_configs(
+            [
+                {
+                    "config_name": "echo",
+                    "model_type": "echo_model",
+                    "model_name": "echo",
+                    "batching": {"max_batch_size": 4, "max_wait": 0.05},
+                },
+                {
+                    "config_name": "embedding",
+                    "model_type": "batch_embedding_model",
+                    "model_name": "embedding",
+                    "batching": {"max_batch_size": 8, "max_wait": 0.05},
+                },
+            ],
+        )
+
+    def test_pass_through(self) -> None:
+        """Test sending the calls directly if the model wrapper doesn't
+        implement `_call_batch`."""
+        model = ModelManager.get_instance().get_model_by_config_name("echo")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            texts = list(executor.map(lambda _: model(str(_)).text, range(8)))
+
+        self.assertListEqual(texts, [str(_) for _ in range(8)])
+        self.assertFalse(
+            any(_.startswith("micro-batcher") for _ in model.threads),
+        )
+        self.assertEqual(model.batcher.stats["requests"], 0)
+
+    def test_post_api_batch_inputs(self) -> None:
+        """Test merging the calls of the post api embedding model wrapper
+        only if the API accepts a list of inputs."""
+        model = PostAPIEmbeddingWrapper(
+            "post",
+            api_url="http://localhost",
+            model_name="embedding",
+        )
+        self.assertIsNone(model._call_batch)  # pylint: disable=W0212
+
+        model = PostAPIEmbeddingWrapper(
+            "post",
+            api_url="http://localhost",
+            model_name="embedding",
+            batch_inputs=True,
+        )
+        self.assertIsNotNone(model._call_batch)  # pylint: disable=W0212
+
+    def test_merged_embedding(self) -> None:
+        """Test merging the batched calls into one request."""
+        model = ModelManager.get_instance().get_model_by_config_name(
+            "embedding",
+        )
+        # The model wrappers of the same config share the micro-batcher
+        another = ModelManager.get_instance().get_model_by_config_name(
+            "embedding",
+            shared=False,
+        )
+        self.assertIs(another.batcher, model.batcher)
+
+        inputs = ["a", ["bb", "ccc"], "dddd", ["eeeee"]]
+        barrier = threading.Barrier(len(inputs))
+
+        def call(texts: Union[str, List[str]]) -> list:
+            barrier.wait()
+            return model(texts=texts).embedding
+
+        with ThreadPoolExecutor(max_workers=len(inputs)) as executor:
+            embeddings = list(executor.map(call, inputs))
+
+        self.assertListEqual(
+            embeddings,
+            [[[1]], [[2], [3]], [[4]], [[5]]],
+        )
+        self.assertLess(len(model.inputs), len(inputs))
+        self.assertEqual(sum(len(_) for _ in model.inputs), 5)
+
+    def test_merged_rate_limited(self) -> None:
+        """Test throttling the merged requests by the rate limiter."""
+        model = ModelManager.get_instance().get_model_by_config_name(
+            "embedding",
+        )
+        model.enable_rate_limiter(max_concurrency=1)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(model, ["a", "bb", "ccc", "dddd"]))
+
+        self.assertEqual(
+            model.rate_limiter.stats["requests"],
+            len(model.inputs),
+        )
+        self.assertEqual(model.rate_limiter.stats["in_flight"], 0)
+
+    def test_merged_error(self) -> None:
+        """Test propagating the error of a merged request to its callers."""
+        model = ModelManager.get_instance().get_model_by_config_name(
+            "embedding",
+        )
+        self.assertRaises(ValueError, model, "error")
+        self.assertEqual(model("ok").embedding, [[2]])
+
+    def tearDown(self) -> None:
+        """Clean up the environment."""
+        for cls in [EchoModelWrapper, BatchEmbeddingModelWrapper]:
+            ModelManager.get_instance().model_wrapper_mapping.pop(
+                cls.model_type,
+            )
+        ASManager.get_instance().flush()
+
+
+if __name__ == "__main__":
+    unittest.main()
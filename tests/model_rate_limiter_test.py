@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the client-side rate limiter of model wrappers."""
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import agentscope
+from agentscope.manager import ASManager, ModelManager
+from agentscope.models import ModelResponse, ModelWrapperBase, RateLimiter
+
+
+class _RateLimitError(Exception):
+    """A mocked rate limit error."""
+
+    status_code = 429
+
+
+class FlakyModelWrapper(ModelWrapperBase):  # pylint: disable=W0223
+    """A model wrapper that fails with rate limit errors for the first
+    `n_failures` calls."""
+
+    model_type: str = "flaky_model"
+
+    def __init__(self, config_name: str, model_name: str, **kwargs: Any):
+        super().__init__(config_name=config_name, model_name=model_name)
+        self.n_failures = kwargs.get("n_failures", 0)
+        self.cnt = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        with self.lock:
+            self.cnt += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failed = self.cnt <= self.n_failures
+
+        time.sleep(0.02)
+
+        with self.lock:
+            self.in_flight -= 1
+
+        if failed:
+            raise _RateLimitError("Too many requests")
+        if kwargs.get("stream", False):
+            return ModelResponse(
+                stream=(_ for _ in ["o", "k"]),
+                stream_delta=True,
+            )
+        return ModelResponse(text="ok")
+
+
+class RateLimiterTest(unittest.TestCase):
+    """Test cases for the rate limiter."""
+
+    def setUp(self) -> None:
+        """Init the environment."""
+        agentscope.init(disable_saving=True)
+        agentscope.register_model_wrapper_class(
+            FlakyModelWrapper,
+            exist_ok=True,
+        )
+
+    def test_requests_per_minute(self) -> None:
+        """Test limiting the requests per minute."""
+        limiter = RateLimiter(requests_per_minute=600)
+
+        # The bucket allows a burst of 10 requests (one second of refilling)
+        for _ in range(10):
+            self.assertLess(limiter.acquire(), 0.01)
+            limiter.release()
+
+        waited = limiter.acquire()
+        self.assertGreater(waited, 0.05)
+        self.assertGreater(limiter.stats["max_wait_time"], 0.05)
+
+    def test_tokens_per_minute(self) -> None:
+        """Test limiting the tokens per minute by the reported usage."""
+        limiter = RateLimiter(tokens_per_minute=6000)
+
+        limiter.acquire()
+        limiter.record_usage(200)
+        limiter.release()
+
+        # 100 tokens in debt, which takes 1 second to be paid back
+        start = time.monotonic()
+        asyncio.run(limiter.acquire_async())
+        self.assertGreater(time.monotonic() - start, 0.8)
+
+    def test_retry_and_aimd(self) -> None:
+        """Test the retry and rate adaptation on rate limit errors."""
+        ModelManager.get_instance().load_model_configs(
+            {
+                "config_name": "flaky",
+                "model_type": "flaky_model",
+                "model_name": "flaky",
+                "n_failures": 1,
+                "rate_limit": {
+                    "requests_per_minute": 6000,
+                    "cooldown": 0.01,
+                    "increase_step": 0.1,
+                },
+            },
+        )
+        model = ModelManager.get_instance().get_model_by_config_name("flaky")
+
+        self.assertEqual(model().text, "ok")
+        self.assertEqual(model.cnt, 2)
+        self.assertEqual(model.rate_limiter.stats["rate_limited"], 1)
+        self.assertAlmostEqual(model.rate_limiter.factor, 0.6)
+
+        # The model wrappers of the same config share the rate limiter
+        another = ModelManager.get_instance().get_model_by_config_name(
+            "flaky",
+            shared=False,
+        )
+        self.assertIs(another.rate_limiter, model.rate_limiter)
+
+    def test_retry_exhausted(self) -> None:
+        """Test raising the error after the retries are exhausted."""
+        model = FlakyModelWrapper("flaky", "flaky", n_failures=10)
+        model.enable_rate_limiter(cooldown=0.01, max_retries=2)
+
+        self.assertRaises(_RateLimitError, model)
+        self.assertEqual(model.cnt, 3)
+
+    def test_max_concurrency(self) -> None:
+        """Test limiting the in-flight requests across threads."""
+        model = FlakyModelWrapper("flaky", "flaky")
+        model.enable_rate_limiter(max_concurrency=2)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: model(), range(8)))
+
+        self.assertEqual(model.cnt, 8)
+        self.assertLessEqual(model.max_in_flight, 2)
+        self.assertEqual(model.rate_limiter.stats["in_flight"], 0)
+
+    def test_streaming_holds_slot(self) -> None:
+        """Test releasing the slot of a streaming call after the stream is
+        consumed or closed."""
+        model = FlakyModelWrapper("flaky", "flaky")
+        model.enable_rate_limiter(max_concurrency=1)
+
+        response = model(stream=True)
+        self.assertEqual(model.rate_limiter.stats["in_flight"], 1)
+        self.assertEqual(response.text, "ok")
+        self.assertEqual(model.rate_limiter.stats["in_flight"], 0)
+
+        deltas = model(stream=True).stream.deltas()
+        next(deltas)
+        self.assertEqual(model.rate_limiter.stats["in_flight"], 1)
+        deltas.close()
+        self.assertEqual(model.rate_limiter.stats["in_flight"], 0)
+
+    def tearDown(self) -> None:
+        """Clean up the environment."""
+        ModelManager.get_instance().model_wrapper_mapping.pop(
+            FlakyModelWrapper.model_type,
+        )
+        ASManager.get_instance().flush()
+
+
+if __name__ == "__main__":
+    unittest.main()
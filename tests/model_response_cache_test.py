@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the response cache of model wrappers."""
+
+import shutil
+import time
+import unittest
+from typing import Any, Optional
+
+import agentscope
+from agentscope.manager import ASManager, ModelManager, MonitorManager
+from agentscope.models import ModelResponse, ModelWrapperBase
+
+
+class CountingModelWrapper(ModelWrapperBase):  # pylint: disable=W0223
+    """A model wrapper that counts its invocations."""
+
+    model_type: str = "counting_model"
+
+    def __init__(self, config_name: str, model_name: str, **kwargs: Any):
+        super().__init__(config_name=config_name, model_name=model_name)
+        self.stream = False
+        self.cnt = 0
+
+    def __call__(
+        self,
+        messages: list[dict],
+        stream: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        self.cnt += 1
+        text = f"response {self.cnt} " * 5
+        if stream:
+
+            def generator() -> Any:
+                for i in range(1, len(text) + 1, 7):
+                    yield text[:i]
+                yield text
+
+            return ModelResponse(stream=generator())
+        return ModelResponse(text=text, raw={"cnt": self.cnt})
+
+
+class ResponseCacheTest(unittest.TestCase):
+    """Test cases for the model response cache."""
+
+    def setUp(self) -> None:
+        """Init the environment."""
+        self.cache_dir = "./tmp_response_cache"
+        agentscope.init(
+            cache_dir=self.cache_dir,
+            save_dir="./test_runs",
+            use_monitor=True,
+        )
+        agentscope.register_model_wrapper_class(
+            CountingModelWrapper,
+            exist_ok=True,
+        )
+        self.messages = [{"role": "user", "content": "hi"}]
+
+    def test_disabled_by_default(self) -> None:
+        """Test the cache is opt-in."""
+        model = CountingModelWrapper("m", "m")
+        model(self.messages)
+        model(self.messages)
+        self.assertEqual(model.cnt, 2)
+
+    def test_memory_and_disk_cache(self) -> None:
+        """Test the in-memory and on-disk tiers."""
+        ModelManager.get_instance().load_model_configs(
+            {
+                "config_name": "counting",
+                "model_type": "counting_model",
+                "model_name": "counting",
+                "response_cache": {"max_size": 2},
+            },
+        )
+        model = ModelManager.get_instance().get_model_by_config_name(
+            "counting",
+        )
+
+        res1 = model(self.messages, temperature=0)
+        res2 = model(self.messages, temperature=0)
+        self.assertEqual(model.cnt, 1)
+        self.assertEqual(res1.text, res2.text)
+        self.assertDictEqual(res2.raw, {"cnt": 1})
+
+        # Different generation arguments miss the cache
+        model(self.messages, temperature=1)
+        self.assertEqual(model.cnt, 2)
+
+        # A new wrapper instance reuses the on-disk tier
+        another = ModelManager.get_instance().get_model_by_config_name(
+            "counting",
+            shared=False,
+        )
+        self.assertEqual(another(self.messages, temperature=0).text, res1.text)
+        self.assertEqual(another.cnt, 0)
+
+        self.assertListEqual(
+            MonitorManager.get_instance().show_response_cache_stats(),
+            [{"config_name": "counting", "hits": 2, "misses": 2}],
+        )
+
+    def test_lru_and_ttl(self) -> None:
+        """Test the LRU eviction and TTL expiration."""
+        model = CountingModelWrapper("lru", "lru")
+        model.enable_response_cache(max_size=1, ttl=0.2, use_disk=False)
+
+        model([{"role": "user", "content": "1"}])
+        model([{"role": "user", "content": "2"}])
+        model([{"role": "user", "content": "1"}])
+        self.assertEqual(model.cnt, 3)
+
+        model([{"role": "user", "content": "1"}])
+        self.assertEqual(model.cnt, 3)
+
+        time.sleep(0.3)
+        model([{"role": "user", "content": "1"}])
+        self.assertEqual(model.cnt, 4)
+
+    def test_stream_replay(self) -> None:
+        """Test caching stream responses and replaying them."""
+        model = CountingModelWrapper("stream", "stream")
+        model.enable_response_cache(use_disk=False)
+
+        res = model(self.messages, stream=True)
+        chunks = [chunk for _, chunk in res.stream]
+        self.assertEqual(model.cnt, 1)
+
+        # Replay as a stream
+        replay = model(self.messages, stream=True)
+        replayed_chunks = list(replay.stream)
+        self.assertEqual(model.cnt, 1)
+        self.assertTrue(replayed_chunks[-1][0])
+        self.assertEqual(replayed_chunks[-1][1], chunks[-1])
+        self.assertTrue(
+            all(chunks[-1].startswith(chunk) for _, chunk in replayed_chunks),
+        )
+
+        # Reuse the stream response in non-stream mode
+        self.assertEqual(model(self.messages).text, chunks[-1])
+        self.assertEqual(model.cnt, 1)
+
+    def tearDown(self) -> None:
+        """Clean up the environment."""
+        ModelManager.get_instance().model_wrapper_mapping.pop(
+            CountingModelWrapper.model_type,
+        )
+        ASManager.get_instance().flush()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        shutil.rmtree("./test_runs", ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the router model wrapper."""
+import time
+import unittest
+from typing import Any
+
+import agentscope
+from agentscope.manager import ASManager, ModelManager
+from agentscope.models import ModelResponse, ModelWrapperBase
+
+
+class EndpointModelWrapper(ModelWrapperBase):  # pylint: disable=W0223
+    """A model wrapper that mocks an endpoint with fixed latency."""
+
+    model_type: str = "endpoint_model"
+
+    def __init__(
+        self,
+        config_name: str,
+        model_name: str,
+        latency: float = 0.0,
+        fail: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(config_name=config_name, model_name=model_name)
+        self.latency = latency
+        self.fail = fail
+        self.cnt = 0
+
+    def __call__(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        self.cnt += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError(f"{self.config_name} is down")
+        return ModelResponse(text=self.config_name)
+
+
+class RouterModelTest(unittest.TestCase):
+    """Test cases for the router model wrapper."""
+
+    def setUp(self) -> None:
+        """Init the environment."""
+        agentscope.init(disable_saving=True)
+        agentscope.register_model_wrapper_class(
+            EndpointModelWrapper,
+            exist_ok=True,
+        )
+
+    def _load_router(self, endpoints: list, **kwargs: Any) -> Any:
+        """Load the router model config and its endpoints."""
+        model_manager = ModelManager.get_instance()
+        model_manager.load_model_configs(
+            [
+                {
+                    "model_type": "endpoint_model",
+                    "model_name": "llama3",
+                    **_,
+                }
+                for _ in endpoints
+            ]
+            + [
+                {
+                    "config_name": "router",
+                    "model_type": "router",
+                    "endpoints": [_["config_name"] for _ in endpoints],
+                    **kwargs,
+                },
+            ],
+            clear_existing=True,
+        )
+        return model_manager.get_model_by_config_name("router")
+
+    def test_least_outstanding(self) -> None:
+        """Test distributing the calls across the endpoints."""
+        router = self._load_router(
+            [{"config_name": "e1"}, {"config_name": "e2"}],
+        )
+        texts = [router().text for _ in range(4)]
+        self.assertEqual(texts.count("e1"), 2)
+        self.assertEqual(texts.count("e2"), 2)
+
+    def test_latency_ewma(self) -> None:
+        """Test preferring the endpoint with lower latency."""
+        router = self._load_router(
+            [
+                {"config_name": "slow", "latency": 0.05},
+                {"config_name": "fast"},
+            ],
+            strategy="latency_ewma",
+        )
+        texts = [router().text for _ in range(6)]
+        self.assertLessEqual(texts.count("slow"), 1)
+
+    def test_failover(self) -> None:
+        """Test failing over to the healthy endpoint."""
+        router = self._load_router(
+            [
+                {"config_name": "down", "fail": True},
+                {"config_name": "up"},
+            ],
+        )
+        self.assertListEqual([router().text for _ in range(4)], ["up"] * 4)
+
+        # The failed endpoint is skipped during the cooldown
+        down = router._endpoints[0].model
+        self.assertEqual(down.cnt, 1)
+
+        stats = {_["config_name"]: _ for _ in router.stats}
+        self.assertFalse(stats["down"]["healthy"])
+        self.assertEqual(stats["up"]["requests"], 4)
+
+    def test_all_failed(self) -> None:
+        """Test raising error when all the endpoints fail."""
+        router = self._load_router(
+            [
+                {"config_name": "down1", "fail": True},
+                {"config_name": "down2", "fail": True},
+            ],
+        )
+        self.assertRaises(RuntimeError, router)
+
+    def test_hedged_requests(self) -> None:
+        """Test reducing the tail latency by hedged requests."""
+        router = self._load_router(
+            [
+                {"config_name": "stuck", "latency": 1.0},
+                {"config_name": "fast"},
+            ],
+            strategy="latency_ewma",
+            hedge_delay=0.05,
+        )
+        start = time.monotonic()
+        texts = {router().text for _ in range(2)}
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertSetEqual(texts, {"fast"})
+        router.close()
+
+    def tearDown(self) -> None:
+        """Clean up the environment."""
+        ModelManager.get_instance().model_wrapper_mapping.pop(
+            EndpointModelWrapper.model_type,
+        )
+        ASManager.get_instance().flush()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the delta streaming of model responses."""
+import io
+import unittest
+from contextlib import redirect_stdout
+from typing import Generator, Optional
+from unittest.mock import patch
+
+import agentscope
+from agentscope.agents import AgentBase
+from agentscope.manager import ASManager
+from agentscope.message import Msg
+from agentscope.models import ModelResponse
+
+
+def _delta_generator(n_tokens: int) -> Generator[str, None, None]:
+    """Generate a stream of increments."""
+    for i in range(n_tokens):
+        yield f"t{i} "
+
+
+def _cumulative_generator(n_tokens: int) -> Generator[str, None, None]:
+    """Generate a stream of accumulated texts as the previous versions."""
+    text = ""
+    for delta in _delta_generator(n_tokens):
+        text += delta
+        yield text
+
+
+class StreamAgent(AgentBase):
+    """An agent that speaks the stream of a model response."""
+
+    def reply(self, x: Optional[Msg] = None) -> Msg:
+        """Speak and return the input message."""
+        self.speak(x)
+        return x
+
+
+class ResponseStreamTest(unittest.TestCase):
+    """Test cases for the delta streaming of model responses."""
+
+    def setUp(self) -> None:
+        """Init the environment."""
+        agentscope.init(disable_saving=True)
+        self.text = "".join(_delta_generator(10))
+
+    def test_deltas(self) -> None:
+        """Test iterating over the increments."""
+        response = ModelResponse(
+            stream=_delta_generator(10),
+            stream_delta=True,
+        )
+        chunks = list(response.stream.deltas())
+
+        self.assertEqual(len(chunks), 10)
+        self.assertListEqual([_[0] for _ in chunks], [False] * 9 + [True])
+        self.assertEqual("".join(_[1] for _ in chunks), self.text)
+        self.assertEqual(response.text, self.text)
+        self.assertTrue(response.is_stream_exhausted)
+
+        # The stream can only be consumed once
+        self.assertRaises(RuntimeError, list, response.stream.deltas())
+
+    def test_accumulated_compatibility(self) -> None:
+        """Test iterating over the accumulated texts as before, for both
+        delta and cumulative generators."""
+        for response in [
+            ModelResponse(stream=_delta_generator(10), stream_delta=True),
+            ModelResponse(stream=_cumulative_generator(10)),
+        ]:
+            chunks = list(response.stream)
+            self.assertListEqual(
+                [_[1] for _ in chunks],
+                list(_cumulative_generator(10)),
+            )
+            self.assertTrue(chunks[-1][0])
+            self.assertEqual(response.text, self.text)
+
+        # The cumulative generator is converted into increments
+        response = ModelResponse(stream=_cumulative_generator(3))
+        self.assertListEqual(
+            list(response.stream.deltas()),
+            [(False, "t0 "), (False, "t1 "), (True, "t2 ")],
+        )
+
+    def test_speak(self) -> None:
+        """Test speaking the stream with hooks and the logger consuming the
+        increments."""
+        agent = StreamAgent("assistant")
+
+        hooked = []
+
+        def pre_speak_hook(
+            _agent: AgentBase,
+            msg: Msg,
+            stream: bool,
+            last: bool,
+        ) -> Msg:
+            hooked.append((msg.id, msg.content, stream, last))
+            msg.content = msg.content.upper()
+            return msg
+
+        agent.register_hook("pre_speak", "upper", pre_speak_hook)
+
+        response = ModelResponse(
+            stream=_delta_generator(10),
+            stream_delta=True,
+        )
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            agent.speak(response.stream)
+
+        # The hooks receive the increments of the same message
+        self.assertEqual(len({_[0] for _ in hooked}), 1)
+        self.assertListEqual(
+            [_[1] for _ in hooked], list(_delta_generator(10))
+        )
+        self.assertTrue(all(_[2] for _ in hooked))
+        self.assertListEqual([_[3] for _ in hooked], [False] * 9 + [True])
+
+        # The modified increments are printed once
+        printed = buffer.getvalue()
+        self.assertEqual(printed.count("T0 "), 1)
+        self.assertTrue(printed.rstrip().endswith(self.text.upper().rstrip()))
+        self.assertEqual(response.text, self.text)
+
+    def test_long_stream_linear_cost(self) -> None:
+        """Test the hooks and the logged messages of a long stream only
+        receive the increments, so that the cost grows linearly with the
+        number of tokens."""
+        agent = StreamAgent("assistant")
+        hooked = []
+        agent.register_hook(
+            "pre_speak",
+            "record",
+            lambda _agent, msg, *args: hooked.append(len(msg.content)),
+        )
+
+        logged = []
+
+        def record_log(msg: Msg, last: bool, delta: str) -> None:
+            logged.append((len(msg.content), len(delta), last))
+
+        n_tokens = 2000
+        text = "".join(_delta_generator(n_tokens))
+        response = ModelResponse(
+            stream=_delta_generator(n_tokens),
+            stream_delta=True,
+        )
+        with patch("agentscope.agents._agent.log_stream_msg", record_log):
+            agent.speak(response.stream)
+        self.assertEqual(response.text, text)
+
+        # Each character is passed to the hooks and printed once
+        self.assertEqual(len(hooked), n_tokens)
+        self.assertEqual(sum(hooked), len(text))
+        self.assertEqual(sum(_[1] for _ in logged), len(text))
+        # Only the last message holds the complete text
+        self.assertEqual(
+            sum(_[0] for _ in logged if not _[2]),
+            len(text) - logged[-1][1],
+        )
+        self.assertEqual(logged[-1][0], len(text))
+
+    def tearDown(self) -> None:
+        """Clean up the environment."""
+        ASManager.get_instance().flush()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -28,6 +28,7 @@ from agentscope.models import (
     OpenAIChatWrapper,
     PostAPIChatWrapper,
     AnthropicChatWrapper,
+    RouterModelWrapper,
 )
 
 
@@ -79,6 +80,7 @@ class BasicModelTest(unittest.TestCase):
                 "litellm_chat": LiteLLMChatWrapper,
                 "yi_chat": YiChatWrapper,
                 "anthropic_chat": AnthropicChatWrapper,
+                "router": RouterModelWrapper,
             },
         )
 
@@ -177,6 +179,60 @@ class BasicModelTest(unittest.TestCase):
             "test_model_wrapper",
         )
 
+    @patch("openai.OpenAI")
+    def test_shared_model_and_lazy_client(
+        self, mock_openai: MagicMock
+    ) -> None:
+        """Test the shared model wrappers and the lazy client creation."""
+        model_manager = ModelManager.get_instance()
+        model_manager.load_model_configs(
+            model_configs={
+                "model_type": "openai_chat",
+                "config_name": "gpt-4",
+                "model_name": "gpt-4",
+                "api_key": "xxx",
+            },
+            clear_existing=True,
+        )
+
+        model1 = model_manager.get_model_by_config_name("gpt-4", shared=True)
+        model2 = model_manager.get_model_by_config_name("gpt-4", shared=True)
+        model3 = model_manager.get_model_by_config_name("gpt-4")
+        self.assertIs(model1, model2)
+        self.assertIsNot(model1, model3)
+        # each model wrapper has its own client lock
+        self.assertIsNot(model1._get_client_lock(), model3._get_client_lock())
+
+        # The client is created on the first access only
+        mock_openai.assert_not_called()
+        self.assertIs(model1.client, model2.client)
+        mock_openai.assert_called_once_with(api_key="xxx", organization=None)
+
+        # Close the shared models
+        client = model1.client
+        model_manager.close_models()
+        client.close.assert_called_once()
+        self.assertIsNot(
+            model_manager.get_model_by_config_name("gpt-4", shared=True),
+            model1,
+        )
+
+        # sharing can be enabled in the model config
+        model_manager.load_model_configs(
+            model_configs={
+                "model_type": "openai_chat",
+                "config_name": "gpt-4",
+                "model_name": "gpt-4",
+                "api_key": "xxx",
+                "shared": True,
+            },
+            clear_existing=True,
+        )
+        self.assertIs(
+            model_manager.get_model_by_config_name("gpt-4"),
+            model_manager.get_model_by_config_name("gpt-4"),
+        )
+
     def tearDown(self) -> None:
         """Clean up the test environment"""
         ASManager.get_instance().flush()
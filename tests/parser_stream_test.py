@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for parsing the streamed model responses incrementally."""
+import unittest
+from typing import Generator, List
+
+from agentscope.models import ModelResponse
+from agentscope.models._model_cache import ResponseCache
+from agentscope.parsers import (
+    MarkdownCodeBlockParser,
+    MarkdownJsonDictParser,
+    MultiTaggedContentParser,
+    RegexTaggedContentParser,
+    TaggedContent,
+)
+
+
+class _Stream:
+    """A stream of increments that records the pulled chunks."""
+
+    def __init__(self, text: str, chunk_size: int = 3) -> None:
+        self.chunks = [
+            text[i : i + chunk_size] for i in range(0, len(text), chunk_size)
+        ]
+        self.pulled: List[str] = []
+        self.closed = False
+
+    def __iter__(self) -> Generator[str, None, None]:
+        try:
+            for chunk in self.chunks:
+                self.pulled.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            self.closed = True
+            raise
+
+    def response(self) -> ModelResponse:
+        """Create a streamed response."""
+        return ModelResponse(stream=iter(self), stream_delta=True)
+
+
+class ParseStreamTest(unittest.TestCase):
+    """Test cases for `parse_stream` of the parsers."""
+
+    def test_json_dict(self) -> None:
+        """Test emitting the members of a JSON dictionary in order, and
+        stopping the stream once the dictionary is closed."""
+        text = (
+            '```json\n{"speak": "Hi, {there}!", "function": [{"name": "f"}]}'
+            "\n```\nTrailing text that is not needed."
+        )
+        stream = _Stream(text)
+        response = stream.response()
+        parser = MarkdownJsonDictParser()
+
+        fields = []
+        for name, value in parser.parse_stream(response):
+            fields.append((name, value, len(stream.pulled)))
+
+        self.assertListEqual(
+            [_[:2] for _ in fields],
+            [("speak", "Hi, {there}!"), ("function", [{"name": "f"}])],
+        )
+        # "speak" is emitted before the "function" field is generated
+        self.assertLess(fields[0][2], fields[1][2])
+        self.assertTrue(stream.closed)
+        self.assertLess(len(stream.pulled), len(stream.chunks))
+        self.assertDictEqual(
+            response.parsed,
+            {"speak": "Hi, {there}!", "function": [{"name": "f"}]},
+        )
+
+    def test_multi_tagged_content(self) -> None:
+        """Test stopping the stream once the required tags are complete."""
+        text = (
+            '<thought>xxx</thought><speak>{"a": 1}</speak>'
+            "<end>true</end> trailing text"
+        )
+        parser = MultiTaggedContentParser(
+            TaggedContent("thought", "<thought>", "", "</thought>"),
+            TaggedContent("speak", "<speak>", "", "</speak>", True),
+            TaggedContent("end", "<end>", "", "</end>", True),
+            keys_allow_missing=["end"],
+        )
+
+        stream = _Stream(text, chunk_size=2)
+        response = stream.response()
+        fields = []
+        for name, value in parser.parse_stream(response):
+            fields.append((name, value, len(stream.pulled)))
+
+        self.assertListEqual(
+            [_[:2] for _ in fields],
+            [("thought", "xxx"), ("speak", {"a": 1})],
+        )
+        self.assertLess(fields[0][2], fields[1][2])
+        self.assertTrue(stream.closed)
+        self.assertNotIn("<end>", response.text)
+        self.assertDictEqual(
+            response.parsed,
+            {"thought": "xxx", "speak": {"a": 1}},
+        )
+
+        # Consume the whole stream without stopping early
+        stream = _Stream(text, chunk_size=2)
+        response = stream.response()
+        fields = list(parser.parse_stream(response, stop_early=False))
+        self.assertListEqual(
+            fields,
+            [("thought", "xxx"), ("speak", {"a": 1}), ("end", True)],
+        )
+        self.assertFalse(stream.closed)
+        self.assertEqual(response.text, text)
+
+    def test_regex_tagged_content(self) -> None:
+        """Test the regex parser with the required keys."""
+        text = "<thought>xxx</thought><speak>hi</speak> trailing text"
+        stream = _Stream(text)
+        response = stream.response()
+        parser = RegexTaggedContentParser(required_keys=["thought", "speak"])
+
+        fields = list(parser.parse_stream(response))
+        self.assertListEqual(fields, [("thought", "xxx"), ("speak", "hi")])
+        self.assertTrue(stream.closed)
+        self.assertDictEqual(
+            response.parsed,
+            {"thought": "xxx", "speak": "hi"},
+        )
+
+    def test_stop_early_through_cache(self) -> None:
+        """Test closing the model stream wrapped by the response cache when
+        stopping early, so that the model wrapper records the invocation and
+        the partial text isn't cached."""
+        text = "<thought>xxx</thought><speak>hi</speak> trailing text"
+        stream = _Stream(text)
+        cache = ResponseCache(use_disk=False)
+        response = cache.record_stream("key", stream.response())
+        parser = RegexTaggedContentParser(required_keys=["thought", "speak"])
+
+        fields = list(parser.parse_stream(response))
+        self.assertListEqual(fields, [("thought", "xxx"), ("speak", "hi")])
+        self.assertTrue(stream.closed)
+        self.assertTrue(response.is_stream_exhausted)
+        self.assertIsNone(cache.get("key"))
+
+        # Close the stream without consuming it
+        stream = _Stream(text)
+        response = stream.response()
+        deltas = response.stream.deltas()
+        next(deltas)
+        response.close()
+        self.assertTrue(stream.closed)
+        self.assertEqual(response.text, "".join(stream.pulled[:-1]))
+
+    def test_code_block(self) -> None:
+        """Test the code block parser."""
+        stream = _Stream("```python\nprint('hi')\n```\nThat's all.")
+        response = stream.response()
+        parser = MarkdownCodeBlockParser("python")
+
+        fields = list(parser.parse_stream(response))
+        self.assertListEqual(fields, [("python block", "\nprint('hi')\n")])
+        self.assertEqual(response.parsed, "\nprint('hi')\n")
+
+    def test_non_stream(self) -> None:
+        """Test falling back to `parse` for the non-streamed responses."""
+        parser = MarkdownJsonDictParser()
+        response = ModelResponse(text='```json\n{"a": 1, "b": 2}\n```')
+        self.assertListEqual(
+            list(parser.parse_stream(response)),
+            [("a", 1), ("b", 2)],
+        )
+
+        # The parsing errors are raised as `parse`
+        response = ModelResponse(text='```json\n{a: 1}\n```')
+        with self.assertRaises(Exception):
+            list(parser.parse_stream(response))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the retrieval of the RAG agent
+"""
+import os
+import shutil
+import time
+import unittest
+from typing import Any
+from unittest.mock import MagicMock
+
+import agentscope
+from agentscope.agents import LlamaIndexAgent
+from agentscope.manager import ASManager
+from agentscope.message import Msg
+from agentscope.models import ModelResponse
+from agentscope.rag import Knowledge, RetrievedChunk
+
+
+class StaticKnowledge(Knowledge):
+    """Dummy knowledge returning the given chunks after a delay"""
+
+    knowledge_type = "static_knowledge"
+
+    def __init__(
+        self,
+        knowledge_id: str,
+        chunks: list[RetrievedChunk],
+        delay: float = 0.0,
+    ) -> None:
+        super().__init__(knowledge_id=knowledge_id)
+        self.chunks = chunks
+        self.delay = delay
+
+    def _init_rag(self, **kwargs: Any) -> Any:
+        pass
+
+    def retrieve(
+        self,
+        query: Any,
+        similarity_top_k: int = None,
+        to_list_strs: bool = False,
+        **kwargs: Any,
+    ) -> list[Any]:
+        time.sleep(self.delay)
+        return list(self.chunks)
+
+
+class RAGAgentTest(unittest.TestCase):
+    """
+    Test cases for the retrieval of the RAG agent
+    """
+
+    def setUp(self) -> None:
+        """Set up the knowledge"""
+        agentscope.init(disable_saving=True)
+        self.knowledge_list = [
+            StaticKnowledge(
+                "knowledge_a",
+                [
+                    RetrievedChunk(score=0.9, content="a", hash="a"),
+                    RetrievedChunk(score=0.5, content="b", hash="b"),
+                    RetrievedChunk(score=0.7, content="d", hash="d"),
+                ],
+                delay=0.2,
+            ),
+            StaticKnowledge(
+                "knowledge_b",
+                [
+                    # the scores of the reciprocal rank fusion
+                    RetrievedChunk(score=0.03, content="c", hash="c"),
+                    RetrievedChunk(score=0.01, content="b", hash="b"),
+                ],
+                delay=0.2,
+            ),
+        ]
+
+    def test_concurrent_retrieval(self) -> None:
+        """Test retrieving from the knowledge concurrently and ordering the
+        merged chunks by the normalized scores"""
+        agent = LlamaIndexAgent(
+            name="rag_agent",
+            sys_prompt="",
+            model_config_name=None,
+            knowledge_list=self.knowledge_list,
+        )
+        start = time.perf_counter()
+        chunks = agent.retrieve("query")
+        self.assertLess(time.perf_counter() - start, 0.35)
+        self.assertListEqual(
+            [(_.content, _.score) for _ in chunks],
+            [("a", 0.9), ("c", 0.03), ("d", 0.7), ("b", 0.5)],
+        )
+
+        # the executor is reused by the following retrievals
+        executor = agent._retrieval_executor
+        agent.retrieve("query")
+        self.assertIs(agent._retrieval_executor, executor)
+
+    def test_relevance_check(self) -> None:
+        """Test the relevance check in reply is decided by the raw scores
+        with multiple knowledge"""
+        agent = LlamaIndexAgent(
+            name="rag_agent",
+            sys_prompt="",
+            model_config_name=None,
+            knowledge_list=self.knowledge_list,
+            log_retrieval=False,
+        )
+        agent.model = MagicMock()
+        agent.model.format.side_effect = lambda *msgs: msgs
+        agent.model.return_value = ModelResponse(text="YES")
+        agent.speak = MagicMock()
+
+        # the top chunk scores 0.9, so that the model isn't asked for the
+        # relevance of the retrieved chunks
+        agent(Msg("user", "query", "user"))
+        self.assertEqual(agent.model.call_count, 1)
+
+        # the top normalized score is still 1.0, but the raw scores are low
+        self.knowledge_list[0].chunks = [
+            RetrievedChunk(score=0.3, content="a", hash="a"),
+            RetrievedChunk(score=0.2, content="d", hash="d"),
+        ]
+        agent.model.reset_mock()
+        agent(Msg("user", "query", "user"))
+        self.assertEqual(agent.model.call_count, 2)
+
+    def test_empty_knowledge(self) -> None:
+        """Test retrieving without knowledge"""
+        agent = LlamaIndexAgent(
+            name="rag_agent",
+            sys_prompt="",
+            model_config_name=None,
+            retrieval_timeout=1.0,
+        )
+        self.assertListEqual(agent.retrieve("query"), [])
+
+    def test_retrieval_timeout(self) -> None:
+        """Test skipping the knowledge timed out"""
+        self.knowledge_list[1].delay = 2.0
+        agent = LlamaIndexAgent(
+            name="rag_agent",
+            sys_prompt="",
+            model_config_name=None,
+            knowledge_list=self.knowledge_list,
+            retrieval_timeout=1.0,
+        )
+        self.assertListEqual(
+            [_.content for _ in agent.retrieve("query")],
+            ["a", "d", "b"],
+        )
+
+    def test_rerank(self) -> None:
+        """Test re-ranking the merged chunks in batches"""
+        batches = []
+
+        def reranker(query: str, chunks: list) -> list:
+            batches.append([_.content for _ in chunks])
+            return [float(len(query) + ord(_.content)) for _ in chunks]
+
+        agent = LlamaIndexAgent(
+            name="rag_agent",
+            sys_prompt="",
+            model_config_name=None,
+            knowledge_list=self.knowledge_list,
+            reranker=reranker,
+            rerank_batch_size=2,
+        )
+        self.assertListEqual(
+            [_.content for _ in agent.retrieve("query")],
+            ["d", "c", "b", "a"],
+        )
+        self.assertListEqual(batches, [["a", "b"], ["d", "c"]])
+        # the chunks of the knowledge are not modified
+        self.assertEqual(self.knowledge_list[0].chunks[0].score, 0.9)
+
+    def tearDown(self) -> None:
+        """Clean up before & after tests."""
+        ASManager.get_instance().flush()
+        if os.path.exists("./runs"):
+            shutil.rmtree("./runs")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the acting of the ReActAgentV2
+"""
+import os
+import shutil
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pydantic import BaseModel
+
+import agentscope
+from agentscope.agents import ReActAgentV2
+from agentscope.manager import ASManager
+from agentscope.message import Msg
+from agentscope.models import ModelResponse, OpenAIChatWrapper
+from agentscope.service import (
+    ServiceExecStatus,
+    ServiceResponse,
+    ServiceToolkit,
+)
+
+
+def search(query: str) -> ServiceResponse:
+    """Search the web.
+
+    Args:
+        query (`str`):
+            The query to search.
+    """
+    return ServiceResponse(
+        status=ServiceExecStatus.SUCCESS,
+        content=f"result of {query}",
+    )
+
+
+class Answer(BaseModel):
+    """The structured output"""
+
+    answer: str
+
+
+class ReActAgentV2Test(unittest.TestCase):
+    """
+    Test cases for the acting of the ReActAgentV2
+    """
+
+    def setUp(self) -> None:
+        """Set up the agent"""
+        agentscope.init(
+            disable_saving=True,
+            model_configs={
+                "model_type": "openai_chat",
+                "config_name": "gpt-4",
+                "model_name": "gpt-4",
+                "api_key": "xxx",
+            },
+        )
+
+    def tearDown(self) -> None:
+        """Clean up before & after tests."""
+        ASManager.get_instance().flush()
+        if os.path.exists("./runs"):
+            shutil.rmtree("./runs")
+
+    @patch("openai.OpenAI")
+    def test_parallel_structured_output(self, _: MagicMock) -> None:
+        """Test finishing the reply after a non-finish tool call and the
+        finish function in one parallel batch with structured output"""
+        service_toolkit = ServiceToolkit()
+        service_toolkit.add(search)
+        agent = ReActAgentV2(
+            name="assistant",
+            model_config_name="gpt-4",
+            service_toolkit=service_toolkit,
+            verbose=False,
+            parallel_tool_calls=True,
+        )
+
+        response = ModelResponse(
+            tool_calls=[
+                {
+                    "type": "tool_use",
+                    "id": "1",
+                    "name": "search",
+                    "input": {"query": "agentscope"},
+                },
+                {
+                    "type": "tool_use",
+                    "id": "2",
+                    "name": "generate_response",
+                    "input": {"response": "done", "answer": "42"},
+                },
+            ],
+        )
+        with patch.object(
+            OpenAIChatWrapper,
+            "__call__",
+            return_value=response,
+        ):
+            msg = agent(
+                Msg("user", "What's agentscope?", "user"),
+                structured_model=Answer,
+            )
+
+        self.assertEqual(msg.content, "done")
+        self.assertDictEqual(msg.metadata, {"answer": "42"})
+        # both the tool results are recorded in order
+        results = [
+            block["output"]
+            for memory_msg in agent.memory.get_memory()
+            if memory_msg.role == "system"
+            for block in memory_msg.content
+        ]
+        self.assertEqual(len(results), 2)
+        self.assertIn("result of agentscope", str(results[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,13 @@ from datetime import datetime
 import unittest
 from typing import Any
 
-from agentscope.service import retrieve_from_list, cos_sim
+import numpy as np
+
+from agentscope.service import (
+    retrieve_from_list,
+    retrieve_from_embeddings,
+    cos_sim,
+)
 from agentscope.service.service_status import ServiceExecStatus
 from agentscope.message import Msg
 from agentscope.memory.temporary_memory import TemporaryMemory
@@ -82,6 +88,50 @@ class TestRetrieval(unittest.TestCase):
         self.assertEqual(retrieved.status, ServiceExecStatus.SUCCESS)
         self.assertEqual(retrieved.content[0][2], m1)
 
+    def test_retrieve_from_embeddings(self) -> None:
+        """test the vectorised retrieval against the generic one"""
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(50, 8)).tolist()
+        knowledge = [f"doc{i}" for i in range(50)]
+        queries = rng.normal(size=(3, 8))
+
+        for top_k in [None, 0, 5, 50]:
+            for preserve_order in [True, False]:
+                batch = retrieve_from_embeddings(
+                    queries,
+                    embeddings,
+                    top_k=top_k,
+                    knowledge=knowledge,
+                    preserve_order=preserve_order,
+                )
+                self.assertEqual(batch.status, ServiceExecStatus.SUCCESS)
+                for query, retrieved in zip(queries, batch.content):
+                    expected = retrieve_from_list(
+                        query.tolist(),
+                        list(zip(embeddings, knowledge)),
+                        lambda q, x: cos_sim(q, x[0]).content,
+                        top_k=top_k,
+                        preserve_order=preserve_order,
+                    ).content
+                    self.assertListEqual(
+                        [(i, obj) for _, i, obj in retrieved],
+                        [(i, obj[1]) for _, i, obj in expected],
+                    )
+                    np.testing.assert_allclose(
+                        [score for score, _, _ in retrieved],
+                        [score for score, _, _ in expected],
+                        rtol=1e-5,
+                    )
+
+        # a single query with the embeddings as the results
+        retrieved = retrieve_from_embeddings([1.0, 0.0], [[0.0, 1.0], [2, 0]])
+        self.assertListEqual(
+            retrieved.content,
+            [(0.0, 0, [0.0, 1.0]), (1.0, 1, [2, 0])],
+        )
+        retrieved = retrieve_from_embeddings([1.0, 0.0], [[1.0, 0.0, 0.0]])
+        self.assertEqual(retrieved.status, ServiceExecStatus.ERROR)
+
 
 # This allows the tests to be run from the command line
 if __name__ == "__main__":
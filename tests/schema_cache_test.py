@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Unit test for caching the pydantic schemas and the tool function
+schemas."""
+import unittest
+from unittest.mock import patch
+
+from pydantic import BaseModel, Field, create_model
+
+from agentscope.exception import JsonParsingError
+from agentscope.models import ModelResponse
+from agentscope.parsers import MarkdownJsonDictParser
+from agentscope.service import ServiceToolkit
+from agentscope.utils import schema_utils
+from agentscope.utils.schema_utils import (
+    clear_schema_cache,
+    get_json_schema,
+    get_type_adapter,
+)
+
+
+class Answer(BaseModel):
+    """The structured output for testing."""
+
+    speak: str = Field(description="what you speak")
+    score: int = Field(description="the score", ge=0)
+
+
+def search(query: str, num_results: int = 10, api_key: str = "") -> None:
+    """Search the query.
+
+    Args:
+        query (`str`):
+            The query.
+        num_results (`int`):
+            The number of results.
+        api_key (`str`):
+            The API key.
+    """
+
+
+class SchemaCacheTest(unittest.TestCase):
+    """Unit test for caching the pydantic schemas and the tool function
+    schemas."""
+
+    def setUp(self) -> None:
+        """Clear the caches."""
+        clear_schema_cache()
+        ServiceToolkit.clear_cache()
+
+    def test_pydantic_schema(self) -> None:
+        """Test generating the schema and validator once per class."""
+        with patch.object(
+            Answer,
+            "model_json_schema",
+            wraps=Answer.model_json_schema,
+        ) as mock_schema:
+            schema = get_json_schema(Answer)
+            schema["properties"].clear()
+            self.assertIn("speak", get_json_schema(Answer)["properties"])
+            self.assertEqual(mock_schema.call_count, 1)
+
+        self.assertIs(get_type_adapter(Answer), get_type_adapter(Answer))
+
+    def test_parser(self) -> None:
+        """Test the parsers created per turn share the cached instruction
+        and validator."""
+        parsers = [MarkdownJsonDictParser(content_hint=Answer) for _ in "ab"]
+        self.assertIs(
+            parsers[0].format_instruction,
+            parsers[1].format_instruction,
+        )
+        self.assertIn("'speak'", parsers[0].format_instruction)
+        self.assertEqual(
+            schema_utils.format_schema_instruction.cache_info().misses,
+            1,
+        )
+
+        res = parsers[1].parse(
+            ModelResponse(text='```json\n{"speak": "Hi", "score": "3"}\n```'),
+        )
+        self.assertDictEqual(res.parsed, {"speak": "Hi", "score": 3})
+
+        with self.assertRaises(JsonParsingError):
+            parsers[0].parse(
+                ModelResponse(
+                    text='```json\n{"speak": "Hi", "score": -1}\n```',
+                ),
+            )
+
+    def test_tool_schema(self) -> None:
+        """Test caching the JSON schemas of the tool functions."""
+        with patch(
+            "agentscope.service.service_toolkit.create_model",
+            wraps=create_model,
+        ) as mock_create:
+            func1, schema1 = ServiceToolkit.get(search, api_key="xxx")
+            _, schema2 = ServiceToolkit.get(search, api_key="yyy")
+            self.assertEqual(mock_create.call_count, 1)
+
+            # The returned schema can be modified safely
+            self.assertEqual(schema1, schema2)
+            self.assertIsNot(schema1, schema2)
+            schema1["function"]["parameters"]["properties"].clear()
+            _, schema3 = ServiceToolkit.get(search, api_key="zzz")
+            self.assertEqual(schema2, schema3)
+            self.assertEqual(mock_create.call_count, 1)
+
+            # Different preset arguments generate different schemas
+            _, schema4 = ServiceToolkit.get(search)
+            self.assertEqual(mock_create.call_count, 2)
+            self.assertIn(
+                "api_key",
+                schema4["function"]["parameters"]["properties"],
+            )
+            self.assertNotIn(
+                "api_key",
+                schema2["function"]["parameters"]["properties"],
+            )
+
+        self.assertEqual(func1.keywords, {"api_key": "xxx"})
+
+
+if __name__ == "__main__":
+    unittest.main()
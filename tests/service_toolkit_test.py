@@ -5,6 +5,7 @@ import asyncio
 import json
 import os
 import sys
+import time
 import unittest
 import threading
 from typing import Literal
@@ -17,8 +18,10 @@ from agentscope.service import (
     execute_python_code,
     retrieve_from_list,
     query_mysql,
+    ServiceToolkit,
+    ServiceResponse,
+    ServiceExecStatus,
 )
-from agentscope.service import ServiceToolkit
 from agentscope.message import ToolUseBlock
 
 
@@ -392,6 +395,122 @@ The following tool functions are available in the format of
         """Test the mcp tool in the main async context."""
         asyncio.run(self.async_run_mcp_tool_test())
 
+    def test_mcp_tool_shared_session(self) -> None:
+        """Test sharing the MCP session across threads and event loops."""
+        if not sys.version_info >= (3, 10):
+            self.skipTest(
+                "`test_mcp_tool_shared_session` is skipped for Python "
+                "versions < 3.10",
+            )
+        service_toolkit = ServiceToolkit()
+        service_toolkit.add_mcp_servers(
+            server_configs={
+                "mcpServers": {
+                    "echo_mcp_server": {
+                        "command": "python",
+                        "args": [
+                            os.path.join(
+                                os.path.abspath(os.path.dirname(__file__)),
+                                "custom",
+                                "echo_mcp_server.py",
+                            ),
+                        ],
+                    },
+                },
+            },
+        )
+        tool_calls = [
+            ToolUseBlock(
+                type="tool_use",
+                id=str(i),
+                name="echo",
+                input={"text": f"Hi {i}"},
+            )
+            for i in range(4)
+        ]
+
+        # From the child threads
+        outputs = {}
+
+        def thread_target(index: int) -> None:
+            res = service_toolkit.parse_and_call_func(
+                tool_calls[index],
+                tools_api_mode=True,
+            )
+            outputs[index] = res.content[0]["output"][0]["text"]
+
+        threads = [
+            threading.Thread(target=thread_target, args=(i,))
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertDictEqual(outputs, {i: f"Hi {i}" for i in range(4)})
+
+        # From a running event loop without nesting it
+        res = asyncio.run(
+            service_toolkit.parse_and_call_func_async(
+                tool_calls,
+                tools_api_mode=True,
+                parallel=True,
+            ),
+        )
+        self.assertListEqual(
+            [_["output"][0]["text"] for _ in res.content],
+            [f"Hi {i}" for i in range(4)],
+        )
+
+    def test_parse_and_call_func_async(self) -> None:
+        """Test executing the tool calls asynchronously."""
+
+        def echo(text: str) -> ServiceResponse:
+            """Echo the text.
+
+            Args:
+                text (`str`):
+                    The text to echo.
+            """
+            return ServiceResponse(ServiceExecStatus.SUCCESS, text)
+
+        async def async_sleep(seconds: float) -> ServiceResponse:
+            """Sleep asynchronously.
+
+            Args:
+                seconds (`float`):
+                    The seconds to sleep.
+            """
+            await asyncio.sleep(seconds)
+            return ServiceResponse(ServiceExecStatus.SUCCESS, "done")
+
+        service_toolkit = ServiceToolkit()
+        service_toolkit.add(echo)
+        service_toolkit.add(async_sleep)
+
+        res = asyncio.run(
+            service_toolkit.parse_and_call_func_async(
+                [
+                    ToolUseBlock(
+                        type="tool_use",
+                        id="0",
+                        name="async_sleep",
+                        input={"seconds": 3},
+                    ),
+                    ToolUseBlock(
+                        type="tool_use",
+                        id="1",
+                        name="echo",
+                        input={"text": "Hi"},
+                    ),
+                ],
+                tools_api_mode=True,
+                timeout=0.5,
+            ),
+        )
+        self.assertIn("TimeoutError", res.content[0]["output"])
+        self.assertEqual(res.content[1]["output"], "Hi")
+
     def test_service_toolkit(self) -> None:
         """Test the object of ServiceToolkit."""
         service_toolkit = ServiceToolkit()
@@ -429,6 +548,137 @@ The following tool functions are available in the format of
             },
         )
 
+    def test_parallel_call(self) -> None:
+        """Test executing the tool calls concurrently."""
+
+        def sleep_echo(text: str, seconds: float) -> ServiceResponse:
+            """Echo the text after sleeping.
+
+            Args:
+                text (`str`):
+                    The text to echo.
+                seconds (`float`):
+                    The seconds to sleep.
+            """
+            time.sleep(seconds)
+            return ServiceResponse(ServiceExecStatus.SUCCESS, text)
+
+        async def async_sleep_echo(
+            text: str,
+            seconds: float,
+        ) -> ServiceResponse:
+            """Echo the text after sleeping asynchronously.
+
+            Args:
+                text (`str`):
+                    The text to echo.
+                seconds (`float`):
+                    The seconds to sleep.
+            """
+            await asyncio.sleep(seconds)
+            return ServiceResponse(ServiceExecStatus.SUCCESS, text)
+
+        service_toolkit = ServiceToolkit()
+        service_toolkit.add(sleep_echo)
+        service_toolkit.add(async_sleep_echo)
+
+        tool_calls = [
+            ToolUseBlock(
+                type="tool_use",
+                id=str(i),
+                name=name,
+                input={"text": str(i), "seconds": 0.5},
+            )
+            for i, name in enumerate(
+                ["sleep_echo", "async_sleep_echo"] * 2 + ["not_exist"],
+            )
+        ]
+
+        start = time.time()
+        res = service_toolkit.parse_and_call_func(
+            tool_calls,
+            tools_api_mode=True,
+            parallel=True,
+        )
+        self.assertLess(time.time() - start, 1.5)
+        self.assertListEqual(
+            [_["id"] for _ in res.content],
+            ["0", "1", "2", "3", "4"],
+        )
+        self.assertListEqual(
+            [_["output"] for _ in res.content[:4]],
+            ["0", "1", "2", "3"],
+        )
+        self.assertIn("FunctionNotFoundError", res.content[4]["output"])
+
+        # Timeout
+        for call in tool_calls[:4]:
+            call["input"]["seconds"] = 0.5 if int(call["id"]) < 2 else 3
+        res = service_toolkit.parse_and_call_func(
+            tool_calls[:4],
+            tools_api_mode=True,
+            parallel=True,
+            max_workers=2,
+            timeout=1,
+        )
+        self.assertListEqual(
+            [_["output"] for _ in res.content[:2]],
+            ["0", "1"],
+        )
+        for block in res.content[2:]:
+            self.assertIn("TimeoutError", block["output"])
+
+        # More calls than workers, where the queued ones time out as well
+        for call in tool_calls[:4]:
+            call["input"]["seconds"] = 3
+        start = time.time()
+        res = service_toolkit.parse_and_call_func(
+            tool_calls[:4],
+            tools_api_mode=True,
+            parallel=True,
+            max_workers=1,
+            timeout=1,
+        )
+        self.assertLess(time.time() - start, 2)
+        for block in res.content:
+            self.assertIn("TimeoutError", block["output"])
+
+        async def _call_async() -> tuple:
+            # Measured in the event loop, since `asyncio.run` waits for the
+            # timed-out sync functions in its threads on shutdown
+            start = time.time()
+            res = await service_toolkit.parse_and_call_func_async(
+                tool_calls[:4],
+                tools_api_mode=True,
+                parallel=True,
+                max_workers=1,
+                timeout=1,
+            )
+            return res, time.time() - start
+
+        res, elapsed = asyncio.run(_call_async())
+        self.assertLess(elapsed, 2)
+        for block in res.content:
+            self.assertIn("TimeoutError", block["output"])
+
+    def test_truncated_arguments(self) -> None:
+        """Test the truncated arguments are not repaired and executed."""
+        service_toolkit = ServiceToolkit()
+        service_toolkit.add(bing_search, api_key="xxx", num_results=3)
+
+        res = service_toolkit.parse_and_call_func(
+            [
+                ToolUseBlock(
+                    type="tool_use",
+                    id="0",
+                    name="bing_search",
+                    input='{"question": "What is Agent',
+                ),
+            ],
+            tools_api_mode=True,
+        )
+        self.assertIn("FunctionCallFormatError", res.content[0]["output"])
+
     def test_multi_tagged_content(self) -> None:
         """Test multi tagged content"""
 
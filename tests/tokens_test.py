@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 """Unit tests for token counting."""
 import json
+import os
+import shutil
+import tempfile
 import unittest
 from http import HTTPStatus
+from importlib.util import find_spec
 from unittest.mock import patch, MagicMock
 
 from agentscope.tokens import (
@@ -13,6 +17,11 @@ from agentscope.tokens import (
     count,
     supported_models,
     count_huggingface_tokens,
+    count_many,
+    clear_cache,
+    count_approximate_tokens,
+    local_tokens_counter,
+    _count_message_tokens,
 )
 
 
@@ -80,6 +89,62 @@ class TokenCountTest(unittest.TestCase):
         n_tokens = count_openai_tokens("gpt-4o", self.messages_openai_vision)
         self.assertEqual(n_tokens, 186)
 
+    def test_openai_token_counting_cache(self) -> None:
+        """Test reusing the cached tokenizer and message token counts."""
+        clear_cache()
+        with patch("tiktoken.encoding_for_model") as mock_encoding:
+            mock_encoding.return_value.encode.side_effect = lambda _: [
+                0
+            ] * len(
+                _,
+            )
+            count_openai_tokens("gpt-4o", self.messages)
+            n_encoded = mock_encoding.return_value.encode.call_count
+
+            # A growing history only encodes the new message
+            count_openai_tokens(
+                "gpt-4o",
+                self.messages + [{"role": "user", "content": "Good."}],
+            )
+
+        self.assertEqual(mock_encoding.call_count, 1)
+        self.assertEqual(
+            mock_encoding.return_value.encode.call_count,
+            n_encoded + 2,
+        )
+        clear_cache()
+
+    def test_message_tokens_cache(self) -> None:
+        """Test caching the token counts of the messages that are not JSON
+        serializable, and recounting the messages with replaced fields."""
+        clear_cache()
+        count_func = MagicMock(side_effect=lambda _: len(str(_["content"])))
+        message = {"role": "user", "content": b"Hello"}
+
+        self.assertEqual(_count_message_tokens("ns", message, count_func), 8)
+        self.assertEqual(_count_message_tokens("ns", message, count_func), 8)
+        self.assertEqual(count_func.call_count, 1)
+
+        message["content"] = "Hi"
+        self.assertEqual(_count_message_tokens("ns", message, count_func), 2)
+        self.assertEqual(count_func.call_count, 2)
+        clear_cache()
+
+    @patch("tiktoken.encoding_for_model")
+    def test_count_many(self, mock_encoding: MagicMock) -> None:
+        """Test counting a batch of message lists."""
+        clear_cache()
+        mock_encoding.return_value.encode.side_effect = lambda _: [0] * len(
+            _,
+        )
+        messages_list = [self.messages_openai, self.messages, []]
+        expected = [count("gpt-4o", _) for _ in messages_list]
+
+        self.assertListEqual(count_many("gpt-4o", messages_list), expected)
+        self.assertEqual(expected[-1], 3)
+        self.assertRaises(TypeError, count_many, "gpt-4o", "Hello")
+        clear_cache()
+
     @patch("dashscope.Tokenization.call")
     def test_dashscope_token_counting(self, mock_call: MagicMock) -> None:
         """Test Dashscope token counting functions."""
@@ -128,5 +193,103 @@ class TokenCountTest(unittest.TestCase):
         self.assertEqual(n_tokens, 34)
 
 
+class LocalTokenCountTest(unittest.TestCase):
+    """Unit test for the offline token counting."""
+
+    def setUp(self) -> None:
+        """Init the messages and the recorded counts of the remote APIs."""
+        clear_cache()
+        self.messages = [
+            {"role": "system", "content": "You're a helpful assistant."},
+            {"role": "user", "content": "Hello, how are you?"},
+            {"role": "assistant", "content": "I'm fine, thank you."},
+        ]
+        self.messages_gemini = [
+            {"role": _["role"], "parts": _["content"]} for _ in self.messages
+        ]
+        # The counts returned by the remote counting APIs
+        self.recorded = [
+            ("qwen-max", self.messages, 21),
+            ("gemini-1.5-pro", self.messages_gemini, 24),
+        ]
+        self.tmpdir = tempfile.mkdtemp()
+
+    def _save_tokenizer(self) -> str:
+        """Save a whitespace word-level tokenizer file for testing."""
+        from tokenizers import Tokenizer, models, pre_tokenizers
+
+        vocab = {"[UNK]": 0, "hello": 1, "world": 2}
+        tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+        tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+
+        path = os.path.join(self.tmpdir, "tokenizer.json")
+        tokenizer.save(path)
+        return path
+
+    def test_approximation_parity(self) -> None:
+        """Test the approximation against the recorded API counts."""
+        counter = local_tokens_counter()
+        for model_name, messages, expected in self.recorded:
+            n_tokens = counter(model_name, messages)
+            self.assertLessEqual(
+                abs(n_tokens - expected),
+                expected * 0.2,
+                f"{model_name}: {n_tokens} vs {expected}",
+            )
+
+        self.assertEqual(count_approximate_tokens("你好，世界 2024"), 9)
+        self.assertEqual(count_approximate_tokens(""), 0)
+
+    @unittest.skipUnless(
+        find_spec("tokenizers") is not None,
+        "The package `tokenizers` is not installed.",
+    )
+    def test_local_tokenizer(self) -> None:
+        """Test counting the texts of the messages by a local tokenizer
+        file, which splits the texts by whitespace."""
+        path = self._save_tokenizer()
+        # The number of whitespace-separated words
+        n_words = sum(len(_["content"].split()) for _ in self.messages)
+
+        counter = local_tokens_counter(path)
+        self.assertEqual(counter("qwen-max", self.messages), n_words)
+        self.assertEqual(
+            counter("gemini-1.5-pro", self.messages_gemini),
+            n_words,
+        )
+
+        # Load from the directory with the per-message overhead
+        counter = local_tokens_counter(self.tmpdir, tokens_per_message=5)
+        self.assertEqual(
+            counter("qwen-max", self.messages),
+            n_words + 5 * len(self.messages),
+        )
+
+        # Only the texts of the multimodal content are counted
+        self.assertEqual(
+            counter(
+                "qwen-vl-max",
+                [
+                    {
+                        "role": "user",
+                        "content": [{"image": "a.png"}, {"text": "hello"}],
+                    },
+                ],
+            ),
+            6,
+        )
+
+        self.assertRaises(
+            FileNotFoundError,
+            local_tokens_counter,
+            os.path.join(self.tmpdir, "missing.json"),
+        )
+
+    def tearDown(self) -> None:
+        """Clean up the environment."""
+        clear_cache()
+        shutil.rmtree(self.tmpdir)
+
+
 if __name__ == "__main__":
     unittest.main()